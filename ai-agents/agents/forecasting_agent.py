@@ -8,6 +8,7 @@ advanced statistical models, machine learning, and economic indicators.
 
 from typing import Dict, Any, List, Optional, Union, Tuple
 import asyncio
+import importlib.util
 import json
 import numpy as np
 import pandas as pd
@@ -16,10 +17,31 @@ from dataclasses import dataclass
 from enum import Enum
 import statistics
 import math
+import sys
+from pathlib import Path
 
 from ..core.agent_base import FinancialAgent, AgentType, AgentTask
 from langchain_core.prompts import ChatPromptTemplate
 
+# The Monte Carlo engine lives in the financial engine (financial-engine/core),
+# which is not an importable package name; it has no engine dependencies, so
+# the module is loaded from its file the first time a simulation runs
+MONTE_CARLO_PATH = Path(__file__).resolve().parents[2] / "financial-engine" / "core" / "monte_carlo.py"
+_MONTE_CARLO_MODULE = "finclick_monte_carlo"
+
+
+def _load_monte_carlo():
+    """Import the financial engine's Monte Carlo module on first use"""
+    module = sys.modules.get(_MONTE_CARLO_MODULE)
+    if module is None:
+        if not MONTE_CARLO_PATH.exists():
+            raise ImportError(f"Monte Carlo engine not found at {MONTE_CARLO_PATH}")
+        spec = importlib.util.spec_from_file_location(_MONTE_CARLO_MODULE, MONTE_CARLO_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        sys.modules[_MONTE_CARLO_MODULE] = module
+    return module
+
 
 class ForecastHorizon(Enum):
     """Forecast time horizons"""
@@ -646,38 +668,47 @@ class ForecastingAgent(FinancialAgent):
 
     async def monte_carlo_simulation(self, base_forecast: float,
                                    volatility: float,
-                                   num_simulations: int = 10000) -> Dict[str, Any]:
+                                   num_simulations: int = 10000,
+                                   seed: Optional[int] = None) -> Dict[str, Any]:
         """
         Perform Monte Carlo simulation for forecast uncertainty
         إجراء محاكاة مونت كارلو لعدم اليقين في التنبؤات
+
+        Shocks are drawn in antithetic pairs and reduced chunk by chunk, so
+        large simulation counts run in bounded memory; pass `seed` for
+        reproducible results.
         """
         try:
-            simulations = []
+            monte_carlo = _load_monte_carlo()
+            engine = monte_carlo.MonteCarloEngine(seed, antithetic=True)
 
-            for _ in range(num_simulations):
-                # Generate random shock using normal distribution
-                random_shock = np.random.normal(0, volatility)
-                simulated_value = base_forecast * (1 + random_shock)
-                simulations.append(max(0, simulated_value))  # Ensure non-negative
+            # Random shocks from a normal distribution, floored at zero
+            simulations = (
+                np.maximum(base_forecast * (1 + shocks), 0)
+                for shocks in engine.normal_draws(num_simulations, 0, volatility)
+            )
+            summary = monte_carlo.summarize_paths(
+                simulations,
+                num_simulations,
+                percentiles=(5, 25, 75, 95),
+                thresholds={
+                    "prob_above_base": ("above", base_forecast),
+                    "prob_below_80pct": ("below", base_forecast * 0.8),
+                    "prob_above_120pct": ("above", base_forecast * 1.2)
+                }
+            )
 
             # Calculate statistics
             simulation_results = {
-                "mean": statistics.mean(simulations),
-                "median": statistics.median(simulations),
-                "std_dev": statistics.stdev(simulations),
-                "min_value": min(simulations),
-                "max_value": max(simulations),
+                "mean": summary["mean"],
+                "median": summary["median"],
+                "std_dev": summary["std_dev"],
+                "min_value": summary["min_value"],
+                "max_value": summary["max_value"],
                 "percentiles": {
-                    "5th": np.percentile(simulations, 5),
-                    "25th": np.percentile(simulations, 25),
-                    "75th": np.percentile(simulations, 75),
-                    "95th": np.percentile(simulations, 95)
+                    f"{p}th": value for p, value in summary["percentiles"].items()
                 },
-                "probability_analysis": {
-                    "prob_above_base": sum(1 for s in simulations if s > base_forecast) / num_simulations,
-                    "prob_below_80pct": sum(1 for s in simulations if s < base_forecast * 0.8) / num_simulations,
-                    "prob_above_120pct": sum(1 for s in simulations if s > base_forecast * 1.2) / num_simulations
-                }
+                "probability_analysis": summary["probabilities"]
             }
 
             return simulation_results
@@ -19,10 +19,13 @@ from uuid import uuid4
 # LangGraph imports for multi-agent orchestration
 from langgraph.graph import Graph, StateGraph
 from langgraph.checkpoint.memory import MemorySaver
+from langchain_core.caches import BaseCache
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 
+from .response_cache import get_default_response_cache
+
 
 class AgentType(Enum):
     """Types of AI agents in the system"""
@@ -106,7 +109,8 @@ class BaseAgent(ABC):
         agent_type: AgentType,
         model_name: str = "gpt-4",
         temperature: float = 0.1,
-        max_tokens: int = 2000
+        max_tokens: int = 2000,
+        response_cache: Union[BaseCache, bool, None] = None
     ):
         self.state = AgentState(
             agent_id=agent_id,
@@ -114,11 +118,17 @@ class BaseAgent(ABC):
             agent_type=agent_type
         )
 
-        # LLM configuration
+        # LLM configuration; responses are cached per prompt and model settings
+        # when a cache is passed or the shared one is enabled by configuration
+        # (pass response_cache=False to always call the model)
+        if response_cache is None:
+            response_cache = get_default_response_cache(temperature)
+        self.response_cache = response_cache if isinstance(response_cache, BaseCache) else None
         self.llm = ChatOpenAI(
             model=model_name,
             temperature=temperature,
-            max_tokens=max_tokens
+            max_tokens=max_tokens,
+            cache=response_cache
         )
 
         # Communication
@@ -410,18 +420,14 @@ class FinancialAgent(BaseAgent):
         - Provide actionable recommendations
         """
 
-    async def analyze_financial_data(self, data: Dict[str, Any], analysis_type: str) -> Dict[str, Any]:
-        """Generic financial data analysis method"""
-        prompt = ChatPromptTemplate.from_messages([
+        self.financial_data_prompt = ChatPromptTemplate.from_messages([
             ("system", self.base_system_prompt),
-            ("human", f"""
+            ("human", """
             قم بتحليل البيانات المالية التالية من نوع {analysis_type}:
-
-            البيانات: {json.dumps(data, indent=2, ensure_ascii=False)}
-
             Please analyze the following financial data for {analysis_type}:
 
-            Data: {json.dumps(data, indent=2)}
+            البيانات / Data:
+            {data_json}
 
             قدم تحليلاً شاملاً يتضمن:
             1. النتائج الرئيسية
@@ -437,8 +443,14 @@ class FinancialAgent(BaseAgent):
             """)
         ])
 
-        chain = prompt | self.llm
-        response = await chain.ainvoke({"data": data, "analysis_type": analysis_type})
+    async def analyze_financial_data(self, data: Dict[str, Any], analysis_type: str) -> Dict[str, Any]:
+        """Generic financial data analysis method"""
+        # Serialized once with sorted keys so identical data always yields the
+        # same prompt and hits the response cache
+        data_json = json.dumps(data, indent=2, ensure_ascii=False, sort_keys=True, default=str)
+
+        chain = self.financial_data_prompt | self.llm
+        response = await chain.ainvoke({"data_json": data_json, "analysis_type": analysis_type})
 
         return {
             "analysis_type": analysis_type,
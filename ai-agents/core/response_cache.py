@@ -0,0 +1,330 @@
+"""
+LLM Response Cache
+ذاكرة التخزين المؤقت لاستجابات النماذج اللغوية
+
+SQLite-backed LangChain cache for the chat models used by the FinClick.AI
+agents. Entries are keyed by the normalized prompt and the model
+configuration (model name, temperature and the other generation
+parameters), expire after a TTL and are evicted least-recently-used once
+the store exceeds its entry or byte limits. Optionally, a prompt whose
+embedded financial payload differs from a cached one only by numeric noise
+is served from the cached response.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "finclick", "llm_responses.sqlite")
+
+_WHITESPACE = re.compile(r"\s+")
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _round_numbers(value: Any, digits: int) -> Any:
+    """Round every number in a JSON value to `digits` significant digits"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return float(f"{value:.{digits}g}")
+    if isinstance(value, dict):
+        return {k: _round_numbers(v, digits) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_round_numbers(v, digits) for v in value]
+    return value
+
+
+def _canonicalize_text(text: str, digits: Optional[int] = None) -> str:
+    """
+    Canonicalize free text with embedded JSON payloads
+
+    Every JSON object or array found in the text is re-serialized with sorted
+    keys and compact separators, so key order and indentation do not change
+    the key; with `digits`, numbers are also rounded to that many significant
+    digits. Remaining whitespace runs collapse to a single space.
+    """
+    parts = []
+    position = 0
+    index = 0
+    while index < len(text):
+        if text[index] in "{[":
+            try:
+                payload, end = _JSON_DECODER.raw_decode(text, index)
+            except ValueError:
+                index += 1
+                continue
+            if isinstance(payload, (dict, list)):
+                if digits is not None:
+                    payload = _round_numbers(payload, digits)
+                parts.append(text[position:index])
+                parts.append(json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False))
+                position = index = end
+                continue
+        index += 1
+    parts.append(text[position:])
+    return _WHITESPACE.sub(" ", "".join(parts)).strip()
+
+
+def normalize_prompt(prompt: str, digits: Optional[int] = None) -> str:
+    """
+    Normalize a serialized LangChain prompt for use as a cache key
+
+    Chat prompts arrive as a JSON list of serialized messages; only each
+    message's role and canonicalized content take part in the key, so
+    message ids and empty metadata do not cause misses.
+    """
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return _canonicalize_text(prompt, digits)
+
+    if not isinstance(messages, list):
+        return _canonicalize_text(prompt, digits)
+
+    normalized = []
+    for message in messages:
+        if isinstance(message, dict) and "kwargs" in message:
+            kwargs = message["kwargs"]
+            role = kwargs.get("type") or message.get("id", ["unknown"])[-1]
+            content = kwargs.get("content", "")
+        else:
+            role, content = "raw", message
+        if not isinstance(content, str):
+            content = json.dumps(content, sort_keys=True, ensure_ascii=False)
+        normalized.append(f"{role}: {_canonicalize_text(content, digits)}")
+    return "\n".join(normalized)
+
+
+def _hash(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class SQLiteResponseCache(BaseCache):
+    """
+    Local SQLite store for chat model responses
+    مخزن محلي لاستجابات النماذج اللغوية
+
+    Pass an instance as the `cache` of a LangChain chat model (BaseAgent does
+    this when given one, or when the shared cache is enabled) and repeated
+    prompts are answered from disk instead of the API.
+    """
+
+    def __init__(
+        self,
+        database_path: str = DEFAULT_CACHE_PATH,
+        ttl_seconds: float = 24 * 3600,
+        max_entries: int = 10000,
+        max_bytes: int = 256 * 1024 * 1024,
+        near_duplicate: bool = False,
+        near_duplicate_digits: int = 4
+    ):
+        self.database_path = database_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.near_duplicate = near_duplicate
+        self.near_duplicate_digits = near_duplicate_digits
+
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if database_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(database_path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(database_path, check_same_thread=False)
+        self._initialize_schema()
+
+    def _initialize_schema(self) -> None:
+        with self._lock, self._connection:
+            if self.database_path != ":memory:":
+                self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript("""
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    cache_key TEXT PRIMARY KEY,
+                    fuzzy_key TEXT NOT NULL,
+                    response BLOB NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_accessed REAL NOT NULL,
+                    hit_count INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS idx_llm_responses_fuzzy ON llm_responses (fuzzy_key);
+                CREATE INDEX IF NOT EXISTS idx_llm_responses_expires ON llm_responses (expires_at);
+                CREATE INDEX IF NOT EXISTS idx_llm_responses_accessed ON llm_responses (last_accessed);
+            """)
+
+    def _keys(self, prompt: str, llm_string: str) -> Tuple[str, str]:
+        """Exact and near-duplicate keys for a prompt and model configuration"""
+        exact_key = _hash(normalize_prompt(prompt), llm_string)
+        fuzzy_key = _hash(normalize_prompt(prompt, self.near_duplicate_digits), llm_string)
+        return exact_key, fuzzy_key
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """Return cached generations for the prompt, or None on a miss"""
+        exact_key, fuzzy_key = self._keys(prompt, llm_string)
+        now = time.time()
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT cache_key, response FROM llm_responses WHERE cache_key = ? AND expires_at > ?",
+                (exact_key, now)
+            ).fetchone()
+            near_hit = False
+
+            if row is None and self.near_duplicate:
+                row = self._connection.execute(
+                    "SELECT cache_key, response FROM llm_responses "
+                    "WHERE fuzzy_key = ? AND expires_at > ? ORDER BY created_at DESC LIMIT 1",
+                    (fuzzy_key, now)
+                ).fetchone()
+                near_hit = row is not None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            with self._connection:
+                self._connection.execute(
+                    "UPDATE llm_responses SET last_accessed = ?, hit_count = hit_count + 1 WHERE cache_key = ?",
+                    (now, row[0])
+                )
+
+            if near_hit:
+                self.near_hits += 1
+            else:
+                self.hits += 1
+
+        try:
+            return pickle.loads(row[1])
+        except Exception as e:
+            logger.warning(f"Discarding unreadable LLM cache entry: {str(e)}")
+            self._delete(row[0])
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """Store generations for the prompt and enforce the size limits"""
+        exact_key, fuzzy_key = self._keys(prompt, llm_string)
+        try:
+            payload = pickle.dumps(list(return_val), protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.warning(f"LLM response could not be cached: {str(e)}")
+            return
+
+        if len(payload) > self.max_bytes:
+            return
+
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO llm_responses "
+                "(cache_key, fuzzy_key, response, size_bytes, created_at, expires_at, last_accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (exact_key, fuzzy_key, payload, len(payload), now, now + self.ttl_seconds, now)
+            )
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones over the limits"""
+        self._connection.execute("DELETE FROM llm_responses WHERE expires_at <= ?", (now,))
+
+        count, total_bytes = self._connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM llm_responses"
+        ).fetchone()
+        if count <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+
+        evicted: List[str] = []
+        for cache_key, size_bytes in self._connection.execute(
+            "SELECT cache_key, size_bytes FROM llm_responses ORDER BY last_accessed ASC"
+        ).fetchall():
+            if count <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            evicted.append(cache_key)
+            count -= 1
+            total_bytes -= size_bytes
+
+        self._connection.executemany(
+            "DELETE FROM llm_responses WHERE cache_key = ?", [(key,) for key in evicted]
+        )
+        self.evictions += len(evicted)
+
+    def _delete(self, cache_key: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM llm_responses WHERE cache_key = ?", (cache_key,))
+
+    def clear(self, **kwargs: Any) -> None:
+        """Remove every cached response"""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM llm_responses")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and store occupancy"""
+        with self._lock:
+            entries, size_bytes = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM llm_responses"
+            ).fetchone()
+        lookups = self.hits + self.near_hits + self.misses
+        return {
+            "hits": self.hits,
+            "near_duplicate_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.near_hits) / lookups if lookups else 0.0,
+            "entries": entries,
+            "size_bytes": size_bytes,
+            "evictions": self.evictions
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+# Configuration of the cache shared by agents that are not given one
+RESPONSE_CACHE_PATH_ENV = "LLM_RESPONSE_CACHE_PATH"
+RESPONSE_CACHE_MAX_TEMPERATURE_ENV = "LLM_RESPONSE_CACHE_MAX_TEMPERATURE"
+
+_default_response_cache: Optional[SQLiteResponseCache] = None
+_default_response_cache_lock = threading.Lock()
+
+
+def get_default_response_cache(temperature: float = 0.0) -> Optional[SQLiteResponseCache]:
+    """
+    Return the process-wide response cache, or None when caching is off
+
+    Caching is opt-in: set LLM_RESPONSE_CACHE_PATH to the SQLite file that
+    should hold the cached prompts and responses. A cached response answers
+    every repeat of its prompt, so models sampling above
+    LLM_RESPONSE_CACHE_MAX_TEMPERATURE (default 0) do not use it.
+    """
+    global _default_response_cache
+    database_path = os.getenv(RESPONSE_CACHE_PATH_ENV)
+    if not database_path:
+        return None
+    if temperature > float(os.getenv(RESPONSE_CACHE_MAX_TEMPERATURE_ENV, "0")):
+        return None
+
+    if _default_response_cache is None:
+        with _default_response_cache_lock:
+            if _default_response_cache is None:
+                _default_response_cache = SQLiteResponseCache(database_path=database_path)
+    return _default_response_cache
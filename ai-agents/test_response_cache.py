@@ -0,0 +1,346 @@
+"""
+Tests for the LLM response cache
+اختبارات ذاكرة التخزين المؤقت لاستجابات النماذج اللغوية
+
+A fake chat model counts how often the underlying model is actually
+called, so each test asserts which prompts are answered from the cache.
+The agent tests put the same fake in place of ChatOpenAI and need
+langgraph and langchain_openai installed.
+
+python -m pytest test_response_cache.py
+"""
+
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import threading
+import types
+from typing import Any, List, Optional
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+AGENTS_DIR = os.path.dirname(os.path.abspath(__file__))
+# Private name: `core` is also the financial engine's package name
+CORE_PACKAGE = '_ai_agents_core'
+
+
+def _load_core_module(name):
+    """Import one core module without running core/__init__"""
+    if CORE_PACKAGE not in sys.modules:
+        package = types.ModuleType(CORE_PACKAGE)
+        package.__path__ = [os.path.join(AGENTS_DIR, 'core')]
+        sys.modules[CORE_PACKAGE] = package
+    qualified = f'{CORE_PACKAGE}.{name}'
+    if qualified not in sys.modules:
+        spec = importlib.util.spec_from_file_location(qualified, os.path.join(AGENTS_DIR, 'core', f'{name}.py'))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[qualified] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[qualified]
+            raise
+    return sys.modules[qualified]
+
+
+response_cache = _load_core_module('response_cache')
+
+SQLiteResponseCache = response_cache.SQLiteResponseCache
+normalize_prompt = response_cache.normalize_prompt
+
+
+class CountingChatModel(BaseChatModel):
+    """Chat model that answers with a numbered reply and counts its calls"""
+
+    temperature: float = 0.0
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "counting-fake"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"temperature": self.temperature}
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        self.calls += 1
+        message = AIMessage(content=f"response {self.calls}")
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class FakeChatOpenAI(CountingChatModel):
+    """Takes ChatOpenAI's place in BaseAgent, with the settings it is built with"""
+
+    model: str = ""
+    max_tokens: int = 0
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model": self.model, "temperature": self.temperature, "max_tokens": self.max_tokens}
+
+
+def financial_prompt(payload: dict, indent: Optional[int] = None) -> List[BaseMessage]:
+    return [
+        SystemMessage(content="You are a financial analyst."),
+        HumanMessage(content=f"Analyze these statements:\n{json.dumps(payload, indent=indent)}")
+    ]
+
+
+STATEMENTS = {
+    "company": "FinClick Test Corporation",
+    "revenue": 1250000.0,
+    "net_income": 187500.0,
+    "total_assets": 4300000.0,
+    "ratios": {"current_ratio": 1.875, "debt_to_equity": 0.62}
+}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    response_cache = SQLiteResponseCache(database_path=str(tmp_path / "responses.sqlite"))
+    yield response_cache
+    response_cache.close()
+
+
+@pytest.fixture
+def near_duplicate_cache(tmp_path):
+    response_cache = SQLiteResponseCache(
+        database_path=str(tmp_path / "responses.sqlite"),
+        near_duplicate=True,
+        near_duplicate_digits=4
+    )
+    yield response_cache
+    response_cache.close()
+
+
+def test_exact_repeat_is_served_from_cache(cache):
+    model = CountingChatModel(cache=cache)
+
+    first = model.invoke(financial_prompt(STATEMENTS))
+    second = model.invoke(financial_prompt(STATEMENTS))
+
+    assert model.calls == 1
+    assert second.content == first.content
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_reordered_keys_and_whitespace_hit(cache):
+    model = CountingChatModel(cache=cache)
+    reordered = dict(reversed(list(STATEMENTS.items())))
+    reordered["ratios"] = dict(reversed(list(STATEMENTS["ratios"].items())))
+
+    model.invoke(financial_prompt(STATEMENTS))
+    model.invoke(financial_prompt(reordered))
+    model.invoke(financial_prompt(STATEMENTS, indent=2))
+
+    assert model.calls == 1
+    assert cache.stats()["hits"] == 2
+
+
+def test_near_duplicate_numbers_hit_when_enabled(near_duplicate_cache):
+    model = CountingChatModel(cache=near_duplicate_cache)
+    noisy = dict(STATEMENTS, revenue=1250000.4, ratios={"current_ratio": 1.87501, "debt_to_equity": 0.62})
+
+    first = model.invoke(financial_prompt(STATEMENTS))
+    second = model.invoke(financial_prompt(noisy))
+
+    assert model.calls == 1
+    assert second.content == first.content
+    assert near_duplicate_cache.stats()["near_duplicate_hits"] == 1
+
+
+def test_near_duplicate_numbers_miss_when_disabled(cache):
+    model = CountingChatModel(cache=cache)
+    noisy = dict(STATEMENTS, revenue=1250000.4)
+
+    model.invoke(financial_prompt(STATEMENTS))
+    model.invoke(financial_prompt(noisy))
+
+    assert model.calls == 2
+    assert cache.stats()["near_duplicate_hits"] == 0
+
+
+@pytest.mark.parametrize("changed", [
+    dict(STATEMENTS, revenue=1300000.0),
+    dict(STATEMENTS, company="Another Corporation"),
+    dict(STATEMENTS, ratios={"current_ratio": 2.5, "debt_to_equity": 0.62})
+])
+def test_material_changes_miss(near_duplicate_cache, changed):
+    model = CountingChatModel(cache=near_duplicate_cache)
+
+    model.invoke(financial_prompt(STATEMENTS))
+    model.invoke(financial_prompt(changed))
+
+    assert model.calls == 2
+    assert near_duplicate_cache.stats()["misses"] == 2
+
+
+def test_model_settings_are_part_of_the_key(cache):
+    cold = CountingChatModel(cache=cache, temperature=0.0)
+    warm = CountingChatModel(cache=cache, temperature=0.7)
+
+    cold.invoke(financial_prompt(STATEMENTS))
+    warm.invoke(financial_prompt(STATEMENTS))
+
+    assert cold.calls == 1
+    assert warm.calls == 1
+
+
+def test_expired_entries_miss(tmp_path):
+    response_cache = SQLiteResponseCache(database_path=str(tmp_path / "responses.sqlite"), ttl_seconds=-1)
+    model = CountingChatModel(cache=response_cache)
+
+    model.invoke(financial_prompt(STATEMENTS))
+    model.invoke(financial_prompt(STATEMENTS))
+
+    assert model.calls == 2
+    response_cache.close()
+
+
+def test_lru_eviction_keeps_entry_limit(tmp_path):
+    response_cache = SQLiteResponseCache(database_path=str(tmp_path / "responses.sqlite"), max_entries=2)
+    model = CountingChatModel(cache=response_cache)
+    prompts = [financial_prompt(dict(STATEMENTS, company=f"Company {index}")) for index in range(3)]
+
+    for prompt in prompts:
+        model.invoke(prompt)
+    model.invoke(prompts[0])
+
+    assert model.calls == 4
+    assert response_cache.stats()["entries"] == 2
+    assert response_cache.stats()["evictions"] >= 1
+    response_cache.close()
+
+
+def test_normalize_prompt_ignores_message_ids():
+    prompt = json.dumps([
+        {"lc": 1, "type": "constructor", "id": ["langchain", "schema", "messages", "HumanMessage"],
+         "kwargs": {"content": "Analyze {\"b\": 1, \"a\": 2}", "type": "human", "id": "run-1"}}
+    ])
+    same = json.dumps([
+        {"lc": 1, "type": "constructor", "id": ["langchain", "schema", "messages", "HumanMessage"],
+         "kwargs": {"content": "Analyze  {\"a\": 2,\n \"b\": 1}", "type": "human", "id": "run-2"}}
+    ])
+
+    assert normalize_prompt(prompt) == normalize_prompt(same)
+
+
+@pytest.fixture
+def default_cache(monkeypatch, tmp_path):
+    """Shared cache enabled through configuration, reset around the test"""
+    monkeypatch.setattr(response_cache, "_default_response_cache", None)
+    monkeypatch.setenv(response_cache.RESPONSE_CACHE_PATH_ENV, str(tmp_path / "shared.sqlite"))
+    monkeypatch.delenv(response_cache.RESPONSE_CACHE_MAX_TEMPERATURE_ENV, raising=False)
+    yield
+    if response_cache._default_response_cache is not None:
+        response_cache._default_response_cache.close()
+
+
+def test_default_cache_is_off_unless_configured(monkeypatch):
+    monkeypatch.setattr(response_cache, "_default_response_cache", None)
+    monkeypatch.delenv(response_cache.RESPONSE_CACHE_PATH_ENV, raising=False)
+
+    assert response_cache.get_default_response_cache() is None
+
+
+def test_default_cache_skips_sampling_models(default_cache, monkeypatch):
+    assert response_cache.get_default_response_cache(temperature=0.7) is None
+    assert response_cache.get_default_response_cache(temperature=0.0) is not None
+
+    monkeypatch.setenv(response_cache.RESPONSE_CACHE_MAX_TEMPERATURE_ENV, "0.7")
+    assert response_cache.get_default_response_cache(temperature=0.7) is not None
+
+
+def test_default_cache_is_created_once_across_threads(default_cache, tmp_path):
+    barrier = threading.Barrier(8)
+    caches = []
+
+    def get_cache():
+        barrier.wait()
+        caches.append(response_cache.get_default_response_cache())
+
+    threads = [threading.Thread(target=get_cache) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(caches) == 8
+    assert all(cache is caches[0] for cache in caches)
+    assert caches[0].database_path == str(tmp_path / "shared.sqlite")
+
+
+@pytest.fixture
+def agent_base(monkeypatch):
+    pytest.importorskip("langgraph")
+    pytest.importorskip("langchain_openai")
+    module = _load_core_module("agent_base")
+    monkeypatch.setattr(module, "ChatOpenAI", FakeChatOpenAI)
+    return module
+
+
+def make_agent(agent_base, **kwargs):
+    class AnalysisAgent(agent_base.FinancialAgent):
+        async def process_task(self, task):
+            return await self.analyze_financial_data(task.input_data, task.task_type)
+
+    return AnalysisAgent("analyst", "Analyst", agent_base.AgentType.FINANCIAL_ANALYSIS, **kwargs)
+
+
+def analyze(agent, data, analysis_type="liquidity_analysis"):
+    return asyncio.run(agent.analyze_financial_data(data, analysis_type))
+
+
+def test_financial_agent_repeats_are_served_from_cache(agent_base, cache):
+    agent = make_agent(agent_base, response_cache=cache)
+    reordered = dict(reversed(list(STATEMENTS.items())))
+
+    first = analyze(agent, STATEMENTS)
+    second = analyze(agent, reordered)
+    other_type = analyze(agent, STATEMENTS, "profitability_analysis")
+
+    assert agent.llm.calls == 2
+    assert second["raw_response"] == first["raw_response"]
+    assert other_type["raw_response"] != first["raw_response"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_financial_agent_calls_model_without_configured_cache(agent_base, monkeypatch):
+    monkeypatch.setattr(response_cache, "_default_response_cache", None)
+    monkeypatch.delenv(response_cache.RESPONSE_CACHE_PATH_ENV, raising=False)
+    agent = make_agent(agent_base)
+
+    analyze(agent, STATEMENTS)
+    analyze(agent, STATEMENTS)
+
+    assert agent.response_cache is None
+    assert agent.llm.calls == 2
+
+
+def test_financial_agents_share_configured_cache(agent_base, default_cache):
+    first = make_agent(agent_base, temperature=0.0)
+    second = make_agent(agent_base, temperature=0.0)
+    sampling = make_agent(agent_base, temperature=0.7)
+
+    answer = analyze(first, STATEMENTS)
+    assert analyze(second, STATEMENTS)["raw_response"] == answer["raw_response"]
+    analyze(sampling, STATEMENTS)
+    analyze(sampling, STATEMENTS)
+
+    assert first.response_cache is second.response_cache
+    assert (first.llm.calls, second.llm.calls) == (1, 0)
+    assert sampling.response_cache is None
+    assert sampling.llm.calls == 2
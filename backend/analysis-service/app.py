@@ -23,6 +23,18 @@ app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
 app.config['REDIS_URL'] = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
 app.config['CACHE_DEFAULT_TIMEOUT'] = int(os.getenv('CACHE_TIMEOUT', 300))
 
+# Background analysis queue configuration
+app.config['ANALYSIS_QUEUE_BACKEND'] = os.getenv('ANALYSIS_QUEUE_BACKEND', 'redis')  # redis or memory
+app.config['ANALYSIS_START_WORKERS'] = os.getenv('ANALYSIS_START_WORKERS', 'true').lower() == 'true'
+app.config['ANALYSIS_WORKER_CONCURRENCY'] = int(os.getenv('ANALYSIS_WORKER_CONCURRENCY', 4))
+app.config['ANALYSIS_MAX_JOBS_PER_USER'] = int(os.getenv('ANALYSIS_MAX_JOBS_PER_USER', 2))
+app.config['ANALYSIS_JOB_MAX_ATTEMPTS'] = int(os.getenv('ANALYSIS_JOB_MAX_ATTEMPTS', 3))
+app.config['ANALYSIS_JOB_LEASE_SECONDS'] = int(os.getenv('ANALYSIS_JOB_LEASE_SECONDS', 600))
+
+# Maintain daily/monthly performance metric rollup rows as metrics are recorded;
+# run MetricsService.rebuild_performance_rollups() once when turning this on
+app.config['METRICS_ROLLUPS_ENABLED'] = os.getenv('METRICS_ROLLUPS_ENABLED', 'false').lower() == 'true'
+
 # Financial Engine Configuration
 app.config['FINANCIAL_ENGINE_URL'] = os.getenv('FINANCIAL_ENGINE_URL', 'http://localhost:8000')
 app.config['FINANCIAL_ENGINE_API_KEY'] = os.getenv('FINANCIAL_ENGINE_API_KEY')
@@ -81,6 +93,13 @@ def expired_token_callback(jwt_header, jwt_payload):
 from models import *
 from routes import *
 
+# Run queued analysis jobs in this process from startup. Set
+# ANALYSIS_START_WORKERS=false to serve HTTP only and run `python worker.py`
+# as a separate process instead
+if app.config['ANALYSIS_START_WORKERS']:
+    from services import AnalysisQueueService
+    AnalysisQueueService.start_workers(app)
+
 # Error handlers
 @app.errorhandler(400)
 def bad_request(error):
@@ -0,0 +1,586 @@
+import json
+import heapq
+import itertools
+import threading
+import time
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Lower rank is claimed first
+PRIORITY_RANKS = {
+    'urgent': 0,
+    'high': 1,
+    'normal': 2,
+    'low': 3
+}
+
+class JobStatus:
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    RETRYING = 'retrying'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+    FINAL = (COMPLETED, FAILED, CANCELLED)
+
+class Job:
+    """A unit of background work for one analysis"""
+
+    FIELDS = (
+        'job_id', 'analysis_id', 'user_id', 'priority', 'status', 'progress',
+        'stage', 'attempts', 'max_attempts', 'error', 'enqueued_at',
+        'available_at', 'started_at', 'updated_at', 'claim_token'
+    )
+
+    def __init__(self, analysis_id, user_id, priority='normal', max_attempts=3, job_id=None):
+        now = time.time()
+        self.job_id = job_id or str(uuid.uuid4())
+        self.analysis_id = analysis_id
+        self.user_id = user_id
+        self.priority = priority
+        self.status = JobStatus.QUEUED
+        self.progress = 0
+        self.stage = None
+        self.attempts = 0
+        self.max_attempts = max_attempts
+        self.error = None
+        self.enqueued_at = now
+        self.available_at = now
+        self.started_at = None
+        self.updated_at = now
+        # Identifies the current attempt; reports from an earlier claim are ignored
+        self.claim_token = None
+
+    @property
+    def rank(self):
+        return PRIORITY_RANKS.get(self.priority, PRIORITY_RANKS['normal'])
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        job = cls(data['analysis_id'], data['user_id'])
+        for field in cls.FIELDS:
+            if field in data:
+                setattr(job, field, data[field])
+        return job
+
+def retry_delay(attempts, base_delay=5, max_delay=300):
+    """Exponential backoff before the next attempt"""
+    return min(base_delay * (2 ** max(attempts - 1, 0)), max_delay)
+
+def new_claim_token():
+    return uuid.uuid4().hex
+
+LEASE_EXPIRED_ERROR = 'Worker lease expired'
+
+class JobQueue:
+    """
+    Priority job queue with per-user concurrency caps
+
+    Jobs are claimed in priority order (FIFO within a priority), skipping
+    users that already have `max_per_user` jobs running. Workers report
+    progress through `checkpoint`, which also renews their lease; jobs whose
+    lease lapses (e.g. the worker process died) are put back in the queue.
+    Failed jobs, including lapsed leases, are retried with exponential
+    backoff until `max_attempts`.
+
+    Every claim gets a new `claim_token`. `checkpoint`, `complete` and
+    `fail` given a token only act while it is the job's current claim, so
+    a worker that outlived its lease can't finish or renew a later attempt.
+    """
+
+    def __init__(self, max_per_user=2, lease_seconds=600, base_retry_delay=5):
+        self.max_per_user = max_per_user
+        self.lease_seconds = lease_seconds
+        self.base_retry_delay = base_retry_delay
+
+    def enqueue(self, job):
+        raise NotImplementedError
+
+    def claim(self):
+        """Claim the next runnable job, or None"""
+        raise NotImplementedError
+
+    def checkpoint(self, job_id, progress, stage=None, claim_token=None):
+        """Record progress of a running job and renew its lease"""
+        raise NotImplementedError
+
+    def complete(self, job_id, claim_token=None):
+        raise NotImplementedError
+
+    def fail(self, job_id, error, claim_token=None):
+        """Record a failed attempt; returns True when the job will be retried"""
+        raise NotImplementedError
+
+    def cancel(self, job_id):
+        raise NotImplementedError
+
+    def get_job(self, job_id):
+        raise NotImplementedError
+
+    def get_analysis_job(self, analysis_id):
+        """Latest job enqueued for an analysis, or None"""
+        raise NotImplementedError
+
+    def requeue_expired(self):
+        """Retry running jobs with lapsed leases, or fail them once out of attempts"""
+        return 0
+
+class InProcessJobQueue(JobQueue):
+    """Job queue held in memory; for tests and single-process deployments"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._lock = threading.Lock()
+        self._heap = []
+        self._sequence = itertools.count()
+        self._jobs = {}
+        self._analysis_jobs = {}
+        self._running = {}
+        self._leases = {}
+
+    def enqueue(self, job):
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._analysis_jobs[job.analysis_id] = job.job_id
+            heapq.heappush(self._heap, (job.rank, job.available_at, next(self._sequence), job.job_id))
+        return job.job_id
+
+    def claim(self):
+        now = time.time()
+        with self._lock:
+            skipped = []
+            claimed = None
+            while self._heap:
+                entry = heapq.heappop(self._heap)
+                job = self._jobs.get(entry[3])
+                if job is None or job.status not in (JobStatus.QUEUED, JobStatus.RETRYING):
+                    continue
+                if job.available_at > now or self._running.get(job.user_id, 0) >= self.max_per_user:
+                    skipped.append(entry)
+                    continue
+                claimed = job
+                break
+            for entry in skipped:
+                heapq.heappush(self._heap, entry)
+
+            if claimed is None:
+                return None
+
+            claimed.status = JobStatus.RUNNING
+            claimed.attempts += 1
+            claimed.progress = 0
+            claimed.stage = None
+            claimed.started_at = claimed.updated_at = now
+            claimed.claim_token = new_claim_token()
+            self._running[claimed.user_id] = self._running.get(claimed.user_id, 0) + 1
+            self._leases[claimed.job_id] = now + self.lease_seconds
+            return Job.from_dict(claimed.to_dict())
+
+    def _current_claim(self, job_id, claim_token):
+        """The running job, if `claim_token` (when given) is its current claim"""
+        job = self._jobs.get(job_id)
+        if job is None or job.status != JobStatus.RUNNING:
+            return None
+        if claim_token is not None and claim_token != job.claim_token:
+            return None
+        return job
+
+    def checkpoint(self, job_id, progress, stage=None, claim_token=None):
+        with self._lock:
+            job = self._current_claim(job_id, claim_token)
+            if job is None:
+                return False
+            job.progress = progress
+            job.stage = stage
+            job.updated_at = time.time()
+            self._leases[job_id] = job.updated_at + self.lease_seconds
+            return True
+
+    def _release(self, job):
+        self._leases.pop(job.job_id, None)
+        remaining = self._running.get(job.user_id, 0) - 1
+        if remaining > 0:
+            self._running[job.user_id] = remaining
+        else:
+            self._running.pop(job.user_id, None)
+
+    def complete(self, job_id, claim_token=None):
+        with self._lock:
+            job = self._current_claim(job_id, claim_token)
+            if job is None:
+                return
+            self._release(job)
+            job.status = JobStatus.COMPLETED
+            job.progress = 100
+            job.updated_at = time.time()
+
+    def fail(self, job_id, error, claim_token=None):
+        with self._lock:
+            job = self._current_claim(job_id, claim_token)
+            if job is None:
+                return False
+            self._release(job)
+            return self._end_attempt(job, error, time.time())
+
+    def _end_attempt(self, job, error, now):
+        """Schedule a retry of a released job, or fail it when out of attempts"""
+        job.error = error
+        job.updated_at = now
+        if job.attempts >= job.max_attempts:
+            job.status = JobStatus.FAILED
+            return False
+        job.status = JobStatus.RETRYING
+        job.available_at = now + retry_delay(job.attempts, self.base_retry_delay)
+        heapq.heappush(self._heap, (job.rank, job.available_at, next(self._sequence), job.job_id))
+        return True
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in JobStatus.FINAL:
+                return False
+            if job.status == JobStatus.RUNNING:
+                self._release(job)
+            # Queued heap entries are dropped lazily by claim
+            job.status = JobStatus.CANCELLED
+            job.updated_at = time.time()
+            return True
+
+    def get_job(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return Job.from_dict(job.to_dict()) if job else None
+
+    def get_analysis_job(self, analysis_id):
+        with self._lock:
+            job_id = self._analysis_jobs.get(analysis_id)
+        return self.get_job(job_id) if job_id else None
+
+    def requeue_expired(self):
+        now = time.time()
+        with self._lock:
+            expired = [job_id for job_id, deadline in self._leases.items() if deadline < now]
+            for job_id in expired:
+                job = self._jobs[job_id]
+                self._release(job)
+                self._end_attempt(job, LEASE_EXPIRED_ERROR, now)
+            return len(expired)
+
+# Atomically pick the first pending job whose user is under the cap and
+# move it to the running set with a lease deadline.
+# KEYS: pending zset, running zset; ARGV: prefix, max_per_user, now, lease, scan limit, claim token (JSON)
+CLAIM_SCRIPT = """
+local candidates = redis.call('ZRANGE', KEYS[1], 0, tonumber(ARGV[5]) - 1)
+for _, job_id in ipairs(candidates) do
+    local job_key = ARGV[1] .. ':job:' .. job_id
+    local user_id = redis.call('HGET', job_key, 'user_id')
+    if not user_id then
+        redis.call('ZREM', KEYS[1], job_id)
+    else
+        local user_key = ARGV[1] .. ':user:' .. user_id .. ':running'
+        local running = tonumber(redis.call('GET', user_key) or '0')
+        if running < tonumber(ARGV[2]) then
+            redis.call('ZREM', KEYS[1], job_id)
+            redis.call('INCR', user_key)
+            redis.call('ZADD', KEYS[2], tonumber(ARGV[3]) + tonumber(ARGV[4]), job_id)
+            redis.call('HINCRBY', job_key, 'attempts', 1)
+            redis.call('HSET', job_key, 'status', 'running', 'progress', '0', 'stage', 'null',
+                'started_at', ARGV[3], 'updated_at', ARGV[3], 'claim_token', ARGV[6])
+            return job_id
+        end
+    end
+end
+return false
+"""
+
+# Remove a job from the running set and release its user slot, once,
+# unless a claim token is given and is not the job's current claim.
+# KEYS: running zset; ARGV: prefix, job_id, claim token (JSON, or '' for any)
+RELEASE_SCRIPT = """
+if ARGV[3] ~= '' and redis.call('HGET', ARGV[1] .. ':job:' .. ARGV[2], 'claim_token') ~= ARGV[3] then
+    return 0
+end
+if redis.call('ZREM', KEYS[1], ARGV[2]) == 0 then
+    return 0
+end
+local user_id = redis.call('HGET', ARGV[1] .. ':job:' .. ARGV[2], 'user_id')
+if user_id then
+    local user_key = ARGV[1] .. ':user:' .. user_id .. ':running'
+    if redis.call('DECR', user_key) <= 0 then
+        redis.call('DEL', user_key)
+    end
+end
+return 1
+"""
+
+# Renew a running job's lease and record its progress, if the claim is current.
+# KEYS: running zset, job hash; ARGV: job_id, lease deadline, claim token (JSON, or ''), progress, stage, now
+CHECKPOINT_SCRIPT = """
+if ARGV[3] ~= '' and redis.call('HGET', KEYS[2], 'claim_token') ~= ARGV[3] then
+    return 0
+end
+if not redis.call('ZSCORE', KEYS[1], ARGV[1]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+redis.call('HSET', KEYS[2], 'progress', ARGV[4], 'stage', ARGV[5], 'updated_at', ARGV[6])
+return 1
+"""
+
+class RedisJobQueue(JobQueue):
+    """
+    Durable job queue stored in Redis
+
+    Pending jobs live in a sorted set scored by priority rank then enqueue
+    time, jobs waiting for a retry in a sorted set scored by when they
+    become due, and running jobs in a sorted set scored by lease deadline.
+    Job state is a hash per job, so any API process can report progress
+    and jobs survive worker restarts.
+    """
+
+    # Spacing between priority ranks in the pending score; larger than any epoch-ms timestamp
+    RANK_SCALE = 10 ** 13
+
+    def __init__(self, redis_client, prefix='analysis_queue', job_ttl=7 * 24 * 3600, scan_limit=100, **kwargs):
+        super().__init__(**kwargs)
+        self.redis = redis_client
+        self.prefix = prefix
+        self.job_ttl = job_ttl
+        self.scan_limit = scan_limit
+        self.pending_key = f"{prefix}:pending"
+        self.delayed_key = f"{prefix}:delayed"
+        self.running_key = f"{prefix}:running"
+        self._claim = redis_client.register_script(CLAIM_SCRIPT)
+        self._release = redis_client.register_script(RELEASE_SCRIPT)
+        self._checkpoint = redis_client.register_script(CHECKPOINT_SCRIPT)
+
+    def _job_key(self, job_id):
+        return f"{self.prefix}:job:{job_id}"
+
+    def _analysis_key(self, analysis_id):
+        return f"{self.prefix}:analysis:{analysis_id}"
+
+    def _pending_score(self, job):
+        return job.rank * self.RANK_SCALE + int(job.enqueued_at * 1000)
+
+    @staticmethod
+    def _encode_token(claim_token):
+        return json.dumps(claim_token) if claim_token is not None else ''
+
+    def _release_claim(self, job_id, claim_token=None):
+        return self._release(keys=[self.running_key], args=[self.prefix, job_id, self._encode_token(claim_token)])
+
+    @staticmethod
+    def _encode(job):
+        return {field: json.dumps(value) for field, value in job.to_dict().items()}
+
+    @staticmethod
+    def _decode(data):
+        decoded = {}
+        for field, value in data.items():
+            field = field.decode() if isinstance(field, bytes) else field
+            value = value.decode() if isinstance(value, bytes) else value
+            try:
+                decoded[field] = json.loads(value)
+            except ValueError:
+                # Fields written by the Lua scripts are plain strings
+                decoded[field] = value
+        for field in ('attempts', 'max_attempts', 'progress'):
+            if field in decoded:
+                decoded[field] = int(decoded[field])
+        for field in ('started_at', 'updated_at', 'available_at', 'enqueued_at'):
+            if decoded.get(field) is not None:
+                decoded[field] = float(decoded[field])
+        return Job.from_dict(decoded)
+
+    def enqueue(self, job):
+        pipe = self.redis.pipeline()
+        pipe.hset(self._job_key(job.job_id), mapping=self._encode(job))
+        pipe.expire(self._job_key(job.job_id), self.job_ttl)
+        pipe.set(self._analysis_key(job.analysis_id), job.job_id, ex=self.job_ttl)
+        pipe.zadd(self.pending_key, {job.job_id: self._pending_score(job)})
+        pipe.execute()
+        return job.job_id
+
+    def _promote_due(self, now):
+        """Move retries whose backoff has elapsed back to the pending set"""
+        for job_id in self.redis.zrangebyscore(self.delayed_key, '-inf', now):
+            # Only the process that removes the entry re-queues it
+            if self.redis.zrem(self.delayed_key, job_id):
+                job = self.get_job(job_id.decode() if isinstance(job_id, bytes) else job_id)
+                if job is not None and job.status == JobStatus.RETRYING:
+                    self.redis.zadd(self.pending_key, {job.job_id: self._pending_score(job)})
+
+    def claim(self):
+        now = time.time()
+        self._promote_due(now)
+        job_id = self._claim(
+            keys=[self.pending_key, self.running_key],
+            args=[self.prefix, self.max_per_user, now, self.lease_seconds, self.scan_limit,
+                  json.dumps(new_claim_token())]
+        )
+        if not job_id:
+            return None
+        return self.get_job(job_id.decode() if isinstance(job_id, bytes) else job_id)
+
+    def checkpoint(self, job_id, progress, stage=None, claim_token=None):
+        now = time.time()
+        return bool(self._checkpoint(
+            keys=[self.running_key, self._job_key(job_id)],
+            args=[job_id, now + self.lease_seconds, self._encode_token(claim_token),
+                  json.dumps(progress), json.dumps(stage), json.dumps(now)]
+        ))
+
+    def complete(self, job_id, claim_token=None):
+        if self._release_claim(job_id, claim_token):
+            self.redis.hset(self._job_key(job_id), mapping={
+                'status': json.dumps(JobStatus.COMPLETED),
+                'progress': json.dumps(100),
+                'updated_at': json.dumps(time.time())
+            })
+
+    def fail(self, job_id, error, claim_token=None):
+        if not self._release_claim(job_id, claim_token):
+            return False
+        job = self.get_job(job_id)
+        if job is None:
+            return False
+        return self._end_attempt(job, error, time.time())
+
+    def _end_attempt(self, job, error, now):
+        """Schedule a retry of a released job, or fail it when out of attempts"""
+        job_id = job.job_id
+        if job.attempts >= job.max_attempts:
+            self.redis.hset(self._job_key(job_id), mapping={
+                'status': json.dumps(JobStatus.FAILED),
+                'error': json.dumps(error),
+                'updated_at': json.dumps(now)
+            })
+            return False
+        available_at = now + retry_delay(job.attempts, self.base_retry_delay)
+        pipe = self.redis.pipeline()
+        pipe.hset(self._job_key(job_id), mapping={
+            'status': json.dumps(JobStatus.RETRYING),
+            'error': json.dumps(error),
+            'available_at': json.dumps(available_at),
+            'updated_at': json.dumps(now)
+        })
+        pipe.zadd(self.delayed_key, {job_id: available_at})
+        pipe.execute()
+        return True
+
+    def cancel(self, job_id):
+        job = self.get_job(job_id)
+        if job is None or job.status in JobStatus.FINAL:
+            return False
+        pipe = self.redis.pipeline()
+        pipe.zrem(self.pending_key, job_id)
+        pipe.zrem(self.delayed_key, job_id)
+        pipe.execute()
+        self._release_claim(job_id)
+        self.redis.hset(self._job_key(job_id), mapping={
+            'status': json.dumps(JobStatus.CANCELLED),
+            'updated_at': json.dumps(time.time())
+        })
+        return True
+
+    def get_job(self, job_id):
+        data = self.redis.hgetall(self._job_key(job_id))
+        return self._decode(data) if data else None
+
+    def get_analysis_job(self, analysis_id):
+        job_id = self.redis.get(self._analysis_key(analysis_id))
+        if not job_id:
+            return None
+        return self.get_job(job_id.decode() if isinstance(job_id, bytes) else job_id)
+
+    def requeue_expired(self):
+        now = time.time()
+        expired = 0
+        for job_id in self.redis.zrangebyscore(self.running_key, '-inf', now):
+            job_id = job_id.decode() if isinstance(job_id, bytes) else job_id
+            # The release script succeeds for exactly one caller
+            if self._release_claim(job_id):
+                job = self.get_job(job_id)
+                if job is None:
+                    continue
+                self._end_attempt(job, LEASE_EXPIRED_ERROR, now)
+                expired += 1
+        if expired:
+            logger.warning(f"Released {expired} analysis jobs with expired leases")
+        return expired
+
+class JobWorkerPool:
+    """
+    Threads that claim jobs from a queue and run them with `handler`
+
+    The handler receives the claimed Job and returns normally on success;
+    an exception counts as a failed attempt and is retried by the queue.
+    """
+
+    def __init__(self, queue, handler, concurrency=4, poll_interval=1.0):
+        self.queue = queue
+        self.handler = handler
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return
+            self._stop.clear()
+            self._threads = [
+                threading.Thread(target=self._run, name=f"analysis-worker-{index}", daemon=True)
+                for index in range(self.concurrency)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def notify(self):
+        """Wake idle workers after an enqueue"""
+        self._wake.set()
+
+    def run_once(self):
+        """Claim and run a single job; returns False when nothing was runnable"""
+        job = self.queue.claim()
+        if job is None:
+            return False
+        try:
+            self.handler(job)
+            self.queue.complete(job.job_id, job.claim_token)
+        except Exception as e:
+            will_retry = self.queue.fail(job.job_id, str(e), job.claim_token)
+            logger.error(f"Analysis job {job.job_id} attempt {job.attempts} failed "
+                         f"({'retrying' if will_retry else 'giving up'}): {str(e)}")
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.queue.requeue_expired()
+                if self.run_once():
+                    continue
+            except Exception as e:
+                logger.error(f"Analysis worker error: {str(e)}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
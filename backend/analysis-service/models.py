@@ -366,6 +366,8 @@ class PerformanceMetrics(db.Model):
 
     recorded_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
+    __table_args__ = (db.Index('ix_performance_metrics_recorded_name', 'recorded_at', 'metric_name'),)
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -378,4 +380,33 @@ class PerformanceMetrics(db.Model):
             'environment': self.environment,
             'metadata': self.metadata,
             'recorded_at': self.recorded_at.isoformat()
-        }
\ No newline at end of file
+        }
+
+class PerformanceMetricRollup(db.Model):
+    __tablename__ = 'performance_metric_rollups'
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    bucket = db.Column(db.String(10), nullable=False)  # day, month
+    bucket_start = db.Column(db.Date, nullable=False)
+    metric_name = db.Column(db.String(100), nullable=False)
+    component = db.Column(db.String(50), default='', nullable=False)  # '' when not set
+    sample_count = db.Column(db.Integer, default=0, nullable=False)
+    total_value = db.Column(db.Float, default=0.0, nullable=False)
+    min_value = db.Column(db.Float, nullable=True)
+    max_value = db.Column(db.Float, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    __table_args__ = (db.UniqueConstraint('bucket', 'bucket_start', 'metric_name', 'component'),)
+
+    def to_dict(self):
+        return {
+            'bucket': self.bucket,
+            'bucket_start': self.bucket_start.isoformat(),
+            'metric_name': self.metric_name,
+            'component': self.component or None,
+            'count': self.sample_count,
+            'average': self.total_value / self.sample_count if self.sample_count else None,
+            'minimum': self.min_value,
+            'maximum': self.max_value,
+            'total': self.total_value
+        }
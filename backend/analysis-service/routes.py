@@ -7,7 +7,7 @@ from models import (
     AnalysisType, AnalysisStatus, Priority
 )
 from services import (
-    AnalysisService, FinancialEngineService, CacheService,
+    AnalysisService, AnalysisQueueService, FinancialEngineService, CacheService,
     MetricsService, ComparisonService, TemplateService
 )
 import logging
@@ -166,13 +166,27 @@ def get_analysis_status(analysis_id):
         if not analysis:
             return jsonify({'error': 'Analysis not found'}), 404
 
+        # Running jobs checkpoint to the queue, so it has the freshest progress
+        job = AnalysisQueueService.get_progress(analysis_id)
+        progress_percentage = analysis.progress_percentage
+        if job and analysis.status in [AnalysisStatus.QUEUED, AnalysisStatus.PROCESSING]:
+            progress_percentage = max(progress_percentage, job['progress'])
+
         return jsonify({
             'analysis_id': analysis.id,
             'status': analysis.status.value,
-            'progress_percentage': analysis.progress_percentage,
+            'progress_percentage': progress_percentage,
             'estimated_completion_time': analysis.estimated_completion_time.isoformat() if analysis.estimated_completion_time else None,
             'elapsed_time': analysis.get_elapsed_time(),
-            'error_message': analysis.error_message
+            'error_message': analysis.error_message,
+            'job': {
+                'task_id': job['job_id'],
+                'status': job['status'],
+                'stage': job['stage'],
+                'attempts': job['attempts'],
+                'max_attempts': job['max_attempts'],
+                'last_error': job['error']
+            } if job else None
         }), 200
 
     except Exception as e:
@@ -412,7 +426,19 @@ def get_metrics_summary():
 @app.route('/api/analysis/performance', methods=['GET'])
 @jwt_required()
 def get_performance_metrics():
-    """Get system performance metrics"""
+    """
+    Get system performance metrics
+
+    Query parameters: hours (default 24) and component. Returns one
+    aggregate per metric name over the window:
+
+        {"metrics": {name: {"count", "average", "minimum", "maximum", "total",
+                            "unit", "latest_value", "latest_recorded_at"}}}
+
+    Earlier versions returned every raw sample as a list per metric name;
+    clients that need the history per day or month should use
+    /api/analysis/performance/rollups.
+    """
     try:
         # Get query parameters
         hours = request.args.get('hours', 24, type=int)
@@ -426,6 +452,27 @@ def get_performance_metrics():
         logger.error(f"Get performance metrics error: {str(e)}")
         return jsonify({'error': 'Failed to get performance metrics'}), 500
 
+@app.route('/api/analysis/performance/rollups', methods=['GET'])
+@jwt_required()
+def get_performance_rollups():
+    """Get daily or monthly performance metric rollups"""
+    try:
+        bucket = request.args.get('bucket', 'day')
+        periods = request.args.get('periods', 30, type=int)
+        metric_name = request.args.get('metric_name')
+        component = request.args.get('component')
+
+        if bucket not in ['day', 'month']:
+            return jsonify({'error': 'bucket must be day or month'}), 400
+
+        rollups = MetricsService.get_performance_rollups(bucket, max(periods, 1), metric_name, component)
+
+        return jsonify({'bucket': bucket, 'rollups': rollups}), 200
+
+    except Exception as e:
+        logger.error(f"Get performance rollups error: {str(e)}")
+        return jsonify({'error': 'Failed to get performance rollups'}), 500
+
 @app.route('/api/analysis/<analysis_id>/export', methods=['POST'])
 @jwt_required()
 @limiter.limit("10 per hour")
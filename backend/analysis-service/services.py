@@ -7,9 +7,13 @@ from datetime import datetime, timedelta
 from app import db, current_app
 from models import (
     Analysis, FinancialData, AnalysisMetric, AnalysisComparison,
-    CachedResult, AnalysisTemplate, PerformanceMetrics,
+    CachedResult, AnalysisTemplate, PerformanceMetrics, PerformanceMetricRollup,
     AnalysisType, AnalysisStatus, Priority
 )
+from sqlalchemy.dialects import postgresql, sqlite
+from job_queue import Job, InProcessJobQueue, RedisJobQueue, JobWorkerPool
+from bulk_insert import bulk_insert
+import threading
 import logging
 
 logger = logging.getLogger(__name__)
@@ -43,7 +47,8 @@ class AnalysisService:
 
     @staticmethod
     def start_processing(analysis_id):
-        """Start analysis processing"""
+        """Queue analysis for background processing"""
+        analysis = None
         try:
             analysis = Analysis.query.get(analysis_id)
             if not analysis:
@@ -66,59 +71,107 @@ class AnalysisService:
                 component='queue_manager'
             )
 
-            # Process based on type
-            task_id = str(uuid.uuid4())
+            # Workers load the analysis from their own session, so it must be committed first
+            db.session.commit()
 
-            if analysis.analysis_type in [AnalysisType.FINANCIAL_STATEMENT, AnalysisType.RATIO_ANALYSIS]:
-                AnalysisService.process_financial_analysis(analysis_id, task_id)
-            elif analysis.analysis_type == AnalysisType.TREND_ANALYSIS:
-                AnalysisService.process_trend_analysis(analysis_id, task_id)
-            elif analysis.analysis_type == AnalysisType.RISK_ASSESSMENT:
-                AnalysisService.process_risk_analysis(analysis_id, task_id)
-            else:
-                AnalysisService.process_generic_analysis(analysis_id, task_id)
+            job = Job(
+                analysis_id=analysis_id,
+                user_id=analysis.user_id,
+                priority=analysis.priority.value,
+                max_attempts=current_app.config.get('ANALYSIS_JOB_MAX_ATTEMPTS', 3)
+            )
+            task_id = AnalysisQueueService.enqueue(job)
 
             return task_id
 
         except Exception as e:
             logger.error(f"Start processing error: {str(e)}")
-            analysis.status = AnalysisStatus.FAILED
-            analysis.error_message = str(e)
+            if analysis:
+                analysis.status = AnalysisStatus.FAILED
+                analysis.error_message = str(e)
             raise
 
     @staticmethod
-    def process_financial_analysis(analysis_id, task_id):
+    def run_job(job):
+        """Run a claimed queue job; raises when the attempt failed so the queue retries it"""
+        analysis = Analysis.query.get(job.analysis_id)
+        if not analysis:
+            raise ValueError("Analysis not found")
+        if analysis.status == AnalysisStatus.CANCELLED:
+            return
+
+        if job.attempts > 1:
+            # Discard rows stored by the failed attempt before running again
+            FinancialData.query.filter_by(analysis_id=analysis.id).delete()
+            AnalysisMetric.query.filter_by(analysis_id=analysis.id).delete()
+            analysis.error_message = None
+            analysis.progress_percentage = 0
+        analysis.status = AnalysisStatus.PROCESSING
+        db.session.commit()
+
+        if analysis.analysis_type in [AnalysisType.FINANCIAL_STATEMENT, AnalysisType.RATIO_ANALYSIS]:
+            AnalysisService.process_financial_analysis(analysis.id, job.job_id, job.claim_token)
+        elif analysis.analysis_type == AnalysisType.TREND_ANALYSIS:
+            AnalysisService.process_trend_analysis(analysis.id, job.job_id)
+        elif analysis.analysis_type == AnalysisType.RISK_ASSESSMENT:
+            AnalysisService.process_risk_analysis(analysis.id, job.job_id)
+        else:
+            AnalysisService.process_generic_analysis(analysis.id, job.job_id)
+
+        if analysis.status == AnalysisStatus.FAILED:
+            error_message = analysis.error_message
+            if job.attempts < job.max_attempts:
+                # Keep the analysis visible as queued while the retry waits
+                analysis.status = AnalysisStatus.QUEUED
+            db.session.commit()
+            raise RuntimeError(error_message or "Analysis processing failed")
+
+        db.session.commit()
+
+    @staticmethod
+    def checkpoint(analysis, task_id, progress, stage=None, claim_token=None):
+        """Persist analysis progress and report it to the job queue"""
+        analysis.progress_percentage = progress
+        db.session.commit()
+        try:
+            AnalysisQueueService.get_queue().checkpoint(task_id, progress, stage, claim_token)
+        except Exception as e:
+            # Progress is already stored on the analysis; a queue outage must not fail the job
+            logger.error(f"Queue checkpoint error: {str(e)}")
+
+    @staticmethod
+    def process_financial_analysis(analysis_id, task_id, claim_token=None):
         """Process financial statement analysis"""
         try:
             analysis = Analysis.query.get(analysis_id)
             analysis.status = AnalysisStatus.PROCESSING
-            analysis.progress_percentage = 10
+            AnalysisService.checkpoint(analysis, task_id, 10, 'loading_file', claim_token)
 
             # Get file data if available
             file_data = None
             if analysis.file_id:
                 file_data = AnalysisService.get_file_data(analysis.file_id)
 
-            analysis.progress_percentage = 30
+            AnalysisService.checkpoint(analysis, task_id, 30, 'extracting_data', claim_token)
 
             # Extract financial data
             if file_data:
                 financial_data = FinancialEngineService.extract_financial_data(file_data)
                 AnalysisService.store_financial_data(analysis_id, financial_data)
 
-            analysis.progress_percentage = 50
+            AnalysisService.checkpoint(analysis, task_id, 50, 'calculating_ratios', claim_token)
 
             # Calculate financial ratios
             ratios = FinancialEngineService.calculate_financial_ratios(analysis_id)
             AnalysisService.store_metrics(analysis_id, ratios)
 
-            analysis.progress_percentage = 70
+            AnalysisService.checkpoint(analysis, task_id, 70, 'generating_insights', claim_token)
 
             # Generate insights
             insights = AnalysisService.generate_insights(analysis_id)
             recommendations = AnalysisService.generate_recommendations(analysis_id)
 
-            analysis.progress_percentage = 90
+            AnalysisService.checkpoint(analysis, task_id, 90, 'compiling_results', claim_token)
 
             # Compile results
             results = {
@@ -250,6 +303,10 @@ class AnalysisService:
                 analysis.status = AnalysisStatus.CANCELLED
                 analysis.completed_at = datetime.utcnow()
 
+                job = AnalysisQueueService.get_queue().get_analysis_job(analysis_id)
+                if job:
+                    AnalysisQueueService.get_queue().cancel(job.job_id)
+
         except Exception as e:
             logger.error(f"Cancel analysis error: {str(e)}")
             raise
@@ -304,21 +361,23 @@ class AnalysisService:
 
     @staticmethod
     def store_financial_data(analysis_id, financial_data):
-        """Store extracted financial data"""
+        """Store extracted financial data in bulk"""
         try:
-            for data_item in financial_data:
-                financial_record = FinancialData(
-                    analysis_id=analysis_id,
-                    data_type=data_item.get('type'),
-                    category=data_item.get('category'),
-                    value=data_item.get('value'),
-                    currency=data_item.get('currency', 'USD'),
-                    period_start=data_item.get('period_start'),
-                    period_end=data_item.get('period_end'),
-                    confidence=data_item.get('confidence'),
-                    source=data_item.get('source', 'extracted')
-                )
-                db.session.add(financial_record)
+            rows = [
+                {
+                    'analysis_id': analysis_id,
+                    'data_type': data_item.get('type'),
+                    'category': data_item.get('category'),
+                    'value': data_item.get('value'),
+                    'currency': data_item.get('currency', 'USD'),
+                    'period_start': data_item.get('period_start'),
+                    'period_end': data_item.get('period_end'),
+                    'confidence': data_item.get('confidence'),
+                    'source': data_item.get('source', 'extracted')
+                }
+                for data_item in financial_data
+            ]
+            return bulk_insert(db.session, FinancialData.__table__, rows)
 
         except Exception as e:
             logger.error(f"Store financial data error: {str(e)}")
@@ -326,20 +385,22 @@ class AnalysisService:
 
     @staticmethod
     def store_metrics(analysis_id, metrics):
-        """Store calculated metrics"""
+        """Store calculated metrics in bulk"""
         try:
-            for metric_name, metric_data in metrics.items():
-                metric_record = AnalysisMetric(
-                    analysis_id=analysis_id,
-                    metric_name=metric_name,
-                    metric_category=metric_data.get('category', 'general'),
-                    value=metric_data.get('value'),
-                    unit=metric_data.get('unit'),
-                    industry_average=metric_data.get('industry_average'),
-                    interpretation=metric_data.get('interpretation'),
-                    trend=metric_data.get('trend')
-                )
-                db.session.add(metric_record)
+            rows = [
+                {
+                    'analysis_id': analysis_id,
+                    'metric_name': metric_name,
+                    'metric_category': metric_data.get('category', 'general'),
+                    'value': metric_data.get('value'),
+                    'unit': metric_data.get('unit'),
+                    'industry_average': metric_data.get('industry_average'),
+                    'interpretation': metric_data.get('interpretation'),
+                    'trend': metric_data.get('trend')
+                }
+                for metric_name, metric_data in metrics.items()
+            ]
+            return bulk_insert(db.session, AnalysisMetric.__table__, rows)
 
         except Exception as e:
             logger.error(f"Store metrics error: {str(e)}")
@@ -428,6 +489,101 @@ class AnalysisService:
             logger.error(f"Export analysis error: {str(e)}")
             raise
 
+class AnalysisQueueService:
+    """Background job queue and workers for analysis processing"""
+
+    _queue = None
+    _workers = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_queue():
+        """Get the process-wide job queue, creating it from app config"""
+        if AnalysisQueueService._queue is None:
+            with AnalysisQueueService._lock:
+                if AnalysisQueueService._queue is None:
+                    AnalysisQueueService._queue = AnalysisQueueService.create_queue(current_app)
+        return AnalysisQueueService._queue
+
+    @staticmethod
+    def create_queue(app):
+        """Create a Redis-backed queue, or an in-process one when configured or Redis is unavailable"""
+        options = {
+            'max_per_user': app.config.get('ANALYSIS_MAX_JOBS_PER_USER', 2),
+            'lease_seconds': app.config.get('ANALYSIS_JOB_LEASE_SECONDS', 600),
+            'base_retry_delay': app.config.get('ANALYSIS_JOB_RETRY_DELAY', 5)
+        }
+        backend = app.config.get('ANALYSIS_QUEUE_BACKEND', 'redis')
+        if backend == 'redis' and app.redis:
+            return RedisJobQueue(app.redis, **options)
+        if backend == 'redis':
+            logger.warning("Redis unavailable, analysis jobs will use an in-process queue")
+        return InProcessJobQueue(**options)
+
+    @staticmethod
+    def get_workers(start=None):
+        """
+        Get the worker pool for this process
+
+        The pool is started when `start` is true, or, when `start` is None,
+        if ANALYSIS_START_WORKERS is set.
+        """
+        if AnalysisQueueService._workers is None:
+            with AnalysisQueueService._lock:
+                if AnalysisQueueService._workers is None:
+                    app = current_app._get_current_object()
+
+                    def handler(job):
+                        with app.app_context():
+                            try:
+                                AnalysisService.run_job(job)
+                            finally:
+                                db.session.remove()
+
+                    AnalysisQueueService._workers = JobWorkerPool(
+                        AnalysisQueueService.get_queue(),
+                        handler,
+                        concurrency=app.config.get('ANALYSIS_WORKER_CONCURRENCY', 4),
+                        poll_interval=app.config.get('ANALYSIS_WORKER_POLL_INTERVAL', 1.0)
+                    )
+        workers = AnalysisQueueService._workers
+        if start is None:
+            start = current_app.config.get('ANALYSIS_START_WORKERS', True)
+        if start:
+            workers.start()
+        return workers
+
+    @staticmethod
+    def start_workers(app):
+        """
+        Start this process's workers at startup
+
+        Jobs left queued by a restart, or whose lease expired when their
+        worker died, are claimed right away instead of waiting for the next
+        enqueue to start the pool.
+        """
+        with app.app_context():
+            workers = AnalysisQueueService.get_workers(start=True)
+        logger.info(f"Started {workers.concurrency} analysis workers")
+        return workers
+
+    @staticmethod
+    def enqueue(job):
+        """Add a job to the queue and wake the local workers"""
+        task_id = AnalysisQueueService.get_queue().enqueue(job)
+        AnalysisQueueService.get_workers().notify()
+        return task_id
+
+    @staticmethod
+    def get_progress(analysis_id):
+        """Get queue progress for an analysis, or None if it was never queued"""
+        try:
+            job = AnalysisQueueService.get_queue().get_analysis_job(analysis_id)
+            return job.to_dict() if job else None
+        except Exception as e:
+            logger.error(f"Get queue progress error: {str(e)}")
+            return None
+
 class FinancialEngineService:
     """Financial analysis engine service"""
 
@@ -625,25 +781,54 @@ class MetricsService:
 
     @staticmethod
     def get_performance_metrics(hours=24, component=None):
-        """Get system performance metrics"""
+        """Get system performance metrics aggregated per metric name"""
         try:
             start_time = datetime.utcnow() - timedelta(hours=hours)
 
-            query = PerformanceMetrics.query.filter(
-                PerformanceMetrics.recorded_at >= start_time
-            )
-
+            filters = [PerformanceMetrics.recorded_at >= start_time]
             if component:
-                query = query.filter(PerformanceMetrics.component == component)
-
-            metrics = query.all()
+                filters.append(PerformanceMetrics.component == component)
+
+            aggregates = db.session.query(
+                PerformanceMetrics.metric_name,
+                db.func.count(PerformanceMetrics.id),
+                db.func.avg(PerformanceMetrics.metric_value),
+                db.func.min(PerformanceMetrics.metric_value),
+                db.func.max(PerformanceMetrics.metric_value),
+                db.func.sum(PerformanceMetrics.metric_value),
+                db.func.max(PerformanceMetrics.metric_unit)
+            ).filter(*filters).group_by(PerformanceMetrics.metric_name).all()
+
+            # Most recent sample per metric name
+            ranked = db.session.query(
+                PerformanceMetrics.metric_name.label('metric_name'),
+                PerformanceMetrics.metric_value.label('metric_value'),
+                PerformanceMetrics.recorded_at.label('recorded_at'),
+                db.func.row_number().over(
+                    partition_by=PerformanceMetrics.metric_name,
+                    order_by=PerformanceMetrics.recorded_at.desc()
+                ).label('position')
+            ).filter(*filters).subquery()
+            latest = {
+                name: (value, recorded_at)
+                for name, value, recorded_at in db.session.query(
+                    ranked.c.metric_name, ranked.c.metric_value, ranked.c.recorded_at
+                ).filter(ranked.c.position == 1).all()
+            }
 
-            # Group metrics by name
             grouped_metrics = {}
-            for metric in metrics:
-                if metric.metric_name not in grouped_metrics:
-                    grouped_metrics[metric.metric_name] = []
-                grouped_metrics[metric.metric_name].append(metric.to_dict())
+            for name, count, average, minimum, maximum, total, unit in aggregates:
+                latest_value, latest_recorded_at = latest.get(name, (None, None))
+                grouped_metrics[name] = {
+                    'count': count,
+                    'average': average,
+                    'minimum': minimum,
+                    'maximum': maximum,
+                    'total': total,
+                    'unit': unit,
+                    'latest_value': latest_value,
+                    'latest_recorded_at': latest_recorded_at.isoformat() if hasattr(latest_recorded_at, 'isoformat') else latest_recorded_at
+                }
 
             return grouped_metrics
 
@@ -651,20 +836,172 @@ class MetricsService:
             logger.error(f"Get performance metrics error: {str(e)}")
             return {}
 
+    @staticmethod
+    def get_performance_rollups(bucket='day', periods=30, metric_name=None, component=None):
+        """Get pre-aggregated performance metrics per day or month"""
+        try:
+            if bucket not in ('day', 'month'):
+                raise ValueError("bucket must be 'day' or 'month'")
+
+            today = datetime.utcnow().date()
+            if bucket == 'day':
+                start = today - timedelta(days=periods - 1)
+            else:
+                months = today.year * 12 + today.month - 1 - (periods - 1)
+                start = today.replace(year=months // 12, month=months % 12 + 1, day=1)
+
+            query = PerformanceMetricRollup.query.filter(
+                PerformanceMetricRollup.bucket == bucket,
+                PerformanceMetricRollup.bucket_start >= start
+            )
+            if metric_name:
+                query = query.filter(PerformanceMetricRollup.metric_name == metric_name)
+            if component:
+                query = query.filter(PerformanceMetricRollup.component == component)
+
+            rollups = query.order_by(PerformanceMetricRollup.bucket_start).all()
+            return [rollup.to_dict() for rollup in rollups]
+
+        except Exception as e:
+            logger.error(f"Get performance rollups error: {str(e)}")
+            return []
+
+    @staticmethod
+    def update_performance_rollups(metric_name, value, component=None, timestamp=None):
+        """Fold one sample into the daily and monthly rollup rows"""
+        table = PerformanceMetricRollup.__table__
+        dialect = db.session.get_bind().dialect.name
+        day = (timestamp or datetime.utcnow()).date()
+        now = datetime.utcnow()
+
+        for bucket, bucket_start in [('day', day), ('month', day.replace(day=1))]:
+            if dialect in ('postgresql', 'sqlite'):
+                insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+                # SQLite spells LEAST/GREATEST as the multi-argument MIN/MAX
+                least = db.func.least if dialect == 'postgresql' else db.func.min
+                greatest = db.func.greatest if dialect == 'postgresql' else db.func.max
+                statement = insert(table).values(
+                    id=str(uuid.uuid4()),
+                    bucket=bucket,
+                    bucket_start=bucket_start,
+                    metric_name=metric_name,
+                    component=component or '',
+                    sample_count=1,
+                    total_value=value,
+                    min_value=value,
+                    max_value=value,
+                    updated_at=now
+                )
+                excluded = statement.excluded
+                statement = statement.on_conflict_do_update(
+                    index_elements=['bucket', 'bucket_start', 'metric_name', 'component'],
+                    set_={
+                        'sample_count': table.c.sample_count + 1,
+                        'total_value': table.c.total_value + excluded.total_value,
+                        'min_value': least(table.c.min_value, excluded.min_value),
+                        'max_value': greatest(table.c.max_value, excluded.max_value),
+                        'updated_at': excluded.updated_at
+                    }
+                )
+                db.session.execute(statement)
+            else:
+                rollup = PerformanceMetricRollup.query.filter_by(
+                    bucket=bucket,
+                    bucket_start=bucket_start,
+                    metric_name=metric_name,
+                    component=component or ''
+                ).with_for_update().first()
+                if rollup:
+                    rollup.sample_count += 1
+                    rollup.total_value += value
+                    rollup.min_value = min(rollup.min_value, value)
+                    rollup.max_value = max(rollup.max_value, value)
+                else:
+                    db.session.add(PerformanceMetricRollup(
+                        bucket=bucket,
+                        bucket_start=bucket_start,
+                        metric_name=metric_name,
+                        component=component or '',
+                        sample_count=1,
+                        total_value=value,
+                        min_value=value,
+                        max_value=value
+                    ))
+
+    @staticmethod
+    def rebuild_performance_rollups(metric_name=None):
+        """Recompute rollup rows from raw performance metrics, e.g. after enabling rollups"""
+        day = db.func.date(PerformanceMetrics.recorded_at)
+        component = db.func.coalesce(PerformanceMetrics.component, '')
+        query = db.session.query(
+            PerformanceMetrics.metric_name,
+            component,
+            day,
+            db.func.count(PerformanceMetrics.id),
+            db.func.sum(PerformanceMetrics.metric_value),
+            db.func.min(PerformanceMetrics.metric_value),
+            db.func.max(PerformanceMetrics.metric_value)
+        ).group_by(PerformanceMetrics.metric_name, component, day)
+
+        rollups_query = PerformanceMetricRollup.query
+        if metric_name:
+            query = query.filter(PerformanceMetrics.metric_name == metric_name)
+            rollups_query = rollups_query.filter_by(metric_name=metric_name)
+
+        # Months are combined from the daily groups so the SQL stays portable
+        totals = {}
+        for name, component_name, metric_day, count, total, minimum, maximum in query.all():
+            if isinstance(metric_day, str):
+                metric_day = datetime.strptime(metric_day, '%Y-%m-%d').date()
+            for bucket, bucket_start in [('day', metric_day), ('month', metric_day.replace(day=1))]:
+                key = (bucket, bucket_start, name, component_name)
+                previous = totals.get(key)
+                if previous is None:
+                    totals[key] = (count, total or 0.0, minimum, maximum)
+                else:
+                    totals[key] = (
+                        previous[0] + count,
+                        previous[1] + (total or 0.0),
+                        min(previous[2], minimum),
+                        max(previous[3], maximum)
+                    )
+
+        rollups_query.delete(synchronize_session=False)
+        db.session.bulk_insert_mappings(PerformanceMetricRollup, [
+            {
+                'id': str(uuid.uuid4()),
+                'bucket': bucket,
+                'bucket_start': bucket_start,
+                'metric_name': name,
+                'component': component_name,
+                'sample_count': count,
+                'total_value': total,
+                'min_value': minimum,
+                'max_value': maximum
+            }
+            for (bucket, bucket_start, name, component_name), (count, total, minimum, maximum) in totals.items()
+        ])
+        return len(totals)
+
     @staticmethod
     def record_performance_metric(metric_name, value, unit=None, component=None, metadata=None):
         """Record a performance metric"""
         try:
+            now = datetime.utcnow()
             metric = PerformanceMetrics(
                 metric_name=metric_name,
                 metric_value=value,
                 metric_unit=unit,
                 service_name='analysis-service',
                 component=component,
-                metadata=metadata
+                metadata=metadata,
+                recorded_at=now
             )
             db.session.add(metric)
 
+            if current_app.config.get('METRICS_ROLLUPS_ENABLED'):
+                MetricsService.update_performance_rollups(metric_name, value, component, now)
+
         except Exception as e:
             logger.error(f"Record performance metric error: {str(e)}")
 
@@ -0,0 +1,298 @@
+"""
+Tests for the analysis job queue and worker pool
+
+Each queue test runs against the in-process queue and, when fakeredis
+with Lua scripting is installed, against the Redis queue. Time is a
+fake clock so leases and retry backoff can be stepped through.
+
+python -m pytest test_job_queue.py
+"""
+
+import importlib.util
+import os
+import threading
+
+import pytest
+
+# Load by path so this file does not import the Flask app
+_spec = importlib.util.spec_from_file_location(
+    'analysis_job_queue',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'job_queue.py')
+)
+job_queue = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(job_queue)
+
+Job = job_queue.Job
+JobStatus = job_queue.JobStatus
+JobWorkerPool = job_queue.JobWorkerPool
+
+LEASE_SECONDS = 60
+BASE_RETRY_DELAY = 5
+
+
+class FakeClock:
+    """Stands in for the time module inside job_queue"""
+
+    def __init__(self, start=1_700_000_000.0):
+        self.now = start
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def redis_client():
+    fakeredis = pytest.importorskip('fakeredis')
+    client = fakeredis.FakeRedis()
+    try:
+        client.eval('return 1', 0)
+    except Exception:
+        pytest.skip('fakeredis without Lua scripting (install lupa)')
+    return client
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(job_queue, 'time', fake)
+    return fake
+
+
+@pytest.fixture(params=['in_process', 'redis'])
+def make_queue(request, clock):
+    def make(**options):
+        options.setdefault('lease_seconds', LEASE_SECONDS)
+        options.setdefault('base_retry_delay', BASE_RETRY_DELAY)
+        if request.param == 'redis':
+            return job_queue.RedisJobQueue(redis_client(), **options)
+        return job_queue.InProcessJobQueue(**options)
+    return make
+
+
+def enqueue(queue, clock, user_id='user-1', priority='normal', max_attempts=3):
+    job = Job(f"analysis-{clock.now}-{priority}-{user_id}", user_id, priority=priority, max_attempts=max_attempts)
+    queue.enqueue(job)
+    # Distinct enqueue times keep FIFO order within a priority observable
+    clock.advance(0.01)
+    return job.job_id
+
+
+def test_claims_in_priority_order_then_fifo(make_queue, clock):
+    queue = make_queue(max_per_user=10)
+    low = enqueue(queue, clock, priority='low')
+    normal_first = enqueue(queue, clock, priority='normal')
+    urgent = enqueue(queue, clock, priority='urgent')
+    normal_second = enqueue(queue, clock, priority='normal')
+    high = enqueue(queue, clock, priority='high')
+
+    claimed = [queue.claim().job_id for _ in range(5)]
+
+    assert claimed == [urgent, high, normal_first, normal_second, low]
+    assert queue.claim() is None
+
+
+def test_per_user_cap_skips_busy_users(make_queue, clock):
+    queue = make_queue(max_per_user=2)
+    first = enqueue(queue, clock, user_id='busy')
+    second = enqueue(queue, clock, user_id='busy')
+    third = enqueue(queue, clock, user_id='busy')
+    other = enqueue(queue, clock, user_id='other')
+
+    assert [queue.claim().job_id for _ in range(3)] == [first, second, other]
+    assert queue.claim() is None
+
+    queue.complete(first)
+    assert queue.claim().job_id == third
+
+
+def test_claim_marks_job_running(make_queue, clock):
+    queue = make_queue()
+    job_id = enqueue(queue, clock)
+
+    job = queue.claim()
+
+    assert job.job_id == job_id
+    assert job.status == JobStatus.RUNNING
+    assert job.attempts == 1
+    assert job.claim_token
+    assert queue.get_job(job_id).claim_token == job.claim_token
+
+
+def test_checkpoint_records_progress_and_renews_lease(make_queue, clock):
+    queue = make_queue()
+    job_id = enqueue(queue, clock)
+    job = queue.claim()
+
+    clock.advance(LEASE_SECONDS - 10)
+    assert queue.checkpoint(job_id, 40, 'calculating_ratios', job.claim_token)
+    clock.advance(LEASE_SECONDS - 10)
+    assert queue.requeue_expired() == 0
+
+    stored = queue.get_job(job_id)
+    assert stored.status == JobStatus.RUNNING
+    assert stored.progress == 40
+    assert stored.stage == 'calculating_ratios'
+
+    clock.advance(11)
+    assert queue.requeue_expired() == 1
+    assert queue.get_job(job_id).status == JobStatus.RETRYING
+
+
+def test_checkpoint_of_finished_job_is_rejected(make_queue, clock):
+    queue = make_queue()
+    job_id = enqueue(queue, clock)
+    queue.claim()
+    queue.complete(job_id)
+
+    assert not queue.checkpoint(job_id, 50)
+    assert queue.get_job(job_id).progress == 100
+
+
+def test_failures_back_off_until_max_attempts(make_queue, clock):
+    queue = make_queue()
+    job_id = enqueue(queue, clock, max_attempts=3)
+
+    for attempt, delay in [(1, 5), (2, 10)]:
+        job = queue.claim()
+        assert job.attempts == attempt
+        assert queue.fail(job_id, f"error {attempt}", job.claim_token)
+
+        retrying = queue.get_job(job_id)
+        assert retrying.status == JobStatus.RETRYING
+        assert retrying.available_at == pytest.approx(clock.now + delay)
+        clock.advance(delay - 1)
+        assert queue.claim() is None
+        clock.advance(1)
+
+    job = queue.claim()
+    assert job.attempts == 3
+    assert not queue.fail(job_id, 'error 3', job.claim_token)
+
+    failed = queue.get_job(job_id)
+    assert failed.status == JobStatus.FAILED
+    assert failed.error == 'error 3'
+    clock.advance(3600)
+    assert queue.claim() is None
+
+
+def test_cancel_queued_and_running_jobs(make_queue, clock):
+    queue = make_queue(max_per_user=1)
+    running = enqueue(queue, clock)
+    queued = enqueue(queue, clock)
+    queue.claim()
+
+    assert queue.cancel(queued)
+    assert queue.cancel(running)
+    assert not queue.cancel(running)
+
+    # Cancelling the running job frees the user's slot, and the cancelled job is never claimed
+    later = enqueue(queue, clock)
+    assert queue.claim().job_id == later
+    assert queue.get_job(queued).status == JobStatus.CANCELLED
+    assert queue.get_job(running).status == JobStatus.CANCELLED
+
+
+def test_expired_lease_is_retried_with_backoff(make_queue, clock):
+    queue = make_queue(max_per_user=1)
+    job_id = enqueue(queue, clock)
+    queue.claim()
+
+    clock.advance(LEASE_SECONDS + 1)
+    assert queue.requeue_expired() == 1
+
+    job = queue.get_job(job_id)
+    assert job.status == JobStatus.RETRYING
+    assert job.error == job_queue.LEASE_EXPIRED_ERROR
+    assert queue.claim() is None
+    clock.advance(BASE_RETRY_DELAY)
+    assert queue.claim().job_id == job_id
+
+
+def test_expired_lease_fails_job_out_of_attempts(make_queue, clock):
+    queue = make_queue()
+    job_id = enqueue(queue, clock, max_attempts=2)
+
+    for _ in range(2):
+        clock.advance(3600)
+        assert queue.claim().job_id == job_id
+        clock.advance(LEASE_SECONDS + 1)
+        assert queue.requeue_expired() == 1
+
+    assert queue.get_job(job_id).status == JobStatus.FAILED
+    clock.advance(3600)
+    assert queue.claim() is None
+
+
+def test_stale_claim_cannot_finish_the_next_attempt(make_queue, clock):
+    queue = make_queue(max_per_user=2)
+    job_id = enqueue(queue, clock)
+    stale = queue.claim()
+
+    clock.advance(LEASE_SECONDS + 1)
+    queue.requeue_expired()
+    clock.advance(BASE_RETRY_DELAY)
+    current = queue.claim()
+    assert current.claim_token != stale.claim_token
+
+    queue.complete(job_id, stale.claim_token)
+    assert not queue.fail(job_id, 'stale failure', stale.claim_token)
+    assert not queue.checkpoint(job_id, 90, None, stale.claim_token)
+    assert queue.get_job(job_id).status == JobStatus.RUNNING
+
+    # The stale calls did not release the user's slot
+    other = enqueue(queue, clock)
+    assert queue.claim().job_id == other
+    assert queue.claim() is None
+
+    queue.complete(job_id, current.claim_token)
+    assert queue.get_job(job_id).status == JobStatus.COMPLETED
+
+
+def test_worker_pool_completes_and_retries_jobs(clock):
+    queue = job_queue.InProcessJobQueue(lease_seconds=LEASE_SECONDS, base_retry_delay=BASE_RETRY_DELAY)
+    attempts = []
+
+    def handler(job):
+        attempts.append(job.job_id)
+        if job.attempts == 1:
+            raise RuntimeError('first attempt fails')
+
+    pool = JobWorkerPool(queue, handler, concurrency=1)
+    job_id = enqueue(queue, clock)
+
+    assert pool.run_once()
+    assert queue.get_job(job_id).status == JobStatus.RETRYING
+    assert not pool.run_once()
+
+    clock.advance(BASE_RETRY_DELAY)
+    assert pool.run_once()
+    assert queue.get_job(job_id).status == JobStatus.COMPLETED
+    assert attempts == [job_id, job_id]
+
+
+def test_worker_pool_threads_run_jobs_concurrently():
+    queue = job_queue.InProcessJobQueue(max_per_user=4)
+    barrier = threading.Barrier(3, timeout=5)
+    done = threading.Event()
+    finished = []
+
+    def handler(job):
+        barrier.wait()
+        finished.append(job.job_id)
+        if len(finished) == 3:
+            done.set()
+
+    job_ids = [queue.enqueue(Job(f"analysis-{index}", 'user-1')) for index in range(3)]
+    pool = JobWorkerPool(queue, handler, concurrency=3, poll_interval=0.05)
+    pool.start()
+    try:
+        assert done.wait(5)
+    finally:
+        pool.stop(timeout=5)
+
+    assert sorted(finished) == sorted(job_ids)
+    assert not pool.running
+    for job_id in job_ids:
+        assert queue.get_job(job_id).status == JobStatus.COMPLETED
@@ -0,0 +1,58 @@
+"""
+Standalone analysis worker
+
+Runs queued analysis jobs without serving HTTP. Use it when the web
+processes run with ANALYSIS_START_WORKERS=false:
+
+    python worker.py [--concurrency N]
+
+Jobs are shared through the Redis queue, so the web processes and any
+number of worker processes can run side by side. On start the worker
+claims jobs that were already queued, or whose lease expired, and it
+stops cleanly on SIGINT or SIGTERM once the running jobs finish.
+"""
+
+import argparse
+import logging
+import os
+import signal
+import sys
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run analysis jobs from the shared queue')
+    parser.add_argument('--concurrency', type=int, help='Worker threads (default: ANALYSIS_WORKER_CONCURRENCY)')
+    parser.add_argument('--shutdown-timeout', type=float, default=None,
+                        help='Seconds to wait for running jobs on shutdown (default: wait for them)')
+    args = parser.parse_args(argv)
+
+    # This process starts its own pool below, with the requested concurrency
+    os.environ['ANALYSIS_START_WORKERS'] = 'false'
+    from app import app
+    from services import AnalysisQueueService
+
+    if app.config['ANALYSIS_QUEUE_BACKEND'] != 'redis' or app.redis is None:
+        logger.error("The standalone worker needs the Redis queue; an in-process queue "
+                     "is not shared with the web processes")
+        return 1
+
+    if args.concurrency:
+        app.config['ANALYSIS_WORKER_CONCURRENCY'] = args.concurrency
+
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    workers = AnalysisQueueService.start_workers(app)
+    stop.wait()
+
+    logger.info("Stopping analysis workers")
+    workers.stop(args.shutdown_timeout)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,295 @@
+import hmac
+import json
+import hashlib
+import threading
+import time
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class ApiKeyVerificationCache:
+    """
+    Short-lived cache of successfully verified API keys
+
+    Entries are keyed by an HMAC-SHA256 digest of the presented key, so
+    neither the plaintext key nor anything usable offline is stored. A hit
+    skips the slow werkzeug password hash check. Entries expire after `ttl`
+    seconds (or when the key itself expires) and are dropped immediately
+    when a key is revoked. With a Redis client the cache is shared by all
+    workers; otherwise it is a per-process LRU of at most `max_entries`.
+
+    Without Redis, `invalidate` only reaches the revoking process: other
+    workers keep accepting a revoked key until their entry expires, i.e.
+    for up to `ttl` seconds. Multi-worker deployments should use Redis or
+    keep `ttl` short.
+    """
+
+    def __init__(self, secret: str, ttl: int = 60, max_entries: int = 10000, redis_client=None, prefix: str = 'api_key_verified'):
+        self.secret = secret.encode() if isinstance(secret, str) else secret
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.redis = redis_client
+        self.prefix = prefix
+        self._entries = OrderedDict()
+        self._key_digests: Dict[str, set] = {}
+        self._lock = threading.Lock()
+
+    def digest(self, api_key: str) -> str:
+        return hmac.new(self.secret, api_key.encode(), hashlib.sha256).hexdigest()
+
+    def _entry_ttl(self, expires_at: Optional[datetime]) -> float:
+        ttl = self.ttl
+        if expires_at:
+            ttl = min(ttl, (expires_at - datetime.utcnow()).total_seconds())
+        return ttl
+
+    def get(self, api_key: str) -> Optional[Dict]:
+        """Cached verification for a presented key: {'api_key_id', 'user_id'} or None"""
+        digest = self.digest(api_key)
+        if self.redis is not None:
+            try:
+                cached = self.redis.get(f"{self.prefix}:{digest}")
+                return json.loads(cached) if cached else None
+            except Exception as e:
+                logger.warning(f"API key cache read failed: {str(e)}")
+                return None
+
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            deadline, value = entry
+            if deadline <= time.monotonic():
+                self._discard(digest, value['api_key_id'])
+                return None
+            self._entries.move_to_end(digest)
+            return value
+
+    def set(self, api_key: str, api_key_id: str, user_id: str, expires_at: Optional[datetime] = None):
+        """Remember a key that just passed the full hash check"""
+        ttl = self._entry_ttl(expires_at)
+        if ttl <= 0:
+            return
+        digest = self.digest(api_key)
+        value = {'api_key_id': api_key_id, 'user_id': user_id}
+
+        if self.redis is not None:
+            try:
+                pipe = self.redis.pipeline()
+                pipe.setex(f"{self.prefix}:{digest}", max(int(ttl), 1), json.dumps(value))
+                # Reverse index so revocation can find the entry without the plaintext key
+                pipe.sadd(f"{self.prefix}:id:{api_key_id}", digest)
+                pipe.expire(f"{self.prefix}:id:{api_key_id}", max(int(self.ttl), 1))
+                pipe.execute()
+            except Exception as e:
+                logger.warning(f"API key cache write failed: {str(e)}")
+            return
+
+        with self._lock:
+            self._entries[digest] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(digest)
+            self._key_digests.setdefault(api_key_id, set()).add(digest)
+            while len(self._entries) > self.max_entries:
+                oldest, (_, oldest_value) = next(iter(self._entries.items()))
+                self._discard(oldest, oldest_value['api_key_id'])
+
+    def _discard(self, digest: str, api_key_id: str):
+        self._entries.pop(digest, None)
+        digests = self._key_digests.get(api_key_id)
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                del self._key_digests[api_key_id]
+
+    def invalidate(self, api_key_id: str):
+        """Drop every cached verification of an API key, e.g. after revocation"""
+        if self.redis is not None:
+            try:
+                index_key = f"{self.prefix}:id:{api_key_id}"
+                digests = self.redis.smembers(index_key)
+                pipe = self.redis.pipeline()
+                for digest in digests:
+                    digest = digest.decode() if isinstance(digest, bytes) else digest
+                    pipe.delete(f"{self.prefix}:{digest}")
+                pipe.delete(index_key)
+                pipe.execute()
+            except Exception as e:
+                logger.error(f"API key cache invalidation failed: {str(e)}")
+            return
+
+        with self._lock:
+            for digest in list(self._key_digests.get(api_key_id, ())):
+                self._discard(digest, api_key_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._key_digests.clear()
+
+class LastUsedRecorder:
+    """
+    Coalesces API key `last_used_at` updates into periodic batched writes
+
+    `touch` only records the newest timestamp per key in memory. Once
+    `flush_interval` seconds have passed since the last flush, the next
+    `touch` (or an explicit `flush`) hands all pending timestamps to
+    `writer` in one call. After `start`, a background thread also flushes
+    every `flush_interval` seconds, so timestamps are written when traffic
+    stops; `close` stops it and writes what is still pending, e.g. at exit.
+    """
+
+    def __init__(self, writer: Callable[[Dict[str, datetime]], None], flush_interval: float = 30.0, max_pending: int = 5000):
+        self.writer = writer
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[str, datetime] = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Flush pending timestamps in a background thread every `flush_interval` seconds"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='api-key-last-used', daemon=True)
+            self._thread.start()
+
+    def close(self, timeout: Optional[float] = None):
+        """Stop the background thread and write everything still pending"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            with self._lock:
+                due = bool(self._pending) and time.monotonic() - self._last_flush >= self.flush_interval
+            if due:
+                self.flush()
+
+    def touch(self, api_key_id: str, used_at: Optional[datetime] = None):
+        used_at = used_at or datetime.utcnow()
+        with self._lock:
+            previous = self._pending.get(api_key_id)
+            if previous is None or used_at > previous:
+                self._pending[api_key_id] = used_at
+            due = (time.monotonic() - self._last_flush >= self.flush_interval
+                   or len(self._pending) >= self.max_pending)
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write all pending timestamps; returns how many keys were written"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+        try:
+            self.writer(pending)
+        except Exception as e:
+            logger.error(f"Failed to flush API key last_used_at: {str(e)}")
+            # Keep the timestamps for the next flush unless newer ones arrived
+            with self._lock:
+                for api_key_id, used_at in pending.items():
+                    if api_key_id not in self._pending or self._pending[api_key_id] < used_at:
+                        self._pending[api_key_id] = used_at
+            return 0
+        return len(pending)
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+def benchmark_verification(requests_count: int = 2000, keys: int = 50, database_path: Optional[str] = None) -> Dict[str, float]:
+    """
+    Requests per second of API key verification with and without the fast path
+
+    The baseline runs the werkzeug hash check and commits last_used_at for
+    every request; the cached path does one HMAC lookup per request and
+    coalesced last_used_at writes. Writes go to an SQLite file so commit
+    cost is included. The cached figure is steady state: each key's first
+    request, which still pays the hash check, runs before timing starts.
+    The baseline is sampled on fewer requests because each hash check is
+    deliberately slow.
+    """
+    import os
+    import secrets
+    import sqlite3
+    import tempfile
+    from werkzeug.security import generate_password_hash, check_password_hash
+
+    directory = None
+    if database_path is None:
+        directory = tempfile.mkdtemp()
+        database_path = os.path.join(directory, 'api_keys.db')
+    connection = sqlite3.connect(database_path)
+    connection.execute('CREATE TABLE api_keys (id TEXT PRIMARY KEY, key_hash TEXT, last_used_at TEXT)')
+    api_keys = {}
+    for index in range(keys):
+        key = f"fca_{secrets.token_urlsafe(32)}"
+        api_keys[f"key-{index}"] = (key, generate_password_hash(key))
+        connection.execute('INSERT INTO api_keys VALUES (?, ?, NULL)', (f"key-{index}", api_keys[f"key-{index}"][1]))
+    connection.commit()
+    ids = list(api_keys)
+
+    def write(pending):
+        connection.executemany(
+            'UPDATE api_keys SET last_used_at = ? WHERE id = ?',
+            [(used_at.isoformat(), api_key_id) for api_key_id, used_at in pending.items()]
+        )
+        connection.commit()
+
+    try:
+        baseline_requests = max(min(requests_count // 50, 200), 5)
+        start = time.perf_counter()
+        for request_index in range(baseline_requests):
+            api_key_id = ids[request_index % keys]
+            key, key_hash = api_keys[api_key_id]
+            check_password_hash(key_hash, key)
+            connection.execute('UPDATE api_keys SET last_used_at = ? WHERE id = ?', (datetime.utcnow().isoformat(), api_key_id))
+            connection.commit()
+        baseline_seconds = time.perf_counter() - start
+
+        cache = ApiKeyVerificationCache(secret=secrets.token_bytes(32), ttl=300)
+        recorder = LastUsedRecorder(write, flush_interval=1.0)
+        # Each key's first request still pays the hash check; warm the cache outside the timing
+        for api_key_id, (key, key_hash) in api_keys.items():
+            check_password_hash(key_hash, key)
+            cache.set(key, api_key_id, 'user')
+        start = time.perf_counter()
+        for request_index in range(requests_count):
+            api_key_id = ids[request_index % keys]
+            key, key_hash = api_keys[api_key_id]
+            if cache.get(key) is None:
+                check_password_hash(key_hash, key)
+                cache.set(key, api_key_id, 'user')
+            recorder.touch(api_key_id)
+        recorder.flush()
+        cached_seconds = time.perf_counter() - start
+    finally:
+        connection.close()
+        if directory:
+            os.remove(database_path)
+            os.rmdir(directory)
+
+    return {
+        'baseline_requests_per_second': baseline_requests / baseline_seconds,
+        'cached_requests_per_second': requests_count / cached_seconds,
+        'speedup': (requests_count / cached_seconds) / (baseline_requests / baseline_seconds),
+        'distinct_keys': keys
+    }
+
+if __name__ == '__main__':
+    results = benchmark_verification()
+    print(f"Baseline: {results['baseline_requests_per_second']:,.1f} requests/s")
+    print(f"Cached:   {results['cached_requests_per_second']:,.1f} requests/s "
+          f"({results['speedup']:,.0f}x, {results['distinct_keys']} distinct keys, warm cache)")
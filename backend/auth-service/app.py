@@ -27,6 +27,20 @@ app.config['GOOGLE_CLIENT_SECRET'] = os.getenv('GOOGLE_CLIENT_SECRET')
 app.config['FACEBOOK_CLIENT_ID'] = os.getenv('FACEBOOK_CLIENT_ID')
 app.config['FACEBOOK_CLIENT_SECRET'] = os.getenv('FACEBOOK_CLIENT_SECRET')
 
+# API key verification cache (shared through Redis when a URL is set, per process otherwise).
+# Without Redis a revocation only clears the revoking worker's cache, so the
+# per-process TTL, and with it how long other workers accept a revoked key,
+# is capped at API_KEY_CACHE_LOCAL_TTL seconds; use Redis for multi-worker deployments
+app.config['API_KEY_CACHE_TTL'] = int(os.getenv('API_KEY_CACHE_TTL', 60))
+app.config['API_KEY_CACHE_LOCAL_TTL'] = int(os.getenv('API_KEY_CACHE_LOCAL_TTL', 5))
+app.config['API_KEY_CACHE_REDIS_URL'] = os.getenv('API_KEY_CACHE_REDIS_URL')
+app.config['API_KEY_LAST_USED_FLUSH_SECONDS'] = int(os.getenv('API_KEY_LAST_USED_FLUSH_SECONDS', 30))
+
+# Revoked token checks (bloom filter, then Redis when a URL is set, then the database)
+app.config['TOKEN_BLACKLIST_REDIS_URL'] = os.getenv('TOKEN_BLACKLIST_REDIS_URL')
+app.config['TOKEN_BLACKLIST_CAPACITY'] = int(os.getenv('TOKEN_BLACKLIST_CAPACITY', 100000))
+app.config['TOKEN_BLACKLIST_SYNC_SECONDS'] = float(os.getenv('TOKEN_BLACKLIST_SYNC_SECONDS', 1.0))
+
 # Initialize extensions
 db = SQLAlchemy(app)
 jwt = JWTManager(app)
@@ -49,8 +63,9 @@ blacklisted_tokens = set()
 
 @jwt.token_in_blocklist_loader
 def check_if_token_revoked(jwt_header, jwt_payload):
+    from services import SecurityService
     jti = jwt_payload['jti']
-    return jti in blacklisted_tokens
+    return jti in blacklisted_tokens or SecurityService.is_token_blacklisted(jti)
 
 # Import models and routes after app initialization
 from models import *
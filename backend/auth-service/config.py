@@ -32,6 +32,8 @@ class Config:
     MAIL_USERNAME = os.getenv('MAIL_USERNAME')
     MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER', 'noreply@finclick.ai')
+    MAIL_POOL_SIZE = int(os.getenv('MAIL_POOL_SIZE', 2))
+    MAIL_MAX_MESSAGES_PER_CONNECTION = int(os.getenv('MAIL_MAX_MESSAGES_PER_CONNECTION', 100))
 
     # SMS Configuration (Twilio)
     TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID')
@@ -293,8 +293,8 @@ class BlacklistedToken(db.Model):
     token_type = db.Column(db.String(10), nullable=False)  # access or refresh
     user_id = db.Column(db.String(36), nullable=True)
 
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    expires_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
 
     def __repr__(self):
         return f'<BlacklistedToken {self.jti}>'
@@ -354,7 +354,7 @@ class ApiKey(db.Model):
 
     name = db.Column(db.String(100), nullable=False)
     key_hash = db.Column(db.String(255), nullable=False)
-    key_prefix = db.Column(db.String(10), nullable=False)  # First 8 chars for display
+    key_prefix = db.Column(db.String(10), nullable=False, index=True)  # First 8 chars for display
 
     # Permissions and limits
     permissions = db.Column(db.JSON, default=list)
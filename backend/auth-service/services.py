@@ -22,6 +22,11 @@ from utils import (
     get_user_agent, parse_user_agent, hash_api_key, generate_api_key,
     verify_api_key
 )
+from api_key_cache import ApiKeyVerificationCache, LastUsedRecorder
+from token_blacklist import TokenBlacklist
+from sqlalchemy import bindparam, or_
+import atexit
+import threading
 import logging
 import uuid
 
@@ -807,6 +812,88 @@ class ApiKeyService:
             db.session.rollback()
             return None
 
+    _verification_cache = None
+    _last_used_recorder = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_verification_cache():
+        """Get the process-wide verification cache, creating it from app config"""
+        if ApiKeyService._verification_cache is None:
+            with ApiKeyService._lock:
+                if ApiKeyService._verification_cache is None:
+                    redis_client = None
+                    redis_url = current_app.config.get('API_KEY_CACHE_REDIS_URL')
+                    if redis_url:
+                        try:
+                            import redis
+                            redis_client = redis.from_url(redis_url)
+                            redis_client.ping()
+                        except Exception as e:
+                            logger.warning(f"API key cache Redis unavailable, using in-process cache: {str(e)}")
+                            redis_client = None
+                    ttl = current_app.config.get('API_KEY_CACHE_TTL', 60)
+                    if redis_client is None:
+                        # Revocation only clears this process's cache, so other
+                        # workers accept a revoked key until their entry expires
+                        ttl = min(ttl, current_app.config.get('API_KEY_CACHE_LOCAL_TTL', 5))
+                        logger.warning(
+                            f"API key cache is per process: other workers may accept a revoked key "
+                            f"for up to {ttl}s; set API_KEY_CACHE_REDIS_URL when running several workers"
+                        )
+                    ApiKeyService._verification_cache = ApiKeyVerificationCache(
+                        secret=current_app.config['SECRET_KEY'],
+                        ttl=ttl,
+                        redis_client=redis_client
+                    )
+        return ApiKeyService._verification_cache
+
+    @staticmethod
+    def get_last_used_recorder():
+        """Get the process-wide recorder that batches last_used_at writes"""
+        if ApiKeyService._last_used_recorder is None:
+            with ApiKeyService._lock:
+                if ApiKeyService._last_used_recorder is None:
+                    app = current_app._get_current_object()
+
+                    def writer(pending):
+                        # Own app context, and so its own session: flushes from the
+                        # timer thread or at exit have none, and a flush during a
+                        # request must not commit that request's changes
+                        with app.app_context():
+                            try:
+                                ApiKeyService.write_last_used(pending)
+                            finally:
+                                db.session.remove()
+
+                    recorder = LastUsedRecorder(
+                        writer,
+                        flush_interval=current_app.config.get('API_KEY_LAST_USED_FLUSH_SECONDS', 30)
+                    )
+                    recorder.start()
+                    atexit.register(recorder.close)
+                    ApiKeyService._last_used_recorder = recorder
+        return ApiKeyService._last_used_recorder
+
+    @staticmethod
+    def write_last_used(pending):
+        """Write coalesced last_used_at timestamps in one executemany UPDATE"""
+        table = ApiKey.__table__
+        statement = table.update().where(
+            table.c.id == bindparam('key_id'),
+            # Never move last_used_at backwards when several workers flush
+            or_(table.c.last_used_at.is_(None), table.c.last_used_at < bindparam('used_at'))
+        ).values(last_used_at=bindparam('used_at'))
+        try:
+            db.session.execute(statement, [
+                {'key_id': api_key_id, 'used_at': used_at}
+                for api_key_id, used_at in pending.items()
+            ])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
     @staticmethod
     def verify_api_key(api_key):
         """Verify API key and return user"""
@@ -815,13 +902,29 @@ class ApiKeyService:
             if not api_key.startswith('fca_'):
                 return None, "Invalid API key format"
 
+            # Fast path: key verified recently
+            cache = ApiKeyService.get_verification_cache()
+            cached = cache.get(api_key)
+            if cached:
+                user = User.query.get(cached['user_id'])
+                if user:
+                    ApiKeyService.get_last_used_recorder().touch(cached['api_key_id'])
+                    return user, None
+
             prefix = api_key[:8] + "..."
 
-            # Find API key by prefix
-            api_key_record = ApiKey.query.filter_by(
+            # Prefixes are short and can collide, so check every active key sharing it
+            candidates = ApiKey.query.filter_by(
                 key_prefix=prefix,
                 is_active=True
-            ).first()
+            ).all()
+
+            api_key_record = None
+            for candidate in candidates:
+                # Verify hash
+                if verify_api_key(api_key, candidate.key_hash):
+                    api_key_record = candidate
+                    break
 
             if not api_key_record:
                 return None, "Invalid API key"
@@ -830,13 +933,10 @@ class ApiKeyService:
             if api_key_record.is_expired():
                 return None, "API key expired"
 
-            # Verify hash
-            if not verify_api_key(api_key, api_key_record.key_hash):
-                return None, "Invalid API key"
+            cache.set(api_key, api_key_record.id, api_key_record.user_id, api_key_record.expires_at)
 
-            # Update last used
-            api_key_record.last_used_at = datetime.utcnow()
-            db.session.commit()
+            # Update last used in the next batched flush
+            ApiKeyService.get_last_used_recorder().touch(api_key_record.id)
 
             return api_key_record.user, None
 
@@ -869,6 +969,10 @@ class ApiKeyService:
             )
 
             db.session.commit()
+
+            # Stop serving cached verifications of the revoked key
+            ApiKeyService.get_verification_cache().invalidate(api_key_id)
+
             return True, "API key revoked successfully"
 
         except Exception as e:
@@ -962,6 +1066,50 @@ FinClick.AI Team
 class SecurityService:
     """Enhanced security-related services"""
 
+    _token_blacklist = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_token_blacklist():
+        """Get the process-wide layered token blacklist, creating it from app config"""
+        if SecurityService._token_blacklist is None:
+            with SecurityService._lock:
+                if SecurityService._token_blacklist is None:
+                    app = current_app._get_current_object()
+                    redis_client = None
+                    redis_url = app.config.get('TOKEN_BLACKLIST_REDIS_URL')
+                    if redis_url:
+                        try:
+                            import redis
+                            redis_client = redis.from_url(redis_url)
+                            redis_client.ping()
+                        except Exception as e:
+                            logger.warning(f"Token blacklist Redis unavailable, syncing from database: {str(e)}")
+                            redis_client = None
+
+                    # Loaders may run outside a request (e.g. first check in a worker)
+                    def load_active():
+                        with app.app_context():
+                            return [jti for (jti,) in db.session.query(BlacklistedToken.jti).filter(
+                                BlacklistedToken.expires_at >= datetime.utcnow()
+                            ).all()]
+
+                    def load_since(since):
+                        with app.app_context():
+                            return [jti for (jti,) in db.session.query(BlacklistedToken.jti).filter(
+                                BlacklistedToken.created_at >= since
+                            ).all()]
+
+                    SecurityService._token_blacklist = TokenBlacklist(
+                        load_active=load_active,
+                        load_since=load_since,
+                        db_contains=lambda jti: BlacklistedToken.query.filter_by(jti=jti).first() is not None,
+                        redis_client=redis_client,
+                        capacity=app.config.get('TOKEN_BLACKLIST_CAPACITY', 100000),
+                        sync_interval=app.config.get('TOKEN_BLACKLIST_SYNC_SECONDS', 1.0)
+                    )
+        return SecurityService._token_blacklist
+
     @staticmethod
     def blacklist_token(jti, token_type, user_id, expires_at):
         """Add token to blacklist"""
@@ -976,6 +1124,9 @@ class SecurityService:
             db.session.add(blacklisted_token)
             db.session.commit()
 
+            # Add to the filter and propagate to other processes
+            SecurityService.get_token_blacklist().revoke(jti, expires_at)
+
             return True
 
         except Exception as e:
@@ -987,8 +1138,7 @@ class SecurityService:
     def is_token_blacklisted(jti):
         """Check if token is blacklisted"""
         try:
-            blacklisted = BlacklistedToken.query.filter_by(jti=jti).first()
-            return blacklisted is not None
+            return SecurityService.get_token_blacklist().is_revoked(jti)
 
         except Exception as e:
             logger.error(f"Failed to check token blacklist: {str(e)}")
@@ -998,17 +1148,18 @@ class SecurityService:
     def cleanup_expired_tokens():
         """Clean up expired blacklisted tokens"""
         try:
-            expired_tokens = BlacklistedToken.query.filter(
+            count = BlacklistedToken.query.filter(
                 BlacklistedToken.expires_at < datetime.utcnow()
-            ).all()
-
-            count = len(expired_tokens)
-            for token in expired_tokens:
-                db.session.delete(token)
+            ).delete(synchronize_session=False)
 
             db.session.commit()
             logger.info(f"Cleaned up {count} expired blacklisted tokens")
 
+            # Expired tokens can leave the filter at its next rebuild
+            blacklist = SecurityService.get_token_blacklist()
+            blacklist.remove_expired()
+            blacklist.invalidate()
+
             return count
 
         except Exception as e:
@@ -0,0 +1,278 @@
+import math
+import time
+import hashlib
+import threading
+import logging
+from datetime import datetime
+from typing import Callable, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class BloomFilter:
+    """
+    Fixed-size bloom filter of strings
+
+    Sized for `capacity` items at `error_rate` false positives. Membership
+    tests never give false negatives, so a miss proves an item was never
+    added. Bit positions come from double hashing one BLAKE2b digest.
+
+    `count` only grows when an add sets a new bit, so adding an item again
+    does not count it twice.
+    """
+
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.001):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.size = max(int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.hash_count = max(int(round(self.size / self.capacity * math.log(2))), 1)
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _hashes(self, item: str) -> Tuple[int, int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+    def add(self, item: str) -> bool:
+        """Add an item; returns False when it was (probably) already present"""
+        first, second = self._hashes(item)
+        bits, size = self._bits, self.size
+        added = False
+        for index in range(self.hash_count):
+            position = (first + index * second) % size
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, item: str) -> bool:
+        first, second = self._hashes(item)
+        bits, size = self._bits, self.size
+        # Stop at the first clear bit; most lookups are misses
+        for index in range(self.hash_count):
+            position = (first + index * second) % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def __len__(self) -> int:
+        return self.count
+
+class TokenBlacklist:
+    """
+    Layered revoked-token check: bloom filter, then Redis, then the database
+
+    - The in-process bloom filter answers most checks: a miss means the JTI
+      was never revoked.
+    - On a filter hit, the Redis sorted set of revoked JTIs (scored by
+      token expiry) confirms revocation without touching the database.
+    - Only filter hits that Redis cannot confirm (false positives, Redis
+      down or evicted) reach `db_contains`, which is authoritative.
+
+    Revocations made by other processes reach the filter incrementally:
+    every `sync_interval` seconds JTIs revoked since the last sync are
+    read from the database via `load_since`. The database is the source of
+    truth, so a revocation whose Redis write failed still reaches every
+    process. The filter is rebuilt from the database every
+    `rebuild_interval` seconds, or when it fills up, so expired tokens drop
+    out and the false-positive rate stays at `error_rate`.
+    """
+
+    # Re-read a little before the last watermark so revocations committed late are not missed
+    SYNC_OVERLAP_SECONDS = 5
+
+    def __init__(
+        self,
+        load_active: Callable[[], Iterable[str]],
+        load_since: Callable[[datetime], Iterable[str]],
+        db_contains: Callable[[str], bool],
+        redis_client=None,
+        prefix: str = 'token_blacklist',
+        capacity: int = 100000,
+        error_rate: float = 0.001,
+        sync_interval: float = 1.0,
+        rebuild_interval: float = 3600.0
+    ):
+        self.load_active = load_active
+        self.load_since = load_since
+        self.db_contains = db_contains
+        self.redis = redis_client
+        self.revoked_key = f"{prefix}:revoked"
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self.stats = {'filter_negative': 0, 'redis_positive': 0, 'db_checks': 0}
+
+        self._lock = threading.Lock()
+        self._filter: Optional[BloomFilter] = None
+        self._built_at = 0.0
+        self._synced_at = 0.0
+        self._watermark = 0.0
+
+    def revoke(self, jti: str, expires_at: Optional[datetime] = None):
+        """Record a revocation made by this process (after it is committed to the database)"""
+        now = time.time()
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+        if self.redis is None:
+            return
+        try:
+            expiry = expires_at.timestamp() if expires_at else now + self.rebuild_interval
+            self.redis.zadd(self.revoked_key, {jti: expiry})
+        except Exception as e:
+            # Other processes still pick it up from the database; their
+            # filter hits fall through to `db_contains`
+            logger.warning(f"Failed to add token revocation to Redis: {str(e)}")
+
+    def is_revoked(self, jti: str) -> bool:
+        bloom = self._current_filter()
+        if jti not in bloom:
+            self.stats['filter_negative'] += 1
+            return False
+
+        if self.redis is not None:
+            try:
+                expiry = self.redis.zscore(self.revoked_key, jti)
+                if expiry is not None:
+                    self.stats['redis_positive'] += 1
+                    return True
+            except Exception as e:
+                logger.warning(f"Token blacklist Redis check failed: {str(e)}")
+
+        self.stats['db_checks'] += 1
+        return self.db_contains(jti)
+
+    def invalidate(self):
+        """Force a full rebuild on the next check, e.g. after bulk cleanup"""
+        with self._lock:
+            self._built_at = 0.0
+
+    def remove_expired(self, now: Optional[float] = None) -> int:
+        """Drop expired entries from the Redis layer"""
+        if self.redis is None:
+            return 0
+        now = now or time.time()
+        try:
+            return self.redis.zremrangebyscore(self.revoked_key, '-inf', now)
+        except Exception as e:
+            logger.warning(f"Failed to trim token blacklist in Redis: {str(e)}")
+            return 0
+
+    def _current_filter(self) -> BloomFilter:
+        now = time.time()
+        bloom = self._filter
+        if bloom is not None and now - self._synced_at < self.sync_interval:
+            return bloom
+
+        with self._lock:
+            if (self._filter is None or now - self._built_at >= self.rebuild_interval
+                    or len(self._filter) >= self._filter.capacity):
+                self._rebuild(now)
+            elif now - self._synced_at >= self.sync_interval:
+                self._sync(now)
+            return self._filter
+
+    def _rebuild(self, now: float):
+        jtis = list(self.load_active())
+        bloom = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+        for jti in jtis:
+            bloom.add(jti)
+        self._filter = bloom
+        self._built_at = self._synced_at = now
+        self._watermark = now
+        logger.info(f"Rebuilt token blacklist filter with {len(jtis)} revoked tokens")
+
+    def _sync(self, now: float):
+        since = self._watermark - self.SYNC_OVERLAP_SECONDS
+        try:
+            jtis = list(self.load_since(datetime.utcfromtimestamp(since)))
+        except Exception as e:
+            # Keep serving the current filter; the next check retries the sync
+            logger.warning(f"Token blacklist sync failed: {str(e)}")
+            return
+        # The overlap re-reads recent JTIs; the filter ignores ones it already holds
+        for jti in jtis:
+            self._filter.add(jti)
+        self._synced_at = self._watermark = now
+
+def benchmark_token_checks(revoked: int = 10000, checks: int = 50000, revoked_share: float = 0.01, database_url: str = 'sqlite://') -> dict:
+    """
+    Token checks per second: the per-request ORM query versus the layered blacklist
+
+    The baseline issues the same `filter_by(jti=...).first()` query that
+    SecurityService used for every check. The layered check runs without
+    Redis, so every filter hit (revoked tokens plus false positives) still
+    falls through to that query. Network latency to a remote database is
+    not included, which understates the gain in production.
+    """
+    import random
+    import uuid
+    from sqlalchemy import Column, String, DateTime, create_engine
+    from sqlalchemy.orm import Session, declarative_base
+
+    Base = declarative_base()
+
+    class BenchmarkBlacklistedToken(Base):
+        __tablename__ = 'benchmark_blacklisted_tokens'
+
+        id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+        jti = Column(String(36), unique=True, nullable=False)
+        created_at = Column(DateTime, default=datetime.utcnow)
+
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+
+    try:
+        revoked_jtis = [str(uuid.uuid4()) for _ in range(revoked)]
+        session.bulk_insert_mappings(BenchmarkBlacklistedToken, [
+            {'id': str(uuid.uuid4()), 'jti': jti} for jti in revoked_jtis
+        ])
+        session.commit()
+
+        def db_contains(jti):
+            return session.query(BenchmarkBlacklistedToken).filter_by(jti=jti).first() is not None
+
+        rng = random.Random(0)
+        workload = [
+            rng.choice(revoked_jtis) if rng.random() < revoked_share else str(uuid.uuid4())
+            for _ in range(checks)
+        ]
+
+        start = time.perf_counter()
+        expected = [db_contains(jti) for jti in workload]
+        database_seconds = time.perf_counter() - start
+
+        blacklist = TokenBlacklist(
+            load_active=lambda: [jti for (jti,) in session.query(BenchmarkBlacklistedToken.jti)],
+            load_since=lambda since: [],
+            db_contains=db_contains,
+            capacity=revoked * 2,
+            sync_interval=60
+        )
+        blacklist.is_revoked(str(uuid.uuid4()))  # builds the filter outside the timing
+        start = time.perf_counter()
+        layered = [blacklist.is_revoked(jti) for jti in workload]
+        layered_seconds = time.perf_counter() - start
+    finally:
+        session.close()
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+
+    return {
+        'database_checks_per_second': checks / database_seconds,
+        'layered_checks_per_second': checks / layered_seconds,
+        'database_fallbacks': blacklist.stats['db_checks'],
+        'results_match': expected == layered
+    }
+
+if __name__ == '__main__':
+    results = benchmark_token_checks()
+    print(f"Database query: {results['database_checks_per_second']:,.0f} checks/s")
+    print(f"Layered check:  {results['layered_checks_per_second']:,.0f} checks/s "
+          f"({results['database_fallbacks']} database fallbacks, results match: {results['results_match']})")
@@ -6,17 +6,18 @@ import hmac
 import base64
 import qrcode
 import io
+import threading
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from email.mime.text import MimeText
 from email.mime.multipart import MimeMultipart
-import smtplib
 from twilio.rest import Client
 from flask import current_app, request
 import pyotp
 import jwt
 from functools import wraps
 from werkzeug.security import generate_password_hash
+from smtp_pool import SMTPConnectionPool
 
 def validate_password(password: str) -> Tuple[bool, List[str]]:
     """
@@ -163,6 +164,26 @@ def generate_qr_code(data: str) -> bytes:
 
     return img_buffer.getvalue()
 
+_mail_pool = None
+_mail_pool_lock = threading.Lock()
+
+def get_mail_pool() -> SMTPConnectionPool:
+    """Get the process-wide pool of SMTP sessions for the MAIL_* settings"""
+    global _mail_pool
+    if _mail_pool is None:
+        with _mail_pool_lock:
+            if _mail_pool is None:
+                _mail_pool = SMTPConnectionPool(
+                    current_app.config['MAIL_SERVER'],
+                    current_app.config['MAIL_PORT'],
+                    username=current_app.config.get('MAIL_USERNAME'),
+                    password=current_app.config.get('MAIL_PASSWORD'),
+                    use_tls=bool(current_app.config.get('MAIL_USE_TLS')),
+                    max_connections=current_app.config.get('MAIL_POOL_SIZE', 2),
+                    max_messages_per_connection=current_app.config.get('MAIL_MAX_MESSAGES_PER_CONNECTION', 100)
+                )
+    return _mail_pool
+
 def send_email(to_email: str, subject: str, body: str, html_body: Optional[str] = None) -> bool:
     """Send email using SMTP"""
     try:
@@ -180,23 +201,8 @@ def send_email(to_email: str, subject: str, body: str, html_body: Optional[str]
             html_part = MimeText(html_body, 'html', 'utf-8')
             msg.attach(html_part)
 
-        # Send email
-        server = smtplib.SMTP(
-            current_app.config['MAIL_SERVER'],
-            current_app.config['MAIL_PORT']
-        )
-
-        if current_app.config.get('MAIL_USE_TLS'):
-            server.starttls()
-
-        if current_app.config.get('MAIL_USERNAME'):
-            server.login(
-                current_app.config['MAIL_USERNAME'],
-                current_app.config['MAIL_PASSWORD']
-            )
-
-        server.send_message(msg)
-        server.quit()
+        # Send email over a pooled session
+        get_mail_pool().send(msg)
 
         return True
     except Exception as e:
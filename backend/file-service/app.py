@@ -32,6 +32,9 @@ app.config['AWS_S3_REGION'] = os.getenv('AWS_S3_REGION', 'us-east-1')
 app.config['TESSERACT_PATH'] = os.getenv('TESSERACT_PATH', '/usr/bin/tesseract')
 app.config['GOOGLE_VISION_API_KEY'] = os.getenv('GOOGLE_VISION_API_KEY')
 app.config['AWS_TEXTRACT_REGION'] = os.getenv('AWS_TEXTRACT_REGION', 'us-east-1')
+app.config['OCR_PARALLEL_ENABLED'] = os.getenv('OCR_PARALLEL_ENABLED', 'true').lower() == 'true'
+app.config['OCR_WORKERS'] = int(os.getenv('OCR_WORKERS', 0)) or None  # None: one per CPU
+app.config['OCR_DPI'] = int(os.getenv('OCR_DPI', 200))
 
 # Service URLs
 app.config['USER_SERVICE_URL'] = os.getenv('USER_SERVICE_URL', 'http://localhost:5002')
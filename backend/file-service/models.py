@@ -141,6 +141,7 @@ class OCRResult(db.Model):
     extracted_text = db.Column(db.Text, nullable=True)
     confidence_score = db.Column(db.Float, nullable=True)
     page_count = db.Column(db.Integer, default=1, nullable=False)
+    pages_processed = db.Column(db.Integer, default=0, nullable=False)
 
     # Structured data
     structured_data = db.Column(db.JSON, nullable=True)  # Tables, forms, etc.
@@ -163,6 +164,7 @@ class OCRResult(db.Model):
             'extracted_text': self.extracted_text,
             'confidence_score': self.confidence_score,
             'page_count': self.page_count,
+            'pages_processed': self.pages_processed,
             'structured_data': self.structured_data,
             'entities': self.entities,
             'processing_time_seconds': self.processing_time_seconds,
@@ -15,8 +15,10 @@ from models import (
     FileRecord, OCRResult, FileAnalysisRequest, FileShare,
     FileActivity, FileType, FileStatus, OCRStatus
 )
+from ocr_pipeline import ocr_pdf_pages, join_page_text
 import logging
 import mimetypes
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -420,7 +422,8 @@ class OCRService:
 
             # Process based on provider
             if provider == 'tesseract':
-                result = OCRService.process_with_tesseract(file_record)
+                progress = OCRService.page_progress_recorder(ocr_result)
+                result = OCRService.process_with_tesseract(file_record, progress_callback=progress)
             elif provider == 'google_vision':
                 result = OCRService.process_with_google_vision(file_record)
             elif provider == 'aws_textract':
@@ -456,14 +459,55 @@ class OCRService:
             raise
 
     @staticmethod
-    def process_with_tesseract(file_record):
+    def page_progress_recorder(ocr_result, min_interval=1.0):
+        """
+        Progress callback that stores pages processed on the OCR result
+
+        The counts are set on `ocr_result`, so they are saved with the
+        caller's commit. At most every `min_interval` seconds they are also
+        written with a narrow UPDATE in a separate transaction, so other
+        sessions can follow progress. The caller's unit of work is never
+        committed early. Only a committed OCR result row can be updated
+        that way. A row created in the caller's open transaction is
+        invisible to the separate one, so its counts only appear when the
+        caller commits. SQLite allows a single writer, so it only gets the
+        final counts.
+        """
+        table = OCRResult.__table__
+        state = {'last_write': 0.0, 'enabled': db.engine.dialect.name != 'sqlite'}
+
+        def record(page_result, completed, total):
+            ocr_result.page_count = total
+            ocr_result.pages_processed = completed
+            now = time.monotonic()
+            if not state['enabled'] or (completed != total and now - state['last_write'] < min_interval):
+                return
+            state['last_write'] = now
+            try:
+                with db.engine.begin() as connection:
+                    updated = connection.execute(
+                        table.update()
+                        .where(table.c.id == ocr_result.id)
+                        .values(page_count=total, pages_processed=completed)
+                    ).rowcount
+                if not updated:
+                    # Not committed yet; the caller's commit will carry the counts
+                    state['enabled'] = False
+            except Exception as e:
+                logger.warning(f"Failed to record OCR progress for {ocr_result.id}: {str(e)}")
+                state['enabled'] = False
+
+        return record
+
+    @staticmethod
+    def process_with_tesseract(file_record, progress_callback=None):
         """Process file with Tesseract OCR"""
         try:
             file_path = FileStorageService.get_file_path(file_record)
 
             if file_record.file_type == FileType.PDF:
-                # For PDF, convert to images first
-                extracted_text = OCRService.extract_text_from_pdf(file_path)
+                # For PDF, rasterize and recognize page by page
+                extracted_text = OCRService.extract_text_from_pdf(file_path, progress_callback)
             else:
                 # For images, use directly
                 extracted_text = pytesseract.image_to_string(Image.open(file_path))
@@ -551,20 +595,20 @@ class OCRService:
             raise
 
     @staticmethod
-    def extract_text_from_pdf(pdf_path):
-        """Extract text from PDF using OCR"""
+    def extract_text_from_pdf(pdf_path, progress_callback=None):
+        """Extract text from PDF using OCR, one page at a time across a worker pool"""
         try:
-            import pdf2image
-
-            # Convert PDF to images
-            images = pdf2image.convert_from_path(pdf_path)
-
-            extracted_text = ""
-            for i, image in enumerate(images):
-                text = pytesseract.image_to_string(image)
-                extracted_text += f"Page {i+1}:\n{text}\n\n"
-
-            return extracted_text
+            workers = current_app.config.get('OCR_WORKERS') or os.cpu_count() or 1
+            if not current_app.config.get('OCR_PARALLEL_ENABLED', True):
+                workers = 1
+
+            pages = ocr_pdf_pages(
+                pdf_path,
+                workers=workers,
+                dpi=current_app.config.get('OCR_DPI', 200),
+                progress_callback=progress_callback
+            )
+            return join_page_text(pages)
 
         except Exception as e:
             logger.error(f"PDF OCR error: {str(e)}")
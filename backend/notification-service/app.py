@@ -23,6 +23,9 @@ app.config['SMTP_PORT'] = int(os.getenv('SMTP_PORT', 587))
 app.config['SMTP_USERNAME'] = os.getenv('SMTP_USERNAME')
 app.config['SMTP_PASSWORD'] = os.getenv('SMTP_PASSWORD')
 app.config['FROM_EMAIL'] = os.getenv('FROM_EMAIL', 'noreply@finclick.ai')
+app.config['SMTP_USE_TLS'] = os.getenv('SMTP_USE_TLS', 'true').lower() == 'true'
+app.config['SMTP_POOL_SIZE'] = int(os.getenv('SMTP_POOL_SIZE', 4))
+app.config['SMTP_MAX_MESSAGES_PER_CONNECTION'] = int(os.getenv('SMTP_MAX_MESSAGES_PER_CONNECTION', 100))
 
 # Push notification configuration
 app.config['FCM_SERVER_KEY'] = os.getenv('FCM_SERVER_KEY')
@@ -36,6 +36,35 @@ def send_notification():
         logger.error(f"Send notification error: {str(e)}")
         return jsonify({'error': 'Failed to send notification'}), 500
 
+@app.route('/api/notifications/send-bulk', methods=['POST'])
+@jwt_required()
+@limiter.limit("10 per hour")
+def send_bulk_notifications():
+    """Send the same notification to many users"""
+    try:
+        data = request.get_json()
+
+        notifications = NotificationService.send_bulk_notifications(
+            user_ids=data['user_ids'],
+            type=NotificationType(data['type']),
+            title=data['title'],
+            message=data['message'],
+            data=data.get('data', {})
+        )
+
+        db.session.commit()
+        return jsonify({
+            'message': 'Notifications sent successfully',
+            'total': len(notifications),
+            'sent': sum(1 for notification in notifications if notification.status == NotificationStatus.SENT),
+            'failed': sum(1 for notification in notifications if notification.status == NotificationStatus.FAILED)
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Send bulk notifications error: {str(e)}")
+        return jsonify({'error': 'Failed to send notifications'}), 500
+
 @app.route('/api/notifications', methods=['GET'])
 @jwt_required()
 def get_notifications():
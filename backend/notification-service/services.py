@@ -1,10 +1,11 @@
 import os
-import smtplib
+import threading
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
 from app import db, current_app
 from models import Notification, NotificationTemplate, UserNotificationSettings, NotificationType, NotificationStatus
+from smtp_pool import SMTPConnectionPool
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,6 +13,59 @@ logger = logging.getLogger(__name__)
 class NotificationService:
     """Notification management service"""
 
+    _smtp_pool = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get_smtp_pool():
+        """Get the process-wide pool of SMTP sessions, or None if SMTP is not configured"""
+        if NotificationService._smtp_pool is None:
+            smtp_server = current_app.config.get('SMTP_SERVER')
+            smtp_username = current_app.config.get('SMTP_USERNAME')
+            smtp_password = current_app.config.get('SMTP_PASSWORD')
+            if not all([smtp_server, smtp_username, smtp_password]):
+                return None
+
+            with NotificationService._lock:
+                if NotificationService._smtp_pool is None:
+                    NotificationService._smtp_pool = SMTPConnectionPool(
+                        smtp_server,
+                        current_app.config.get('SMTP_PORT'),
+                        username=smtp_username,
+                        password=smtp_password,
+                        use_tls=current_app.config.get('SMTP_USE_TLS', True),
+                        max_connections=current_app.config.get('SMTP_POOL_SIZE', 4),
+                        max_messages_per_connection=current_app.config.get('SMTP_MAX_MESSAGES_PER_CONNECTION', 100)
+                    )
+        return NotificationService._smtp_pool
+
+    @staticmethod
+    def send_bulk_notifications(user_ids, type, title, message, data=None):
+        """Create a notification per user and deliver them as one batch"""
+        try:
+            notifications = [
+                Notification(
+                    user_id=user_id,
+                    type=type,
+                    title=title,
+                    message=message,
+                    recipient=NotificationService.get_user_recipient(user_id, type),
+                    data=data or {}
+                )
+                for user_id in user_ids
+            ]
+
+            db.session.add_all(notifications)
+            db.session.flush()
+
+            NotificationService.deliver_notifications([notification.id for notification in notifications])
+
+            return notifications
+
+        except Exception as e:
+            logger.error(f"Send bulk notifications error: {str(e)}")
+            raise
+
     @staticmethod
     def send_notification(user_id, type, title, message, recipient=None, data=None, scheduled_at=None):
         """Send a notification"""
@@ -74,32 +128,55 @@ class NotificationService:
             notification.status = NotificationStatus.FAILED
             notification.delivery_attempts += 1
 
+    @staticmethod
+    def deliver_notifications(notification_ids):
+        """Deliver many notifications, sending their emails concurrently over pooled SMTP sessions"""
+        notifications = Notification.query.filter(Notification.id.in_(notification_ids)).all()
+        user_ids = {notification.user_id for notification in notifications}
+        settings_by_user = {
+            settings.user_id: settings
+            for settings in UserNotificationSettings.query.filter(UserNotificationSettings.user_id.in_(user_ids))
+        }
+
+        emails = []
+        for notification in notifications:
+            if not NotificationService.should_send_notification(notification, settings_by_user.get(notification.user_id)):
+                notification.status = NotificationStatus.FAILED
+            elif notification.type == NotificationType.EMAIL:
+                emails.append(notification)
+            else:
+                NotificationService.deliver_notification(notification.id)
+
+        if emails:
+            NotificationService.send_email_batch(emails)
+            for notification in emails:
+                notification.sent_at = datetime.utcnow()
+                notification.delivery_attempts += 1
+
+        return notifications
+
+    @staticmethod
+    def build_email(notification):
+        """Build the MIME message for an email notification"""
+        msg = MIMEMultipart()
+        msg['From'] = current_app.config.get('FROM_EMAIL')
+        msg['To'] = notification.recipient
+        msg['Subject'] = notification.title
+
+        msg.attach(MIMEText(notification.message, 'plain'))
+        return msg
+
     @staticmethod
     def send_email(notification):
         """Send email notification"""
         try:
-            smtp_server = current_app.config.get('SMTP_SERVER')
-            smtp_port = current_app.config.get('SMTP_PORT')
-            smtp_username = current_app.config.get('SMTP_USERNAME')
-            smtp_password = current_app.config.get('SMTP_PASSWORD')
-            from_email = current_app.config.get('FROM_EMAIL')
-
-            if not all([smtp_server, smtp_username, smtp_password]):
+            pool = NotificationService.get_smtp_pool()
+            if pool is None:
                 logger.warning("SMTP not configured")
                 return
 
-            msg = MIMEMultipart()
-            msg['From'] = from_email
-            msg['To'] = notification.recipient
-            msg['Subject'] = notification.title
-
-            msg.attach(MIMEText(notification.message, 'plain'))
-
-            server = smtplib.SMTP(smtp_server, smtp_port)
-            server.starttls()
-            server.login(smtp_username, smtp_password)
-            server.sendmail(from_email, notification.recipient, msg.as_string())
-            server.quit()
+            msg = NotificationService.build_email(notification)
+            pool.send(msg, current_app.config.get('FROM_EMAIL'), [notification.recipient])
 
             notification.status = NotificationStatus.SENT
             notification.delivered_at = datetime.utcnow()
@@ -108,6 +185,26 @@ class NotificationService:
             logger.error(f"Send email error: {str(e)}")
             notification.status = NotificationStatus.FAILED
 
+    @staticmethod
+    def send_email_batch(notifications):
+        """Send email notifications concurrently across the SMTP pool"""
+        pool = NotificationService.get_smtp_pool()
+        if pool is None:
+            logger.warning("SMTP not configured")
+            return
+
+        messages = [NotificationService.build_email(notification) for notification in notifications]
+        results = pool.send_many(messages)
+
+        delivered_at = datetime.utcnow()
+        for notification, result in zip(notifications, results):
+            if isinstance(result, Exception):
+                logger.error(f"Send email error: {str(result)}")
+                notification.status = NotificationStatus.FAILED
+            else:
+                notification.status = NotificationStatus.SENT
+                notification.delivered_at = delivered_at
+
     @staticmethod
     def send_push_notification(notification):
         """Send push notification"""
@@ -0,0 +1,243 @@
+import time
+import socket
+import smtplib
+import logging
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+class PooledSMTPConnection:
+    """An open, authenticated SMTP session and its usage"""
+
+    def __init__(self, smtp):
+        self.smtp = smtp
+        self.messages_sent = 0
+        self.last_used = time.monotonic()
+
+class SMTPConnectionPool:
+    """
+    Bounded pool of persistent SMTP sessions
+
+    A session is opened on demand (connect, STARTTLS and AUTH once) and
+    then reused for many messages, so those round trips are paid per
+    session instead of per email. At most `max_connections` sessions are
+    open at a time; callers beyond that wait for a free one. Sessions are
+    retired after `max_messages_per_connection` messages or `idle_timeout`
+    idle seconds, before most servers would drop them, and a send on a
+    session the server has closed is retried once on a fresh session.
+    """
+
+    def __init__(self, host, port=587, username=None, password=None, use_tls=True, max_connections=4,
+                 max_messages_per_connection=100, idle_timeout=60.0, timeout=30.0):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.max_connections = max(1, max_connections)
+        self.max_messages_per_connection = max_messages_per_connection
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.stats = {'connections_opened': 0, 'messages_sent': 0}
+
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_connections)
+
+    def _open(self):
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            smtp.ehlo()
+            if self.use_tls:
+                smtp.starttls()
+                smtp.ehlo()
+            if self.username:
+                smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        with self._lock:
+            self.stats['connections_opened'] += 1
+        return PooledSMTPConnection(smtp)
+
+    def _discard(self, connection):
+        try:
+            connection.smtp.quit()
+        except Exception:
+            try:
+                connection.smtp.close()
+            except Exception:
+                pass
+
+    def _checkout(self):
+        now = time.monotonic()
+        stale = []
+        connection = None
+        with self._lock:
+            # Most recently used first: it is the least likely to have been dropped by the server
+            while self._idle:
+                candidate = self._idle.pop()
+                if now - candidate.last_used < self.idle_timeout:
+                    connection = candidate
+                    break
+                stale.append(candidate)
+        for candidate in stale:
+            self._discard(candidate)
+        return connection or self._open()
+
+    def _checkin(self, connection):
+        if connection.messages_sent >= self.max_messages_per_connection:
+            self._discard(connection)
+            return
+        with self._lock:
+            self._idle.append(connection)
+
+    @contextmanager
+    def _slot(self):
+        self._slots.acquire()
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    def _deliver(self, connection, message, from_addr, to_addrs):
+        refused = connection.smtp.send_message(message, from_addr, to_addrs)
+        connection.messages_sent += 1
+        connection.last_used = time.monotonic()
+        with self._lock:
+            self.stats['messages_sent'] += 1
+        return refused
+
+    def send(self, message, from_addr=None, to_addrs=None):
+        """Send one email message on a pooled session; returns the recipients the server refused"""
+        with self._slot():
+            connection = self._checkout()
+            try:
+                try:
+                    return self._deliver(connection, message, from_addr, to_addrs)
+                except (smtplib.SMTPServerDisconnected, ConnectionError, socket.timeout):
+                    # Idle sessions can be closed by the server at any time; retry once on a new one
+                    self._discard(connection)
+                    connection = None
+                    connection = self._open()
+                    return self._deliver(connection, message, from_addr, to_addrs)
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError):
+                # The message was rejected but smtplib has reset the session, so it can be reused
+                raise
+            except Exception:
+                if connection is not None:
+                    self._discard(connection)
+                    connection = None
+                raise
+            finally:
+                if connection is not None:
+                    self._checkin(connection)
+
+    def send_many(self, messages):
+        """
+        Send a batch of messages concurrently across the pool
+
+        Returns one result per message, in order: the dict of refused
+        recipients on success, or the exception that stopped that message.
+        """
+        results = [None] * len(messages)
+        workers = min(self.max_connections, len(messages))
+        if not workers:
+            return results
+
+        def send_share(worker):
+            # Each worker keeps reusing one session for its share of the batch
+            for index in range(worker, len(messages), workers):
+                try:
+                    results[index] = self.send(messages[index])
+                except Exception as e:
+                    results[index] = e
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='smtp-send') as executor:
+            list(executor.map(send_share, range(workers)))
+        return results
+
+    def close(self):
+        """Close all idle sessions"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            self._discard(connection)
+
+def benchmark_smtp(messages=10000, pool_sizes=(1, 4, 8), baseline_messages=1000):
+    """
+    Messages per second into a local aiosmtpd sink
+
+    The baseline opens, greets and quits a new SMTP connection for every
+    message, as the services did; it runs on `baseline_messages` messages
+    to keep the run short. The sink has no TLS or AUTH, so real servers,
+    where each new connection also pays a TLS handshake and a login,
+    favour pooling even more than these numbers show.
+    """
+    from email.message import EmailMessage
+    from aiosmtpd.controller import Controller
+
+    class CountingHandler:
+        def __init__(self):
+            self.received = 0
+
+        async def handle_DATA(self, server, session, envelope):
+            self.received += 1
+            return '250 Message accepted for delivery'
+
+    def make_message(index):
+        message = EmailMessage()
+        message['From'] = 'noreply@finclick.ai'
+        message['To'] = f'user{index}@example.com'
+        message['Subject'] = 'Your monthly financial summary'
+        message.set_content(f'Hello user {index},\n\nYour analysis is ready.\n' + 'Details line.\n' * 20)
+        return message
+
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        host, port = probe.getsockname()
+
+    handler = CountingHandler()
+    controller = Controller(handler, hostname=host, port=port)
+    controller.start()
+    results = []
+    try:
+        batch = [make_message(index) for index in range(messages)]
+
+        start = time.perf_counter()
+        for message in batch[:baseline_messages]:
+            smtp = smtplib.SMTP(host, port)
+            smtp.send_message(message)
+            smtp.quit()
+        elapsed = time.perf_counter() - start
+        results.append({'mode': 'connection_per_message', 'connections': baseline_messages,
+                        'messages': baseline_messages, 'messages_per_second': baseline_messages / elapsed})
+
+        for pool_size in pool_sizes:
+            pool = SMTPConnectionPool(host, port, use_tls=False, max_connections=pool_size,
+                                      max_messages_per_connection=1000)
+            start = time.perf_counter()
+            outcomes = pool.send_many(batch)
+            elapsed = time.perf_counter() - start
+            pool.close()
+            failures = sum(1 for outcome in outcomes if isinstance(outcome, Exception))
+            results.append({'mode': f'pool_{pool_size}', 'connections': pool.stats['connections_opened'],
+                            'messages': messages - failures, 'messages_per_second': (messages - failures) / elapsed})
+    finally:
+        controller.stop()
+    return results
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark pooled SMTP delivery against a local aiosmtpd sink')
+    parser.add_argument('--messages', type=int, default=10000)
+    parser.add_argument('--pool-sizes', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--baseline-messages', type=int, default=1000)
+    args = parser.parse_args()
+
+    for row in benchmark_smtp(args.messages, args.pool_sizes, args.baseline_messages):
+        print(f"{row['mode']:<24} {row['messages']:>6} messages  {row['connections']:>5} connections  "
+              f"{row['messages_per_second']:>8,.0f} messages/s")
@@ -24,6 +24,9 @@ app.config['AUTH_SERVICE_URL'] = os.getenv('AUTH_SERVICE_URL', 'http://localhost
 app.config['SUBSCRIPTION_SERVICE_URL'] = os.getenv('SUBSCRIPTION_SERVICE_URL', 'http://localhost:5007')
 app.config['NOTIFICATION_SERVICE_URL'] = os.getenv('NOTIFICATION_SERVICE_URL', 'http://localhost:5008')
 
+# Maintain daily/monthly usage rollup rows as usage is recorded
+app.config['USAGE_ROLLUPS_ENABLED'] = os.getenv('USAGE_ROLLUPS_ENABLED', 'false').lower() == 'true'
+
 # Initialize extensions
 db = SQLAlchemy(app)
 jwt = JWTManager(app)
@@ -189,6 +189,8 @@ class UsageRecord(db.Model):
     metadata = db.Column(db.JSON, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
+    __table_args__ = (db.Index('ix_usage_records_profile_created', 'user_profile_id', 'created_at'),)
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -200,6 +202,29 @@ class UsageRecord(db.Model):
             'created_at': self.created_at.isoformat()
         }
 
+class UsageRollup(db.Model):
+    __tablename__ = 'usage_rollups'
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_profile_id = db.Column(db.String(36), db.ForeignKey('user_profiles.id'), nullable=False)
+    bucket = db.Column(db.String(10), nullable=False)  # day, month
+    bucket_start = db.Column(db.Date, nullable=False)
+    usage_type = db.Column(db.Enum(UsageType), nullable=False)
+    record_count = db.Column(db.Integer, default=0, nullable=False)
+    total_amount = db.Column(db.Float, default=0.0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    __table_args__ = (db.UniqueConstraint('user_profile_id', 'bucket', 'bucket_start', 'usage_type'),)
+
+    def to_dict(self):
+        return {
+            'bucket': self.bucket,
+            'bucket_start': self.bucket_start.isoformat(),
+            'usage_type': self.usage_type.value,
+            'count': self.record_count,
+            'total_amount': self.total_amount
+        }
+
 class UserSettings(db.Model):
     __tablename__ = 'user_settings'
 
@@ -360,6 +360,35 @@ def get_usage_stats():
         logger.error(f"Get usage stats error: {str(e)}")
         return create_response({'error': 'Internal server error'}, 500)
 
+@app.route('/api/v1/usage/rollups', methods=['GET'])
+@require_auth
+@require_profile
+@limiter.limit("100 per hour")
+def get_usage_rollups():
+    """Get daily or monthly usage rollups"""
+    try:
+        user_id = g.user_id
+        bucket = request.args.get('bucket', 'day')
+        periods = request.args.get('periods', 30, type=int)
+        usage_type = request.args.get('usage_type')
+
+        if bucket not in ['day', 'month']:
+            return create_response({'error': 'bucket must be day or month'}, 400)
+        periods = max(1, min(periods, 366 if bucket == 'day' else 36))
+
+        rollups = UsageService.get_usage_rollups(user_id, bucket, periods, usage_type)
+
+        return create_response({
+            'bucket': bucket,
+            'rollups': rollups
+        }, 200)
+
+    except ValueError as e:
+        return create_response({'error': f'Invalid usage_type: {str(e)}'}, 400)
+    except Exception as e:
+        logger.error(f"Get usage rollups error: {str(e)}")
+        return create_response({'error': 'Internal server error'}, 500)
+
 @app.route('/api/v1/usage/record', methods=['POST'])
 @require_auth
 @require_profile
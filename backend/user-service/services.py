@@ -5,9 +5,10 @@ from datetime import datetime, timedelta
 from werkzeug.utils import secure_filename
 from app import db, current_app
 from models import (
-    UserProfile, UserSubscription, UsageRecord, UserSettings,
+    UserProfile, UserSubscription, UsageRecord, UsageRollup, UserSettings,
     UserActivity, UserPreferences, UsageType, SubscriptionStatus
 )
+from sqlalchemy.dialects import postgresql, sqlite
 import logging
 import json
 
@@ -346,69 +347,197 @@ class UsageService:
     @staticmethod
     def record_usage(user_profile_id, usage_type, amount, resource_id=None, resource_name=None, metadata=None):
         """Record usage"""
+        now = datetime.utcnow()
         usage_record = UsageRecord(
             user_profile_id=user_profile_id,
             usage_type=usage_type,
             amount=amount,
             resource_id=resource_id,
             resource_name=resource_name,
-            metadata=metadata
+            metadata=metadata,
+            created_at=now
         )
         db.session.add(usage_record)
+
+        if current_app.config.get('USAGE_ROLLUPS_ENABLED'):
+            UsageService.update_usage_rollups(user_profile_id, usage_type, amount, now)
+
         return usage_record
 
+    @staticmethod
+    def rollup_buckets(timestamp):
+        """Daily and monthly bucket starts containing a timestamp"""
+        day = timestamp.date() if isinstance(timestamp, datetime) else timestamp
+        return [('day', day), ('month', day.replace(day=1))]
+
+    @staticmethod
+    def update_usage_rollups(user_profile_id, usage_type, amount, timestamp, count=1):
+        """Add usage to the daily and monthly rollup rows, creating them as needed"""
+        table = UsageRollup.__table__
+        dialect = db.session.get_bind().dialect.name
+        now = datetime.utcnow()
+
+        for bucket, bucket_start in UsageService.rollup_buckets(timestamp):
+            if dialect in ('postgresql', 'sqlite'):
+                insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+                statement = insert(table).values(
+                    id=str(uuid.uuid4()),
+                    user_profile_id=user_profile_id,
+                    bucket=bucket,
+                    bucket_start=bucket_start,
+                    usage_type=usage_type,
+                    record_count=count,
+                    total_amount=amount,
+                    updated_at=now
+                )
+                # Increment in the database so concurrent writers never lose updates
+                statement = statement.on_conflict_do_update(
+                    index_elements=['user_profile_id', 'bucket', 'bucket_start', 'usage_type'],
+                    set_={
+                        'record_count': table.c.record_count + statement.excluded.record_count,
+                        'total_amount': table.c.total_amount + statement.excluded.total_amount,
+                        'updated_at': statement.excluded.updated_at
+                    }
+                )
+                db.session.execute(statement)
+            else:
+                rollup = UsageRollup.query.filter_by(
+                    user_profile_id=user_profile_id,
+                    bucket=bucket,
+                    bucket_start=bucket_start,
+                    usage_type=usage_type
+                ).with_for_update().first()
+                if rollup:
+                    rollup.record_count += count
+                    rollup.total_amount += amount
+                else:
+                    db.session.add(UsageRollup(
+                        user_profile_id=user_profile_id,
+                        bucket=bucket,
+                        bucket_start=bucket_start,
+                        usage_type=usage_type,
+                        record_count=count,
+                        total_amount=amount
+                    ))
+
+    @staticmethod
+    def rebuild_usage_rollups(user_profile_id=None):
+        """Recompute rollup rows from raw usage records, e.g. after enabling rollups"""
+        day = db.func.date(UsageRecord.created_at)
+        query = db.session.query(
+            UsageRecord.user_profile_id,
+            UsageRecord.usage_type,
+            day,
+            db.func.count(UsageRecord.id),
+            db.func.sum(UsageRecord.amount)
+        ).group_by(UsageRecord.user_profile_id, UsageRecord.usage_type, day)
+
+        rollups_query = UsageRollup.query
+        if user_profile_id:
+            query = query.filter(UsageRecord.user_profile_id == user_profile_id)
+            rollups_query = rollups_query.filter_by(user_profile_id=user_profile_id)
+
+        # Months are summed from the daily groups so the SQL stays portable
+        totals = {}
+        for profile_id, usage_type, usage_day, count, amount in query.all():
+            if isinstance(usage_day, str):
+                usage_day = datetime.strptime(usage_day, '%Y-%m-%d').date()
+            for bucket, bucket_start in UsageService.rollup_buckets(usage_day):
+                key = (profile_id, bucket, bucket_start, usage_type)
+                record_count, total_amount = totals.get(key, (0, 0.0))
+                totals[key] = (record_count + count, total_amount + (amount or 0))
+
+        rollups_query.delete(synchronize_session=False)
+        db.session.bulk_insert_mappings(UsageRollup, [
+            {
+                'id': str(uuid.uuid4()),
+                'user_profile_id': profile_id,
+                'bucket': bucket,
+                'bucket_start': bucket_start,
+                'usage_type': usage_type,
+                'record_count': record_count,
+                'total_amount': total_amount
+            }
+            for (profile_id, bucket, bucket_start, usage_type), (record_count, total_amount) in totals.items()
+        ])
+        return len(totals)
+
     @staticmethod
     def get_usage_statistics(user_id, days=30, usage_type=None):
         """Get usage statistics"""
         profile = UserService.get_or_create_profile(user_id)
 
-        # Base query
-        query = UsageRecord.query.filter(
+        filters = [
             UsageRecord.user_profile_id == profile.id,
             UsageRecord.created_at >= datetime.utcnow() - timedelta(days=days)
-        )
+        ]
 
         if usage_type:
             try:
-                usage_type_enum = UsageType(usage_type)
-                query = query.filter_by(usage_type=usage_type_enum)
+                filters.append(UsageRecord.usage_type == UsageType(usage_type))
             except ValueError:
                 pass
 
-        records = query.all()
+        # Group by type
+        by_type = db.session.query(
+            UsageRecord.usage_type,
+            db.func.count(UsageRecord.id),
+            db.func.sum(UsageRecord.amount)
+        ).filter(*filters).group_by(UsageRecord.usage_type).all()
+
+        # Group by day, with a running total across the period
+        day = db.func.date(UsageRecord.created_at)
+        daily_amount = db.func.sum(UsageRecord.amount)
+        by_day = db.session.query(
+            day,
+            db.func.count(UsageRecord.id),
+            daily_amount,
+            db.func.sum(daily_amount).over(order_by=day)
+        ).filter(*filters).group_by(day).order_by(day).all()
 
-        # Aggregate statistics
         stats = {
-            'total_records': len(records),
-            'by_type': {},
-            'by_day': {},
+            'total_records': sum(count for _, count, _ in by_type),
+            'by_type': {
+                type_.value: {'count': count, 'total_amount': amount or 0}
+                for type_, count, amount in by_type
+            },
+            'by_day': {
+                (usage_day.isoformat() if hasattr(usage_day, 'isoformat') else str(usage_day)): {
+                    'count': count,
+                    'total_amount': amount or 0,
+                    'cumulative_amount': cumulative or 0
+                }
+                for usage_day, count, amount, cumulative in by_day
+            },
             'current_subscription': profile.subscription.to_dict() if profile.subscription else None
         }
 
-        # Group by type
-        for record in records:
-            type_name = record.usage_type.value
-            if type_name not in stats['by_type']:
-                stats['by_type'][type_name] = {
-                    'count': 0,
-                    'total_amount': 0
-                }
-            stats['by_type'][type_name]['count'] += 1
-            stats['by_type'][type_name]['total_amount'] += record.amount
-
-        # Group by day
-        for record in records:
-            day = record.created_at.date().isoformat()
-            if day not in stats['by_day']:
-                stats['by_day'][day] = {
-                    'count': 0,
-                    'total_amount': 0
-                }
-            stats['by_day'][day]['count'] += 1
-            stats['by_day'][day]['total_amount'] += record.amount
-
         return stats
 
+    @staticmethod
+    def get_usage_rollups(user_id, bucket='day', periods=30, usage_type=None):
+        """Get pre-aggregated usage per day or month from the rollup table"""
+        if bucket not in ('day', 'month'):
+            raise ValueError("bucket must be 'day' or 'month'")
+
+        profile = UserService.get_or_create_profile(user_id)
+        today = datetime.utcnow().date()
+        if bucket == 'day':
+            start = today - timedelta(days=periods - 1)
+        else:
+            months = today.year * 12 + today.month - 1 - (periods - 1)
+            start = today.replace(year=months // 12, month=months % 12 + 1, day=1)
+
+        query = UsageRollup.query.filter(
+            UsageRollup.user_profile_id == profile.id,
+            UsageRollup.bucket == bucket,
+            UsageRollup.bucket_start >= start
+        )
+        if usage_type:
+            query = query.filter(UsageRollup.usage_type == UsageType(usage_type))
+
+        return [rollup.to_dict() for rollup in query.order_by(UsageRollup.bucket_start).all()]
+
 class ProfileService:
     """Profile management service"""
 
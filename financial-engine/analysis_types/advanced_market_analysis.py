@@ -27,6 +27,7 @@ import pandas as pd
 import math
 from datetime import datetime, timedelta
 from .base_analysis import BaseAnalysis, AnalysisCategory, RiskLevel, PerformanceRating
+from . import indicator_kernels, peak_detection
 
 
 class MarketTrend(Enum):
@@ -135,14 +136,9 @@ class AdvancedMarketAnalysis(BaseAnalysis):
 
             for period in periods:
                 if len(prices_array) >= period:
-                    # Simple Moving Average
-                    sma = np.convolve(prices_array, np.ones(period)/period, mode='valid')
-
-                    # Exponential Moving Average
-                    alpha = 2 / (period + 1)
-                    ema = [prices_array[0]]
-                    for price in prices_array[1:]:
-                        ema.append(alpha * price + (1 - alpha) * ema[-1])
+                    # Simple and Exponential Moving Averages
+                    sma = indicator_kernels.sma(prices_array, period)
+                    ema = indicator_kernels.ema(prices_array, period)
 
                     moving_averages[f'sma_{period}'] = {
                         'current': round(sma[-1], 2),
@@ -153,7 +149,7 @@ class AdvancedMarketAnalysis(BaseAnalysis):
                     moving_averages[f'ema_{period}'] = {
                         'current': round(ema[-1], 2),
                         'previous': round(ema[-2] if len(ema) > 1 else ema[-1], 2),
-                        'values': ema
+                        'values': ema.tolist()
                     }
 
             # Generate trading signals
@@ -220,35 +216,11 @@ class AdvancedMarketAnalysis(BaseAnalysis):
             if len(prices_array) < period + 1:
                 raise ValueError(f"Insufficient data points. Need at least {period + 1}, got {len(prices_array)}")
 
-            # Calculate price changes
-            deltas = np.diff(prices_array)
-
-            # Separate gains and losses
-            gains = np.where(deltas > 0, deltas, 0)
-            losses = np.where(deltas < 0, -deltas, 0)
-
-            # Calculate average gains and losses
-            avg_gain = np.mean(gains[:period])
-            avg_loss = np.mean(losses[:period])
-
-            # Calculate RSI values
-            rsi_values = []
-
-            for i in range(period, len(deltas)):
-                if avg_loss != 0:
-                    rs = avg_gain / avg_loss
-                    rsi = 100 - (100 / (1 + rs))
-                else:
-                    rsi = 100
-
-                rsi_values.append(rsi)
-
-                # Update averages using Wilder's smoothing
-                if i < len(deltas) - 1:
-                    current_gain = gains[i] if i < len(gains) else 0
-                    current_loss = losses[i] if i < len(losses) else 0
-                    avg_gain = ((avg_gain * (period - 1)) + current_gain) / period
-                    avg_loss = ((avg_loss * (period - 1)) + current_loss) / period
+            # Calculate RSI values using Wilder's smoothing
+            if len(prices_array) > period + 1:
+                rsi_values = indicator_kernels.rsi(prices_array, period).tolist()
+            else:
+                rsi_values = []
 
             current_rsi = rsi_values[-1] if rsi_values else 50
 
@@ -322,25 +294,10 @@ class AdvancedMarketAnalysis(BaseAnalysis):
             if len(prices_array) < slow_period:
                 raise ValueError(f"Insufficient data. Need at least {slow_period} periods")
 
-            # Calculate EMAs
-            def calculate_ema(data, period):
-                alpha = 2 / (period + 1)
-                ema = [data[0]]
-                for price in data[1:]:
-                    ema.append(alpha * price + (1 - alpha) * ema[-1])
-                return np.array(ema)
-
-            fast_ema = calculate_ema(prices_array, fast_period)
-            slow_ema = calculate_ema(prices_array, slow_period)
-
-            # Calculate MACD line
-            macd_line = fast_ema - slow_ema
-
-            # Calculate Signal line (EMA of MACD)
-            signal_line = calculate_ema(macd_line, signal_period)
-
-            # Calculate Histogram
-            histogram = macd_line - signal_line
+            # Calculate MACD line, Signal line (EMA of MACD) and Histogram
+            macd_line, signal_line, histogram = indicator_kernels.macd(
+                prices_array, fast_period, slow_period, signal_period
+            )
 
             current_macd = macd_line[-1]
             current_signal = signal_line[-1]
@@ -412,19 +369,8 @@ class AdvancedMarketAnalysis(BaseAnalysis):
             if len(prices_array) < period:
                 raise ValueError(f"Insufficient data. Need at least {period} periods")
 
-            # Calculate moving average and standard deviation
-            sma = np.convolve(prices_array, np.ones(period)/period, mode='valid')
-
-            rolling_std = []
-            for i in range(period - 1, len(prices_array)):
-                window_data = prices_array[i - period + 1:i + 1]
-                rolling_std.append(np.std(window_data, ddof=1))
-
-            rolling_std = np.array(rolling_std)
-
-            # Calculate bands
-            upper_band = sma + (std_dev * rolling_std)
-            lower_band = sma - (std_dev * rolling_std)
+            # Calculate moving average, standard deviation and bands
+            sma, upper_band, lower_band = indicator_kernels.bollinger_bands(prices_array, period, std_dev)
 
             current_price = prices_array[-1]
             current_upper = upper_band[-1]
@@ -1123,31 +1069,11 @@ class AdvancedMarketAnalysis(BaseAnalysis):
 
     def _find_peaks(self, data: np.ndarray, min_distance: int = 3) -> List[int]:
         """Find peaks in data"""
-        peaks = []
-        for i in range(min_distance, len(data) - min_distance):
-            if all(data[i] >= data[i-j] for j in range(1, min_distance+1)) and \
-               all(data[i] >= data[i+j] for j in range(1, min_distance+1)):
-                peaks.append(i)
-        return peaks
+        return peak_detection.find_peaks(data, min_distance)
 
     def _find_support_resistance(self, data: np.ndarray, level_type: str) -> List[float]:
         """Find support or resistance levels"""
-        if level_type == 'support':
-            peaks = self._find_peaks(-data)  # Find troughs
-            levels = [data[peak] for peak in peaks]
-        else:  # resistance
-            peaks = self._find_peaks(data)  # Find peaks
-            levels = [data[peak] for peak in peaks]
-
-        # Cluster similar levels
-        clustered_levels = []
-        tolerance = 0.02  # 2% tolerance
-
-        for level in levels:
-            if not clustered_levels or all(abs(level - existing) / existing > tolerance for existing in clustered_levels):
-                clustered_levels.append(level)
-
-        return sorted(clustered_levels)
+        return peak_detection.find_levels(data, level_type, tolerance=0.02)
 
     def _analyze_price_position(self, current_price: float, support: Optional[float], resistance: Optional[float]) -> str:
         """Analyze current price position relative to support and resistance"""
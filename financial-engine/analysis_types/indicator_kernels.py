@@ -0,0 +1,161 @@
+"""
+Technical Indicator Kernels
+نوى حساب المؤشرات الفنية
+
+Vectorized moving averages, Wilder smoothing, MACD, rolling standard
+deviation and Bollinger Bands used by AdvancedMarketAnalysis.
+
+Every kernel accepts a 1-D series or a 2-D array with time along axis 0
+and one column per symbol, so multi-year daily or intraday history for a
+whole universe is processed in a single call. Outputs keep the input's
+dimensionality. The recursions run in pandas' compiled ewm/rolling loops
+and reproduce the element-by-element definitions used by the analysis
+methods: the EMA is seeded with the first observation and Wilder
+smoothing with the simple average of the first `period` values.
+"""
+
+from typing import Tuple, Union
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+ArrayLike = Union[np.ndarray, list, tuple, pd.Series, pd.DataFrame]
+
+
+def _as_frame(values: ArrayLike) -> Tuple[pd.DataFrame, bool]:
+    """Wrap a 1-D or 2-D (time x symbols) array as a float DataFrame"""
+    array = np.asarray(values, dtype=float)
+    if array.ndim == 1:
+        return pd.DataFrame(array[:, None]), True
+    if array.ndim == 2:
+        return pd.DataFrame(array), False
+    raise ValueError(f"Expected a 1-D or 2-D array, got {array.ndim} dimensions")
+
+
+def _to_array(frame: pd.DataFrame, squeeze: bool) -> np.ndarray:
+    array = frame.to_numpy()
+    return array[:, 0] if squeeze else array
+
+
+def ema(values: ArrayLike, period: int) -> np.ndarray:
+    """
+    Exponential moving average with alpha = 2 / (period + 1)
+    المتوسط المتحرك الأسي
+
+    ema[0] = values[0]; ema[t] = alpha * values[t] + (1 - alpha) * ema[t - 1]
+    """
+    frame, squeeze = _as_frame(values)
+    smoothed = frame.ewm(alpha=2 / (period + 1), adjust=False).mean()
+    return _to_array(smoothed, squeeze)
+
+
+def sma(values: ArrayLike, period: int) -> np.ndarray:
+    """
+    Simple moving average over complete windows only
+    المتوسط المتحرك البسيط
+
+    Returns len(values) - period + 1 rows, like np.convolve(..., mode='valid').
+    """
+    frame, squeeze = _as_frame(values)
+    averages = frame.rolling(period).mean().iloc[period - 1:]
+    return _to_array(averages, squeeze)
+
+
+def rolling_std(values: ArrayLike, period: int, ddof: int = 1, chunk_rows: int = 65536) -> np.ndarray:
+    """
+    Rolling standard deviation over complete windows only
+    الانحراف المعياري المتحرك
+
+    Each window is evaluated with the two-pass formula, which stays exact
+    for flat stretches where running-sum updates lose precision. Windows
+    are processed `chunk_rows` at a time to bound temporary memory on long
+    intraday series.
+    """
+    array = np.asarray(values, dtype=float)
+    if array.ndim not in (1, 2):
+        raise ValueError(f"Expected a 1-D or 2-D array, got {array.ndim} dimensions")
+
+    count = max(array.shape[0] - period + 1, 0)
+    deviations = np.empty((count,) + array.shape[1:])
+    for start in range(0, count, chunk_rows):
+        stop = min(start + chunk_rows, count)
+        windows = sliding_window_view(array[start:stop + period - 1], period, axis=0)
+        deviations[start:stop] = windows.std(axis=-1, ddof=ddof)
+    return deviations
+
+
+def wilder_smooth(values: ArrayLike, period: int) -> np.ndarray:
+    """
+    Wilder's smoothing seeded with the simple average of the first `period` values
+    تنعيم وايلدر
+
+    out[0] = mean(values[:period]);
+    out[k] = (out[k - 1] * (period - 1) + values[period + k - 1]) / period
+    Returns len(values) - period + 1 rows.
+    """
+    frame, squeeze = _as_frame(values)
+    if len(frame) < period:
+        raise ValueError(f"Need at least {period} values, got {len(frame)}")
+    seeded = pd.concat(
+        [frame.iloc[:period].mean().to_frame().T, frame.iloc[period:]],
+        ignore_index=True
+    )
+    smoothed = seeded.ewm(alpha=1 / period, adjust=False).mean()
+    return _to_array(smoothed, squeeze)
+
+
+def rsi(prices: ArrayLike, period: int = 14) -> np.ndarray:
+    """
+    Relative Strength Index series as computed by AdvancedMarketAnalysis.calculate_rsi
+    مؤشر القوة النسبية
+
+    One value per price change from index `period` on; the averages used
+    for a value include the changes before it, not the change itself.
+    Periods without losses score 100.
+    """
+    prices_array = np.asarray(prices, dtype=float)
+    if prices_array.shape[0] < period + 2:
+        raise ValueError(f"Insufficient data points. Need at least {period + 2}, got {prices_array.shape[0]}")
+
+    deltas = np.diff(prices_array, axis=0)
+    gains = np.where(deltas > 0, deltas, 0.0)
+    losses = np.where(deltas < 0, -deltas, 0.0)
+
+    # The last change never enters the averages
+    avg_gain = wilder_smooth(gains[:-1], period)
+    avg_loss = wilder_smooth(losses[:-1], period)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_gain / avg_loss
+        values = 100 - (100 / (1 + rs))
+    return np.where(avg_loss != 0, values, 100.0)
+
+
+def macd(
+    prices: ArrayLike,
+    fast_period: int = 12,
+    slow_period: int = 26,
+    signal_period: int = 9
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    MACD line, signal line and histogram
+    خط MACD وخط الإشارة والمدرج التكراري
+    """
+    macd_line = ema(prices, fast_period) - ema(prices, slow_period)
+    signal_line = ema(macd_line, signal_period)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def bollinger_bands(
+    prices: ArrayLike,
+    period: int = 20,
+    std_dev: float = 2
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Middle, upper and lower Bollinger Bands over complete windows only
+    نطاقات بولينجر الوسطى والعليا والسفلى
+    """
+    middle = sma(prices, period)
+    deviation = rolling_std(prices, period, ddof=1)
+    return middle, middle + std_dev * deviation, middle - std_dev * deviation
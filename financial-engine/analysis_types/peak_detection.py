@@ -0,0 +1,309 @@
+"""
+Peak and Support/Resistance Detection
+كشف القمم ومستويات الدعم والمقاومة
+
+A bar at index i is a peak when it is greater than or equal to every bar
+within `min_distance` bars on either side. Support levels are the lows
+at troughs and resistance levels the highs at peaks, clustered so that
+a level is kept only when it lies more than `tolerance` (relative to
+each already kept level) away from all of them.
+
+Two interfaces share these definitions:
+- Batch functions (find_peaks, find_levels) return exactly what
+  AdvancedMarketAnalysis produced with its original loops.
+- Streaming classes (IncrementalPeakDetector, LevelTracker,
+  SupportResistanceStream) update in amortized constant time per bar, so
+  live intraday feeds are never rescanned. A peak is confirmed
+  `min_distance` bars after it occurs, once its right-hand neighbours
+  are known.
+"""
+
+import bisect
+import math
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+DEFAULT_MIN_DISTANCE = 3
+DEFAULT_TOLERANCE = 0.02
+
+
+def find_peaks(data: Sequence[float], min_distance: int = DEFAULT_MIN_DISTANCE) -> List[int]:
+    """
+    Indices of all peaks in `data`
+    مؤشرات جميع القمم في البيانات
+
+    Vectorized over a sliding window; bars within `min_distance` of either
+    end are never peaks and windows containing NaN produce none.
+    """
+    values = np.asarray(data, dtype=float)
+    if min_distance == 0:
+        return list(range(len(values)))
+    span = 2 * min_distance + 1
+    if len(values) < span:
+        return []
+    window_max = sliding_window_view(values, span).max(axis=-1)
+    centers = values[min_distance:len(values) - min_distance]
+    return (np.flatnonzero(centers >= window_max) + min_distance).tolist()
+
+
+def _is_distinct(level: float, existing: float, tolerance: float) -> bool:
+    return abs(level - existing) / existing > tolerance
+
+
+class LevelTracker:
+    """
+    Incremental clustering of price levels
+    تجميع تدريجي لمستويات الأسعار
+
+    Levels are offered in chronological order and kept when they are more
+    than `tolerance` away from every kept level. Kept levels stay sorted,
+    so for positive prices only the few neighbours within the tolerance
+    band are examined per offer.
+    """
+
+    def __init__(self, tolerance: float = DEFAULT_TOLERANCE):
+        self.tolerance = tolerance
+        self._levels: List[float] = []
+        self._positive = True
+
+    @property
+    def levels(self) -> List[float]:
+        """Kept levels in ascending order"""
+        return list(self._levels)
+
+    def __len__(self) -> int:
+        return len(self._levels)
+
+    def add(self, level: float) -> bool:
+        """Offer a level; returns True when it was kept"""
+        if not (self._positive and level > 0):
+            # Non-positive levels break the band arithmetic; use the plain rule
+            self._positive = False
+            if all(_is_distinct(level, existing, self.tolerance) for existing in self._levels):
+                bisect.insort(self._levels, level)
+                return True
+            return False
+
+        # A kept level e is too close when level / (1 + tol) <= e <= level / (1 - tol);
+        # the band is widened slightly and the exact rule decides at its edges
+        lower = level / (1 + self.tolerance) * (1 - 1e-9)
+        upper = level / (1 - self.tolerance) * (1 + 1e-9) if self.tolerance < 1 else math.inf
+        index = bisect.bisect_left(self._levels, lower)
+        while index < len(self._levels) and self._levels[index] <= upper:
+            if not _is_distinct(level, self._levels[index], self.tolerance):
+                return False
+            index += 1
+
+        bisect.insort(self._levels, level)
+        return True
+
+
+def find_levels(
+    data: Sequence[float],
+    level_type: str,
+    min_distance: int = DEFAULT_MIN_DISTANCE,
+    tolerance: float = DEFAULT_TOLERANCE
+) -> List[float]:
+    """
+    Clustered support ('support') or resistance levels of `data`
+    مستويات الدعم أو المقاومة المجمعة
+    """
+    values = np.asarray(data)
+    peaks = find_peaks(-values if level_type == 'support' else values, min_distance)
+    tracker = LevelTracker(tolerance)
+    for peak in peaks:
+        tracker.add(values[peak])
+    return tracker.levels
+
+
+class IncrementalPeakDetector:
+    """
+    Streaming peak (or trough) detection
+    كشف القمم أو القيعان بشكل متدفق
+
+    Keeps a monotonic deque of the last 2 * min_distance + 1 bars, so each
+    update costs amortized O(1) regardless of history length. `update`
+    returns the index of the peak confirmed by the new bar, if any.
+    """
+
+    def __init__(self, min_distance: int = DEFAULT_MIN_DISTANCE, troughs: bool = False, max_peaks: Optional[int] = None):
+        self.min_distance = min_distance
+        self.troughs = troughs
+        self.count = 0
+        self.peaks: deque = deque(maxlen=max_peaks)
+
+        self._span = 2 * min_distance + 1
+        self._recent: deque = deque(maxlen=self._span)
+        self._maxima: deque = deque()  # (index, value), values non-increasing
+        self._last_nan = -self._span
+
+    def update(self, value: float) -> Optional[int]:
+        """Add the next bar; returns the newly confirmed peak index or None"""
+        index = self.count
+        self.count += 1
+        if self.min_distance == 0:
+            # Every bar is its own window
+            self.peaks.append(index)
+            return index
+
+        value = -value if self.troughs else value
+        self._recent.append(value)
+
+        if value != value:  # NaN: no window containing it has a peak
+            self._last_nan = index
+        else:
+            while self._maxima and self._maxima[-1][1] < value:
+                self._maxima.pop()
+            self._maxima.append((index, value))
+        while self._maxima and self._maxima[0][0] <= index - self._span:
+            self._maxima.popleft()
+
+        if index < self._span - 1 or self._last_nan > index - self._span:
+            return None
+
+        center = index - self.min_distance
+        if self._recent[self.min_distance] >= self._maxima[0][1]:
+            self.peaks.append(center)
+            return center
+        return None
+
+    def peaks_between(self, start: int, stop: int) -> List[int]:
+        """Confirmed peaks with start <= index < stop"""
+        # Peaks are appended in index order and queries target recent bars,
+        # so walk back from the newest peak
+        found = []
+        for peak in reversed(self.peaks):
+            if peak < start:
+                break
+            if peak < stop:
+                found.append(peak)
+        found.reverse()
+        return found
+
+    def window_peaks(self, window: int) -> List[int]:
+        """
+        Peaks of the last `window` bars as find_peaks would report them on
+        that slice, as indices into the slice
+        """
+        start = max(self.count - window, 0)
+        return [peak - start for peak in self.peaks_between(start + self.min_distance, self.count)]
+
+
+class SupportResistanceStream:
+    """
+    Streaming support and resistance levels for one symbol
+    مستويات الدعم والمقاومة المتدفقة لرمز واحد
+
+    Feed one (high, low) bar at a time. Peaks of the highs become
+    resistance candidates and troughs of the lows support candidates; both
+    are clustered with LevelTracker over the whole stream.
+    """
+
+    def __init__(
+        self,
+        min_distance: int = DEFAULT_MIN_DISTANCE,
+        tolerance: float = DEFAULT_TOLERANCE,
+        max_peaks: Optional[int] = None
+    ):
+        self.peak_detector = IncrementalPeakDetector(min_distance, max_peaks=max_peaks)
+        self.trough_detector = IncrementalPeakDetector(min_distance, troughs=True, max_peaks=max_peaks)
+        self.resistance = LevelTracker(tolerance)
+        self.support = LevelTracker(tolerance)
+        self._highs: deque = deque(maxlen=min_distance + 1)
+        self._lows: deque = deque(maxlen=min_distance + 1)
+
+    @property
+    def count(self) -> int:
+        return self.peak_detector.count
+
+    @property
+    def resistance_levels(self) -> List[float]:
+        return self.resistance.levels
+
+    @property
+    def support_levels(self) -> List[float]:
+        return self.support.levels
+
+    def update(self, high: float, low: float) -> Dict[str, Any]:
+        """Add the next bar; reports peaks confirmed and levels added by it"""
+        self._highs.append(high)
+        self._lows.append(low)
+        events: Dict[str, Any] = {'peak': None, 'trough': None, 'new_resistance': None, 'new_support': None}
+
+        peak = self.peak_detector.update(high)
+        if peak is not None:
+            # The confirmed bar lies min_distance bars back, i.e. the oldest buffered one
+            level = self._highs[0]
+            events['peak'] = peak
+            if self.resistance.add(level):
+                events['new_resistance'] = level
+
+        trough = self.trough_detector.update(low)
+        if trough is not None:
+            level = self._lows[0]
+            events['trough'] = trough
+            if self.support.add(level):
+                events['new_support'] = level
+
+        return events
+
+
+def _legacy_find_peaks(data: np.ndarray, min_distance: int = DEFAULT_MIN_DISTANCE) -> List[int]:
+    """The original per-element loop, kept as the benchmark reference"""
+    peaks = []
+    for i in range(min_distance, len(data) - min_distance):
+        if all(data[i] >= data[i-j] for j in range(1, min_distance+1)) and \
+           all(data[i] >= data[i+j] for j in range(1, min_distance+1)):
+            peaks.append(i)
+    return peaks
+
+
+def benchmark_peak_detection(
+    sizes: Sequence[int] = (1_000, 10_000, 100_000, 1_000_000),
+    legacy_limit: int = 100_000,
+    seed: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Scaling of legacy, batch and streaming detection on random-walk bars
+
+    The legacy loop is only timed up to `legacy_limit` bars. Streaming
+    figures are per bar, i.e. the latency added by each live update.
+    """
+    rng = np.random.default_rng(seed)
+    results = []
+    for size in sizes:
+        closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, size)))
+        highs = closes * (1 + rng.uniform(0, 0.01, size))
+        lows = closes * (1 - rng.uniform(0, 0.01, size))
+        row: Dict[str, Any] = {'bars': size}
+
+        if size <= legacy_limit:
+            start = time.perf_counter()
+            legacy = _legacy_find_peaks(highs)
+            row['legacy_seconds'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch = find_peaks(highs)
+        find_levels(highs, 'resistance')
+        find_levels(lows, 'support')
+        row['batch_seconds'] = time.perf_counter() - start
+
+        stream = SupportResistanceStream()
+        start = time.perf_counter()
+        for high, low in zip(highs.tolist(), lows.tolist()):
+            stream.update(high, low)
+        elapsed = time.perf_counter() - start
+        row['stream_seconds'] = elapsed
+        row['stream_us_per_bar'] = elapsed / size * 1e6
+
+        row['peaks'] = len(batch)
+        row['results_match'] = list(stream.peak_detector.peaks) == batch and (
+            size > legacy_limit or legacy == batch
+        )
+        results.append(row)
+    return results
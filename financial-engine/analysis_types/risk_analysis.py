@@ -24,6 +24,7 @@ import pandas as pd
 import math
 from datetime import datetime, timedelta
 from .base_analysis import BaseAnalysis, AnalysisCategory, RiskLevel, PerformanceRating
+from ..core.monte_carlo import MonteCarloEngine
 
 
 class RiskType(Enum):
@@ -503,17 +504,30 @@ class ComprehensiveRiskAnalysis(BaseAnalysis):
     def calculate_value_at_risk(self,
                                returns: List[float],
                                confidence_levels: List[float] = [0.90, 0.95, 0.99],
-                               method: str = 'historical') -> Dict[str, Any]:
+                               method: str = 'historical',
+                               num_simulations: int = 10000,
+                               seed: Optional[int] = None) -> Dict[str, Any]:
         """
         حساب القيمة المعرضة للمخاطر - Value at Risk (VaR) Calculation
 
         Calculates VaR using different methodologies
         يحسب VaR باستخدام منهجيات مختلفة
+
+        The monte_carlo method draws `num_simulations` returns once (antithetic,
+        reproducible with `seed`) and reads every confidence level from them.
         """
         try:
             returns_array = np.array(returns)
             var_results = {}
 
+            if method == 'monte_carlo':
+                # Monte Carlo Simulation / محاكاة مونت كارلو
+                mean_return = np.mean(returns_array)
+                std_return = np.std(returns_array, ddof=1)
+                simulated_returns = MonteCarloEngine(seed, antithetic=True).simulate(
+                    num_simulations, mean_return, std_return
+                )
+
             for confidence in confidence_levels:
                 if method == 'historical':
                     # Historical Method / الطريقة التاريخية
@@ -528,10 +542,6 @@ class ComprehensiveRiskAnalysis(BaseAnalysis):
                     var_value = norm.ppf(1 - confidence, mean_return, std_return)
 
                 elif method == 'monte_carlo':
-                    # Monte Carlo Simulation / محاكاة مونت كارلو
-                    mean_return = np.mean(returns_array)
-                    std_return = np.std(returns_array, ddof=1)
-                    simulated_returns = np.random.normal(mean_return, std_return, 10000)
                     percentile = (1 - confidence) * 100
                     var_value = np.percentile(simulated_returns, percentile)
 
@@ -15,15 +15,27 @@ from .data_models import (
     FinancialStatements,
     AnalysisRequest,
     AnalysisResult,
+    AnalysisStreamEvent,
     CompanyInfo
 )
 from .analysis_registry import AnalysisRegistry
+from .batch_ratios import BatchRatioEngine, StatementColumns
+from .report_cache import ReportCache, MemoryCacheBackend, DiskCacheBackend
+from .monte_carlo import MonteCarloEngine, summarize_paths
 
 __all__ = [
     'FinancialAnalysisEngine',
     'FinancialStatements',
     'AnalysisRequest',
     'AnalysisResult',
+    'AnalysisStreamEvent',
     'CompanyInfo',
-    'AnalysisRegistry'
+    'AnalysisRegistry',
+    'BatchRatioEngine',
+    'StatementColumns',
+    'ReportCache',
+    'MemoryCacheBackend',
+    'DiskCacheBackend',
+    'MonteCarloEngine',
+    'summarize_paths'
 ]
\ No newline at end of file
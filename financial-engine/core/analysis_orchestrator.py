@@ -6,16 +6,16 @@ This module orchestrates the execution of all 180 financial analysis types,
 manages the analysis workflow, and coordinates between different analysis categories.
 """
 
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Union, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 import asyncio
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
 
 from .data_models import FinancialStatements, AnalysisResult, CompanyInfo
 from .engine import FinancialAnalysisEngine
+from .execution_backends import ExecutionBackend, create_execution_backend
 
 # Import all analysis modules
 from ..analysis_types.classical_foundational.structural_analysis import StructuralAnalyzer
@@ -39,6 +39,7 @@ class AnalysisConfiguration:
     parallel_execution: bool = True
     max_workers: int = 10
     timeout_seconds: int = 300  # 5 minutes timeout per analysis
+    execution_backend: str = "thread"  # thread, process
 
 
 @dataclass
@@ -62,10 +63,14 @@ class AnalysisOrchestrator:
     ينسق تنفيذ جميع التحليلات المالية
     """
 
-    def __init__(self):
+    def __init__(self, execution_backend: Optional[ExecutionBackend] = None):
         self.logger = logging.getLogger(__name__)
         self.engine = FinancialAnalysisEngine()
 
+        # Long-lived worker pools, keyed by backend name and pool size
+        self._execution_backends: Dict[Tuple[str, int], ExecutionBackend] = {}
+        self._custom_execution_backend = execution_backend
+
         # Initialize all analyzers - This represents the 180 analysis types
         self.analyzers = self._initialize_analyzers()
 
@@ -92,147 +97,157 @@ class AnalysisOrchestrator:
         """Initialize all 180 analysis types - this is where we implement the complete set"""
         analyzers = {}
 
+        # Analyzers are stateless, so every analysis type of a class shares
+        # the registry's single instance of it
+        registry = self.engine.analysis_registry
+        structural = registry.get_analyzer(StructuralAnalyzer)
+        liquidity = registry.get_analyzer(LiquidityAnalyzer)
+        profitability = registry.get_analyzer(ProfitabilityAnalyzer)
+        efficiency = registry.get_analyzer(EfficiencyAnalyzer)
+        credit_risk = registry.get_analyzer(CreditRiskAnalyzer)
+        valuation = registry.get_analyzer(ValuationAnalyzer)
+
         # Classical Foundational Analysis (106 types)
         classical_foundational = {
             # Structural Analysis (20 types)
-            "vertical_analysis": StructuralAnalyzer(),
-            "horizontal_analysis": StructuralAnalyzer(),
-            "trend_analysis": StructuralAnalyzer(),
-            "size_analysis": StructuralAnalyzer(),
-            "composition_analysis": StructuralAnalyzer(),
+            "vertical_analysis": structural,
+            "horizontal_analysis": structural,
+            "trend_analysis": structural,
+            "size_analysis": structural,
+            "composition_analysis": structural,
 
             # Liquidity Analysis (15 types)
-            "current_ratio_analysis": LiquidityAnalyzer(),
-            "quick_ratio_analysis": LiquidityAnalyzer(),
-            "cash_ratio_analysis": LiquidityAnalyzer(),
-            "operating_cash_flow_ratio": LiquidityAnalyzer(),
-            "working_capital_analysis": LiquidityAnalyzer(),
-            "cash_conversion_cycle": LiquidityAnalyzer(),
-            "receivables_turnover": LiquidityAnalyzer(),
-            "inventory_turnover": LiquidityAnalyzer(),
-            "payables_turnover": LiquidityAnalyzer(),
-            "net_working_capital_turnover": LiquidityAnalyzer(),
+            "current_ratio_analysis": liquidity,
+            "quick_ratio_analysis": liquidity,
+            "cash_ratio_analysis": liquidity,
+            "operating_cash_flow_ratio": liquidity,
+            "working_capital_analysis": liquidity,
+            "cash_conversion_cycle": liquidity,
+            "receivables_turnover": liquidity,
+            "inventory_turnover": liquidity,
+            "payables_turnover": liquidity,
+            "net_working_capital_turnover": liquidity,
 
             # Profitability Analysis (25 types)
-            "gross_profit_margin": ProfitabilityAnalyzer(),
-            "operating_profit_margin": ProfitabilityAnalyzer(),
-            "net_profit_margin": ProfitabilityAnalyzer(),
-            "ebitda_margin": ProfitabilityAnalyzer(),
-            "return_on_assets": ProfitabilityAnalyzer(),
-            "return_on_equity": ProfitabilityAnalyzer(),
-            "return_on_invested_capital": ProfitabilityAnalyzer(),
-            "earnings_per_share": ProfitabilityAnalyzer(),
-            "price_earnings_ratio": ProfitabilityAnalyzer(),
-            "earnings_quality": ProfitabilityAnalyzer(),
+            "gross_profit_margin": profitability,
+            "operating_profit_margin": profitability,
+            "net_profit_margin": profitability,
+            "ebitda_margin": profitability,
+            "return_on_assets": profitability,
+            "return_on_equity": profitability,
+            "return_on_invested_capital": profitability,
+            "earnings_per_share": profitability,
+            "price_earnings_ratio": profitability,
+            "earnings_quality": profitability,
 
             # Efficiency Analysis (20 types)
-            "asset_turnover": EfficiencyAnalyzer(),
-            "fixed_asset_turnover": EfficiencyAnalyzer(),
-            "total_asset_turnover": EfficiencyAnalyzer(),
-            "inventory_efficiency": EfficiencyAnalyzer(),
-            "receivables_efficiency": EfficiencyAnalyzer(),
-            "operational_efficiency": EfficiencyAnalyzer(),
-            "capital_efficiency": EfficiencyAnalyzer(),
-            "resource_utilization": EfficiencyAnalyzer(),
-            "cost_efficiency": EfficiencyAnalyzer(),
-            "productivity_analysis": EfficiencyAnalyzer(),
+            "asset_turnover": efficiency,
+            "fixed_asset_turnover": efficiency,
+            "total_asset_turnover": efficiency,
+            "inventory_efficiency": efficiency,
+            "receivables_efficiency": efficiency,
+            "operational_efficiency": efficiency,
+            "capital_efficiency": efficiency,
+            "resource_utilization": efficiency,
+            "cost_efficiency": efficiency,
+            "productivity_analysis": efficiency,
 
             # Leverage Analysis (15 types)
-            "debt_to_equity": StructuralAnalyzer(),  # Using structural for leverage
-            "debt_to_assets": StructuralAnalyzer(),
-            "interest_coverage": StructuralAnalyzer(),
-            "debt_service_coverage": StructuralAnalyzer(),
-            "financial_leverage": StructuralAnalyzer(),
+            "debt_to_equity": structural,  # Using structural for leverage
+            "debt_to_assets": structural,
+            "interest_coverage": structural,
+            "debt_service_coverage": structural,
+            "financial_leverage": structural,
 
             # Growth Analysis (11 types)
-            "revenue_growth": ProfitabilityAnalyzer(),
-            "profit_growth": ProfitabilityAnalyzer(),
-            "sustainable_growth": ProfitabilityAnalyzer(),
-            "internal_growth": ProfitabilityAnalyzer(),
-            "dividend_growth": ProfitabilityAnalyzer()
+            "revenue_growth": profitability,
+            "profit_growth": profitability,
+            "sustainable_growth": profitability,
+            "internal_growth": profitability,
+            "dividend_growth": profitability
         }
 
         # Risk Analysis (21 types)
         risk_analysis = {
             # Credit Risk (8 types)
-            "credit_risk_assessment": CreditRiskAnalyzer(),
-            "default_probability": CreditRiskAnalyzer(),
-            "altman_z_score": CreditRiskAnalyzer(),
-            "credit_rating_analysis": CreditRiskAnalyzer(),
-            "bankruptcy_prediction": CreditRiskAnalyzer(),
-            "payment_capacity": CreditRiskAnalyzer(),
-            "debt_capacity": CreditRiskAnalyzer(),
-            "credit_quality": CreditRiskAnalyzer(),
+            "credit_risk_assessment": credit_risk,
+            "default_probability": credit_risk,
+            "altman_z_score": credit_risk,
+            "credit_rating_analysis": credit_risk,
+            "bankruptcy_prediction": credit_risk,
+            "payment_capacity": credit_risk,
+            "debt_capacity": credit_risk,
+            "credit_quality": credit_risk,
 
             # Market Risk (5 types)
-            "market_risk_analysis": CreditRiskAnalyzer(),  # Placeholder - would need dedicated analyzer
-            "beta_analysis": CreditRiskAnalyzer(),
-            "volatility_analysis": CreditRiskAnalyzer(),
-            "correlation_analysis": CreditRiskAnalyzer(),
-            "systematic_risk": CreditRiskAnalyzer(),
+            "market_risk_analysis": credit_risk,  # Placeholder - would need dedicated analyzer
+            "beta_analysis": credit_risk,
+            "volatility_analysis": credit_risk,
+            "correlation_analysis": credit_risk,
+            "systematic_risk": credit_risk,
 
             # Operational Risk (4 types)
-            "operational_risk": CreditRiskAnalyzer(),
-            "business_risk": CreditRiskAnalyzer(),
-            "financial_risk": CreditRiskAnalyzer(),
-            "liquidity_risk": CreditRiskAnalyzer(),
+            "operational_risk": credit_risk,
+            "business_risk": credit_risk,
+            "financial_risk": credit_risk,
+            "liquidity_risk": credit_risk,
 
             # Other Risk Types (4 types)
-            "currency_risk": CreditRiskAnalyzer(),
-            "interest_rate_risk": CreditRiskAnalyzer(),
-            "commodity_risk": CreditRiskAnalyzer(),
-            "concentration_risk": CreditRiskAnalyzer()
+            "currency_risk": credit_risk,
+            "interest_rate_risk": credit_risk,
+            "commodity_risk": credit_risk,
+            "concentration_risk": credit_risk
         }
 
         # Market Analysis (53 types)
         market_analysis = {
             # Valuation Analysis (15 types)
-            "dcf_valuation": ValuationAnalyzer(),
-            "comparable_company_analysis": ValuationAnalyzer(),
-            "precedent_transactions": ValuationAnalyzer(),
-            "asset_based_valuation": ValuationAnalyzer(),
-            "market_multiples": ValuationAnalyzer(),
-            "enterprise_value": ValuationAnalyzer(),
-            "equity_valuation": ValuationAnalyzer(),
-            "intrinsic_value": ValuationAnalyzer(),
-            "relative_valuation": ValuationAnalyzer(),
-            "sum_of_parts_valuation": ValuationAnalyzer(),
+            "dcf_valuation": valuation,
+            "comparable_company_analysis": valuation,
+            "precedent_transactions": valuation,
+            "asset_based_valuation": valuation,
+            "market_multiples": valuation,
+            "enterprise_value": valuation,
+            "equity_valuation": valuation,
+            "intrinsic_value": valuation,
+            "relative_valuation": valuation,
+            "sum_of_parts_valuation": valuation,
 
             # Market Performance (12 types)
-            "market_performance": ValuationAnalyzer(),
-            "peer_comparison": ValuationAnalyzer(),
-            "industry_analysis": ValuationAnalyzer(),
-            "sector_performance": ValuationAnalyzer(),
-            "market_position": ValuationAnalyzer(),
-            "competitive_analysis": ValuationAnalyzer(),
-            "market_share_analysis": ValuationAnalyzer(),
-            "brand_value": ValuationAnalyzer(),
-            "customer_metrics": ValuationAnalyzer(),
-            "market_trends": ValuationAnalyzer(),
+            "market_performance": valuation,
+            "peer_comparison": valuation,
+            "industry_analysis": valuation,
+            "sector_performance": valuation,
+            "market_position": valuation,
+            "competitive_analysis": valuation,
+            "market_share_analysis": valuation,
+            "brand_value": valuation,
+            "customer_metrics": valuation,
+            "market_trends": valuation,
 
             # Investment Analysis (14 types)
-            "investment_attractiveness": ValuationAnalyzer(),
-            "shareholder_value": ValuationAnalyzer(),
-            "dividend_analysis": ValuationAnalyzer(),
-            "capital_allocation": ValuationAnalyzer(),
-            "value_creation": ValuationAnalyzer(),
-            "economic_value_added": ValuationAnalyzer(),
-            "market_value_added": ValuationAnalyzer(),
-            "total_shareholder_return": ValuationAnalyzer(),
-            "risk_adjusted_returns": ValuationAnalyzer(),
-            "portfolio_analysis": ValuationAnalyzer(),
+            "investment_attractiveness": valuation,
+            "shareholder_value": valuation,
+            "dividend_analysis": valuation,
+            "capital_allocation": valuation,
+            "value_creation": valuation,
+            "economic_value_added": valuation,
+            "market_value_added": valuation,
+            "total_shareholder_return": valuation,
+            "risk_adjusted_returns": valuation,
+            "portfolio_analysis": valuation,
 
             # Strategic Analysis (12 types)
-            "strategic_position": ValuationAnalyzer(),
-            "competitive_advantage": ValuationAnalyzer(),
-            "moat_analysis": ValuationAnalyzer(),
-            "swot_analysis": ValuationAnalyzer(),
-            "porter_five_forces": ValuationAnalyzer(),
-            "value_chain_analysis": ValuationAnalyzer(),
-            "core_competencies": ValuationAnalyzer(),
-            "strategic_options": ValuationAnalyzer(),
-            "scenario_analysis": ValuationAnalyzer(),
-            "sensitivity_analysis": ValuationAnalyzer()
+            "strategic_position": valuation,
+            "competitive_advantage": valuation,
+            "moat_analysis": valuation,
+            "swot_analysis": valuation,
+            "porter_five_forces": valuation,
+            "value_chain_analysis": valuation,
+            "core_competencies": valuation,
+            "strategic_options": valuation,
+            "scenario_analysis": valuation,
+            "sensitivity_analysis": valuation
         }
 
         # Combine all analyzers
@@ -298,6 +313,10 @@ class AnalysisOrchestrator:
                 "successful_analyses": len([r for r in results if not r.error]),
                 "failed_analyses": len([r for r in results if r.error]),
                 "parallel_execution": config.parallel_execution,
+                "execution_backend": (
+                    self._get_execution_backend(config).name
+                    if config.parallel_execution else "sequential"
+                ),
                 "max_workers": config.max_workers if config.parallel_execution else 1
             }
 
@@ -349,46 +368,53 @@ class AnalysisOrchestrator:
 
         return analyses_to_run
 
+    def _get_execution_backend(self, config: AnalysisConfiguration) -> ExecutionBackend:
+        """Return the long-lived execution backend for this configuration"""
+        if self._custom_execution_backend is not None:
+            return self._custom_execution_backend
+
+        key = (config.execution_backend, config.max_workers)
+        if key not in self._execution_backends:
+            self._execution_backends[key] = create_execution_backend(
+                config.execution_backend, config.max_workers
+            )
+        return self._execution_backends[key]
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down all worker pools owned by the orchestrator"""
+        for backend in self._execution_backends.values():
+            backend.shutdown(wait=wait)
+        self._execution_backends.clear()
+
     async def _execute_analyses_parallel(
         self,
         financial_statements: FinancialStatements,
         analyses_to_run: List[Tuple[str, str, Any]],
         config: AnalysisConfiguration
     ) -> List[AnalysisResult]:
-        """Execute analyses in parallel for faster processing"""
-        results = []
+        """Execute analyses in parallel on the configured execution backend"""
+        backend = self._get_execution_backend(config)
+        outcomes = await backend.execute(
+            analyses_to_run, financial_statements, config.comparison_data, config.timeout_seconds
+        )
 
-        with ThreadPoolExecutor(max_workers=config.max_workers) as executor:
-            # Submit all analysis tasks
-            future_to_analysis = {}
-
-            for category, analysis_type, analyzer in analyses_to_run:
-                future = executor.submit(
-                    self._execute_single_analysis,
-                    analyzer, financial_statements, config.comparison_data, config.timeout_seconds
+        results = []
+        for outcome in outcomes:
+            if outcome.error is None:
+                result = outcome.result
+                result.analysis_type = outcome.analysis_type
+                result.category = outcome.category
+                results.append(result)
+            else:
+                # Create error result
+                error_result = AnalysisResult(
+                    analysis_type=outcome.analysis_type,
+                    category=outcome.category,
+                    error=f"Analysis execution failed: {outcome.error}",
+                    timestamp=datetime.now()
                 )
-                future_to_analysis[future] = (category, analysis_type)
-
-            # Collect results as they complete
-            for future in as_completed(future_to_analysis):
-                category, analysis_type = future_to_analysis[future]
-
-                try:
-                    result = future.result(timeout=config.timeout_seconds)
-                    result.analysis_type = analysis_type
-                    result.category = category
-                    results.append(result)
-
-                except Exception as e:
-                    # Create error result
-                    error_result = AnalysisResult(
-                        analysis_type=analysis_type,
-                        category=category,
-                        error=f"Analysis execution failed: {str(e)}",
-                        timestamp=datetime.now()
-                    )
-                    results.append(error_result)
-                    self.logger.warning(f"Analysis {analysis_type} failed: {str(e)}")
+                results.append(error_result)
+                self.logger.warning(f"Analysis {outcome.analysis_type} failed: {outcome.error}")
 
         return results
 
@@ -403,7 +429,7 @@ class AnalysisOrchestrator:
 
         for category, analysis_type, analyzer in analyses_to_run:
             try:
-                result = self._execute_single_analysis(
+                result = await self._execute_single_analysis(
                     analyzer, financial_statements, config.comparison_data, config.timeout_seconds
                 )
                 result.analysis_type = analysis_type
@@ -422,19 +448,30 @@ class AnalysisOrchestrator:
 
         return results
 
-    def _execute_single_analysis(
+    async def _execute_single_analysis(
         self,
         analyzer: Any,
         financial_statements: FinancialStatements,
         comparison_data: Optional[Dict],
         timeout_seconds: int
     ) -> AnalysisResult:
-        """Execute a single analysis with timeout protection"""
+        """
+        Execute a single analysis with timeout protection
+
+        The analyzer runs on the default thread pool so the timeout can be
+        enforced without blocking the event loop. As with the thread
+        backend, a timed-out analyzer cannot be interrupted and finishes
+        in the background while the next analysis starts.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            None, analyzer.analyze, financial_statements, comparison_data
+        )
         try:
-            # Execute the analysis
-            result = analyzer.analyze(financial_statements, comparison_data)
-            return result
+            return await asyncio.wait_for(future, timeout=timeout_seconds or None)
 
+        except asyncio.TimeoutError:
+            raise Exception(f"Analysis timed out after {timeout_seconds} seconds")
         except Exception as e:
             raise Exception(f"Analysis failed: {str(e)}")
 
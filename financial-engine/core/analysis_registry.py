@@ -3,13 +3,18 @@ Analysis Registry - Central registry for all 180 financial analysis types
 Manages and organizes all financial analysis definitions and metadata.
 """
 
-from typing import Dict, List, Optional, Any
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Any, Set, Tuple, Type, TypeVar
 from dataclasses import dataclass
 from enum import Enum
 
 from .data_models import AnalysisCategory, AnalysisSubcategory, Language
 
 
+AnalyzerT = TypeVar("AnalyzerT")
+
+
 @dataclass
 class AnalysisDefinition:
     """Definition structure for each financial analysis type"""
@@ -38,33 +43,109 @@ class AnalysisRegistry:
     Organizes analyses by categories and subcategories exactly as required.
     """
 
-    def __init__(self):
-        """Initialize the analysis registry with all 180 analysis types"""
-        self.analyses: Dict[str, AnalysisDefinition] = {}
-        self._initialize_all_analyses()
-
-    def _initialize_all_analyses(self):
-        """Initialize all 180 analysis types with their definitions"""
-
+    # Registration methods in load order, with the category and subcategory
+    # each one populates. Definitions are built on first access, one
+    # subcategory at a time.
+    LOADERS: Tuple[Tuple[AnalysisCategory, AnalysisSubcategory, str], ...] = (
         # Classical Foundational Analysis (106 total)
-        self._register_structural_analyses()  # 13 analyses
-        self._register_financial_ratios()     # 75 analyses
-        self._register_flow_movement_analyses()  # 18 analyses
+        (AnalysisCategory.CLASSICAL_FOUNDATIONAL, AnalysisSubcategory.STRUCTURAL_ANALYSIS,
+         "_register_structural_analyses"),  # 13 analyses
+        (AnalysisCategory.CLASSICAL_FOUNDATIONAL, AnalysisSubcategory.FINANCIAL_RATIOS,
+         "_register_financial_ratios"),  # 75 analyses
+        (AnalysisCategory.CLASSICAL_FOUNDATIONAL, AnalysisSubcategory.FLOW_MOVEMENT_ANALYSIS,
+         "_register_flow_movement_analyses"),  # 18 analyses
 
         # Applied Intermediate Analysis (21 total)
-        self._register_advanced_comparison_analyses()  # 3 analyses
-        self._register_valuation_investment_analyses()  # 13 analyses
-        self._register_performance_efficiency_analyses()  # 5 analyses
+        (AnalysisCategory.APPLIED_INTERMEDIATE, AnalysisSubcategory.ADVANCED_COMPARISON,
+         "_register_advanced_comparison_analyses"),  # 3 analyses
+        (AnalysisCategory.APPLIED_INTERMEDIATE, AnalysisSubcategory.VALUATION_INVESTMENT,
+         "_register_valuation_investment_analyses"),  # 13 analyses
+        (AnalysisCategory.APPLIED_INTERMEDIATE, AnalysisSubcategory.PERFORMANCE_EFFICIENCY,
+         "_register_performance_efficiency_analyses"),  # 5 analyses
 
         # Advanced Sophisticated Analysis (53 total)
-        self._register_modeling_simulation_analyses()  # 11 analyses
-        self._register_statistical_quantitative_analyses()  # 16 analyses
-        self._register_prediction_credit_analyses()  # 10 analyses
-        self._register_quantitative_risk_analyses()  # 25 analyses
-        self._register_portfolio_investment_analyses()  # 14 analyses
-        self._register_merger_acquisition_analyses()  # 5 analyses
-        self._register_detection_prediction_analyses()  # 10 analyses
-        self._register_timeseries_statistical_analyses()  # 6 analyses
+        (AnalysisCategory.ADVANCED_SOPHISTICATED, AnalysisSubcategory.MODELING_SIMULATION,
+         "_register_modeling_simulation_analyses"),  # 11 analyses
+        (AnalysisCategory.ADVANCED_SOPHISTICATED, AnalysisSubcategory.STATISTICAL_QUANTITATIVE,
+         "_register_statistical_quantitative_analyses"),  # 16 analyses
+        (AnalysisCategory.ADVANCED_SOPHISTICATED, AnalysisSubcategory.PREDICTION_CREDIT_CLASSIFICATION,
+         "_register_prediction_credit_analyses"),  # 10 analyses
+        (AnalysisCategory.ADVANCED_SOPHISTICATED, AnalysisSubcategory.QUANTITATIVE_RISK,
+         "_register_quantitative_risk_analyses"),  # 25 analyses
+        (AnalysisCategory.ADVANCED_SOPHISTICATED, AnalysisSubcategory.PORTFOLIO_INVESTMENT,
+         "_register_portfolio_investment_analyses"),  # 14 analyses
+        (AnalysisCategory.ADVANCED_SOPHISTICATED, AnalysisSubcategory.MERGER_ACQUISITION,
+         "_register_merger_acquisition_analyses"),  # 5 analyses
+        (AnalysisCategory.ADVANCED_SOPHISTICATED, AnalysisSubcategory.QUANTITATIVE_DETECTION_PREDICTION,
+         "_register_detection_prediction_analyses"),  # 10 analyses
+        (AnalysisCategory.ADVANCED_SOPHISTICATED, AnalysisSubcategory.TIME_SERIES_STATISTICAL,
+         "_register_timeseries_statistical_analyses"),  # 6 analyses
+    )
+
+    def __init__(self):
+        """Initialize an empty registry; definitions load on first lookup"""
+        self._analyses: Dict[str, AnalysisDefinition] = {}
+        self._by_category: Dict[AnalysisCategory, List[AnalysisDefinition]] = defaultdict(list)
+        self._by_subcategory: Dict[AnalysisSubcategory, List[AnalysisDefinition]] = defaultdict(list)
+        self._loaded: Set[str] = set()
+        self._analyzers: Dict[type, Any] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def analyses(self) -> Dict[str, AnalysisDefinition]:
+        """All analysis definitions by code (loads every subcategory)"""
+        self._initialize_all_analyses()
+        return self._analyses
+
+    @property
+    def fully_loaded(self) -> bool:
+        return len(self._loaded) == len(self.LOADERS)
+
+    def _initialize_all_analyses(self):
+        """Load all 180 analysis types with their definitions"""
+        if not self.fully_loaded:
+            for loader in self.LOADERS:
+                self._load(loader[2])
+
+    def _load(self, method_name: str):
+        """Run one registration method unless it already ran"""
+        if method_name in self._loaded:
+            return
+        with self._lock:
+            if method_name not in self._loaded:
+                getattr(self, method_name)()
+                self._loaded.add(method_name)
+                self._reorder()
+
+    def _reorder(self):
+        """
+        Put the code and category indexes back in load order
+
+        Subcategories can load in any order; listings must match a fully
+        loaded registry, so both indexes are rebuilt from the subcategory
+        lists in LOADERS order.
+        """
+        ordered = [
+            analysis
+            for _, subcategory, _ in self.LOADERS
+            for analysis in self._by_subcategory.get(subcategory, ())
+        ]
+        self._analyses = {analysis.code: analysis for analysis in ordered}
+        self._by_category = defaultdict(list)
+        for analysis in ordered:
+            self._by_category[analysis.category].append(analysis)
+
+    def _load_matching(
+        self,
+        category: Optional[AnalysisCategory] = None,
+        subcategory: Optional[AnalysisSubcategory] = None
+    ):
+        for loader_category, loader_subcategory, method_name in self.LOADERS:
+            if category is not None and loader_category != category:
+                continue
+            if subcategory is not None and loader_subcategory != subcategory:
+                continue
+            self._load(method_name)
 
     def _register_structural_analyses(self):
         """Register all 13 structural analysis types"""
@@ -556,7 +637,14 @@ class AnalysisRegistry:
             dependencies=analysis_data.get("dependencies", [])
         )
 
-        self.analyses[analysis_data["code"]] = analysis
+        with self._lock:
+            previous = self._analyses.get(analysis.code)
+            if previous is not None:
+                self._by_category[previous.category].remove(previous)
+                self._by_subcategory[previous.subcategory].remove(previous)
+            self._analyses[analysis.code] = analysis
+            self._by_category[category].append(analysis)
+            self._by_subcategory[subcategory].append(analysis)
 
     # [Continue with all other analysis registration methods...]
     def _register_flow_movement_analyses(self):
@@ -609,15 +697,25 @@ class AnalysisRegistry:
 
     def get_analysis(self, code: str) -> Optional[AnalysisDefinition]:
         """Get analysis definition by code"""
-        return self.analyses.get(code)
+        analysis = self._analyses.get(code)
+        if analysis is None and not self.fully_loaded:
+            # Load subcategories in order only until the code turns up
+            for loader in self.LOADERS:
+                self._load(loader[2])
+                analysis = self._analyses.get(code)
+                if analysis is not None:
+                    break
+        return analysis
 
     def get_analyses_by_category(self, category: AnalysisCategory) -> List[AnalysisDefinition]:
         """Get all analyses in a category"""
-        return [analysis for analysis in self.analyses.values() if analysis.category == category]
+        self._load_matching(category=category)
+        return list(self._by_category.get(category, ()))
 
     def get_analyses_by_subcategory(self, subcategory: AnalysisSubcategory) -> List[AnalysisDefinition]:
         """Get all analyses in a subcategory"""
-        return [analysis for analysis in self.analyses.values() if analysis.subcategory == subcategory]
+        self._load_matching(subcategory=subcategory)
+        return list(self._by_subcategory.get(subcategory, ()))
 
     def get_all_analysis_codes(self) -> List[str]:
         """Get all analysis codes"""
@@ -629,8 +727,38 @@ class AnalysisRegistry:
 
     def get_count_by_category(self) -> Dict[str, int]:
         """Get count of analyses by category"""
-        counts = {}
-        for analysis in self.analyses.values():
-            category_name = analysis.category.value
-            counts[category_name] = counts.get(category_name, 0) + 1
-        return counts
\ No newline at end of file
+        self._initialize_all_analyses()
+        return {
+            category.value: len(analyses)
+            for category, analyses in self._by_category.items()
+            if analyses
+        }
+
+    def get_analyzer(self, analyzer_class: Type[AnalyzerT]) -> AnalyzerT:
+        """
+        Shared instance of a stateless analyzer class, created on first use
+        نسخة مشتركة من فئة المحلل تُنشأ عند أول استخدام
+        """
+        analyzer = self._analyzers.get(analyzer_class)
+        if analyzer is None:
+            with self._lock:
+                analyzer = self._analyzers.get(analyzer_class)
+                if analyzer is None:
+                    analyzer = analyzer_class()
+                    self._analyzers[analyzer_class] = analyzer
+        return analyzer
+
+
+# Process-wide registry shared by engines and orchestrators unless one is injected
+_default_registry: Optional[AnalysisRegistry] = None
+_default_registry_lock = threading.Lock()
+
+
+def get_default_registry() -> AnalysisRegistry:
+    """Return the process-wide analysis registry, creating it on first use"""
+    global _default_registry
+    if _default_registry is None:
+        with _default_registry_lock:
+            if _default_registry is None:
+                _default_registry = AnalysisRegistry()
+    return _default_registry
@@ -0,0 +1,336 @@
+"""
+Batch Ratio Engine
+محرك النسب المالية الدفعي
+
+Evaluates liquidity, profitability, efficiency and leverage ratios for many
+FinancialStatements at once. Statements are stored column-wise in numpy
+arrays so that each ratio is a single vectorized expression over the whole
+universe instead of one analyzer call per company.
+"""
+
+import time
+from dataclasses import dataclass, fields
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .data_models import FinancialStatements
+from ..analysis_types.liquidity_analysis import LiquidityAnalysis
+from ..analysis_types.profitability_analysis import ProfitabilityAnalysis
+from ..analysis_types.efficiency_analysis import EfficiencyAnalysis
+from ..analysis_types.leverage_analysis import LeverageAnalysis
+
+
+# Numeric statement fields stored as columns (year/period are metadata)
+STATEMENT_COLUMNS: Tuple[str, ...] = tuple(
+    f.name for f in fields(FinancialStatements) if f.type in (float, 'float')
+)
+
+
+@dataclass(frozen=True)
+class RatioSpec:
+    """
+    Definition of a single batch ratio
+
+    `inputs` maps a statement (or a column store) to the positional arguments
+    of the scalar analyzer method. The same arithmetic is applied to floats
+    and to numpy columns, which keeps both paths bit-for-bit aligned.
+    `kernel` repeats the scalar formula, `guard` is the index of the argument
+    that the scalar method requires to be non-zero and `digits` is the
+    rounding the scalar method applies to its 'value'.
+    """
+    name: str
+    category: str
+    engine: str
+    method: str
+    inputs: Callable[[Mapping[str, Any]], Tuple[Any, ...]]
+    kernel: Callable[..., Any]
+    guard: Optional[int]
+    digits: int
+
+
+def _total_debt(c: Mapping[str, Any]) -> Any:
+    return c['short_term_debt'] + c['long_term_debt']
+
+
+def _working_capital(c: Mapping[str, Any]) -> Any:
+    return c['current_assets'] - c['current_liabilities']
+
+
+RATIO_SPECS: Tuple[RatioSpec, ...] = (
+    # Liquidity Ratios - نسب السيولة
+    RatioSpec('current_ratio', 'liquidity', 'liquidity', 'current_ratio',
+              lambda c: (c['current_assets'], c['current_liabilities']),
+              lambda ca, cl: ca / cl, 1, 4),
+    RatioSpec('quick_ratio', 'liquidity', 'liquidity', 'quick_ratio',
+              lambda c: (c['current_assets'], c['inventory'], c['prepaid_expenses'], c['current_liabilities']),
+              lambda ca, inv, pre, cl: (ca - inv - pre) / cl, 3, 4),
+    RatioSpec('cash_ratio', 'liquidity', 'liquidity', 'cash_ratio',
+              lambda c: (c['cash_and_equivalents'], 0.0, c['current_liabilities']),
+              lambda cash, sti, cl: (cash + sti) / cl, 2, 4),
+    RatioSpec('working_capital', 'liquidity', 'liquidity', 'working_capital',
+              lambda c: (c['current_assets'], c['current_liabilities']),
+              lambda ca, cl: ca - cl, None, 2),
+    RatioSpec('operating_cash_flow_ratio', 'liquidity', 'liquidity', 'operating_cash_flow_ratio',
+              lambda c: (c['operating_cash_flow'], c['current_liabilities']),
+              lambda ocf, cl: ocf / cl, 1, 4),
+    RatioSpec('days_inventory_outstanding', 'liquidity', 'liquidity', 'days_inventory_outstanding',
+              lambda c: (c['inventory'], c['cost_of_goods_sold']),
+              lambda inv, cogs: (inv / cogs) * 365, 1, 2),
+    RatioSpec('days_payable_outstanding', 'liquidity', 'liquidity', 'days_payable_outstanding',
+              lambda c: (c['accounts_payable'], c['cost_of_goods_sold']),
+              lambda ap, cogs: (ap / cogs) * 365, 1, 2),
+    RatioSpec('working_capital_ratio', 'liquidity', 'liquidity', 'working_capital_ratio',
+              lambda c: (_working_capital(c), c['total_assets']),
+              lambda wc, ta: wc / ta, 1, 4),
+    RatioSpec('cash_to_current_liabilities', 'liquidity', 'liquidity', 'cash_to_current_liabilities',
+              lambda c: (c['cash_and_equivalents'], c['current_liabilities']),
+              lambda cash, cl: cash / cl, 1, 4),
+
+    # Profitability Ratios - نسب الربحية
+    RatioSpec('gross_profit_margin', 'profitability', 'profitability', 'gross_profit_margin',
+              lambda c: (c['gross_profit'], c['revenue']),
+              lambda gp, rev: (gp / rev) * 100, 1, 2),
+    RatioSpec('operating_profit_margin', 'profitability', 'profitability', 'operating_profit_margin',
+              lambda c: (c['operating_income'], c['revenue']),
+              lambda oi, rev: (oi / rev) * 100, 1, 2),
+    RatioSpec('net_profit_margin', 'profitability', 'profitability', 'net_profit_margin',
+              lambda c: (c['net_income'], c['revenue']),
+              lambda ni, rev: (ni / rev) * 100, 1, 2),
+    RatioSpec('ebitda_margin', 'profitability', 'profitability', 'ebitda_margin',
+              lambda c: (c['ebitda'], c['revenue']),
+              lambda ebitda, rev: (ebitda / rev) * 100, 1, 2),
+    RatioSpec('return_on_assets', 'profitability', 'profitability', 'return_on_assets',
+              lambda c: (c['net_income'], c['total_assets']),
+              lambda ni, ta: (ni / ta) * 100, 1, 2),
+    RatioSpec('return_on_equity', 'profitability', 'profitability', 'return_on_equity',
+              lambda c: (c['net_income'], c['shareholders_equity']),
+              lambda ni, eq: (ni / eq) * 100, 1, 2),
+    RatioSpec('earnings_per_share', 'profitability', 'profitability', 'earnings_per_share',
+              lambda c: (c['net_income'], c['shares_outstanding']),
+              lambda ni, shares: ni / shares, 1, 2),
+
+    # Efficiency Ratios - نسب الكفاءة
+    RatioSpec('inventory_turnover', 'efficiency', 'efficiency', 'inventory_turnover',
+              lambda c: (c['cost_of_goods_sold'], c['inventory']),
+              lambda cogs, inv: cogs / inv, 1, 2),
+    RatioSpec('accounts_receivable_turnover', 'efficiency', 'efficiency', 'accounts_receivable_turnover',
+              lambda c: (c['revenue'], c['accounts_receivable']),
+              lambda rev, ar: rev / ar, 1, 2),
+    RatioSpec('accounts_payable_turnover', 'efficiency', 'efficiency', 'accounts_payable_turnover',
+              lambda c: (c['cost_of_goods_sold'], c['accounts_payable']),
+              lambda cogs, ap: cogs / ap, 1, 2),
+    RatioSpec('total_asset_turnover', 'efficiency', 'efficiency', 'total_asset_turnover',
+              lambda c: (c['revenue'], c['total_assets']),
+              lambda rev, ta: rev / ta, 1, 2),
+    RatioSpec('fixed_asset_turnover', 'efficiency', 'efficiency', 'fixed_asset_turnover',
+              lambda c: (c['revenue'], c['property_plant_equipment']),
+              lambda rev, ppe: rev / ppe, 1, 2),
+    RatioSpec('working_capital_turnover', 'efficiency', 'efficiency', 'working_capital_turnover',
+              lambda c: (c['revenue'], _working_capital(c)),
+              lambda rev, wc: rev / wc, 1, 2),
+    RatioSpec('receivables_to_sales_ratio', 'efficiency', 'efficiency', 'receivables_to_sales_ratio',
+              lambda c: (c['accounts_receivable'], c['revenue']),
+              lambda ar, rev: (ar / rev) * 100, 1, 2),
+    RatioSpec('inventory_to_sales_ratio', 'efficiency', 'efficiency', 'inventory_to_sales_ratio',
+              lambda c: (c['inventory'], c['revenue']),
+              lambda inv, rev: (inv / rev) * 100, 1, 2),
+    RatioSpec('operating_expense_ratio', 'efficiency', 'efficiency', 'operating_expense_ratio',
+              lambda c: (c['operating_expenses'], c['revenue']),
+              lambda opex, rev: (opex / rev) * 100, 1, 2),
+
+    # Leverage Ratios - نسب الرافعة المالية
+    RatioSpec('debt_to_equity_ratio', 'leverage', 'leverage', 'debt_to_equity_ratio',
+              lambda c: (_total_debt(c), c['shareholders_equity']),
+              lambda debt, eq: debt / eq, 1, 2),
+    RatioSpec('debt_ratio', 'leverage', 'leverage', 'debt_ratio',
+              lambda c: (_total_debt(c), c['total_assets']),
+              lambda debt, ta: debt / ta, 1, 2),
+    RatioSpec('equity_multiplier', 'leverage', 'leverage', 'equity_multiplier',
+              lambda c: (c['total_assets'], c['shareholders_equity']),
+              lambda ta, eq: ta / eq, 1, 2),
+    RatioSpec('times_interest_earned', 'leverage', 'leverage', 'times_interest_earned',
+              lambda c: (c['ebit'], c['interest_expense']),
+              lambda ebit, interest: ebit / interest, 1, 2),
+    RatioSpec('long_term_debt_to_equity', 'leverage', 'leverage', 'long_term_debt_to_equity',
+              lambda c: (c['long_term_debt'], c['shareholders_equity']),
+              lambda ltd, eq: ltd / eq, 1, 2),
+    RatioSpec('capitalization_ratio', 'leverage', 'leverage', 'capitalization_ratio',
+              lambda c: (c['long_term_debt'], c['long_term_debt'] + c['shareholders_equity']),
+              lambda ltd, cap: ltd / cap, 1, 2),
+    RatioSpec('cash_coverage_ratio', 'leverage', 'leverage', 'cash_coverage_ratio',
+              lambda c: (c['ebitda'], c['interest_expense']),
+              lambda ebitda, interest: ebitda / interest, 1, 2),
+)
+
+
+class StatementColumns:
+    """
+    Columnar store for a universe of FinancialStatements
+    مخزن عمودي للقوائم المالية
+
+    Every numeric field of FinancialStatements becomes one float64 column
+    with one entry per company, so ratio kernels run over whole columns.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], years: Optional[np.ndarray] = None):
+        sizes = {len(column) for column in columns.values()}
+        if len(sizes) > 1:
+            raise ValueError("All statement columns must have the same length")
+
+        self.columns = columns
+        self.size = sizes.pop() if sizes else 0
+        self.years = years if years is not None else np.zeros(self.size, dtype=np.int64)
+
+    @classmethod
+    def from_statements(cls, statements: Sequence[FinancialStatements]) -> 'StatementColumns':
+        """Build the column store from a sequence of FinancialStatements"""
+        getter = attrgetter(*STATEMENT_COLUMNS)
+        matrix = np.array(
+            [getter(stmt) for stmt in statements],
+            dtype=np.float64,
+            order='F'
+        ).reshape(len(statements), len(STATEMENT_COLUMNS))
+
+        columns = {name: matrix[:, i] for i, name in enumerate(STATEMENT_COLUMNS)}
+        years = np.fromiter((stmt.year for stmt in statements), dtype=np.int64, count=len(statements))
+        return cls(columns, years)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+
+class BatchRatioEngine:
+    """
+    Vectorized ratio evaluation for thousands of companies
+    تقييم متجه للنسب المالية لآلاف الشركات
+    """
+
+    def __init__(self, specs: Sequence[RatioSpec] = RATIO_SPECS):
+        self.specs = tuple(specs)
+        self.analysis_engines = {
+            'liquidity': LiquidityAnalysis(),
+            'profitability': ProfitabilityAnalysis(),
+            'efficiency': EfficiencyAnalysis(),
+            'leverage': LeverageAnalysis()
+        }
+
+    @property
+    def ratio_names(self) -> List[str]:
+        return [spec.name for spec in self.specs]
+
+    def evaluate(self, data: StatementColumns) -> Dict[str, np.ndarray]:
+        """
+        Evaluate every ratio over the column store
+
+        Returns one float64 array per ratio; entries where the scalar
+        analyzer would return no value (zero denominator) are NaN.
+        """
+        results = {}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for spec in self.specs:
+                args = [np.broadcast_to(arg, (len(data),)) for arg in spec.inputs(data)]
+                values = np.asarray(spec.kernel(*args), dtype=np.float64)
+                if spec.guard is not None:
+                    values = np.where(args[spec.guard] == 0, np.nan, values)
+                results[spec.name] = values
+        return results
+
+    def evaluate_statements(
+        self,
+        statements: Sequence[FinancialStatements]
+    ) -> List[Dict[str, Optional[float]]]:
+        """
+        Evaluate every ratio and return one result dict per company
+
+        Values are rounded exactly like the scalar analyzers round their
+        'value' field, and undefined ratios are None.
+        """
+        data = StatementColumns.from_statements(statements)
+        evaluated = self.evaluate(data)
+
+        per_ratio = {}
+        for spec in self.specs:
+            digits = spec.digits
+            per_ratio[spec.name] = [
+                None if value != value else round(value, digits)
+                for value in evaluated[spec.name].tolist()
+            ]
+
+        names = self.ratio_names
+        rows = zip(*(per_ratio[name] for name in names))
+        return [dict(zip(names, row)) for row in rows]
+
+    def evaluate_scalar(self, statement: FinancialStatements) -> Dict[str, Optional[float]]:
+        """Evaluate every ratio for one company through the scalar analyzers"""
+        values = vars(statement)
+        results = {}
+        for spec in self.specs:
+            method = getattr(self.analysis_engines[spec.engine], spec.method)
+            results[spec.name] = method(*spec.inputs(values)).get('value')
+        return results
+
+
+def _synthetic_statements(company_count: int, seed: int = 0) -> List[FinancialStatements]:
+    """Generate a reproducible universe of synthetic statements"""
+    rng = np.random.default_rng(seed)
+    statements = []
+    for _ in range(company_count):
+        revenue = float(rng.uniform(1e6, 1e9))
+        current_liabilities = float(rng.choice([0.0, rng.uniform(1e5, 1e8)], p=[0.02, 0.98]))
+        statements.append(FinancialStatements(
+            revenue=revenue,
+            cost_of_goods_sold=revenue * float(rng.uniform(0.4, 0.8)),
+            operating_expenses=revenue * float(rng.uniform(0.05, 0.2)),
+            interest_expense=float(rng.uniform(0, 1e6)),
+            depreciation=float(rng.uniform(1e4, 1e6)),
+            amortization=float(rng.uniform(1e3, 1e5)),
+            net_income=revenue * float(rng.uniform(-0.05, 0.2)),
+            current_assets=float(rng.uniform(1e5, 5e8)),
+            cash_and_equivalents=float(rng.uniform(1e4, 1e8)),
+            accounts_receivable=float(rng.uniform(1e4, 1e8)),
+            inventory=float(rng.uniform(0, 1e8)),
+            prepaid_expenses=float(rng.uniform(0, 1e6)),
+            property_plant_equipment=float(rng.uniform(1e5, 1e9)),
+            total_assets=float(rng.uniform(1e6, 2e9)),
+            current_liabilities=current_liabilities,
+            accounts_payable=float(rng.uniform(1e4, 5e7)),
+            short_term_debt=float(rng.uniform(0, 5e7)),
+            long_term_debt=float(rng.uniform(0, 5e8)),
+            shareholders_equity=float(rng.uniform(-1e6, 1e9)),
+            operating_cash_flow=float(rng.uniform(-1e6, 1e8)),
+            shares_outstanding=float(rng.uniform(1e5, 1e8))
+        ))
+    return statements
+
+
+def benchmark_batch_ratios(company_count: int = 5000, seed: int = 0) -> Dict[str, Any]:
+    """
+    Compare the scalar analyzers with the batch engine on a synthetic universe
+
+    Returns timings for both paths, the speedup and whether every
+    per-company result matches exactly.
+    """
+    statements = _synthetic_statements(company_count, seed)
+    engine = BatchRatioEngine()
+
+    start = time.perf_counter()
+    scalar_results = [engine.evaluate_scalar(stmt) for stmt in statements]
+    scalar_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_results = engine.evaluate_statements(statements)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        'company_count': company_count,
+        'ratio_count': len(engine.specs),
+        'scalar_seconds': scalar_seconds,
+        'batch_seconds': batch_seconds,
+        'speedup': scalar_seconds / batch_seconds if batch_seconds > 0 else float('inf'),
+        'results_match': scalar_results == batch_results
+    }
@@ -0,0 +1,527 @@
+"""
+Analysis Benchmark Suite
+مجموعة قياس أداء التحليلات
+
+Times every analyzer AnalysisOrchestrator runs, against synthetic
+statements of configurable size, reporting per-analyzer latency, allocation
+and throughput together with the analysis types it serves. Analyzers that
+fail to import are reported one by one. Also measures AnalysisRegistry
+construction and lookup latency, plus end-to-end numbers for
+FinancialAnalysisEngine.perform_comprehensive_analysis and
+AnalysisOrchestrator. Runs are written as JSON baselines and later runs are
+compared against them.
+
+Run as part of the financial engine package:
+    python -m financial_engine.core.benchmarks run --companies 1000 --years 5 --output baseline.json
+    python -m financial_engine.core.benchmarks compare baseline.json current.json --threshold 0.15
+"""
+
+import argparse
+import ast
+import asyncio
+import importlib
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .data_models import (
+    ANALYSIS_TYPES, AnalysisCategory, AnalysisRequest, AnalysisSubcategory, CompanyInfo, FinancialStatements
+)
+from .analysis_registry import AnalysisRegistry, get_default_registry
+from .batch_ratios import BatchRatioEngine, _synthetic_statements
+
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_FORMAT_VERSION = 2
+
+ORCHESTRATOR_SOURCE = Path(__file__).with_name('analysis_orchestrator.py')
+
+# Metrics compared against the baseline; higher is worse for all of them
+COMPARED_METRICS = ('median_us', 'peak_alloc_bytes')
+
+
+def _flatten_analysis_types(node: Any) -> List[str]:
+    """Analysis codes of ANALYSIS_TYPES in declaration order"""
+    if isinstance(node, dict):
+        return [code for child in node.values() for code in _flatten_analysis_types(child)]
+    return list(node)
+
+
+def collect_analysis_codes(registry: Optional[AnalysisRegistry] = None) -> Dict[str, List[str]]:
+    """
+    Every analysis code known to the engine and where it is declared
+    جميع رموز التحليل المعروفة للمحرك ومصدر تعريفها
+    """
+    registry = registry or get_default_registry()
+    codes: Dict[str, List[str]] = {}
+    for code in registry.get_all_analysis_codes():
+        codes.setdefault(code, []).append('registry')
+    for code in _flatten_analysis_types(ANALYSIS_TYPES):
+        codes.setdefault(code, []).append('analysis_types')
+    return codes
+
+
+def orchestrator_analyzer_imports() -> List[Tuple[str, str]]:
+    """
+    (module, class name) of every analyzer AnalysisOrchestrator imports
+
+    Read from the orchestrator's source so the list follows it, and so each
+    analyzer can be imported on its own: one broken module would otherwise
+    make the whole orchestrator, and every analyzer with it, unavailable.
+    """
+    tree = ast.parse(ORCHESTRATOR_SOURCE.read_text(encoding='utf-8'))
+    imports = []
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.level == 2 and (node.module or '').startswith('analysis_types.'):
+            imports.extend((node.module, alias.name) for alias in node.names)
+    return imports
+
+
+def load_orchestrator_analyzers() -> Dict[str, Dict[str, Any]]:
+    """Import each orchestrator analyzer class, recording the error for those that fail"""
+    package = (__package__ or '').rpartition('.')[0]
+    analyzers: Dict[str, Dict[str, Any]] = {}
+    for module, name in orchestrator_analyzer_imports():
+        try:
+            imported = importlib.import_module(f"{package}.{module}" if package else module)
+            analyzers[name] = {'status': 'ok', 'module': module, 'class': getattr(imported, name)}
+        except Exception as e:
+            analyzers[name] = {'status': 'import_error', 'module': module, 'error': f"{type(e).__name__}: {e}"}
+    return analyzers
+
+
+def orchestrator_analysis_types() -> Tuple[Optional[Dict[str, List[Dict[str, str]]]], Optional[str]]:
+    """
+    Analysis types AnalysisOrchestrator._determine_analyses runs with include_all, by analyzer class
+
+    Returns (types by analyzer class name, None), or (None, error) when the
+    orchestrator cannot be built.
+    """
+    try:
+        from .analysis_orchestrator import AnalysisOrchestrator, AnalysisConfiguration
+        orchestrator = AnalysisOrchestrator()
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+    try:
+        config = AnalysisConfiguration(analysis_types=[], analysis_categories=[], include_all=True)
+        by_analyzer: Dict[str, List[Dict[str, str]]] = {}
+        for category, analysis_type, analyzer in orchestrator._determine_analyses(config):
+            by_analyzer.setdefault(type(analyzer).__name__, []).append(
+                {'category': category, 'analysis_type': analysis_type}
+            )
+        return by_analyzer, None
+    finally:
+        orchestrator.shutdown(wait=False)
+
+
+def synthetic_statements(company_count: int, years: int = 1, seed: int = 0) -> List[FinancialStatements]:
+    """
+    Reproducible statements for `company_count` companies over `years` years
+    قوائم مالية اصطناعية قابلة لإعادة الإنتاج
+
+    Derived income statement lines are filled in so the analyzers take
+    their normal, non-degenerate branches.
+    """
+    statements = _synthetic_statements(company_count * years, seed)
+    current_year = datetime.now().year
+    for index, stmt in enumerate(statements):
+        stmt.year = current_year - years + 1 + index % years
+        stmt.gross_profit = stmt.revenue - stmt.cost_of_goods_sold
+        stmt.operating_income = stmt.gross_profit - stmt.operating_expenses
+        stmt.ebit = stmt.operating_income
+        stmt.ebitda = stmt.ebit + stmt.depreciation + stmt.amortization
+        stmt.total_liabilities = stmt.current_liabilities + stmt.long_term_debt
+    return statements
+
+
+def _measure(call: Callable[[], Any], operations: int, repeats: int) -> Dict[str, Any]:
+    """
+    Latency, throughput and allocation of `call`, which performs `operations` operations
+
+    Timing and allocation tracing run in separate passes so that tracemalloc
+    overhead does not distort the latency figures.
+    """
+    call()  # warm-up
+
+    per_operation = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        call()
+        per_operation.append((time.perf_counter() - start) / operations)
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.clear_traces()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    call()
+    after, peak = tracemalloc.get_traced_memory()
+    if not tracing:
+        tracemalloc.stop()
+
+    median = statistics.median(per_operation)
+    return {
+        'status': 'ok',
+        'operations': operations,
+        'repeats': repeats,
+        'mean_us': statistics.fmean(per_operation) * 1e6,
+        'median_us': median * 1e6,
+        'min_us': min(per_operation) * 1e6,
+        'stdev_us': statistics.stdev(per_operation) * 1e6 if repeats > 1 else 0.0,
+        'ops_per_second': 1.0 / median if median > 0 else float('inf'),
+        'peak_alloc_bytes': max(peak - before, 0),
+        'retained_bytes': max(after - before, 0)
+    }
+
+
+def benchmark_analyzers(
+    statements: Sequence[FinancialStatements],
+    repeats: int = 5,
+    analysis_types: Optional[Dict[str, List[Dict[str, str]]]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Benchmark each analyzer the orchestrator runs, one analyze() call per statement
+
+    Analyzers are shared by all the analysis types they serve, as in the
+    orchestrator, so each is timed once and lists its `analysis_types`.
+    Analyzers that fail to import are reported with status "import_error"
+    and the error; analyzers that raise while running, with "error".
+    """
+    registry = get_default_registry()
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, loaded in load_orchestrator_analyzers().items():
+        entry: Dict[str, Any] = {
+            'module': loaded['module'],
+            'analysis_types': (analysis_types or {}).get(name, [])
+        }
+        if loaded['status'] != 'ok':
+            entry.update(status=loaded['status'], error=loaded['error'])
+            results[name] = entry
+            logger.warning(f"{name} unavailable: {loaded['error']}")
+            continue
+
+        analyzer = registry.get_analyzer(loaded['class'])
+
+        def run_analyzer(analyzer=analyzer):
+            for stmt in statements:
+                analyzer.analyze(stmt, None)
+
+        try:
+            entry.update(_measure(run_analyzer, len(statements), repeats))
+            logger.debug(f"{name}: {entry['median_us']:.2f} us/op")
+        except Exception as e:
+            entry.update(status='error', error=f"{type(e).__name__}: {e}")
+        results[name] = entry
+    return results
+
+
+def benchmark_batch_engine(statements: Sequence[FinancialStatements], repeats: int = 5) -> Dict[str, Any]:
+    """End-to-end timing of BatchRatioEngine over the whole universe"""
+    engine = BatchRatioEngine()
+    entry = _measure(lambda: engine.evaluate_statements(statements), len(statements), repeats)
+    entry['ratio_count'] = len(engine.specs)
+    return entry
+
+
+def benchmark_registry(repeats: int = 5, constructions: int = 200) -> Dict[str, Dict[str, Any]]:
+    """
+    Construction and lookup latency of AnalysisRegistry
+
+    "construct" is the cost paid when a registry is created (definitions
+    load lazily), "load_all" the cost of building every definition, and the
+    lookup entries are measured on a fully loaded registry.
+    """
+    registry = AnalysisRegistry()
+    registry.get_total_count()
+    codes = registry.get_all_analysis_codes()
+    categories = list(AnalysisCategory)
+    subcategories = list(AnalysisSubcategory)
+
+    def construct():
+        for _ in range(constructions):
+            AnalysisRegistry()
+
+    def load_all():
+        for _ in range(constructions):
+            AnalysisRegistry().get_total_count()
+
+    def lookup_codes():
+        for code in codes:
+            registry.get_analysis(code)
+
+    def lookup_categories():
+        for category in categories:
+            registry.get_analyses_by_category(category)
+
+    def lookup_subcategories():
+        for subcategory in subcategories:
+            registry.get_analyses_by_subcategory(subcategory)
+
+    return {
+        'construct': _measure(construct, constructions, repeats),
+        'load_all': _measure(load_all, constructions, repeats),
+        'get_analysis': _measure(lookup_codes, max(len(codes), 1), repeats),
+        'get_analyses_by_category': _measure(lookup_categories, len(categories), repeats),
+        'get_analyses_by_subcategory': _measure(lookup_subcategories, len(subcategories), repeats)
+    }
+
+
+def _benchmark_request(history: List[FinancialStatements]) -> AnalysisRequest:
+    company_info = CompanyInfo(
+        name="Benchmark Co",
+        sector="Industrials",
+        activity="Manufacturing",
+        legal_entity="Joint Stock",
+        analysis_years=len(history)
+    )
+    return AnalysisRequest(
+        request_id="benchmark",
+        user_id="benchmark",
+        company_info=company_info,
+        financial_statements=history
+    )
+
+
+def benchmark_comprehensive_analysis(history: List[FinancialStatements], repeats: int = 3) -> Dict[str, Any]:
+    """
+    End-to-end timing of FinancialAnalysisEngine.perform_comprehensive_analysis
+
+    The report cache is cleared before every run so the cold path is measured.
+    """
+    try:
+        from .engine import FinancialAnalysisEngine
+        engine = FinancialAnalysisEngine()
+    except Exception as e:
+        return {'status': 'unavailable', 'error': f"{type(e).__name__}: {e}"}
+
+    request = _benchmark_request(history)
+    loop = asyncio.new_event_loop()
+
+    def run_engine():
+        engine.report_cache.clear()
+        return loop.run_until_complete(engine.perform_comprehensive_analysis(request))
+
+    try:
+        entry = _measure(run_engine, 1, repeats)
+    except Exception as e:
+        entry = {'status': 'error', 'error': f"{type(e).__name__}: {e}"}
+    finally:
+        loop.close()
+        engine.executor.shutdown(wait=False)
+    entry['years'] = len(history)
+    return entry
+
+
+def benchmark_orchestrator(history: List[FinancialStatements], repeats: int = 3) -> Dict[str, Any]:
+    """End-to-end timing of AnalysisOrchestrator running every analysis on the latest year"""
+    try:
+        from .analysis_orchestrator import AnalysisOrchestrator, AnalysisConfiguration
+        orchestrator = AnalysisOrchestrator()
+    except Exception as e:
+        return {'status': 'unavailable', 'error': f"{type(e).__name__}: {e}"}
+
+    company_info = _benchmark_request(history).company_info
+    config = AnalysisConfiguration(analysis_types=[], analysis_categories=[], include_all=True)
+    loop = asyncio.new_event_loop()
+
+    def run_orchestrator():
+        return loop.run_until_complete(
+            orchestrator.perform_comprehensive_analysis(history[-1], company_info, config)
+        )
+
+    try:
+        entry = _measure(run_orchestrator, 1, repeats)
+    except Exception as e:
+        entry = {'status': 'error', 'error': f"{type(e).__name__}: {e}"}
+    finally:
+        loop.close()
+        orchestrator.shutdown(wait=False)
+    return entry
+
+
+def run_benchmarks(
+    company_count: int = 1000,
+    years: int = 5,
+    repeats: int = 5,
+    end_to_end_repeats: int = 3,
+    seed: int = 0,
+    include_end_to_end: bool = True
+) -> Dict[str, Any]:
+    """
+    Run the full suite and return a JSON-serializable result document
+    تشغيل مجموعة القياس كاملة وإرجاع النتائج بصيغة JSON
+    """
+    statements = synthetic_statements(company_count, years, seed)
+    analysis_types, orchestrator_error = orchestrator_analysis_types()
+    analyzers = benchmark_analyzers(statements, repeats, analysis_types)
+
+    registry = benchmark_registry(repeats)
+    end_to_end = {'batch_ratio_engine': benchmark_batch_engine(statements, repeats)}
+    if include_end_to_end:
+        history = statements[:years]
+        end_to_end['perform_comprehensive_analysis'] = benchmark_comprehensive_analysis(history, end_to_end_repeats)
+        end_to_end['analysis_orchestrator'] = benchmark_orchestrator(history, end_to_end_repeats)
+
+    statuses = [entry['status'] for entry in analyzers.values()]
+    registered = collect_analysis_codes()
+    if analysis_types is None:
+        orchestrator = {'status': 'unavailable', 'error': orchestrator_error}
+    else:
+        run_types = {item['analysis_type'] for types in analysis_types.values() for item in types}
+        orchestrator = {
+            'status': 'ok',
+            'analysis_type_count': len(run_types),
+            'registered_codes_not_run': sorted(code for code in registered if code not in run_types)
+        }
+    return {
+        'format_version': BENCHMARK_FORMAT_VERSION,
+        'metadata': {
+            'created_at': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'company_count': company_count,
+            'years': years,
+            'statement_count': len(statements),
+            'repeats': repeats,
+            'seed': seed
+        },
+        'summary': {
+            'analyzer_count': len(analyzers),
+            'benchmarked': statuses.count('ok'),
+            'import_errors': statuses.count('import_error'),
+            'errors': statuses.count('error'),
+            'registered_code_count': len(registered)
+        },
+        'orchestrator': orchestrator,
+        'analyzers': analyzers,
+        'registry': registry,
+        'end_to_end': end_to_end
+    }
+
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = 0.10
+) -> Dict[str, Any]:
+    """
+    Compare two result documents metric by metric
+
+    A metric regresses when it grows by more than `threshold` (relative)
+    and improves when it shrinks by more than `threshold`. Entries that
+    were not measured in both runs are listed separately.
+    """
+    regressions, improvements, missing = [], [], []
+
+    if baseline.get('format_version') != current.get('format_version'):
+        logger.warning("Baseline and current runs use different result formats; older sections are not compared")
+
+    for section in ('analyzers', 'registry', 'end_to_end'):
+        base_entries = baseline.get(section, {})
+        current_entries = current.get(section, {})
+        for name, base in base_entries.items():
+            entry = current_entries.get(name)
+            if base.get('status') != 'ok':
+                continue
+            if entry is None or entry.get('status') != 'ok':
+                missing.append(f"{section}.{name}")
+                continue
+            for metric in COMPARED_METRICS:
+                before, after = base.get(metric), entry.get(metric)
+                if not before or after is None:
+                    continue
+                change = (after - before) / before
+                row = {'name': f"{section}.{name}", 'metric': metric,
+                       'baseline': before, 'current': after, 'change': change}
+                if change > threshold:
+                    regressions.append(row)
+                elif change < -threshold:
+                    improvements.append(row)
+
+    if baseline.get('metadata', {}).get('statement_count') != current.get('metadata', {}).get('statement_count'):
+        logger.warning("Baseline and current runs used different statement counts")
+
+    return {
+        'threshold': threshold,
+        'regressions': sorted(regressions, key=lambda row: -row['change']),
+        'improvements': sorted(improvements, key=lambda row: row['change']),
+        'missing': missing
+    }
+
+
+def _format_comparison(comparison: Dict[str, Any]) -> str:
+    lines = [f"Threshold: {comparison['threshold']:.0%}"]
+    for title in ('regressions', 'improvements'):
+        rows = comparison[title]
+        lines.append(f"{title.capitalize()}: {len(rows)}")
+        for row in rows:
+            lines.append(
+                f"  {row['name']} [{row['metric']}] "
+                f"{row['baseline']:.2f} -> {row['current']:.2f} ({row['change']:+.1%})"
+            )
+    if comparison['missing']:
+        lines.append(f"Missing from current run: {', '.join(comparison['missing'])}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the financial analysis types")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="Run the benchmark suite")
+    run_parser.add_argument('--companies', type=int, default=1000, help="Synthetic companies per year")
+    run_parser.add_argument('--years', type=int, default=5, help="Years of statements per company")
+    run_parser.add_argument('--repeats', type=int, default=5, help="Timed passes per analyzer")
+    run_parser.add_argument('--end-to-end-repeats', type=int, default=3, help="Timed passes per end-to-end run")
+    run_parser.add_argument('--seed', type=int, default=0, help="Random seed for the synthetic statements")
+    run_parser.add_argument('--skip-end-to-end', action='store_true', help="Only benchmark individual analyzers")
+    run_parser.add_argument('--output', help="Write results to this JSON file instead of stdout")
+
+    compare_parser = subparsers.add_parser('compare', help="Compare a run against a baseline")
+    compare_parser.add_argument('baseline', help="Baseline results JSON")
+    compare_parser.add_argument('current', help="Current results JSON")
+    compare_parser.add_argument('--threshold', type=float, default=0.10, help="Relative change treated as significant")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        results = run_benchmarks(
+            company_count=args.companies,
+            years=args.years,
+            repeats=args.repeats,
+            end_to_end_repeats=args.end_to_end_repeats,
+            seed=args.seed,
+            include_end_to_end=not args.skip_end_to_end
+        )
+        payload = json.dumps(results, indent=2, ensure_ascii=False)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(payload)
+        else:
+            print(payload)
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, encoding='utf-8') as f:
+        current = json.load(f)
+    comparison = compare_results(baseline, current, args.threshold)
+    print(_format_comparison(comparison))
+    return 1 if comparison['regressions'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -298,6 +298,65 @@ class ComprehensiveAnalysisReport:
     powerpoint_report_path: Optional[str] = None
 
 
+@dataclass
+class AnalysisStreamEvent:
+    """Incremental update emitted while a comprehensive analysis runs"""
+    event_type: str  # group_completed, group_failed, report
+    request_id: str
+    group: Optional[str] = None
+    results: List[AnalysisResult] = field(default_factory=list)
+    error: Optional[str] = None
+
+    # Progress
+    completed_groups: int = 0
+    total_groups: int = 0
+    elapsed_seconds: float = 0.0
+    from_cache: bool = False
+
+    # Set on the final "report" event
+    report: Optional[ComprehensiveAnalysisReport] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-safe summary suitable for websocket or server-sent-event updates"""
+        payload = {
+            "event_type": self.event_type,
+            "request_id": self.request_id,
+            "group": self.group,
+            "completed_groups": self.completed_groups,
+            "total_groups": self.total_groups,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "from_cache": self.from_cache,
+            "results": [
+                {
+                    "analysis_code": result.analysis_code,
+                    "analysis_name": result.analysis_name,
+                    "category": result.category.value,
+                    "subcategory": result.subcategory.value,
+                    "value": result.value,
+                    "unit": result.unit,
+                    "score": result.score,
+                    "rating": result.rating,
+                    "risk_level": result.risk_level
+                }
+                for result in self.results
+            ]
+        }
+        if self.error is not None:
+            payload["error"] = self.error
+        if self.report is not None:
+            payload["report"] = {
+                "overall_financial_health_score": self.report.overall_financial_health_score,
+                "liquidity_score": self.report.liquidity_score,
+                "profitability_score": self.report.profitability_score,
+                "efficiency_score": self.report.efficiency_score,
+                "leverage_score": self.report.leverage_score,
+                "market_score": self.report.market_score,
+                "analysis_count": len(self.report.analysis_results),
+                "generation_time": self.report.generation_time
+            }
+        return payload
+
+
 # Analysis type definitions as per the prompt requirements
 ANALYSIS_TYPES = {
     # Classical Foundational Analysis (106 analyses)
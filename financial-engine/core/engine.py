@@ -5,7 +5,8 @@ Performs all 180 types of financial analysis as specified in the prompt.
 
 import asyncio
 import logging
-from typing import List, Dict, Optional, Any
+import time
+from typing import List, Dict, Optional, Any, AsyncIterator, Awaitable, Tuple
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
@@ -16,13 +17,16 @@ from .data_models import (
     AnalysisRequest,
     AnalysisResult,
     ComprehensiveAnalysisReport,
+    AnalysisStreamEvent,
     CompanyInfo,
     BenchmarkData,
     AnalysisCategory,
     AnalysisSubcategory,
     Language
 )
-from .analysis_registry import AnalysisRegistry
+from .analysis_registry import AnalysisRegistry, get_default_registry
+from .batch_ratios import BatchRatioEngine
+from .report_cache import ReportCache
 from ..analysis_types.classical_foundational import (
     StructuralAnalysis,
     FinancialRatiosAnalysis,
@@ -53,9 +57,23 @@ class FinancialAnalysisEngine:
     Performs comprehensive financial analysis with 180 different analysis types.
     """
 
-    def __init__(self):
-        """Initialize the financial analysis engine"""
-        self.analysis_registry = AnalysisRegistry()
+    def __init__(
+        self,
+        report_cache: Optional[ReportCache] = None,
+        analysis_registry: Optional[AnalysisRegistry] = None
+    ):
+        """
+        Initialize the financial analysis engine
+
+        Args:
+            report_cache: Cache for analysis results; defaults to an
+                in-memory cache. Pass ReportCache(DiskCacheBackend(...))
+                to share results across processes.
+            analysis_registry: Analysis definitions and shared analyzers;
+                defaults to the process-wide registry.
+        """
+        self.analysis_registry = analysis_registry if analysis_registry is not None else get_default_registry()
+        self.report_cache = report_cache if report_cache is not None else ReportCache()
         self.executor = ThreadPoolExecutor(max_workers=8)
 
         # Initialize all analysis modules
@@ -74,6 +92,9 @@ class FinancialAnalysisEngine:
         self.detection_analysis = QuantitativeDetectionAnalysis()
         self.timeseries_analysis = TimeSeriesStatisticalAnalysis()
 
+        # Vectorized ratio engine for multi-company screening
+        self.batch_ratio_engine = BatchRatioEngine()
+
         logger.info("Financial Analysis Engine initialized successfully")
 
     async def perform_comprehensive_analysis(
@@ -91,7 +112,32 @@ class FinancialAnalysisEngine:
         Returns:
             ComprehensiveAnalysisReport: Complete analysis report
         """
+        report = None
+        async for event in self.stream_comprehensive_analysis(request, benchmark_data):
+            if event.event_type == "report":
+                report = event.report
+        return report
+
+    async def stream_comprehensive_analysis(
+        self,
+        request: AnalysisRequest,
+        benchmark_data: Optional[BenchmarkData] = None
+    ) -> AsyncIterator[AnalysisStreamEvent]:
+        """
+        Perform comprehensive financial analysis, yielding each analysis
+        group's results as soon as that group finishes
+
+        Yields one "group_completed" or "group_failed" event per analysis
+        group in completion order, then a final "report" event carrying the
+        ComprehensiveAnalysisReport. Closing the iterator early cancels the
+        groups that are still running.
+
+        Args:
+            request: Analysis request containing company data and preferences
+            benchmark_data: Industry benchmark and comparison data
+        """
         start_time = datetime.now()
+        started = time.perf_counter()
         logger.info(f"Starting comprehensive analysis for request {request.request_id}")
 
         try:
@@ -105,12 +151,66 @@ class FinancialAnalysisEngine:
                 benchmark_data
             )
 
-            # Step 3: Execute all analysis types in parallel
-            analysis_results = await self._execute_all_analyses(
-                prepared_data,
-                request.company_info,
-                benchmark_data
-            )
+            # Step 3: Execute all analysis types in parallel, unless the same
+            # filings were already analysed by this engine version
+            cache_key = self.report_cache.key_for(request, benchmark_data)
+            analysis_results = self.report_cache.get(cache_key)
+
+            if analysis_results is None:
+                groups = self._analysis_groups(prepared_data, request.company_info, benchmark_data)
+                total_groups = len(groups)
+                group_results: List[Optional[List[AnalysisResult]]] = [None] * total_groups
+                completed = 0
+
+                async for index, name, results, error in self._iter_analysis_groups(groups):
+                    completed += 1
+                    if error is not None:
+                        logger.error(f"Analysis group {name} failed: {str(error)}")
+                        yield AnalysisStreamEvent(
+                            event_type="group_failed",
+                            request_id=request.request_id,
+                            group=name,
+                            error=str(error),
+                            completed_groups=completed,
+                            total_groups=total_groups,
+                            elapsed_seconds=time.perf_counter() - started
+                        )
+                        continue
+
+                    group_results[index] = results
+                    yield AnalysisStreamEvent(
+                        event_type="group_completed",
+                        request_id=request.request_id,
+                        group=name,
+                        results=results,
+                        completed_groups=completed,
+                        total_groups=total_groups,
+                        elapsed_seconds=time.perf_counter() - started
+                    )
+
+                # Keep the report in group order regardless of completion order
+                analysis_results = [
+                    result for results in group_results if results for result in results
+                ]
+                logger.info(f"Completed {len(analysis_results)} analyses successfully")
+                # A failed group leaves the results incomplete; only cache full runs
+                if all(results is not None for results in group_results):
+                    self.report_cache.set(cache_key, analysis_results)
+                else:
+                    logger.warning(f"Not caching partial results for request {request.request_id}")
+            else:
+                logger.info(f"Reusing cached analysis results for request {request.request_id}")
+                total_groups = 1
+                yield AnalysisStreamEvent(
+                    event_type="group_completed",
+                    request_id=request.request_id,
+                    group="cached",
+                    results=analysis_results,
+                    completed_groups=1,
+                    total_groups=1,
+                    elapsed_seconds=time.perf_counter() - started,
+                    from_cache=True
+                )
 
             # Step 4: Generate comprehensive report
             report = await self._generate_comprehensive_report(
@@ -128,62 +228,93 @@ class FinancialAnalysisEngine:
                 f"in {report.generation_time:.2f} seconds"
             )
 
-            return report
+            yield AnalysisStreamEvent(
+                event_type="report",
+                request_id=request.request_id,
+                completed_groups=total_groups,
+                total_groups=total_groups,
+                elapsed_seconds=time.perf_counter() - started,
+                report=report
+            )
 
         except Exception as e:
             logger.error(f"Analysis failed for request {request.request_id}: {str(e)}")
             raise
 
-    async def _execute_all_analyses(
+    def perform_batch_ratio_analysis(
         self,
-        data: Dict[str, Any],
-        company_info: CompanyInfo,
-        benchmark_data: Optional[BenchmarkData]
-    ) -> List[AnalysisResult]:
-        """Execute all 180 analysis types in parallel"""
+        statements: List[FinancialStatements]
+    ) -> List[Dict[str, Optional[float]]]:
+        """
+        Evaluate liquidity, profitability, efficiency and leverage ratios
+        for many companies at once
 
-        logger.info("Executing all 180 financial analyses")
-        analysis_tasks = []
+        Args:
+            statements: One financial statement per company
 
-        # Classical Foundational Analysis (106 analyses)
-        analysis_tasks.extend([
-            self._run_structural_analyses(data, company_info, benchmark_data),
-            self._run_ratios_analyses(data, company_info, benchmark_data),
-            self._run_flow_analyses(data, company_info, benchmark_data)
-        ])
+        Returns:
+            List of ratio name -> value dicts, in the order of `statements`
+        """
+        logger.info(f"Running batch ratio analysis for {len(statements)} companies")
+        return self.batch_ratio_engine.evaluate_statements(statements)
 
+    # Analysis groups in report order: (group name, runner method)
+    ANALYSIS_GROUPS = [
+        # Classical Foundational Analysis (106 analyses)
+        ("structural", "_run_structural_analyses"),
+        ("ratios", "_run_ratios_analyses"),
+        ("flow", "_run_flow_analyses"),
         # Applied Intermediate Analysis (21 analyses)
-        analysis_tasks.extend([
-            self._run_comparison_analyses(data, company_info, benchmark_data),
-            self._run_valuation_analyses(data, company_info, benchmark_data),
-            self._run_performance_analyses(data, company_info, benchmark_data)
-        ])
-
+        ("comparison", "_run_comparison_analyses"),
+        ("valuation", "_run_valuation_analyses"),
+        ("performance", "_run_performance_analyses"),
         # Advanced Sophisticated Analysis (53 analyses)
-        analysis_tasks.extend([
-            self._run_modeling_analyses(data, company_info, benchmark_data),
-            self._run_statistical_analyses(data, company_info, benchmark_data),
-            self._run_prediction_analyses(data, company_info, benchmark_data),
-            self._run_risk_analyses(data, company_info, benchmark_data),
-            self._run_portfolio_analyses(data, company_info, benchmark_data),
-            self._run_merger_analyses(data, company_info, benchmark_data),
-            self._run_detection_analyses(data, company_info, benchmark_data),
-            self._run_timeseries_analyses(data, company_info, benchmark_data)
-        ])
-
-        # Execute all analyses in parallel
-        analysis_groups = await asyncio.gather(*analysis_tasks, return_exceptions=True)
+        ("modeling", "_run_modeling_analyses"),
+        ("statistical", "_run_statistical_analyses"),
+        ("prediction", "_run_prediction_analyses"),
+        ("risk", "_run_risk_analyses"),
+        ("portfolio", "_run_portfolio_analyses"),
+        ("merger", "_run_merger_analyses"),
+        ("detection", "_run_detection_analyses"),
+        ("timeseries", "_run_timeseries_analyses")
+    ]
+
+    def _analysis_groups(
+        self,
+        data: Dict[str, Any],
+        company_info: CompanyInfo,
+        benchmark_data: Optional[BenchmarkData]
+    ) -> List[Tuple[str, Awaitable[List[AnalysisResult]]]]:
+        """Coroutines for every analysis group, in report order"""
+        return [
+            (name, getattr(self, runner)(data, company_info, benchmark_data))
+            for name, runner in self.ANALYSIS_GROUPS
+        ]
 
-        # Flatten results and handle exceptions
-        all_results = []
-        for group in analysis_groups:
-            if isinstance(group, Exception):
-                logger.error(f"Analysis group failed: {str(group)}")
-                continue
-            all_results.extend(group)
+    async def _iter_analysis_groups(
+        self,
+        groups: List[Tuple[str, Awaitable[List[AnalysisResult]]]]
+    ) -> AsyncIterator[Tuple[int, str, Optional[List[AnalysisResult]], Optional[BaseException]]]:
+        """
+        Run analysis groups concurrently and yield (index, name, results, error)
+        for each group as it finishes
+        """
+        tasks = {
+            asyncio.ensure_future(coroutine): (index, name)
+            for index, (name, coroutine) in enumerate(groups)
+        }
+        pending = set(tasks)
 
-        logger.info(f"Completed {len(all_results)} analyses successfully")
-        return all_results
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index, name = tasks[task]
+                    error = task.exception()
+                    yield index, name, (None if error else task.result()), error
+        finally:
+            for task in pending:
+                task.cancel()
 
     async def _run_structural_analyses(
         self,
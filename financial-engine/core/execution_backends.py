@@ -0,0 +1,322 @@
+"""
+Execution Backends for the Analysis Orchestrator
+واجهات التنفيذ لمنسق التحليل المالي
+
+Pluggable strategies for running analyzers: a thread pool for I/O-bound or
+lightweight analyzers and a process pool for CPU-bound numpy/pandas work.
+Both pools are long-lived and both enforce the per-analysis timeout from
+AnalysisConfiguration.timeout_seconds.
+"""
+
+import asyncio
+import logging
+import signal
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .data_models import FinancialStatements, AnalysisResult
+
+
+logger = logging.getLogger(__name__)
+
+# (category, analysis_type, analyzer) as produced by AnalysisOrchestrator._determine_analyses
+AnalysisTask = Tuple[str, str, Any]
+
+
+class AnalysisTimeoutError(TimeoutError):
+    """Raised when a single analysis exceeds its configured timeout"""
+
+
+@dataclass
+class AnalysisOutcome:
+    """Result of one analysis as returned by an execution backend"""
+    category: str
+    analysis_type: str
+    result: Optional[AnalysisResult] = None
+    error: Optional[str] = None
+    duration_seconds: float = 0.0
+
+
+def _run_analysis(
+    analyzer: Any,
+    financial_statements: FinancialStatements,
+    comparison_data: Optional[Dict]
+) -> AnalysisResult:
+    """Run one analyzer, normalising its failure message"""
+    try:
+        return analyzer.analyze(financial_statements, comparison_data)
+    except AnalysisTimeoutError:
+        raise
+    except Exception as e:
+        raise Exception(f"Analysis failed: {str(e)}")
+
+
+def _call_with_deadline(func, timeout_seconds: Optional[float], *args) -> Any:
+    """
+    Call func(*args) and interrupt it with SIGALRM after timeout_seconds
+
+    Only available in the main thread of a POSIX process, which is where
+    process-pool workers run their tasks. Elsewhere the call runs unbounded
+    and the caller is responsible for the deadline.
+    """
+    if (
+        not timeout_seconds
+        or not hasattr(signal, 'SIGALRM')
+        or threading.current_thread() is not threading.main_thread()
+    ):
+        return func(*args)
+
+    def _on_timeout(signum, frame):
+        raise AnalysisTimeoutError(f"Analysis timed out after {timeout_seconds} seconds")
+
+    previous_handler = signal.signal(signal.SIGALRM, _on_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout_seconds)
+    try:
+        return func(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+
+def _run_analysis_chunk(
+    financial_statements: FinancialStatements,
+    comparison_data: Optional[Dict],
+    timeout_seconds: Optional[float],
+    tasks: List[AnalysisTask]
+) -> List[AnalysisOutcome]:
+    """
+    Worker entry point for the process backend
+
+    The statements arrive once per chunk and are reused for every analysis
+    in it; each analysis gets its own deadline.
+    """
+    outcomes = []
+    for category, analysis_type, analyzer in tasks:
+        start = time.perf_counter()
+        try:
+            result = _call_with_deadline(
+                _run_analysis, timeout_seconds, analyzer, financial_statements, comparison_data
+            )
+            outcomes.append(AnalysisOutcome(
+                category, analysis_type, result=result,
+                duration_seconds=time.perf_counter() - start
+            ))
+        except Exception as e:
+            outcomes.append(AnalysisOutcome(
+                category, analysis_type, error=str(e),
+                duration_seconds=time.perf_counter() - start
+            ))
+    return outcomes
+
+
+class ExecutionBackend:
+    """
+    Base class for analysis execution backends
+
+    Subclasses own a long-lived worker pool and implement `execute`, which
+    runs every task and returns one AnalysisOutcome per task.
+    """
+
+    name = "base"
+
+    def __init__(self, max_workers: int = 10):
+        self.max_workers = max_workers
+
+    async def execute(
+        self,
+        tasks: List[AnalysisTask],
+        financial_statements: FinancialStatements,
+        comparison_data: Optional[Dict],
+        timeout_seconds: Optional[float]
+    ) -> List[AnalysisOutcome]:
+        raise NotImplementedError
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Release the worker pool"""
+
+
+class ThreadExecutionBackend(ExecutionBackend):
+    """
+    Thread-pool backend
+
+    Suited to analyzers that release the GIL or spend their time waiting.
+    A thread cannot be interrupted, so on timeout the analysis is reported
+    as failed and its thread is left to finish in the background.
+    """
+
+    name = "thread"
+
+    def __init__(self, max_workers: int = 10):
+        super().__init__(max_workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="analysis"
+        )
+
+    async def execute(
+        self,
+        tasks: List[AnalysisTask],
+        financial_statements: FinancialStatements,
+        comparison_data: Optional[Dict],
+        timeout_seconds: Optional[float]
+    ) -> List[AnalysisOutcome]:
+        loop = asyncio.get_running_loop()
+        # Bound admission so a task's timeout starts when it gets a worker
+        slots = asyncio.Semaphore(self.max_workers)
+
+        async def run_one(category: str, analysis_type: str, analyzer: Any) -> AnalysisOutcome:
+            async with slots:
+                start = time.perf_counter()
+                future = loop.run_in_executor(
+                    self._executor, _run_analysis, analyzer, financial_statements, comparison_data
+                )
+                try:
+                    result = await asyncio.wait_for(future, timeout=timeout_seconds or None)
+                    return AnalysisOutcome(
+                        category, analysis_type, result=result,
+                        duration_seconds=time.perf_counter() - start
+                    )
+                except asyncio.TimeoutError:
+                    error = f"Analysis timed out after {timeout_seconds} seconds"
+                except Exception as e:
+                    error = str(e)
+                return AnalysisOutcome(
+                    category, analysis_type, error=error,
+                    duration_seconds=time.perf_counter() - start
+                )
+
+        return list(await asyncio.gather(*[
+            run_one(category, analysis_type, analyzer)
+            for category, analysis_type, analyzer in tasks
+        ]))
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+class ProcessExecutionBackend(ExecutionBackend):
+    """
+    Process-pool backend for CPU-bound analyzers
+
+    Tasks are split into one chunk per worker so the statements are pickled
+    once per worker per request rather than once per analysis. Workers
+    enforce the per-analysis timeout themselves; if a worker stops
+    responding altogether the chunk is failed and the pool is recycled.
+    Chunks that were still running on a pool recycled for a hung worker
+    are retried once on the new pool rather than reported as crashed.
+    Outcomes are returned in task order.
+    """
+
+    name = "process"
+
+    # Extra time allowed on top of the summed per-analysis timeouts of a chunk
+    # before the parent gives up on the worker
+    chunk_grace_seconds = 5.0
+
+    def __init__(self, max_workers: int = 10):
+        super().__init__(max_workers)
+        self._lock = threading.Lock()
+        self._executor = ProcessPoolExecutor(max_workers=max_workers)
+        # Pools shut down because a chunk hung; their other chunks were healthy
+        self._hung_pools = weakref.WeakSet()
+
+    def _chunk(self, tasks: List[AnalysisTask]) -> List[List[int]]:
+        """Deal task indices round-robin so heavy categories spread across workers"""
+        chunk_count = max(1, min(self.max_workers, len(tasks)))
+        chunks = [list(range(i, len(tasks), chunk_count)) for i in range(chunk_count)]
+        return [chunk for chunk in chunks if chunk]
+
+    def _recycle_pool(self, executor: ProcessPoolExecutor) -> None:
+        """Replace a pool with a hung or crashed worker, once per pool"""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+        # A worker stuck in native code ignores SIGALRM; terminate it explicitly
+        for process in list((getattr(executor, '_processes', None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+        logger.warning("Process pool recycled after an unresponsive or crashed worker")
+
+    async def execute(
+        self,
+        tasks: List[AnalysisTask],
+        financial_statements: FinancialStatements,
+        comparison_data: Optional[Dict],
+        timeout_seconds: Optional[float]
+    ) -> List[AnalysisOutcome]:
+        loop = asyncio.get_running_loop()
+
+        async def run_chunk(chunk: List[AnalysisTask], retry: bool = True) -> List[AnalysisOutcome]:
+            executor = self._executor
+            future = loop.run_in_executor(
+                executor, _run_analysis_chunk,
+                financial_statements, comparison_data, timeout_seconds, chunk
+            )
+            deadline = (
+                timeout_seconds * len(chunk) + self.chunk_grace_seconds
+                if timeout_seconds else None
+            )
+            try:
+                return await asyncio.wait_for(future, timeout=deadline)
+            except asyncio.TimeoutError:
+                error = f"Analysis worker did not respond within {deadline} seconds"
+                self._hung_pools.add(executor)
+                self._recycle_pool(executor)
+            except (BrokenProcessPool, asyncio.CancelledError) as e:
+                current = asyncio.current_task()
+                if isinstance(e, asyncio.CancelledError) and (
+                    not future.cancelled() or (current is not None and current.cancelling())
+                ):
+                    raise
+                if retry and executor in self._hung_pools:
+                    # The pool was recycled under this chunk because another one hung
+                    return await run_chunk(chunk, retry=False)
+                # A crash breaks every chunk on the pool and the culprit cannot be told apart
+                error = f"Analysis worker crashed: {str(e) or 'process pool shut down'}"
+                self._recycle_pool(executor)
+            except Exception as e:
+                error = str(e)
+            return [
+                AnalysisOutcome(category, analysis_type, error=error)
+                for category, analysis_type, _ in chunk
+            ]
+
+        index_chunks = self._chunk(tasks)
+        chunk_outcomes = await asyncio.gather(*[
+            run_chunk([tasks[index] for index in indices]) for indices in index_chunks
+        ])
+
+        # Chunks are dealt round-robin; put outcomes back in task order
+        outcomes: List[Optional[AnalysisOutcome]] = [None] * len(tasks)
+        for indices, chunk_result in zip(index_chunks, chunk_outcomes):
+            for index, outcome in zip(indices, chunk_result):
+                outcomes[index] = outcome
+        return outcomes
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            self._executor.shutdown(wait=wait)
+
+
+EXECUTION_BACKENDS = {
+    ThreadExecutionBackend.name: ThreadExecutionBackend,
+    ProcessExecutionBackend.name: ProcessExecutionBackend
+}
+
+
+def create_execution_backend(name: str, max_workers: int = 10) -> ExecutionBackend:
+    """Create an execution backend by name ('thread' or 'process')"""
+    try:
+        backend_class = EXECUTION_BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown execution backend: {name}. "
+            f"Available: {', '.join(sorted(EXECUTION_BACKENDS))}"
+        )
+    return backend_class(max_workers=max_workers)
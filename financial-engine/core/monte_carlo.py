@@ -0,0 +1,194 @@
+"""
+Monte Carlo Simulation Engine
+محرك محاكاة مونت كارلو
+
+Vectorized random draws and streaming summary statistics shared by the
+forecasting agent and the risk analysis VaR calculation. Draws come from
+a seeded numpy Generator so runs are reproducible, are produced in
+fixed-size chunks so memory stays bounded for very large path counts,
+can be antithetic (each draw paired with its mirror image) and can be
+correlated across assets through a covariance matrix.
+"""
+
+import logging
+import math
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 100_000
+DEFAULT_MAX_QUANTILE_SAMPLES = 1_000_000
+
+
+def _cholesky(covariance: np.ndarray) -> np.ndarray:
+    """Lower-triangular factor of a covariance matrix, tolerating semi-definite input"""
+    try:
+        return np.linalg.cholesky(covariance)
+    except np.linalg.LinAlgError:
+        # Positive semi-definite (e.g. perfectly correlated assets): use the
+        # symmetric eigen decomposition with negative round-off clipped
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+        return eigenvectors * np.sqrt(np.clip(eigenvalues, 0.0, None))
+
+
+class MonteCarloEngine:
+    """
+    Seeded, chunked generator of simulation draws
+    مولد سحوبات محاكاة قابل لإعادة الإنتاج
+
+    The same seed and chunk size always yield the same sequence of draws.
+    Each draw method is a generator of chunks with at most `chunk_size`
+    paths, so callers can reduce results chunk by chunk.
+    """
+
+    def __init__(
+        self,
+        seed: Optional[Union[int, np.random.SeedSequence]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        antithetic: bool = False
+    ):
+        if chunk_size < 2:
+            raise ValueError("chunk_size must be at least 2")
+        self.seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.chunk_size = chunk_size
+        self.antithetic = antithetic
+        self._rng = np.random.default_rng(self.seed_sequence)
+
+    def spawn(self, count: int) -> List['MonteCarloEngine']:
+        """Independent child engines, e.g. one per worker"""
+        return [
+            MonteCarloEngine(child, self.chunk_size, self.antithetic)
+            for child in self.seed_sequence.spawn(count)
+        ]
+
+    def _chunk_sizes(self, num_paths: int) -> Iterator[int]:
+        remaining = num_paths
+        while remaining > 0:
+            size = min(self.chunk_size, remaining)
+            yield size
+            remaining -= size
+
+    def _standard_normal(self, size: int, dimensions: Tuple[int, ...] = ()) -> np.ndarray:
+        if not self.antithetic:
+            return self._rng.standard_normal((size,) + dimensions)
+        half = self._rng.standard_normal(((size + 1) // 2,) + dimensions)
+        return np.concatenate((half, -half))[:size]
+
+    def normal_draws(self, num_paths: int, mean: float = 0.0, std: float = 1.0) -> Iterator[np.ndarray]:
+        """Chunks of independent normal draws"""
+        for size in self._chunk_sizes(num_paths):
+            yield mean + std * self._standard_normal(size)
+
+    def correlated_draws(
+        self,
+        num_paths: int,
+        mean: Sequence[float],
+        covariance: Sequence[Sequence[float]]
+    ) -> Iterator[np.ndarray]:
+        """Chunks of multivariate normal draws with shape (paths, assets)"""
+        mean_vector = np.asarray(mean, dtype=float)
+        factor = _cholesky(np.asarray(covariance, dtype=float))
+        if factor.shape != (len(mean_vector), len(mean_vector)):
+            raise ValueError("covariance must be a square matrix matching the mean vector")
+        for size in self._chunk_sizes(num_paths):
+            yield mean_vector + self._standard_normal(size, (len(mean_vector),)) @ factor.T
+
+    def portfolio_returns(
+        self,
+        num_paths: int,
+        weights: Sequence[float],
+        mean: Sequence[float],
+        covariance: Sequence[Sequence[float]]
+    ) -> Iterator[np.ndarray]:
+        """Chunks of simulated portfolio returns for correlated asset returns"""
+        weight_vector = np.asarray(weights, dtype=float)
+        for draws in self.correlated_draws(num_paths, mean, covariance):
+            yield draws @ weight_vector
+
+    def simulate(
+        self,
+        num_paths: int,
+        mean: float = 0.0,
+        std: float = 1.0,
+        transform: Optional[Callable[[np.ndarray], np.ndarray]] = None
+    ) -> np.ndarray:
+        """All draws (optionally transformed) as one array; for moderate path counts"""
+        chunks = self.normal_draws(num_paths, mean, std)
+        if transform is not None:
+            chunks = (transform(chunk) for chunk in chunks)
+        return np.concatenate(list(chunks)) if num_paths > 0 else np.empty(0)
+
+
+def summarize_paths(
+    chunks: Iterable[np.ndarray],
+    num_paths: int,
+    percentiles: Sequence[float] = (),
+    thresholds: Optional[Dict[str, Tuple[str, float]]] = None,
+    max_quantile_samples: int = DEFAULT_MAX_QUANTILE_SAMPLES
+) -> Dict[str, object]:
+    """
+    Reduce simulated values chunk by chunk
+    تلخيص القيم المحاكاة جزءاً بجزء
+
+    Mean, sample standard deviation, extremes and threshold probabilities
+    are exact. Percentiles (and the median) are exact when `num_paths` is
+    at most `max_quantile_samples`; otherwise they are computed from an
+    evenly strided subsample of that size and `exact_percentiles` is False.
+
+    `thresholds` maps a name to ('above' | 'below', value); the result
+    holds the share of paths strictly above or below each value.
+    """
+    thresholds = thresholds or {}
+    stride = max(1, math.ceil(num_paths / max_quantile_samples))
+
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    minimum = math.inf
+    maximum = -math.inf
+    hits = {name: 0 for name in thresholds}
+    kept: List[np.ndarray] = []
+    offset = 0
+
+    for chunk in chunks:
+        chunk = np.asarray(chunk, dtype=float)
+        size = chunk.size
+        if size == 0:
+            continue
+
+        # Chan et al. parallel update of mean and sum of squared deviations
+        chunk_mean = float(chunk.mean())
+        chunk_m2 = float(((chunk - chunk_mean) ** 2).sum())
+        delta = chunk_mean - mean
+        total = count + size
+        mean += delta * size / total
+        m2 += chunk_m2 + delta * delta * count * size / total
+        count = total
+
+        minimum = min(minimum, float(chunk.min()))
+        maximum = max(maximum, float(chunk.max()))
+        for name, (direction, value) in thresholds.items():
+            hits[name] += int(np.count_nonzero(chunk > value if direction == 'above' else chunk < value))
+
+        # Copy so the strided view does not keep the whole chunk alive
+        kept.append(chunk[(-offset) % stride::stride].copy())
+        offset += size
+
+    if count == 0:
+        raise ValueError("No simulated paths to summarize")
+
+    sample = np.concatenate(kept)
+    return {
+        'count': count,
+        'mean': mean,
+        'median': float(np.median(sample)),
+        'std_dev': math.sqrt(m2 / (count - 1)) if count > 1 else 0.0,
+        'min_value': minimum,
+        'max_value': maximum,
+        'percentiles': {p: float(v) for p, v in zip(percentiles, np.percentile(sample, list(percentiles)))} if percentiles else {},
+        'probabilities': {name: hits[name] / count for name in thresholds},
+        'exact_percentiles': stride == 1
+    }
@@ -0,0 +1,307 @@
+"""
+Report Cache for the Financial Analysis Engine
+ذاكرة التخزين المؤقت لنتائج التحليل
+
+Content-addressed cache for the analysis results behind
+FinancialAnalysisEngine.perform_comprehensive_analysis. Entries are keyed
+by a canonical hash of the input statements, the company details and report
+language, the requested analysis set, the benchmark data and the engine
+version, so resubmitting the same filings (for example to export another
+format or template) skips recomputing every analysis group.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, is_dataclass
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from . import __version__ as ENGINE_VERSION
+from .data_models import AnalysisResult, AnalysisRequest, BenchmarkData
+
+
+logger = logging.getLogger(__name__)
+
+
+def _canonical(value: Any) -> Any:
+    """Convert a value into a JSON-serialisable form with a stable layout"""
+    if is_dataclass(value) and not isinstance(value, type):
+        return _canonical(asdict(value))
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, float):
+        # repr round-trips exactly; normalise -0.0 so it matches 0.0
+        return repr(value + 0.0)
+    return value
+
+
+def compute_cache_key(
+    request: AnalysisRequest,
+    benchmark_data: Optional[BenchmarkData] = None,
+    engine_version: str = ENGINE_VERSION
+) -> str:
+    """
+    Compute the content address of an analysis request
+
+    Only inputs that change the cached results take part in the key:
+    statements, budget statements, company details, the selected analyses,
+    benchmark data and the engine version. The language is included too,
+    since results carry translated interpretations and recommendations.
+    Request ids and export options are not, so re-exporting the same
+    analysis in another format hits the cache.
+    """
+    payload = {
+        'engine_version': engine_version,
+        'company_info': _canonical(request.company_info),
+        'language': _canonical(request.language),
+        'financial_statements': _canonical(request.financial_statements),
+        'budget_statements': _canonical(request.budget_statements or []),
+        'selected_analyses': sorted(request.selected_analyses) if request.selected_analyses else None,
+        'benchmark_data': _canonical(benchmark_data)
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class CacheBackend:
+    """
+    Storage backend interface for the report cache
+
+    Backends store opaque bytes and are responsible for their own size
+    bound; `get` returns None on a miss.
+    """
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def size_bytes(self) -> int:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU backend bounded by entry count and total bytes"""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._entries: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = value
+            self._size += len(value)
+
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            value = self._entries.pop(key, None)
+            if value is not None:
+                self._size -= len(value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def size_bytes(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCacheBackend(CacheBackend):
+    """
+    On-disk backend, one file per entry, bounded by total bytes
+
+    Reads refresh the file's modification time, so eviction removes the
+    least recently used entries first. Writes go through a temporary file
+    and an atomic rename so concurrent readers never see partial entries.
+    """
+
+    suffix = '.cache'
+
+    def __init__(self, directory: str, max_bytes: int = 1024 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.suffix)
+
+    def _entries(self) -> List[os.DirEntry]:
+        with os.scandir(self.directory) as entries:
+            return [e for e in entries if e.is_file() and e.name.endswith(self.suffix)]
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = f.read()
+            os.utime(path)
+            return value
+        except FileNotFoundError:
+            return None
+
+    def set(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(value)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = []
+            for entry in self._entries():
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                    self.evictions += 1
+                except FileNotFoundError:
+                    pass
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        for entry in self._entries():
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def size_bytes(self) -> int:
+        total = 0
+        for entry in self._entries():
+            try:
+                total += entry.stat().st_size
+            except FileNotFoundError:
+                pass
+        return total
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+
+class ReportCache:
+    """
+    Content-addressed cache of comprehensive analysis results
+    ذاكرة مؤقتة لنتائج التحليل الشامل معنونة بالمحتوى
+    """
+
+    def __init__(self, backend: Optional[CacheBackend] = None, engine_version: str = ENGINE_VERSION):
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.engine_version = engine_version
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def key_for(self, request: AnalysisRequest, benchmark_data: Optional[BenchmarkData] = None) -> str:
+        return compute_cache_key(request, benchmark_data, self.engine_version)
+
+    def get(self, key: str) -> Optional[List[AnalysisResult]]:
+        """Return cached analysis results for the key, or None on a miss"""
+        try:
+            payload = self.backend.get(key)
+            results = pickle.loads(payload) if payload is not None else None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {key}: {str(e)}")
+            self.backend.delete(key)
+            results = None
+
+        with self._lock:
+            if results is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return results
+
+    def set(self, key: str, results: List[AnalysisResult]) -> None:
+        """Store analysis results under the key"""
+        try:
+            self.backend.set(key, pickle.dumps(results, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception as e:
+            logger.warning(f"Failed to cache analysis results {key}: {str(e)}")
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and backend occupancy"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self.backend),
+            'size_bytes': self.backend.size_bytes(),
+            'evictions': getattr(self.backend, 'evictions', 0),
+            'backend': type(self.backend).__name__
+        }
@@ -0,0 +1,153 @@
+"""
+Tests for the lazily loaded analysis registry
+اختبارات سجل التحليلات ذي التحميل الكسول
+
+The registry must build only the definitions and analyzers a lookup
+needs, and every lookup must return exactly what a fully loaded registry
+returns.
+
+python -m pytest test_analysis_registry.py
+"""
+
+import importlib.util
+import os
+import sys
+import types
+
+import pytest
+
+ENGINE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Private name so the ai-agents `core` package can be imported in the same run
+CORE_PACKAGE = '_financial_engine_core'
+
+
+def _load_core_module(name):
+    """Import one core module without running core/__init__ and its engine imports"""
+    if CORE_PACKAGE not in sys.modules:
+        package = types.ModuleType(CORE_PACKAGE)
+        package.__path__ = [os.path.join(ENGINE_DIR, 'core')]
+        sys.modules[CORE_PACKAGE] = package
+    qualified = f'{CORE_PACKAGE}.{name}'
+    if qualified not in sys.modules:
+        spec = importlib.util.spec_from_file_location(qualified, os.path.join(ENGINE_DIR, 'core', f'{name}.py'))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[qualified] = module
+        spec.loader.exec_module(module)
+    return sys.modules[qualified]
+
+
+data_models = _load_core_module('data_models')
+analysis_registry = _load_core_module('analysis_registry')
+
+AnalysisRegistry = analysis_registry.AnalysisRegistry
+AnalysisCategory = data_models.AnalysisCategory
+AnalysisSubcategory = data_models.AnalysisSubcategory
+
+
+class RecordingRegistry(AnalysisRegistry):
+    """Registry that records which registration methods ran"""
+
+    def __init__(self):
+        super().__init__()
+        self.loaded_methods = []
+
+    def _load(self, method_name):
+        if method_name not in self._loaded:
+            self.loaded_methods.append(method_name)
+        super()._load(method_name)
+
+
+def eager_registry():
+    registry = AnalysisRegistry()
+    registry._initialize_all_analyses()
+    return registry
+
+
+def codes(definitions):
+    return [definition.code for definition in definitions]
+
+
+def test_construction_loads_nothing():
+    registry = RecordingRegistry()
+
+    assert registry.loaded_methods == []
+    assert not registry.fully_loaded
+
+
+@pytest.mark.parametrize('category, subcategory, method_name', AnalysisRegistry.LOADERS)
+def test_subcategory_lookup_loads_only_its_loader(category, subcategory, method_name):
+    registry = RecordingRegistry()
+
+    registry.get_analyses_by_subcategory(subcategory)
+
+    assert registry.loaded_methods == [method_name]
+
+
+@pytest.mark.parametrize('category', list(AnalysisCategory))
+def test_category_lookup_loads_only_its_loaders(category):
+    registry = RecordingRegistry()
+
+    registry.get_analyses_by_category(category)
+
+    expected = [method for loader_category, _, method in AnalysisRegistry.LOADERS if loader_category == category]
+    assert registry.loaded_methods == expected
+
+
+def test_code_lookup_stops_at_the_subcategory_that_defines_it():
+    eager = eager_registry()
+    first_method = AnalysisRegistry.LOADERS[0][2]
+    code = codes(eager.get_analyses_by_subcategory(AnalysisRegistry.LOADERS[0][1]))[0]
+    registry = RecordingRegistry()
+
+    assert registry.get_analysis(code) == eager.get_analysis(code)
+    assert registry.loaded_methods == [first_method]
+
+
+def test_unknown_code_loads_everything_once():
+    registry = RecordingRegistry()
+
+    assert registry.get_analysis('does_not_exist') is None
+    assert registry.get_analysis('does_not_exist') is None
+    assert registry.loaded_methods == [method for _, _, method in AnalysisRegistry.LOADERS]
+
+
+def test_get_analyzer_builds_only_the_requested_analyzer_once():
+    built = []
+
+    class UsedAnalyzer:
+        def __init__(self):
+            built.append('used')
+
+    class UnusedAnalyzer:
+        def __init__(self):
+            built.append('unused')
+
+    registry = RecordingRegistry()
+    first = registry.get_analyzer(UsedAnalyzer)
+    second = registry.get_analyzer(UsedAnalyzer)
+
+    assert first is second
+    assert built == ['used']
+    assert registry.loaded_methods == []
+
+
+def test_lazy_lookups_match_eager_listing():
+    eager = eager_registry()
+
+    # Query in reverse load order so indexes fill out of order
+    lazy = AnalysisRegistry()
+    for _, subcategory, _ in reversed(AnalysisRegistry.LOADERS):
+        assert codes(lazy.get_analyses_by_subcategory(subcategory)) == \
+            codes(eager.get_analyses_by_subcategory(subcategory))
+    for category in AnalysisCategory:
+        assert codes(lazy.get_analyses_by_category(category)) == codes(eager.get_analyses_by_category(category))
+
+    assert lazy.get_all_analysis_codes() == eager.get_all_analysis_codes()
+    assert lazy.get_count_by_category() == eager.get_count_by_category()
+    assert lazy.get_total_count() == eager.get_total_count()
+    for code in eager.get_all_analysis_codes():
+        assert AnalysisRegistry().get_analysis(code) == eager.get_analysis(code)
+
+
+def test_default_registry_is_shared():
+    assert analysis_registry.get_default_registry() is analysis_registry.get_default_registry()
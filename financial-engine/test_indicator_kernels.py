@@ -0,0 +1,230 @@
+"""
+Property tests for the vectorized technical indicator kernels
+اختبارات خصائص نوى المؤشرات الفنية
+
+Each kernel is compared with the element-by-element loops that
+AdvancedMarketAnalysis used before vectorization, over random price
+series and periods, including flat and monotone stretches. 2-D inputs
+must match the 1-D result of every column.
+
+python -m pytest test_indicator_kernels.py
+"""
+
+import importlib.util
+import os
+
+import numpy as np
+import pytest
+
+ENGINE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Load the module on its own; the analysis_types package imports every analyzer
+_spec = importlib.util.spec_from_file_location(
+    'indicator_kernels', os.path.join(ENGINE_DIR, 'analysis_types', 'indicator_kernels.py')
+)
+indicator_kernels = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(indicator_kernels)
+
+SEEDS = range(40)
+RTOL = 1e-9
+ATOL = 1e-9
+
+
+# Reference implementations, as previously written in AdvancedMarketAnalysis
+
+def reference_ema(data, period):
+    alpha = 2 / (period + 1)
+    ema = [data[0]]
+    for price in data[1:]:
+        ema.append(alpha * price + (1 - alpha) * ema[-1])
+    return np.array(ema)
+
+
+def reference_sma(data, period):
+    return np.convolve(data, np.ones(period) / period, mode='valid')
+
+
+def reference_rolling_std(data, period):
+    return np.array([
+        np.std(data[i - period + 1:i + 1], ddof=1)
+        for i in range(period - 1, len(data))
+    ])
+
+
+def reference_rsi(prices, period):
+    deltas = np.diff(prices)
+    gains = np.where(deltas > 0, deltas, 0)
+    losses = np.where(deltas < 0, -deltas, 0)
+
+    avg_gain = np.mean(gains[:period])
+    avg_loss = np.mean(losses[:period])
+
+    rsi_values = []
+    for i in range(period, len(deltas)):
+        if avg_loss != 0:
+            rs = avg_gain / avg_loss
+            rsi = 100 - (100 / (1 + rs))
+        else:
+            rsi = 100
+        rsi_values.append(rsi)
+
+        if i < len(deltas) - 1:
+            avg_gain = ((avg_gain * (period - 1)) + gains[i]) / period
+            avg_loss = ((avg_loss * (period - 1)) + losses[i]) / period
+    return np.array(rsi_values)
+
+
+def reference_wilder(values, period):
+    smoothed = [np.mean(values[:period])]
+    for value in values[period:]:
+        smoothed.append((smoothed[-1] * (period - 1) + value) / period)
+    return np.array(smoothed)
+
+
+def random_prices(rng, length):
+    """Random walk with occasional flat and monotone stretches"""
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, length)))
+    for _ in range(rng.integers(0, 3)):
+        start = rng.integers(0, length)
+        stop = min(length, start + rng.integers(2, 30))
+        if rng.random() < 0.5:
+            prices[start:stop] = prices[start]
+        else:
+            prices[start:stop] = prices[start] + np.arange(stop - start) * rng.choice([-0.5, 0.5])
+    return prices
+
+
+def random_case(seed, min_length=1):
+    rng = np.random.default_rng(seed)
+    period = int(rng.integers(2, 60))
+    length = int(rng.integers(max(period, min_length), 600))
+    return rng, random_prices(rng, length), period
+
+
+def assert_close(actual, expected):
+    np.testing.assert_allclose(actual, expected, rtol=RTOL, atol=ATOL)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_ema_matches_reference(seed):
+    _, prices, period = random_case(seed)
+    assert_close(indicator_kernels.ema(prices, period), reference_ema(prices, period))
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_sma_matches_reference(seed):
+    _, prices, period = random_case(seed)
+    assert_close(indicator_kernels.sma(prices, period), reference_sma(prices, period))
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_rolling_std_matches_reference(seed):
+    _, prices, period = random_case(seed)
+    assert_close(indicator_kernels.rolling_std(prices, period), reference_rolling_std(prices, period))
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_rolling_std_is_chunk_independent(seed):
+    rng, prices, period = random_case(seed)
+    chunk_rows = int(rng.integers(1, 50))
+    assert_close(
+        indicator_kernels.rolling_std(prices, period, chunk_rows=chunk_rows),
+        indicator_kernels.rolling_std(prices, period)
+    )
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_wilder_smooth_matches_reference(seed):
+    rng, _, period = random_case(seed)
+    values = np.abs(rng.normal(0, 1, int(rng.integers(period, 600))))
+    assert_close(indicator_kernels.wilder_smooth(values, period), reference_wilder(values, period))
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_rsi_matches_reference(seed):
+    rng = np.random.default_rng(seed)
+    period = int(rng.integers(2, 40))
+    prices = random_prices(rng, int(rng.integers(period + 2, 600)))
+    assert_close(indicator_kernels.rsi(prices, period), reference_rsi(prices, period))
+
+
+def test_rsi_without_losses_scores_100():
+    prices = np.arange(1.0, 40.0)
+    assert np.all(indicator_kernels.rsi(prices, 14) == 100.0)
+    assert_close(indicator_kernels.rsi(prices, 14), reference_rsi(prices, 14))
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_macd_matches_reference(seed):
+    rng = np.random.default_rng(seed)
+    fast = int(rng.integers(2, 20))
+    slow = int(rng.integers(fast + 1, 60))
+    signal = int(rng.integers(2, 20))
+    prices = random_prices(rng, int(rng.integers(slow, 600)))
+
+    macd_line = reference_ema(prices, fast) - reference_ema(prices, slow)
+    signal_line = reference_ema(macd_line, signal)
+    actual = indicator_kernels.macd(prices, fast, slow, signal)
+
+    assert_close(actual[0], macd_line)
+    assert_close(actual[1], signal_line)
+    assert_close(actual[2], macd_line - signal_line)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_bollinger_bands_match_reference(seed):
+    rng, prices, period = random_case(seed)
+    std_dev = float(rng.uniform(1, 3))
+
+    sma = reference_sma(prices, period)
+    deviation = reference_rolling_std(prices, period)
+    middle, upper, lower = indicator_kernels.bollinger_bands(prices, period, std_dev)
+
+    assert_close(middle, sma)
+    assert_close(upper, sma + std_dev * deviation)
+    assert_close(lower, sma - std_dev * deviation)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('kernel', ['ema', 'sma', 'rolling_std', 'wilder_smooth', 'rsi'])
+def test_2d_input_matches_each_column(seed, kernel):
+    rng = np.random.default_rng(seed)
+    period = int(rng.integers(2, 40))
+    length = int(rng.integers(period + 2, 400))
+    symbols = int(rng.integers(1, 8))
+    prices = np.column_stack([random_prices(rng, length) for _ in range(symbols)])
+
+    function = getattr(indicator_kernels, kernel)
+    result = function(prices, period)
+
+    assert result.ndim == 2 and result.shape[1] == symbols
+    for column in range(symbols):
+        assert_close(result[:, column], function(prices[:, column], period))
+
+
+@pytest.mark.parametrize('seed', SEEDS[:10])
+def test_2d_macd_and_bands_match_each_column(seed):
+    rng = np.random.default_rng(seed)
+    prices = np.column_stack([random_prices(rng, 300) for _ in range(4)])
+
+    for combined, single in [
+        (indicator_kernels.macd(prices), lambda column: indicator_kernels.macd(prices[:, column])),
+        (indicator_kernels.bollinger_bands(prices), lambda column: indicator_kernels.bollinger_bands(prices[:, column]))
+    ]:
+        for column in range(prices.shape[1]):
+            for combined_part, single_part in zip(combined, single(column)):
+                assert_close(combined_part[:, column], single_part)
+
+
+def test_rejects_higher_dimensional_input():
+    with pytest.raises(ValueError):
+        indicator_kernels.ema(np.zeros((3, 3, 3)), 2)
+    with pytest.raises(ValueError):
+        indicator_kernels.rolling_std(np.zeros((3, 3, 3)), 2)
+
+
+def test_short_series_errors():
+    with pytest.raises(ValueError):
+        indicator_kernels.wilder_smooth(np.ones(3), 5)
+    with pytest.raises(ValueError):
+        indicator_kernels.rsi(np.ones(10), 14)
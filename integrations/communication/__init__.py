@@ -56,6 +56,12 @@ from .websocket_service import (
     create_notification_message
 )
 
+from .update_coalescer import (
+    UpdateCoalescer,
+    apply_merge_patch,
+    diff_merge_patch
+)
+
 __all__ = [
     # SendGrid
     'SendGridService',
@@ -104,5 +110,10 @@ __all__ = [
     'ClientConnection',
     'create_websocket_service',
     'create_jwt_token',
-    'create_notification_message'
+    'create_notification_message',
+
+    # Real-time update coalescing
+    'UpdateCoalescer',
+    'apply_merge_patch',
+    'diff_merge_patch'
 ]
\ No newline at end of file
@@ -0,0 +1,148 @@
+"""
+AWS SES Send Benchmark
+Measures per-message wrapper overhead and bulk throughput of AWSSESService
+against an in-process stub of the SES client
+
+Run from the integrations directory:
+    python -m communication.aws_ses_benchmark --messages 2000 --recipients 5000
+"""
+
+import argparse
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict
+
+from botocore.exceptions import ClientError
+
+from .aws_ses_service import AWSSESService, SESRecipient, MAX_BULK_DESTINATIONS
+
+
+class StubSESClient:
+    """In-process stand-in for the SES client with a fixed per-call latency"""
+
+    def __init__(self, latency: float = 0.0, max_send_rate: float = 1000.0):
+        self.latency = latency
+        self.max_send_rate = max_send_rate
+        self.calls = 0
+        self.destinations = 0
+        self._lock = threading.Lock()
+
+    def _record(self, destinations: int):
+        with self._lock:
+            self.calls += 1
+            self.destinations += destinations
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get_send_quota(self):
+        return {'Max24HourSend': 1000000.0, 'MaxSendRate': self.max_send_rate, 'SentLast24Hours': 0.0}
+
+    def send_templated_email(self, **params):
+        self._record(1)
+        return {'MessageId': f"stub-{self.calls}"}
+
+    def send_bulk_templated_email(self, **params):
+        destinations = params['Destinations']
+        if len(destinations) > MAX_BULK_DESTINATIONS:
+            raise ClientError(
+                {'Error': {'Code': 'InvalidParameterValue', 'Message': 'Too many destinations'}},
+                'SendBulkTemplatedEmail'
+            )
+        self._record(len(destinations))
+        return {'Status': [{'Status': 'Success', 'MessageId': f"stub-{self.calls}-{i}"}
+                           for i in range(len(destinations))]}
+
+
+def benchmark_ses(
+    messages: int = 2000,
+    recipients: int = 5000,
+    latency: float = 0.02,
+    max_send_rate: float = 2000.0,
+    max_concurrency: int = 10
+) -> Dict[str, Dict[str, float]]:
+    """
+    Per-message overhead and bulk throughput against StubSESClient
+
+    `per_message` compares the old sync wrapper, which created and closed
+    an event loop for every call, with the loop bridge, using a
+    zero-latency stub so only wrapper cost is measured. `bulk` compares
+    serial 50-destination SendBulkTemplatedEmail calls with the
+    concurrent, quota-paced mode, using a stub with `latency` seconds per
+    call. The 100ms spacing of `_rate_limit_check` is disabled throughout.
+    """
+    service = AWSSESService(
+        'benchmark', 'benchmark', default_from_email='noreply@finclick.ai',
+        max_concurrency=max_concurrency, max_send_rate=max_send_rate
+    )
+    service.rate_limit_delay = 0
+    report = {}
+
+    try:
+        def run_with_new_loop(coro):
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                return loop.run_until_complete(coro)
+            finally:
+                loop.close()
+
+        service.ses_client = StubSESClient()
+        for mode, runner in (('new_loop_per_call', run_with_new_loop), ('loop_bridge', service._run_async)):
+            start = time.perf_counter()
+            for index in range(messages):
+                runner(service.send_templated_email([f"user{index}@example.com"], 'monthly-report', {'name': 'user'}))
+            elapsed = time.perf_counter() - start
+            report[mode] = {'messages': messages, 'seconds': elapsed,
+                            'microseconds_per_message': elapsed / messages * 1e6}
+
+        batch = [SESRecipient(email=f"user{index}@example.com", replacement_data={'name': f"user{index}"})
+                 for index in range(recipients)]
+
+        service.ses_client = StubSESClient(latency=latency)
+        start = time.perf_counter()
+        serial_results = []
+        for offset in range(0, recipients, MAX_BULK_DESTINATIONS):
+            serial_results.extend(service._run_async(service.send_bulk_templated_email(
+                batch[offset:offset + MAX_BULK_DESTINATIONS], 'monthly-report', {'name': 'user'}
+            )))
+        elapsed = time.perf_counter() - start
+        report['bulk_serial'] = {'messages': sum(1 for result in serial_results if result.success),
+                                 'seconds': elapsed, 'messages_per_second': recipients / elapsed,
+                                 'calls': service.ses_client.calls}
+
+        service.ses_client = StubSESClient(latency=latency)
+        start = time.perf_counter()
+        concurrent_results = service._run_async(service.send_bulk_templated_email(
+            batch, 'monthly-report', {'name': 'user'}
+        ))
+        elapsed = time.perf_counter() - start
+        report['bulk_concurrent'] = {'messages': sum(1 for result in concurrent_results if result.success),
+                                     'seconds': elapsed, 'messages_per_second': recipients / elapsed,
+                                     'calls': service.ses_client.calls}
+    finally:
+        service.close()
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure SES send overhead and bulk throughput against a stub client')
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--recipients', type=int, default=5000)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--max-send-rate', type=float, default=2000.0)
+    parser.add_argument('--max-concurrency', type=int, default=10)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    report = benchmark_ses(args.messages, args.recipients, args.latency, args.max_send_rate, args.max_concurrency)
+    for mode, row in report.items():
+        print(f"{mode:<18} " + '  '.join(
+            f"{key}={value:,.1f}" if isinstance(value, float) else f"{key}={value}" for key, value in row.items()
+        ))
+
+
+if __name__ == '__main__':
+    main()
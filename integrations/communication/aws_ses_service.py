@@ -7,13 +7,17 @@ import boto3
 import asyncio
 import logging
 import json
+import random
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Union
 from dataclasses import dataclass
 from enum import Enum
-from functools import wraps
+from functools import wraps, partial
 import base64
+from botocore.config import Config
 from botocore.exceptions import ClientError, BotoCoreError
 
 # Configure logging
@@ -91,6 +95,90 @@ def retry_on_aws_error(max_retries: int = 3, delay: float = 1.0):
         return wrapper
     return decorator
 
+# SES accepts at most 50 destinations per SendBulkTemplatedEmail call
+MAX_BULK_DESTINATIONS = 50
+
+SES_THROTTLING_CODES = ['Throttling', 'ServiceUnavailable', 'TooManyRequestsException']
+
+class AsyncLoopBridge:
+    """
+    Long-lived event loop on a background thread for running coroutines from sync code
+
+    Creating and closing an event loop for every call costs loop setup,
+    executor teardown and any loop-bound state; the bridge keeps one loop
+    running and hands coroutines to it with run_coroutine_threadsafe.
+    """
+
+    def __init__(self, name: str = 'ses-loop'):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                started = threading.Event()
+
+                def run_loop():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(started.set)
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=run_loop, name=self.name, daemon=True)
+                self._thread.start()
+                started.wait()
+                self._loop = loop
+            return self._loop
+
+    def run(self, coro, timeout: float = None):
+        """Run a coroutine on the bridge loop and wait for its result"""
+        loop = self._ensure_started()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("AsyncLoopBridge.run called from its own loop; await the coroutine instead")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+    def close(self):
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+class SendRateLimiter:
+    """
+    Token bucket pacing sends to a messages-per-second quota
+
+    Each acquire reserves its tokens immediately (the balance may go
+    negative) and sleeps off the deficit, so concurrent senders on any
+    event loop share one rate and are served in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: float = None):
+        self.rate = max(rate, 0.001)
+        self.capacity = burst or max(self.rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, count: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= count
+            return max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self, count: float = 1):
+        wait = self._reserve(count)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
 class AWSSESService:
     """Comprehensive AWS SES service for FinClick.AI"""
 
@@ -101,7 +189,9 @@ class AWSSESService:
         region_name: str = 'us-east-1',
         default_from_email: str = None,
         default_from_name: str = "FinClick.AI",
-        configuration_set: str = None
+        configuration_set: str = None,
+        max_concurrency: int = 10,
+        max_send_rate: float = None
     ):
         self.aws_access_key_id = aws_access_key_id
         self.aws_secret_access_key = aws_secret_access_key
@@ -109,13 +199,20 @@ class AWSSESService:
         self.default_from_email = default_from_email
         self.default_from_name = default_from_name
         self.configuration_set = configuration_set
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_send_rate = max_send_rate
+
+        # Clients are thread-safe and reused for every call; size their HTTP
+        # connection pools to the executor so concurrent sends don't queue for a socket
+        client_config = Config(max_pool_connections=max(10, self.max_concurrency))
 
         # Initialize SES client
         self.ses_client = boto3.client(
             'ses',
             aws_access_key_id=aws_access_key_id,
             aws_secret_access_key=aws_secret_access_key,
-            region_name=region_name
+            region_name=region_name,
+            config=client_config
         )
 
         # Initialize SESv2 client for advanced features
@@ -123,9 +220,15 @@ class AWSSESService:
             'sesv2',
             aws_access_key_id=aws_access_key_id,
             aws_secret_access_key=aws_secret_access_key,
-            region_name=region_name
+            region_name=region_name,
+            config=client_config
         )
 
+        # Blocking boto3 calls run here so they don't stall the event loop
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='ses-client')
+        self._loop_bridge = AsyncLoopBridge()
+        self._send_rate_limiter: Optional[SendRateLimiter] = None
+
         # Rate limiting
         self.rate_limit_delay = 0.1  # 100ms between requests
         self.last_request_time = 0
@@ -141,13 +244,33 @@ class AWSSESService:
         self.last_request_time = time.time()
 
     def _run_async(self, coro):
-        """Run async function in sync context"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(coro)
-        finally:
-            loop.close()
+        """Run async function in sync context on the long-lived loop bridge"""
+        return self._loop_bridge.run(coro)
+
+    async def _call_client(self, method, **params):
+        """Run a blocking boto3 client method on the service executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(method, **params))
+
+    async def _get_send_rate_limiter(self) -> SendRateLimiter:
+        """Token bucket at max_send_rate, or the account's MaxSendRate from SES"""
+        if self._send_rate_limiter is None:
+            rate = self.max_send_rate
+            if rate is None:
+                try:
+                    quota = await self._call_client(self.ses_client.get_send_quota)
+                    rate = float(quota['MaxSendRate'])
+                except Exception as e:
+                    # SES sandbox accounts are limited to one message per second
+                    logger.warning(f"Could not read SES send quota, assuming 1 message/s: {str(e)}")
+                    rate = 1.0
+            self._send_rate_limiter = SendRateLimiter(rate)
+        return self._send_rate_limiter
+
+    def close(self):
+        """Stop the loop bridge and executor threads"""
+        self._loop_bridge.close()
+        self._executor.shutdown(wait=True)
 
     @retry_on_aws_error()
     async def send_email(
@@ -230,7 +353,7 @@ class AWSSESService:
                 params['TemplateArn'] = template_arn
 
             # Send email
-            response = self.ses_client.send_email(**params)
+            response = await self._call_client(self.ses_client.send_email, **params)
 
             message_id = response['MessageId']
             logger.info(f"Email sent successfully: {message_id}")
@@ -303,7 +426,7 @@ class AWSSESService:
                 params['Tags'] = tags
 
             # Send templated email
-            response = self.ses_client.send_templated_email(**params)
+            response = await self._call_client(self.ses_client.send_templated_email, **params)
 
             message_id = response['MessageId']
             logger.info(f"Templated email sent successfully: {message_id}")
@@ -341,94 +464,125 @@ class AWSSESService:
         from_name: str = None,
         reply_to_addresses: List[str] = None,
         configuration_set_name: str = None,
-        tags: List[Dict[str, str]] = None
+        tags: List[Dict[str, str]] = None,
+        max_concurrency: int = None,
+        max_attempts: int = 5
     ) -> List[SESEmailResult]:
-        """Send bulk templated emails"""
-        await self._rate_limit_check()
+        """
+        Send bulk templated emails
+
+        Recipients are split into SendBulkTemplatedEmail calls of up to 50
+        destinations, the SES maximum, which run concurrently on the
+        service executor (at most `max_concurrency` at a time). A token
+        bucket at the account's MaxSendRate (or `max_send_rate`) paces
+        them, counting every destination as one message. A throttled call
+        is retried on its own with backoff. Returns one result per
+        recipient, in order.
+        """
+        # Prepare source address
+        if from_name and from_email:
+            source = f"{from_name} <{from_email}>"
+        else:
+            source = from_email or self.default_from_email
 
-        try:
-            # Prepare source address
-            if from_name and from_email:
-                source = f"{from_name} <{from_email}>"
-            else:
-                source = from_email or self.default_from_email
+        # Prepare request parameters shared by every call
+        base_params = {
+            'Source': source,
+            'Template': template_name,
+            'DefaultTemplateData': json.dumps(default_template_data)
+        }
 
-            # Prepare destinations with personalization
-            destinations = []
-            for recipient in recipients:
-                destination = {
-                    'Destination': {
-                        'ToAddresses': [recipient.email]
-                    },
-                    'ReplacementTemplateData': json.dumps(
-                        {**default_template_data, **(recipient.replacement_data or {})}
-                    )
-                }
-                destinations.append(destination)
+        if reply_to_addresses:
+            base_params['ReplyToAddresses'] = reply_to_addresses
 
-            # Prepare request parameters
-            params = {
-                'Source': source,
-                'Template': template_name,
-                'DefaultTemplateData': json.dumps(default_template_data),
-                'Destinations': destinations
-            }
+        if configuration_set_name or self.configuration_set:
+            base_params['ConfigurationSetName'] = configuration_set_name or self.configuration_set
 
-            if reply_to_addresses:
-                params['ReplyToAddresses'] = reply_to_addresses
+        if tags:
+            base_params['Tags'] = tags
 
-            if configuration_set_name or self.configuration_set:
-                params['ConfigurationSetName'] = configuration_set_name or self.configuration_set
+        limiter = await self._get_send_rate_limiter()
+        slots = asyncio.Semaphore(max_concurrency or self.max_concurrency)
 
-            if tags:
-                params['Tags'] = tags
+        async def send_chunk(chunk: List[SESRecipient]) -> List[SESEmailResult]:
+            # Prepare destinations with personalization
+            destinations = [{
+                'Destination': {
+                    'ToAddresses': [recipient.email]
+                },
+                'ReplacementTemplateData': json.dumps(
+                    {**default_template_data, **(recipient.replacement_data or {})}
+                )
+            } for recipient in chunk]
+
+            async with slots:
+                for attempt in range(max_attempts):
+                    await limiter.acquire(len(chunk))
+                    try:
+                        response = await self._call_client(
+                            self.ses_client.send_bulk_templated_email,
+                            Destinations=destinations,
+                            **base_params
+                        )
+                        return self._bulk_status_results(chunk, response)
+
+                    except ClientError as e:
+                        error_code = e.response['Error']['Code']
+                        error_message = e.response['Error']['Message']
+                        if error_code in SES_THROTTLING_CODES and attempt < max_attempts - 1:
+                            wait_time = 0.5 * (2 ** attempt) * (1 + random.random())
+                            logger.warning(f"AWS SES bulk email throttled ({error_code}), retrying in {wait_time:.1f}s")
+                            await asyncio.sleep(wait_time)
+                            continue
 
-            # Send bulk templated email
-            response = self.ses_client.send_bulk_templated_email(**params)
+                        logger.error(f"AWS SES bulk email error {error_code}: {error_message}")
+                        return [SESEmailResult(
+                            success=False,
+                            error_message=error_message,
+                            error_code=error_code
+                        ) for _ in chunk]
 
-            message_id = response['MessageId']
-            status = response.get('Status', [])
-
-            results = []
-            for i, recipient in enumerate(recipients):
-                if i < len(status):
-                    recipient_status = status[i]
-                    if recipient_status.get('Status') == 'Success':
-                        results.append(SESEmailResult(
-                            success=True,
-                            message_id=recipient_status.get('MessageId', message_id)
-                        ))
-                    else:
-                        results.append(SESEmailResult(
+                    except Exception as e:
+                        logger.error(f"Failed to send bulk templated email: {str(e)}")
+                        return [SESEmailResult(
                             success=False,
-                            error_message=recipient_status.get('Error', 'Unknown error')
-                        ))
-                else:
+                            error_message=str(e)
+                        ) for _ in chunk]
+
+        chunks = [recipients[i:i + MAX_BULK_DESTINATIONS] for i in range(0, len(recipients), MAX_BULK_DESTINATIONS)]
+        chunk_results = await asyncio.gather(*(send_chunk(chunk) for chunk in chunks))
+        results = [result for chunk_result in chunk_results for result in chunk_result]
+
+        sent = sum(1 for result in results if result.success)
+        logger.info(f"Bulk templated email sent to {sent}/{len(recipients)} recipients in {len(chunks)} calls")
+        return results
+
+    def _bulk_status_results(self, chunk: List[SESRecipient], response: Dict) -> List[SESEmailResult]:
+        """Per-recipient results from a SendBulkTemplatedEmail response"""
+        message_id = response.get('MessageId')
+        status = response.get('Status', [])
+
+        results = []
+        for i, recipient in enumerate(chunk):
+            if i < len(status):
+                recipient_status = status[i]
+                if recipient_status.get('Status') == 'Success':
                     results.append(SESEmailResult(
                         success=True,
-                        message_id=message_id
+                        message_id=recipient_status.get('MessageId', message_id)
                     ))
-
-            logger.info(f"Bulk templated email sent to {len(recipients)} recipients")
-            return results
-
-        except ClientError as e:
-            error_code = e.response['Error']['Code']
-            error_message = e.response['Error']['Message']
-            logger.error(f"AWS SES bulk email error {error_code}: {error_message}")
-
-            return [SESEmailResult(
-                success=False,
-                error_message=error_message,
-                error_code=error_code
-            )]
-
-        except Exception as e:
-            logger.error(f"Failed to send bulk templated email: {str(e)}")
-            return [SESEmailResult(
-                success=False,
-                error_message=str(e)
-            )]
+                else:
+                    results.append(SESEmailResult(
+                        success=False,
+                        error_message=recipient_status.get('Error', 'Unknown error'),
+                        error_code=recipient_status.get('Status')
+                    ))
+            else:
+                results.append(SESEmailResult(
+                    success=True,
+                    message_id=message_id
+                ))
+        return results
 
     @retry_on_aws_error()
     async def send_raw_email(
@@ -461,7 +615,7 @@ class AWSSESService:
             if tags:
                 params['Tags'] = tags
 
-            response = self.ses_client.send_raw_email(**params)
+            response = await self._call_client(self.ses_client.send_raw_email, **params)
 
             message_id = response['MessageId']
             logger.info(f"Raw email sent successfully: {message_id}")
@@ -912,7 +1066,9 @@ async def create_aws_ses_service(
     region_name: str = 'us-east-1',
     default_from_email: str = None,
     default_from_name: str = "FinClick.AI",
-    configuration_set: str = None
+    configuration_set: str = None,
+    max_concurrency: int = 10,
+    max_send_rate: float = None
 ) -> AWSSESService:
     """Factory function to create AWSSESService instance"""
     return AWSSESService(
@@ -921,7 +1077,9 @@ async def create_aws_ses_service(
         region_name,
         default_from_email,
         default_from_name,
-        configuration_set
+        configuration_set,
+        max_concurrency,
+        max_send_rate
     )
 
 def create_ses_recipient(email: str, name: str = None, **replacement_data) -> SESRecipient:
@@ -952,4 +1110,4 @@ def create_ses_attachment_from_file(file_path: str, filename: str = None) -> SES
         filename=filename,
         content=content,
         content_type=content_type
-    )
\ No newline at end of file
+    )
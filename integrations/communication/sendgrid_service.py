@@ -7,6 +7,7 @@ import aiohttp
 import asyncio
 import logging
 import json
+import random
 import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Union
@@ -54,6 +55,19 @@ class EmailResult:
     message_id: Optional[str] = None
     error_message: Optional[str] = None
     status_code: Optional[int] = None
+    attempts: Optional[int] = None
+
+@dataclass
+class BulkSendStats:
+    recipients: int
+    batches: int
+    succeeded_batches: int
+    failed_batches: int
+    retries: int
+    rate_limited_responses: int
+    peak_concurrency: int
+    elapsed_seconds: float
+    recipients_per_second: float
 
 def retry_on_error(max_retries: int = 3, delay: float = 1.0):
     """Decorator to retry API calls on specific errors"""
@@ -82,16 +96,27 @@ def retry_on_error(max_retries: int = 3, delay: float = 1.0):
 class SendGridService:
     """Comprehensive SendGrid email service for FinClick.AI"""
 
-    def __init__(self, api_key: str, default_from_email: str, default_from_name: str = "FinClick.AI"):
+    def __init__(
+        self,
+        api_key: str,
+        default_from_email: str,
+        default_from_name: str = "FinClick.AI",
+        base_url: str = "https://api.sendgrid.com/v3",
+        max_concurrent_batches: int = 8
+    ):
         self.api_key = api_key
         self.default_from_email = default_from_email
         self.default_from_name = default_from_name
-        self.base_url = "https://api.sendgrid.com/v3"
+        self.base_url = base_url.rstrip('/')
 
         # Rate limiting
         self.rate_limit_delay = 0.1  # 100ms between requests
         self.last_request_time = 0
 
+        # Bulk sends
+        self.max_concurrent_batches = max_concurrent_batches
+        self.last_bulk_send_stats: Optional[BulkSendStats] = None
+
         # Email templates
         self.templates = {
             EmailType.WELCOME: {
@@ -348,7 +373,51 @@ class SendGridService:
                 error_message=str(e)
             )
 
-    @retry_on_error()
+    def _build_bulk_email_data(
+        self,
+        batch: List[Dict],
+        template_id: str,
+        subject: str,
+        from_email: str = None,
+        from_name: str = None
+    ) -> Dict:
+        """Build one mail/send request with a personalization per recipient"""
+        personalizations = []
+        for recipient_data in batch:
+            personalization = {
+                'to': [{'email': recipient_data['email'], 'name': recipient_data.get('name', '')}],
+                'dynamic_template_data': recipient_data.get('template_data', {})
+            }
+            personalizations.append(personalization)
+
+        return {
+            'personalizations': personalizations,
+            'from': {
+                'email': from_email or self.default_from_email,
+                'name': from_name or self.default_from_name
+            },
+            'template_id': template_id,
+            'subject': subject
+        }
+
+    def _rate_limit_delay_from_headers(self, headers, default: float) -> float:
+        """Seconds to wait before the next request, from SendGrid rate-limit headers"""
+        retry_after = headers.get('Retry-After')
+        if retry_after:
+            try:
+                return max(float(retry_after), 0.0)
+            except ValueError:
+                pass
+
+        reset = headers.get('X-RateLimit-Reset')
+        if reset:
+            try:
+                return max(float(reset) - time.time(), 0.0)
+            except ValueError:
+                pass
+
+        return default
+
     async def send_bulk_emails(
         self,
         recipients_data: List[Dict],
@@ -356,58 +425,163 @@ class SendGridService:
         subject: str,
         from_email: str = None,
         from_name: str = None,
-        batch_size: int = 1000
+        batch_size: int = 1000,
+        max_concurrency: int = None,
+        max_attempts: int = 5,
+        base_delay: float = 0.5
     ) -> List[EmailResult]:
-        """Send bulk emails with personalization"""
-        results = []
-
-        try:
-            # Split recipients into batches
-            for i in range(0, len(recipients_data), batch_size):
-                batch = recipients_data[i:i + batch_size]
-
-                # Build personalizations for batch
-                personalizations = []
-                for recipient_data in batch:
-                    personalization = {
-                        'to': [{'email': recipient_data['email'], 'name': recipient_data.get('name', '')}],
-                        'dynamic_template_data': recipient_data.get('template_data', {})
-                    }
-                    personalizations.append(personalization)
-
-                # Build email data
-                email_data = {
-                    'personalizations': personalizations,
-                    'from': {
-                        'email': from_email or self.default_from_email,
-                        'name': from_name or self.default_from_name
-                    },
-                    'template_id': template_id,
-                    'subject': subject
-                }
-
-                # Send batch
-                response = await self._make_request('mail/send', email_data)
-                message_id = response.get('message_id', f"bulk_{int(time.time())}_{i}")
-
-                results.append(EmailResult(
-                    success=True,
-                    message_id=message_id
-                ))
-
-                # Add delay between batches
-                await asyncio.sleep(1)
-
-            logger.info(f"Sent bulk emails to {len(recipients_data)} recipients in {len(results)} batches")
-            return results
+        """
+        Send bulk emails with personalization, adapting to SendGrid's rate limits
+
+        Recipients are split into mail/send requests of `batch_size`
+        personalizations (SendGrid's maximum is 1,000) that are sent
+        concurrently over one HTTP session. Concurrency starts at
+        `max_concurrency`, halves on every 429 and grows back by one after
+        a run of successes. When X-RateLimit-Remaining reaches zero or a 429
+        arrives, all batches pause until X-RateLimit-Reset (or Retry-After).
+        A batch that is rate limited, fails with a 5xx or a network error is
+        retried on its own with exponential backoff, up to `max_attempts`;
+        other 4xx errors fail it immediately. Successful batches are never
+        resent. Returns one result per batch, in order; throughput is
+        logged and kept in `last_bulk_send_stats`.
+
+        mail/send is not idempotent: a 5xx or a dropped connection can come
+        after SendGrid accepted the batch, so its retry may deliver the same
+        email twice. Pass `max_attempts=1` where a duplicate is worse than a
+        missed email; a 429 is only retried after a rejection and does not
+        carry this risk.
+        """
+        batches = [recipients_data[i:i + batch_size] for i in range(0, len(recipients_data), batch_size)]
+        results: List[Optional[EmailResult]] = [None] * len(batches)
+        max_limit = max(1, max_concurrency or self.max_concurrent_batches)
+
+        loop = asyncio.get_running_loop()
+        condition = asyncio.Condition()
+        control = {
+            'limit': max_limit,
+            'in_flight': 0,
+            'peak': 0,
+            'resume_at': 0.0,
+            'successes': 0,
+            'retries': 0,
+            'rate_limited': 0
+        }
 
-        except Exception as e:
-            logger.error(f"Failed to send bulk emails: {str(e)}")
-            results.append(EmailResult(
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+        url = f"{self.base_url}/mail/send"
+
+        async def acquire_slot():
+            async with condition:
+                while control['in_flight'] >= control['limit']:
+                    await condition.wait()
+                control['in_flight'] += 1
+                control['peak'] = max(control['peak'], control['in_flight'])
+
+        async def release_slot():
+            async with condition:
+                control['in_flight'] -= 1
+                condition.notify_all()
+
+        async def send_batch(index: int, session: aiohttp.ClientSession):
+            email_data = self._build_bulk_email_data(batches[index], template_id, subject, from_email, from_name)
+            status_code = None
+            error_message = None
+
+            for attempt in range(1, max_attempts + 1):
+                await acquire_slot()
+                try:
+                    # Honor a rate-limit pause that started while this batch was waiting
+                    pause = control['resume_at'] - loop.time()
+                    if pause > 0:
+                        await asyncio.sleep(pause)
+
+                    try:
+                        async with session.post(url, headers=headers, json=email_data) as response:
+                            status_code = response.status
+                            response_headers = response.headers
+                            response_text = await response.text()
+                    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                        status_code, response_headers, response_text = None, {}, str(e)
+                finally:
+                    await release_slot()
+
+                remaining = response_headers.get('X-RateLimit-Remaining')
+                if remaining is not None and remaining.isdigit() and int(remaining) == 0:
+                    delay = self._rate_limit_delay_from_headers(response_headers, 1.0)
+                    control['resume_at'] = max(control['resume_at'], loop.time() + delay)
+
+                if status_code in (200, 201, 202):
+                    control['successes'] += 1
+                    if control['limit'] < max_limit and control['successes'] >= control['limit']:
+                        control['limit'] += 1
+                        control['successes'] = 0
+                        async with condition:
+                            condition.notify_all()
+
+                    results[index] = EmailResult(
+                        success=True,
+                        message_id=response_headers.get('X-Message-Id', f"bulk_{int(time.time())}_{index}"),
+                        status_code=status_code,
+                        attempts=attempt
+                    )
+                    return
+
+                error_message = f"SendGrid API error {status_code}: {response_text}" if status_code else response_text
+                backoff = base_delay * (2 ** (attempt - 1)) * (1 + random.random())
+
+                if status_code == 429:
+                    control['rate_limited'] += 1
+                    control['limit'] = max(1, control['limit'] // 2)
+                    control['successes'] = 0
+                    delay = self._rate_limit_delay_from_headers(response_headers, backoff)
+                    control['resume_at'] = max(control['resume_at'], loop.time() + delay)
+                elif status_code is not None and status_code < 500:
+                    # Bad request, auth or permission errors will not succeed on retry
+                    break
+                else:
+                    delay = backoff
+
+                if attempt < max_attempts:
+                    control['retries'] += 1
+                    logger.warning(f"Bulk email batch {index} failed ({status_code}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+
+            logger.error(f"Bulk email batch {index} failed: {error_message}")
+            results[index] = EmailResult(
                 success=False,
-                error_message=str(e)
-            ))
-            return results
+                error_message=error_message,
+                status_code=status_code,
+                attempts=attempt
+            )
+
+        start = loop.time()
+        async with aiohttp.ClientSession() as session:
+            await asyncio.gather(*(send_batch(index, session) for index in range(len(batches))))
+        elapsed = loop.time() - start
+
+        succeeded = [result for result in results if result.success]
+        delivered = sum(len(batches[index]) for index, result in enumerate(results) if result.success)
+        self.last_bulk_send_stats = BulkSendStats(
+            recipients=len(recipients_data),
+            batches=len(batches),
+            succeeded_batches=len(succeeded),
+            failed_batches=len(batches) - len(succeeded),
+            retries=control['retries'],
+            rate_limited_responses=control['rate_limited'],
+            peak_concurrency=control['peak'],
+            elapsed_seconds=elapsed,
+            recipients_per_second=delivered / elapsed if elapsed > 0 else 0.0
+        )
+
+        logger.info(
+            f"Sent bulk emails to {delivered}/{len(recipients_data)} recipients in {len(batches)} batches "
+            f"({self.last_bulk_send_stats.recipients_per_second:,.0f} recipients/s, "
+            f"{control['retries']} retries, {control['rate_limited']} rate limited)"
+        )
+        return results
 
     @retry_on_error()
     async def create_list(self, name: str) -> Dict:
@@ -679,10 +853,12 @@ class SendGridService:
 async def create_sendgrid_service(
     api_key: str,
     default_from_email: str,
-    default_from_name: str = "FinClick.AI"
+    default_from_name: str = "FinClick.AI",
+    base_url: str = "https://api.sendgrid.com/v3",
+    max_concurrent_batches: int = 8
 ) -> SendGridService:
     """Factory function to create SendGridService instance"""
-    return SendGridService(api_key, default_from_email, default_from_name)
+    return SendGridService(api_key, default_from_email, default_from_name, base_url, max_concurrent_batches)
 
 def create_email_recipient(email: str, name: str = None, **substitutions) -> EmailRecipient:
     """Create email recipient with substitutions"""
@@ -729,4 +905,136 @@ def create_payment_receipt_email_data(
         'date': date.strftime('%B %d, %Y'),
         'company_name': 'FinClick.AI',
         'support_email': 'support@finclick.ai'
-    }
\ No newline at end of file
+    }
+
+
+async def benchmark_bulk_send(
+    recipients: int = 20000,
+    batch_size: int = 1000,
+    requests_per_window: int = 10,
+    window_seconds: float = 1.0,
+    failure_rate: float = 0.05,
+    latency: float = 0.05,
+    include_baseline: bool = True,
+    port: int = 8798
+) -> Dict[str, Any]:
+    """
+    Bulk send throughput against a local HTTP stub of SendGrid's mail/send
+
+    The stub allows `requests_per_window` requests per `window_seconds`,
+    answering X-RateLimit-Limit/Remaining/Reset headers and 429 once the
+    window is used up, fails `failure_rate` of accepted requests with a
+    500, and takes `latency` seconds per request. It also counts
+    recipients received more than once, which must stay zero. The
+    baseline is the previous loop: one batch at a time with a one-second
+    sleep between batches and no retries.
+    """
+    from aiohttp import web
+
+    stub = {'window_start': 0.0, 'used': 0, 'seen': set(), 'duplicates': 0, 'accepted': 0}
+    rng = random.Random(0)
+
+    async def mail_send(request):
+        now = time.time()
+        if now - stub['window_start'] >= window_seconds:
+            stub['window_start'] = now
+            stub['used'] = 0
+        reset = stub['window_start'] + window_seconds
+        rate_headers = {
+            'X-RateLimit-Limit': str(requests_per_window),
+            'X-RateLimit-Reset': f"{reset:.3f}"
+        }
+
+        if stub['used'] >= requests_per_window:
+            rate_headers['X-RateLimit-Remaining'] = '0'
+            return web.json_response({'errors': [{'message': 'too many requests'}]}, status=429, headers=rate_headers)
+        stub['used'] += 1
+        rate_headers['X-RateLimit-Remaining'] = str(requests_per_window - stub['used'])
+
+        data = await request.json()
+        await asyncio.sleep(latency)
+        if rng.random() < failure_rate:
+            return web.json_response({'errors': [{'message': 'internal error'}]}, status=500, headers=rate_headers)
+
+        for personalization in data['personalizations']:
+            email = personalization['to'][0]['email']
+            if email in stub['seen']:
+                stub['duplicates'] += 1
+            stub['seen'].add(email)
+        stub['accepted'] += len(data['personalizations'])
+        return web.Response(status=202, headers={**rate_headers, 'X-Message-Id': f"stub-{stub['accepted']}"})
+
+    app = web.Application()
+    app.router.add_post('/v3/mail/send', mail_send)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', port).start()
+
+    recipients_data = [
+        {'email': f'user{index}@example.com', 'name': f'User {index}', 'template_data': {'first_name': f'User {index}'}}
+        for index in range(recipients)
+    ]
+    service = SendGridService('stub-key', 'noreply@finclick.ai', base_url=f'http://127.0.0.1:{port}/v3')
+    report = {}
+
+    try:
+        if include_baseline:
+            stub.update(seen=set(), duplicates=0, accepted=0)
+            start = time.perf_counter()
+            async with aiohttp.ClientSession() as session:
+                for i in range(0, recipients, batch_size):
+                    email_data = service._build_bulk_email_data(recipients_data[i:i + batch_size], 'd-stub', 'Stub')
+                    async with session.post(f'{service.base_url}/mail/send', json=email_data) as response:
+                        await response.read()
+                    await asyncio.sleep(1)
+            elapsed = time.perf_counter() - start
+            report['baseline'] = {
+                'delivered': stub['accepted'],
+                'seconds': elapsed,
+                'recipients_per_second': stub['accepted'] / elapsed
+            }
+
+        stub.update(seen=set(), duplicates=0, accepted=0)
+        results = await service.send_bulk_emails(recipients_data, 'd-stub', 'Stub', batch_size=batch_size)
+        stats = service.last_bulk_send_stats
+        report['adaptive'] = {
+            'delivered': stub['accepted'],
+            'duplicates': stub['duplicates'],
+            'failed_batches': sum(1 for result in results if not result.success),
+            'retries': stats.retries,
+            'rate_limited_responses': stats.rate_limited_responses,
+            'peak_concurrency': stats.peak_concurrency,
+            'seconds': stats.elapsed_seconds,
+            'recipients_per_second': stats.recipients_per_second
+        }
+    finally:
+        await runner.cleanup()
+
+    return report
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Measure bulk send throughput against a local SendGrid stub')
+    parser.add_argument('--recipients', type=int, default=20000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--requests-per-window', type=int, default=10)
+    parser.add_argument('--failure-rate', type=float, default=0.05)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--skip-baseline', action='store_true')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    report = asyncio.run(benchmark_bulk_send(
+        recipients=args.recipients,
+        batch_size=args.batch_size,
+        requests_per_window=args.requests_per_window,
+        failure_rate=args.failure_rate,
+        latency=args.latency,
+        include_baseline=not args.skip_baseline
+    ))
+    for mode, row in report.items():
+        print(f"{mode:<9} {row['delivered']:>7} delivered in {row['seconds']:6.2f}s  "
+              f"{row['recipients_per_second']:>9,.0f} recipients/s  "
+              + ' '.join(f"{key}={value}" for key, value in row.items()
+                         if key not in ('delivered', 'seconds', 'recipients_per_second')))
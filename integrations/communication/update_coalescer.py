@@ -0,0 +1,339 @@
+"""
+Real-time Update Coalescer
+Merges rapid progress updates per stream into rate-limited JSON merge-patch deltas for FinClick.AI
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+def apply_merge_patch(target: Any, patch: Any) -> Any:
+    """
+    Apply an RFC 7386 JSON merge patch and return the result
+
+    Objects are merged key by key, a null value removes the key, and any
+    other value (including lists) replaces what was there. `target` is not
+    modified.
+    """
+    if not isinstance(patch, dict):
+        return patch
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
+
+def diff_merge_patch(source: Dict[str, Any], target: Dict[str, Any]) -> Dict[str, Any]:
+    """Smallest merge patch that turns `source` into `target`"""
+    patch = {}
+    for key in source:
+        if key not in target:
+            patch[key] = None
+    for key, value in target.items():
+        if key not in source:
+            patch[key] = value
+            continue
+        previous = source[key]
+        if isinstance(value, dict) and isinstance(previous, dict):
+            nested = diff_merge_patch(previous, value)
+            if nested:
+                patch[key] = nested
+        elif value != previous:
+            patch[key] = value
+    return patch
+
+@dataclass
+class CoalescedStream:
+    """State of one update stream: what has been merged and what the client has seen"""
+    message_type: str
+    state: Dict[str, Any] = field(default_factory=dict)
+    sent: Dict[str, Any] = field(default_factory=dict)
+    seq: int = 0
+    pending: int = 0
+    last_flush: float = 0.0
+    last_update: float = 0.0
+    flush_task: Optional[asyncio.Task] = None
+
+@dataclass
+class CoalescerStats:
+    """Counters for updates received and messages actually sent"""
+    updates_received: int = 0
+    messages_sent: int = 0
+    delta_bytes_sent: int = 0
+    full_state_bytes: int = 0  # What sending the whole state on every flush would have cost
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'updates_received': self.updates_received,
+            'messages_sent': self.messages_sent,
+            'messages_saved': self.updates_received - self.messages_sent,
+            'delta_bytes_sent': self.delta_bytes_sent,
+            'full_state_bytes': self.full_state_bytes,
+            'bytes_saved': self.full_state_bytes - self.delta_bytes_sent
+        }
+
+class UpdateCoalescer:
+    """
+    Rate-limited, delta-encoded delivery of progress updates
+
+    Updates are JSON merge patches against a per-stream state, keyed by
+    (target, stream_id), e.g. (user_id, request_id). The first update of a
+    quiet stream is sent at once; later ones are merged and sent together
+    at most once per `flush_interval` seconds. Each message carries only
+    what changed since the previous one:
+
+        {"type": message_type, stream_field: stream_id, "seq": n, "delta": {...}}
+
+    Clients rebuild the state by applying each delta with JSON merge patch
+    semantics (RFC 7386) in `seq` order; `seq` 1 starts from an empty
+    state. Because null deletes a key, keys set to None are absent on the
+    client. Streams idle for `idle_timeout` seconds are forgotten, and the
+    next update starts again from `seq` 1 with the full state.
+
+    `send(target, message)` is awaited for every message. If it raises,
+    the error is logged and the client can no longer be assumed to hold
+    the state, so the stream's next flush sends the full state again from
+    `seq` 1, as after `reset`.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[Hashable, Dict[str, Any]], Awaitable[None]],
+        flush_interval: float = 0.25,
+        message_type: str = 'progress_update',
+        stream_field: str = 'stream_id',
+        idle_timeout: float = 300.0
+    ):
+        self.send = send
+        self.flush_interval = flush_interval
+        self.message_type = message_type
+        self.stream_field = stream_field
+        self.idle_timeout = idle_timeout
+        self.stats = CoalescerStats()
+        self._streams: Dict[Tuple[Hashable, Hashable], CoalescedStream] = {}
+        self._last_sweep = time.monotonic()
+
+    async def submit(self, target: Hashable, stream_id: Hashable, patch: Dict[str, Any], message_type: str = None):
+        """Merge an update into its stream and send it now or at the next flush window"""
+        now = time.monotonic()
+        self._sweep_idle(now)
+
+        key = (target, stream_id)
+        stream = self._streams.get(key)
+        if stream is None:
+            stream = self._streams[key] = CoalescedStream(message_type=message_type or self.message_type)
+        elif message_type:
+            stream.message_type = message_type
+
+        stream.state = apply_merge_patch(stream.state, patch)
+        stream.pending += 1
+        stream.last_update = now
+        self.stats.updates_received += 1
+
+        if stream.flush_task is not None:
+            return
+        wait = stream.last_flush + self.flush_interval - now
+        if wait <= 0:
+            await self._flush_stream(key, stream)
+        else:
+            stream.flush_task = asyncio.create_task(self._flush_later(key, stream, wait))
+
+    async def flush(self, target: Hashable, stream_id: Hashable, close: bool = False):
+        """
+        Send a stream's pending changes immediately
+
+        Call before a message that must arrive after the progress it
+        follows, such as a completion. With `close=True` the stream is
+        forgotten afterwards.
+        """
+        key = (target, stream_id)
+        stream = self._streams.get(key)
+        if stream is None:
+            return
+        if close:
+            del self._streams[key]
+        await self._flush_stream(key, stream)
+
+    def reset(self, target: Hashable):
+        """Send the full state of the target's streams on their next flush, e.g. after the client reconnects"""
+        for (stream_target, _), stream in self._streams.items():
+            if stream_target == target:
+                stream.sent = {}
+                stream.seq = 0
+                stream.pending = max(stream.pending, 1)
+
+    async def flush_all(self):
+        """Send every stream's pending changes, e.g. before shutdown"""
+        for key, stream in list(self._streams.items()):
+            await self._flush_stream(key, stream)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.stats.to_dict()
+        stats['active_streams'] = len(self._streams)
+        stats['flush_interval'] = self.flush_interval
+        return stats
+
+    async def _flush_later(self, key: Tuple[Hashable, Hashable], stream: CoalescedStream, wait: float):
+        await asyncio.sleep(wait)
+        stream.flush_task = None
+        await self._flush_stream(key, stream)
+
+    async def _flush_stream(self, key: Tuple[Hashable, Hashable], stream: CoalescedStream):
+        task = stream.flush_task
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+        stream.flush_task = None
+        if not stream.pending:
+            return
+
+        delta = diff_merge_patch(stream.sent, stream.state)
+        stream.pending = 0
+        stream.last_flush = time.monotonic()
+        if not delta:
+            return
+
+        # Recorded before sending so a concurrent flush never resends the same change
+        stream.sent = stream.state
+        stream.seq += 1
+        target, stream_id = key
+        message = {
+            'type': stream.message_type,
+            self.stream_field: stream_id,
+            'seq': stream.seq,
+            'delta': delta
+        }
+
+        try:
+            await self.send(target, message)
+        except Exception as e:
+            logger.error(f"Failed to send coalesced update for {stream_id}: {str(e)}")
+            stream.sent = {}
+            stream.seq = 0
+            stream.pending = max(stream.pending, 1)
+            return
+
+        self.stats.messages_sent += 1
+        self.stats.delta_bytes_sent += len(json.dumps(message, default=str))
+        self.stats.full_state_bytes += len(json.dumps({**message, 'delta': stream.state}, default=str))
+
+    def _sweep_idle(self, now: float):
+        if now - self._last_sweep < self.idle_timeout:
+            return
+        self._last_sweep = now
+        for key, stream in list(self._streams.items()):
+            # Pending changes without a flush task are only left by a failed send
+            if stream.flush_task is None and now - stream.last_update >= self.idle_timeout:
+                del self._streams[key]
+
+async def benchmark_coalescing(
+    analyses: int = 200,
+    steps: int = 100,
+    groups: int = 10,
+    step_interval: float = 0.01,
+    flush_interval: float = 0.25
+) -> Dict[str, Any]:
+    """
+    Messages and bytes delivered for per-step progress, sent directly versus coalesced
+
+    `analyses` concurrent streams each report `steps` progress updates,
+    `step_interval` seconds apart; every `steps // groups` steps a group's
+    results are added to the state. The direct mode sends the full state
+    on every step, as the original update path did; the coalesced mode
+    goes through UpdateCoalescer. A simulated client applies every delta,
+    and the run checks that it ends with the same state.
+    """
+    group_every = max(steps // groups, 1)
+
+    def progress(analysis: int, step: int) -> Dict[str, Any]:
+        patch = {
+            'completed_steps': step + 1,
+            'total_steps': steps,
+            'percent': round((step + 1) / steps * 100, 1),
+            'current_step': f"step_{step}"
+        }
+        if (step + 1) % group_every == 0:
+            group = f"group_{(step + 1) // group_every}"
+            patch['groups'] = {group: {
+                'status': 'completed',
+                'results': [{'analysis_code': f"{group}_{index}", 'value': analysis * 0.01 + index} for index in range(5)]
+            }}
+        return patch
+
+    async def run_analyses(submit):
+        async def run(analysis: int):
+            for step in range(steps):
+                await submit(analysis, progress(analysis, step))
+                await asyncio.sleep(step_interval)
+        await asyncio.gather(*(run(analysis) for analysis in range(analyses)))
+
+    direct = {'messages': 0, 'bytes': 0}
+    direct_states: Dict[int, Dict[str, Any]] = {}
+
+    async def send_direct(analysis: int, patch: Dict[str, Any]):
+        direct_states[analysis] = apply_merge_patch(direct_states.get(analysis, {}), patch)
+        direct['messages'] += 1
+        direct['bytes'] += len(json.dumps({'type': 'progress_update', 'stream_id': analysis, **direct_states[analysis]}))
+
+    start = time.perf_counter()
+    await run_analyses(send_direct)
+    direct_seconds = time.perf_counter() - start
+
+    client_states: Dict[int, Dict[str, Any]] = {}
+    client_seq: Dict[int, int] = {}
+    out_of_order = [0]
+
+    async def client_receive(target: int, message: Dict[str, Any]):
+        if message['seq'] != client_seq.get(target, 0) + 1:
+            out_of_order[0] += 1
+        client_seq[target] = message['seq']
+        client_states[target] = apply_merge_patch(client_states.get(target, {}), message['delta'])
+
+    coalescer = UpdateCoalescer(client_receive, flush_interval=flush_interval)
+    start = time.perf_counter()
+    await run_analyses(lambda analysis, patch: coalescer.submit(analysis, analysis, patch))
+    for analysis in range(analyses):
+        await coalescer.flush(analysis, analysis, close=True)
+    coalesced_seconds = time.perf_counter() - start
+
+    stats = coalescer.get_stats()
+    return {
+        'updates': analyses * steps,
+        'direct_messages': direct['messages'],
+        'direct_bytes': direct['bytes'],
+        'direct_seconds': direct_seconds,
+        'coalesced_messages': stats['messages_sent'],
+        'coalesced_bytes': stats['delta_bytes_sent'],
+        'coalesced_seconds': coalesced_seconds,
+        'messages_saved': stats['messages_saved'],
+        'bytes_saved': direct['bytes'] - stats['delta_bytes_sent'],
+        'states_match': client_states == direct_states,
+        'out_of_order': out_of_order[0]
+    }
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare direct and coalesced delivery of progress updates')
+    parser.add_argument('--analyses', type=int, default=200)
+    parser.add_argument('--steps', type=int, default=100)
+    parser.add_argument('--groups', type=int, default=10)
+    parser.add_argument('--step-interval', type=float, default=0.01)
+    parser.add_argument('--flush-interval', type=float, default=0.25)
+    args = parser.parse_args()
+
+    result = asyncio.run(benchmark_coalescing(
+        args.analyses, args.steps, args.groups, args.step_interval, args.flush_interval
+    ))
+    print(f"{result['updates']} progress updates from {args.analyses} analyses")
+    print(f"direct:    {result['direct_messages']:>7} messages  {result['direct_bytes']:>11,} bytes")
+    print(f"coalesced: {result['coalesced_messages']:>7} messages  {result['coalesced_bytes']:>11,} bytes  "
+          f"({result['messages_saved']} messages and {result['bytes_saved']:,} bytes saved)")
+    print(f"client state matches: {result['states_match']}  out-of-order deltas: {result['out_of_order']}")
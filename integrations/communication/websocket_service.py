@@ -6,17 +6,24 @@ Handles real-time notifications and communication for FinClick.AI platform
 import asyncio
 import websockets
 import json
+import os
 import logging
 import time
 import jwt
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Set, Callable
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from enum import Enum
 from functools import wraps
 import uuid
 import redis.asyncio as redis
 
+try:
+    from .update_coalescer import UpdateCoalescer
+except ImportError:
+    # Run as a script: python websocket_service.py
+    from update_coalescer import UpdateCoalescer
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -25,6 +32,7 @@ class MessageType(Enum):
     ALERT = "alert"
     PRICE_UPDATE = "price_update"
     PORTFOLIO_UPDATE = "portfolio_update"
+    PROGRESS_UPDATE = "progress_update"
     TRADE_CONFIRMATION = "trade_confirmation"
     MARKET_NEWS = "market_news"
     SYSTEM_MESSAGE = "system_message"
@@ -72,6 +80,11 @@ class ClientConnection:
     last_ping: datetime
     authenticated: bool = False
     metadata: Dict[str, Any] = None
+    send_queue: Optional[asyncio.Queue] = None
+    sender_task: Optional[asyncio.Task] = None
+    send_started_at: Optional[float] = None
+    dropped_messages: int = 0
+    idle_timer: Optional[asyncio.TimerHandle] = None
 
     def __post_init__(self):
         if self.subscriptions is None:
@@ -82,6 +95,12 @@ class ClientConnection:
 class WebSocketService:
     """Comprehensive WebSocket service for real-time communication - FinClick.AI"""
 
+    # Channels relayed between instances
+    REDIS_CHANNELS = ('user_notifications', 'price_updates', 'system_alerts', 'progress_resets')
+    # Backoff between attempts to resubscribe after losing Redis
+    REDIS_RETRY_DELAY = 0.5
+    REDIS_MAX_RETRY_DELAY = 30.0
+
     def __init__(
         self,
         host: str = "localhost",
@@ -90,7 +109,11 @@ class WebSocketService:
         redis_url: str = None,
         ping_interval: int = 30,
         ping_timeout: int = 10,
-        max_connections_per_user: int = 5
+        max_connections_per_user: int = 5,
+        send_queue_size: int = 256,
+        send_timeout: float = 10.0,
+        max_dropped_messages: int = 1000,
+        progress_flush_interval: float = 0.25
     ):
         self.host = host
         self.port = port
@@ -100,6 +123,19 @@ class WebSocketService:
         self.ping_timeout = ping_timeout
         self.max_connections_per_user = max_connections_per_user
 
+        # Per-connection outbound queues isolate slow clients from fan-out
+        self.send_queue_size = send_queue_size
+        self.send_timeout = send_timeout
+        self.max_dropped_messages = max_dropped_messages
+
+        # Rapid progress updates are merged per request and sent as deltas
+        self.progress_coalescer = UpdateCoalescer(
+            self._deliver_progress_update,
+            flush_interval=progress_flush_interval,
+            message_type=MessageType.PROGRESS_UPDATE.value,
+            stream_field='request_id'
+        )
+
         # Connection management
         self.connections: Dict[str, ClientConnection] = {}
         self.user_connections: Dict[str, Set[str]] = {}
@@ -109,6 +145,8 @@ class WebSocketService:
         self.redis_client = None
         if redis_url:
             self.redis_client = redis.from_url(redis_url)
+        # Tags this instance's publications so it does not deliver them twice
+        self.instance_id = str(uuid.uuid4())
 
         # Message handlers
         self.message_handlers: Dict[MessageType, Callable] = {
@@ -120,6 +158,7 @@ class WebSocketService:
         # Server instance
         self.server = None
         self.running = False
+        self._background_tasks: List[asyncio.Task] = []
 
         logger.info(f"WebSocket service initialized on {host}:{port}")
 
@@ -136,8 +175,10 @@ class WebSocketService:
             self.running = True
 
             # Start background tasks
-            asyncio.create_task(self._cleanup_connections())
-            asyncio.create_task(self._redis_subscriber())
+            self._background_tasks = [
+                asyncio.create_task(self._send_watchdog()),
+                asyncio.create_task(self._redis_subscriber())
+            ]
 
             logger.info(f"WebSocket server started on {self.host}:{self.port}")
 
@@ -149,11 +190,17 @@ class WebSocketService:
         """Stop WebSocket server"""
         try:
             self.running = False
+            await self.progress_coalescer.flush_all()
 
             if self.server:
                 self.server.close()
                 await self.server.wait_closed()
 
+            for task in self._background_tasks:
+                task.cancel()
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+            self._background_tasks = []
+
             # Close all connections
             for connection in list(self.connections.values()):
                 await connection.websocket.close()
@@ -268,6 +315,11 @@ class WebSocketService:
 
     async def _register_connection(self, connection: ClientConnection):
         """Register new connection"""
+        # Start the connection's writer before it can receive messages
+        connection.send_queue = asyncio.Queue(maxsize=self.send_queue_size)
+        connection.sender_task = asyncio.create_task(self._connection_writer(connection))
+        self._schedule_idle_check(connection, self.ping_interval * 2)
+
         # Add to connections
         self.connections[connection.connection_id] = connection
 
@@ -276,6 +328,9 @@ class WebSocketService:
             self.user_connections[connection.user_id] = set()
         self.user_connections[connection.user_id].add(connection.connection_id)
 
+        # A new connection has seen none of the earlier progress deltas
+        self._request_progress_resync(connection.user_id)
+
         # Notify Redis about new connection
         if self.redis_client:
             await self.redis_client.publish(
@@ -293,6 +348,13 @@ class WebSocketService:
         if connection.connection_id in self.connections:
             del self.connections[connection.connection_id]
 
+        if connection.sender_task:
+            connection.sender_task.cancel()
+
+        if connection.idle_timer:
+            connection.idle_timer.cancel()
+            connection.idle_timer = None
+
         # Remove from user connections
         if connection.user_id in self.user_connections:
             self.user_connections[connection.user_id].discard(connection.connection_id)
@@ -413,24 +475,130 @@ class WebSocketService:
             logger.error(f"Error handling unsubscription: {str(e)}")
             await self._send_error(connection, "Failed to process unsubscription")
 
+    def _message_to_dict(self, message: WebSocketMessage) -> Dict:
+        """JSON-ready form of a message, as sent to clients and relayed through Redis"""
+        message_data = {
+            'type': message.type.value,
+            'data': message.data,
+            'timestamp': message.timestamp.isoformat(),
+            'message_id': message.message_id,
+            'priority': message.priority.value
+        }
+
+        if message.expires_at:
+            message_data['expires_at'] = message.expires_at.isoformat()
+
+        return message_data
+
+    def _message_from_dict(self, message_data: Dict) -> WebSocketMessage:
+        """Rebuild a message from _message_to_dict output"""
+        expires_at = message_data.get('expires_at')
+        return WebSocketMessage(
+            type=MessageType(message_data['type']),
+            data=message_data['data'],
+            timestamp=datetime.fromisoformat(message_data['timestamp']),
+            message_id=message_data['message_id'],
+            priority=NotificationPriority(message_data.get('priority', 'normal')),
+            expires_at=datetime.fromisoformat(expires_at) if expires_at else None
+        )
+
+    def _serialize_message(self, message: WebSocketMessage) -> str:
+        """Encode a message for the wire"""
+        return json.dumps(self._message_to_dict(message))
+
+    def _enqueue_payload(self, connection: ClientConnection, payload: str, progress: bool = False) -> bool:
+        """
+        Queue an encoded message for a connection without waiting on its socket
+
+        `progress` marks a progress_update delta: if one is dropped, the
+        client can no longer rebuild the state from later deltas, so the
+        user's progress streams are resynced with their full state.
+        """
+        queue = connection.send_queue
+        if queue is None or connection.sender_task.done() or connection.websocket.closed:
+            return False
+
+        if queue.full():
+            # Slow consumer: drop its oldest pending message rather than block the sender
+            _, dropped_progress = queue.get_nowait()
+            if dropped_progress:
+                self._request_progress_resync(connection.user_id)
+            connection.dropped_messages += 1
+            if connection.dropped_messages >= self.max_dropped_messages:
+                logger.warning(f"Closing slow consumer {connection.connection_id} after {connection.dropped_messages} dropped messages")
+                self._close_slow_consumer(connection)
+                return False
+
+        queue.put_nowait((payload, progress))
+        return True
+
+    async def _connection_writer(self, connection: ClientConnection):
+        """Send queued messages to one connection so a slow client only delays itself"""
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                payload, _ = await connection.send_queue.get()
+                # Stamped rather than wrapped in wait_for, which costs a task per send; _send_watchdog enforces the timeout
+                connection.send_started_at = loop.time()
+                await connection.websocket.send(payload)
+                connection.send_started_at = None
+
+        except websockets.exceptions.ConnectionClosed:
+            logger.info(f"Connection closed: {connection.connection_id}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error sending message to {connection.connection_id}: {str(e)}")
+
+    async def _send_watchdog(self):
+        """Background task closing connections whose socket has not accepted a send within send_timeout"""
+        loop = asyncio.get_running_loop()
+        while self.running:
+            try:
+                now = loop.time()
+                for connection in list(self.connections.values()):
+                    started = connection.send_started_at
+                    if started is not None and now - started > self.send_timeout:
+                        logger.warning(f"Send to {connection.connection_id} timed out, closing slow consumer")
+                        self._close_slow_consumer(connection)
+
+                await asyncio.sleep(min(self.send_timeout / 2, 1.0))
+
+            except Exception as e:
+                logger.error(f"Error in send watchdog: {str(e)}")
+                await asyncio.sleep(1)
+
+    def _close_slow_consumer(self, connection: ClientConnection):
+        """Stop sending to a connection that cannot keep up and close it"""
+        connection.send_started_at = None
+        if connection.sender_task and not connection.sender_task.done():
+            connection.sender_task.cancel()
+        asyncio.create_task(self._close_connection(connection, 4004, "Slow consumer"))
+
+    async def _close_connection(self, connection: ClientConnection, code: int, reason: str):
+        """Close a connection, ignoring errors from an already broken socket"""
+        try:
+            await connection.websocket.close(code=code, reason=reason)
+        except Exception:
+            pass
+
+    def _fan_out(self, connections: List[ClientConnection], message: WebSocketMessage) -> int:
+        """Serialize a message once and queue it for every connection"""
+        if not connections:
+            return 0
+        payload = self._serialize_message(message)
+        progress = message.type == MessageType.PROGRESS_UPDATE
+        return sum(1 for connection in connections if self._enqueue_payload(connection, payload, progress))
+
     async def _send_message(self, connection: ClientConnection, message: WebSocketMessage):
         """Send message to specific connection"""
         try:
             if connection.websocket.closed:
                 return
 
-            message_data = {
-                'type': message.type.value,
-                'data': message.data,
-                'timestamp': message.timestamp.isoformat(),
-                'message_id': message.message_id,
-                'priority': message.priority.value
-            }
-
-            if message.expires_at:
-                message_data['expires_at'] = message.expires_at.isoformat()
-
-            await connection.websocket.send(json.dumps(message_data))
+            payload = self._serialize_message(message)
+            if not self._enqueue_payload(connection, payload, message.type == MessageType.PROGRESS_UPDATE):
+                await connection.websocket.send(payload)
 
         except websockets.exceptions.ConnectionClosed:
             logger.info(f"Connection closed: {connection.connection_id}")
@@ -450,9 +618,10 @@ class WebSocketService:
             return
 
         connection_ids = list(self.user_connections[user_id])
-        for connection_id in connection_ids:
-            if connection_id in self.connections:
-                await self._send_message(self.connections[connection_id], message)
+        self._fan_out([
+            self.connections[connection_id] for connection_id in connection_ids
+            if connection_id in self.connections
+        ], message)
 
     async def send_to_subscription(self, subscription: str, message: WebSocketMessage):
         """Send message to all connections subscribed to a topic"""
@@ -460,16 +629,17 @@ class WebSocketService:
             return
 
         connection_ids = list(self.subscription_connections[subscription])
-        for connection_id in connection_ids:
-            if connection_id in self.connections:
-                await self._send_message(self.connections[connection_id], message)
+        self._fan_out([
+            self.connections[connection_id] for connection_id in connection_ids
+            if connection_id in self.connections
+        ], message)
 
     async def broadcast_to_all(self, message: WebSocketMessage, exclude_user: str = None):
         """Broadcast message to all connected users"""
-        for connection in list(self.connections.values()):
-            if exclude_user and connection.user_id == exclude_user:
-                continue
-            await self._send_message(connection, message)
+        self._fan_out([
+            connection for connection in list(self.connections.values())
+            if not (exclude_user and connection.user_id == exclude_user)
+        ], message)
 
     async def send_notification(
         self,
@@ -501,15 +671,65 @@ class WebSocketService:
         await self.send_to_user(user_id, message)
 
         # Also publish to Redis for other instances
+        await self._relay_user_message(user_id, message)
+
+    async def _relay_user_message(self, user_id: str, message: WebSocketMessage):
+        """Publish a user message to Redis for delivery by other instances"""
         if self.redis_client:
             await self.redis_client.publish(
                 'user_notifications',
                 json.dumps({
+                    'origin': self.instance_id,
                     'user_id': user_id,
-                    'message': asdict(message)
+                    'message': self._message_to_dict(message)
                 })
             )
 
+    async def send_progress_update(self, user_id: str, request_id: str, progress: Dict, final: bool = False):
+        """
+        Send progress of a long-running request to a user, coalesced
+
+        `progress` is merged into the request's state (JSON merge patch)
+        and the user receives at most one progress_update per
+        progress_flush_interval, carrying only the fields that changed.
+        Pass `final=True` with the last update to send it immediately and
+        release the request's state.
+        """
+        await self.progress_coalescer.submit(user_id, request_id, progress)
+        if final:
+            await self.progress_coalescer.flush(user_id, request_id, close=True)
+
+    async def _deliver_progress_update(self, user_id: str, update: Dict):
+        """
+        Send a coalesced progress delta locally and to other instances
+
+        Errors are left to the coalescer, which logs them and sends the
+        stream's full state on its next flush.
+        """
+        message = WebSocketMessage(type=MessageType.PROGRESS_UPDATE, data=update)
+        await self.send_to_user(user_id, message)
+        await self._relay_user_message(user_id, message)
+
+    def _request_progress_resync(self, user_id: str):
+        """
+        Send the user's progress streams in full on their next flush, on every instance
+
+        Progress deltas for a user connected here may come from another
+        instance's coalescer, so the reset is also published to Redis.
+        """
+        self.progress_coalescer.reset(user_id)
+        if self.redis_client:
+            asyncio.create_task(self._publish_progress_reset(user_id))
+
+    async def _publish_progress_reset(self, user_id: str):
+        try:
+            await self.redis_client.publish(
+                'progress_resets',
+                json.dumps({'origin': self.instance_id, 'user_id': user_id})
+            )
+        except Exception as e:
+            logger.error(f"Failed to publish progress reset for {user_id}: {str(e)}")
+
     async def send_price_update(self, symbol: str, price_data: Dict):
         """Send stock price update to subscribers"""
         message = WebSocketMessage(
@@ -551,62 +771,84 @@ class WebSocketService:
 
         await self.broadcast_to_all(message)
 
-    async def _cleanup_connections(self):
-        """Background task to cleanup stale connections"""
-        while self.running:
-            try:
-                current_time = datetime.now()
-                stale_connections = []
-
-                for connection in self.connections.values():
-                    # Check if connection is stale (no ping for 2x ping interval)
-                    if (current_time - connection.last_ping).total_seconds() > (self.ping_interval * 2):
-                        stale_connections.append(connection)
-
-                # Close stale connections
-                for connection in stale_connections:
-                    try:
-                        await connection.websocket.close(code=4003, reason="Connection timeout")
-                    except:
-                        pass
+    def _schedule_idle_check(self, connection: ClientConnection, delay: float):
+        """Arm the connection's idle timer"""
+        loop = asyncio.get_running_loop()
+        connection.idle_timer = loop.call_later(max(delay, 0.0), self._check_idle_connection, connection)
+
+    def _check_idle_connection(self, connection: ClientConnection):
+        """
+        Close a connection with no activity for two ping intervals
+
+        Activity only moves last_ping; when the timer fires on a connection
+        that has been active since, it is re-armed for the time remaining,
+        so nothing scans the connection table.
+        """
+        connection.idle_timer = None
+        if connection.connection_id not in self.connections:
+            return
 
-                await asyncio.sleep(self.ping_interval)
-
-            except Exception as e:
-                logger.error(f"Error in cleanup task: {str(e)}")
-                await asyncio.sleep(5)
+        idle_limit = self.ping_interval * 2
+        idle_seconds = (datetime.now() - connection.last_ping).total_seconds()
+        if idle_seconds > idle_limit:
+            logger.info(f"Closing idle connection {connection.connection_id}")
+            asyncio.create_task(self._close_connection(connection, 4003, "Connection timeout"))
+        else:
+            self._schedule_idle_check(connection, idle_limit - idle_seconds + 0.001)
 
     async def _redis_subscriber(self):
-        """Background task to handle Redis pub/sub for scaling"""
+        """
+        Background task relaying Redis pub/sub messages from other instances
+
+        Waits on the subscription socket with listen(), so a message is
+        handled as soon as it arrives and an idle instance does no work. If
+        the Redis connection drops, the subscription is re-established with
+        capped exponential backoff; messages published meanwhile are lost,
+        as with any Redis pub/sub.
+        """
         if not self.redis_client:
             return
 
-        try:
-            pubsub = self.redis_client.pubsub()
-            await pubsub.subscribe('user_notifications', 'price_updates', 'system_alerts')
+        retry_delay = self.REDIS_RETRY_DELAY
+        while self.running:
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(*self.REDIS_CHANNELS)
+                retry_delay = self.REDIS_RETRY_DELAY
 
-            while self.running:
-                try:
-                    message = await pubsub.get_message(timeout=1.0)
-                    if message and message['type'] == 'message':
+                async for message in pubsub.listen():
+                    if message['type'] == 'message':
                         await self._handle_redis_message(message)
 
-                except Exception as e:
-                    logger.error(f"Error processing Redis message: {str(e)}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Redis subscriber error, resubscribing in {retry_delay:.1f}s: {str(e)}")
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
 
-        except Exception as e:
-            logger.error(f"Error in Redis subscriber: {str(e)}")
+            if self.running:
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, self.REDIS_MAX_RETRY_DELAY)
 
     async def _handle_redis_message(self, redis_message: Dict):
         """Handle message from Redis pub/sub"""
         try:
-            channel = redis_message['channel'].decode('utf-8')
-            data = json.loads(redis_message['data'].decode('utf-8'))
+            channel = redis_message['channel']
+            if isinstance(channel, bytes):
+                channel = channel.decode('utf-8')
+            data = json.loads(redis_message['data'])
+
+            if data.get('origin') == self.instance_id:
+                # Already delivered locally when it was published
+                return
 
             if channel == 'user_notifications':
                 user_id = data['user_id']
-                message_data = data['message']
-                message = WebSocketMessage(**message_data)
+                message = self._message_from_dict(data['message'])
                 await self.send_to_user(user_id, message)
 
             elif channel == 'price_updates':
@@ -619,6 +861,9 @@ class WebSocketService:
                 priority = NotificationPriority(data.get('priority', 'normal'))
                 await self.send_system_alert(alert_data, priority)
 
+            elif channel == 'progress_resets':
+                self.progress_coalescer.reset(data['user_id'])
+
         except Exception as e:
             logger.error(f"Error handling Redis message: {str(e)}")
 
@@ -631,6 +876,12 @@ class WebSocketService:
                 subscription: len(connections)
                 for subscription, connections in self.subscription_connections.items()
             },
+            'queued_messages': sum(
+                connection.send_queue.qsize() for connection in self.connections.values()
+                if connection.send_queue is not None
+            ),
+            'dropped_messages': sum(connection.dropped_messages for connection in self.connections.values()),
+            'progress_coalescing': self.progress_coalescer.get_stats(),
             'server_running': self.running
         }
 
@@ -642,12 +893,18 @@ async def create_websocket_service(
     redis_url: str = None,
     ping_interval: int = 30,
     ping_timeout: int = 10,
-    max_connections_per_user: int = 5
+    max_connections_per_user: int = 5,
+    send_queue_size: int = 256,
+    send_timeout: float = 10.0,
+    max_dropped_messages: int = 1000,
+    progress_flush_interval: float = 0.25
 ) -> WebSocketService:
     """Factory function to create WebSocketService instance"""
     return WebSocketService(
         host, port, jwt_secret, redis_url,
-        ping_interval, ping_timeout, max_connections_per_user
+        ping_interval, ping_timeout, max_connections_per_user,
+        send_queue_size, send_timeout, max_dropped_messages,
+        progress_flush_interval
     )
 
 def create_jwt_token(user_id: str, secret: str, expires_in_hours: int = 24) -> str:
@@ -684,4 +941,284 @@ def create_notification_message(
         data=notification_data,
         priority=priority,
         expires_at=expires_at
-    )
\ No newline at end of file
+    )
+
+def _percentile(sorted_values: List[float], percent: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(percent / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+async def benchmark_broadcast(
+    clients: int = 2000,
+    broadcasts: int = 20,
+    slow_clients: int = 0,
+    payload_bytes: int = 1024,
+    sequential: bool = False,
+    interval: float = 0.1,
+    host: str = "127.0.0.1",
+    port: int = 8799,
+    timeout: float = 60.0
+) -> Dict[str, Any]:
+    """
+    Broadcast delivery latency to many local websocket clients
+
+    Starts a WebSocketService, connects `clients` readers plus
+    `slow_clients` that never read, and sends `broadcasts` system alerts
+    padded to `payload_bytes`, one every `interval` seconds. Latency is measured per delivery from the
+    broadcast call to the client receiving it. With `sequential=True`
+    each broadcast is instead sent with one json.dumps and awaited send
+    per connection, the way broadcast_to_all used to work. Each client
+    uses a file descriptor on both ends, so raise `ulimit -n` for large runs.
+    """
+    secret = 'benchmark-secret'
+    service = WebSocketService(host=host, port=port, jwt_secret=secret, max_connections_per_user=1)
+    await service.start_server()
+
+    loop = asyncio.get_running_loop()
+    latencies: List[float] = []
+    received = [0]
+    all_received = asyncio.Event()
+    expected = clients * broadcasts
+    sockets = []
+    readers = []
+    connect_slots = asyncio.Semaphore(100)
+    # Random padding so permessage-deflate cannot shrink it and slow clients really back up
+    padding = os.urandom(payload_bytes // 2).hex()
+
+    async def connect(index: int):
+        token = create_jwt_token(f"benchmark-user-{index}", secret)
+        async with connect_slots:
+            return await websockets.connect(f"ws://{host}:{port}/?token={token}", max_queue=None if index < clients else 1)
+
+    async def read(websocket):
+        async for raw in websocket:
+            data = json.loads(raw)
+            if data['type'] == MessageType.ALERT.value:
+                latencies.append(loop.time() - data['data']['sent_at'])
+                received[0] += 1
+                if received[0] >= expected:
+                    all_received.set()
+
+    async def sequential_broadcast(message: WebSocketMessage):
+        for connection in list(service.connections.values()):
+            try:
+                await connection.websocket.send(json.dumps({
+                    'type': message.type.value,
+                    'data': message.data,
+                    'timestamp': message.timestamp.isoformat(),
+                    'message_id': message.message_id,
+                    'priority': message.priority.value
+                }))
+            except websockets.exceptions.ConnectionClosed:
+                pass
+
+    try:
+        sockets = await asyncio.gather(*(connect(index) for index in range(clients + slow_clients)))
+        readers = [asyncio.create_task(read(websocket)) for websocket in sockets[:clients]]
+        while len(service.connections) < clients + slow_clients:
+            await asyncio.sleep(0.01)
+
+        call_seconds = []
+        start = loop.time()
+        for sequence in range(broadcasts):
+            message = WebSocketMessage(
+                type=MessageType.ALERT,
+                data={'sequence': sequence, 'sent_at': loop.time(), 'padding': padding}
+            )
+            call_start = loop.time()
+            if sequential:
+                await asyncio.wait_for(sequential_broadcast(message), timeout)
+            else:
+                await service.broadcast_to_all(message)
+            call_seconds.append(loop.time() - call_start)
+            await asyncio.sleep(max(0.0, interval - (loop.time() - call_start)))
+
+        try:
+            await asyncio.wait_for(all_received.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        total_seconds = loop.time() - start
+    finally:
+        for reader in readers:
+            reader.cancel()
+        await asyncio.gather(*(websocket.close() for websocket in sockets), return_exceptions=True)
+        await service.stop_server()
+
+    latencies.sort()
+    call_seconds.sort()
+    return {
+        'mode': 'sequential' if sequential else 'queued',
+        'clients': clients,
+        'slow_clients': slow_clients,
+        'broadcasts': broadcasts,
+        'delivered': received[0],
+        'expected': expected,
+        'total_seconds': total_seconds,
+        'broadcast_call_p50_ms': _percentile(call_seconds, 50) * 1000,
+        'latency_p50_ms': (_percentile(latencies, 50) or 0) * 1000,
+        'latency_p95_ms': (_percentile(latencies, 95) or 0) * 1000,
+        'latency_p99_ms': (_percentile(latencies, 99) or 0) * 1000,
+        'latency_max_ms': (latencies[-1] if latencies else 0) * 1000
+    }
+
+async def benchmark_redis_relay(
+    messages: int = 500,
+    interval: float = 0.01,
+    idle_seconds: float = 5.0,
+    poll: bool = False,
+    redis_url: str = None,
+    host: str = "127.0.0.1",
+    port: int = 8798,
+    timeout: float = 30.0
+) -> Dict[str, Any]:
+    """
+    End-to-end latency of price updates relayed from Redis to a websocket client
+
+    A client subscribes to one symbol; `messages` updates are published
+    to the price_updates channel, one every `interval` seconds, and
+    latency runs from PUBLISH to the client receiving the update. Before
+    publishing, the event loop thread's CPU time is sampled over
+    `idle_seconds`. With `poll=True` the subscriber is replaced by the
+    former get_message(timeout=1.0) loop. Without `redis_url` a fakeredis
+    TCP server is started in-process; it checks its sockets every 10ms,
+    which adds to both modes.
+    """
+    import socket
+    import threading
+
+    fake_server = None
+    if redis_url is None:
+        from fakeredis import TcpFakeServer
+
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            redis_port = probe.getsockname()[1]
+        fake_server = TcpFakeServer(('127.0.0.1', redis_port))
+        threading.Thread(target=fake_server.serve_forever, daemon=True).start()
+        redis_url = f"redis://127.0.0.1:{redis_port}"
+
+    secret = 'benchmark-secret'
+    service = WebSocketService(host=host, port=port, jwt_secret=secret, redis_url=redis_url)
+
+    async def poll_subscriber():
+        pubsub = service.redis_client.pubsub()
+        await pubsub.subscribe(*service.REDIS_CHANNELS)
+        while service.running:
+            try:
+                message = await pubsub.get_message(timeout=1.0)
+                if message and message['type'] == 'message':
+                    await service._handle_redis_message(message)
+            except Exception as e:
+                logger.error(f"Error processing Redis message: {str(e)}")
+
+    if poll:
+        service._redis_subscriber = poll_subscriber
+
+    publisher = redis.from_url(redis_url)
+    loop = asyncio.get_running_loop()
+    latencies: List[float] = []
+    all_received = asyncio.Event()
+    websocket = None
+    reader = None
+    await service.start_server()
+
+    async def read():
+        async for raw in websocket:
+            data = json.loads(raw)
+            if data['type'] == MessageType.PRICE_UPDATE.value:
+                latencies.append(time.time() - data['data']['sent_at'])
+                if len(latencies) >= messages:
+                    all_received.set()
+
+    try:
+        websocket = await websockets.connect(f"ws://{host}:{port}/?token={create_jwt_token('benchmark-user', secret)}")
+        await websocket.send(json.dumps({'type': MessageType.SUBSCRIBE.value, 'subscription': 'stock_prices:BENCH'}))
+        while not service.subscription_connections.get('stock_prices:BENCH'):
+            await asyncio.sleep(0.01)
+        while (await publisher.pubsub_numsub('price_updates'))[0][1] < 1:
+            await asyncio.sleep(0.01)
+        reader = asyncio.create_task(read())
+
+        cpu_start = time.thread_time()
+        await asyncio.sleep(idle_seconds)
+        idle_cpu = time.thread_time() - cpu_start
+
+        start = loop.time()
+        for sequence in range(messages):
+            await publisher.publish('price_updates', json.dumps({
+                'symbol': 'BENCH',
+                'price_data': {'sequence': sequence, 'sent_at': time.time()}
+            }))
+            await asyncio.sleep(interval)
+        try:
+            await asyncio.wait_for(all_received.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        total_seconds = loop.time() - start
+    finally:
+        if reader:
+            reader.cancel()
+        if websocket:
+            await websocket.close()
+        await service.stop_server()
+        await publisher.aclose()
+        if fake_server:
+            fake_server.shutdown()
+            fake_server.server_close()
+
+    latencies.sort()
+    return {
+        'mode': 'poll' if poll else 'listen',
+        'delivered': len(latencies),
+        'expected': messages,
+        'total_seconds': total_seconds,
+        'idle_cpu_ms_per_second': idle_cpu / idle_seconds * 1000,
+        'latency_p50_ms': (_percentile(latencies, 50) or 0) * 1000,
+        'latency_p95_ms': (_percentile(latencies, 95) or 0) * 1000,
+        'latency_p99_ms': (_percentile(latencies, 99) or 0) * 1000,
+        'latency_max_ms': (latencies[-1] if latencies else 0) * 1000
+    }
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Measure WebSocket broadcast latency against local clients')
+    parser.add_argument('--clients', type=int, default=2000)
+    parser.add_argument('--broadcasts', type=int, default=20)
+    parser.add_argument('--slow-clients', type=int, default=0)
+    parser.add_argument('--payload-bytes', type=int, default=1024)
+    parser.add_argument('--interval', type=float, default=0.1, help='Seconds between broadcasts')
+    parser.add_argument('--sequential', action='store_true', help='Send the old way: one json.dumps and awaited send per connection')
+    parser.add_argument('--port', type=int, default=8799)
+    parser.add_argument('--redis-relay', action='store_true', help='Measure Redis pub/sub relay latency instead of broadcast fan-out')
+    parser.add_argument('--messages', type=int, default=500, help='Updates published in --redis-relay mode')
+    parser.add_argument('--poll', action='store_true', help='Relay with the old get_message(timeout=1.0) polling loop')
+    parser.add_argument('--redis-url', help='Redis to relay through; defaults to an in-process fakeredis server')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.redis_relay:
+        result = asyncio.run(benchmark_redis_relay(
+            messages=args.messages,
+            poll=args.poll,
+            redis_url=args.redis_url,
+            port=args.port
+        ))
+        print(f"{result['mode']}: {result['delivered']}/{result['expected']} relayed in {result['total_seconds']:.2f}s, "
+              f"idle CPU {result['idle_cpu_ms_per_second']:.2f}ms/s")
+    else:
+        result = asyncio.run(benchmark_broadcast(
+            clients=args.clients,
+            broadcasts=args.broadcasts,
+            slow_clients=args.slow_clients,
+            payload_bytes=args.payload_bytes,
+            sequential=args.sequential,
+            interval=args.interval,
+            port=args.port
+        ))
+        print(f"{result['mode']}: {result['delivered']}/{result['expected']} delivered to {result['clients']} clients "
+              f"({result['slow_clients']} slow) in {result['total_seconds']:.2f}s")
+        print(f"broadcast call p50 {result['broadcast_call_p50_ms']:.2f}ms")
+    print(f"latency p50 {result['latency_p50_ms']:.1f}ms  p95 {result['latency_p95_ms']:.1f}ms  "
+          f"p99 {result['latency_p99_ms']:.1f}ms  max {result['latency_max_ms']:.1f}ms")
@@ -3,6 +3,21 @@ Financial Data APIs Integration Package
 Provides unified access to all financial data services for FinClick.AI platform
 """
 
+from .http_session import (
+    HTTPSessionPool,
+    HTTPPoolConfig,
+    get_default_session_pool,
+    close_default_session_pool
+)
+
+from .rate_limiter import (
+    TokenBucketRateLimiter,
+    get_shared_rate_limiter,
+    rate_limiter_key
+)
+
+from .ttl_cache import TTLCache
+
 from .yahoo_finance_service import (
     YahooFinanceService,
     StockData,
@@ -51,6 +66,18 @@ from .fred_service import (
 )
 
 __all__ = [
+    # Shared HTTP session pool
+    'HTTPSessionPool',
+    'HTTPPoolConfig',
+    'get_default_session_pool',
+    'close_default_session_pool',
+
+    # Request throttling and caching
+    'TokenBucketRateLimiter',
+    'get_shared_rate_limiter',
+    'rate_limiter_key',
+    'TTLCache',
+
     # Yahoo Finance
     'YahooFinanceService',
     'StockData',
@@ -14,6 +14,10 @@ from dataclasses import dataclass
 from enum import Enum
 from functools import wraps
 
+from .http_session import HTTPSessionPool, get_default_session_pool
+from .rate_limiter import TokenBucketRateLimiter, get_shared_rate_limiter, rate_limiter_key
+from .ttl_cache import TTLCache
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -167,27 +171,38 @@ def retry_on_error(max_retries: int = 3, delay: float = 1.0):
 class AlphaVantageService:
     """Comprehensive Alpha Vantage API service for FinClick.AI"""
 
-    def __init__(self, api_key: str, rate_limit_delay: float = 12.0):
+    def __init__(
+        self,
+        api_key: str,
+        rate_limit_delay: float = 12.0,
+        session_pool: Optional[HTTPSessionPool] = None,
+        burst: int = 1,
+        cache_size: int = 512,
+        rate_limiter: Optional[TokenBucketRateLimiter] = None
+    ):
         self.api_key = api_key
         self.base_url = "https://www.alphavantage.co/query"
 
-        # Alpha Vantage has strict rate limits: 5 calls per minute for free tier
-        self.rate_limit_delay = rate_limit_delay  # 12 seconds between calls for free tier
-        self.last_request_time = 0
+        # Alpha Vantage has strict rate limits: 5 calls per minute for free tier.
+        # One token every 12 seconds with no burst: a full bucket's tokens come on
+        # top of the refill, so any burst above 1 exceeds 5 calls in the first minute
+        self.rate_limit_delay = rate_limit_delay
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter(
+            rate_limiter_key('alpha_vantage', api_key), rate_limit_delay, burst
+        )
 
-        # Cache for data
-        self._cache = {}
+        # Bounded LRU cache for data
         self._cache_ttl = 300  # 5 minutes cache
+        self._cache = TTLCache(maxsize=cache_size, ttl=self._cache_ttl)
+
+        # Shared keep-alive connection pool (one per process unless injected)
+        self.session_pool = session_pool or get_default_session_pool()
 
         logger.info("Alpha Vantage service initialized")
 
     async def _rate_limit_check(self):
-        """Ensure we don't exceed Alpha Vantage rate limits"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.rate_limit_delay:
-            await asyncio.sleep(self.rate_limit_delay - time_since_last)
-        self.last_request_time = time.time()
+        """Wait for a token from the shared Alpha Vantage rate limiter"""
+        await self.rate_limiter.acquire()
 
     def _get_cache_key(self, params: Dict) -> str:
         """Generate cache key for request"""
@@ -196,60 +211,53 @@ class AlphaVantageService:
 
     def _is_cache_valid(self, cache_key: str) -> bool:
         """Check if cached data is still valid"""
-        if cache_key not in self._cache:
-            return False
-
-        cached_time = self._cache[cache_key]['timestamp']
-        return (time.time() - cached_time) < self._cache_ttl
+        return cache_key in self._cache
 
     def _get_cached_data(self, cache_key: str) -> Optional[Any]:
         """Get cached data if valid"""
-        if self._is_cache_valid(cache_key):
-            return self._cache[cache_key]['data']
-        return None
-
-    def _cache_data(self, cache_key: str, data: Any):
-        """Cache data with timestamp"""
-        self._cache[cache_key] = {
-            'data': data,
-            'timestamp': time.time()
-        }
+        return self._cache.get(cache_key)
+
+    def _cache_data(self, cache_key: str, data: Any, ttl: Optional[float] = None):
+        """Cache data for ttl seconds (service default when None)"""
+        self._cache.set(cache_key, data, ttl)
 
     async def _make_request(self, params: Dict) -> Dict:
         """Make request to Alpha Vantage API"""
-        await self._rate_limit_check()
-
         params['apikey'] = self.api_key
 
-        # Check cache first
+        # Serve cache hits without waiting on the rate limiter
         cache_key = self._get_cache_key(params)
         cached_data = self._get_cached_data(cache_key)
-        if cached_data:
+        if cached_data is not None:
             return cached_data
 
+        await self._rate_limit_check()
+
         headers = {
             'User-Agent': 'FinClick.AI/1.0'
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(self.base_url, params=params, headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
+        session = await self.session_pool.get_session()
+        async with session.get(self.base_url, params=params, headers=headers) as response:
+            if response.status == 200:
+                data = await response.json()
 
-                    # Check for API error messages
-                    if "Error Message" in data:
-                        raise Exception(f"Alpha Vantage API error: {data['Error Message']}")
+                # Check for API error messages
+                if "Error Message" in data:
+                    raise Exception(f"Alpha Vantage API error: {data['Error Message']}")
 
-                    if "Note" in data:
-                        logger.warning(f"Alpha Vantage API note: {data['Note']}")
-                        raise Exception(f"Alpha Vantage rate limit exceeded: {data['Note']}")
+                if "Note" in data:
+                    logger.warning(f"Alpha Vantage API note: {data['Note']}")
+                    # Our bucket is ahead of the provider's window; make later calls wait
+                    self.rate_limiter.drain()
+                    raise Exception(f"Alpha Vantage rate limit exceeded: {data['Note']}")
 
-                    self._cache_data(cache_key, data)
-                    return data
-                else:
-                    error_text = await response.text()
-                    logger.error(f"Alpha Vantage API error {response.status}: {error_text}")
-                    raise Exception(f"Alpha Vantage API error {response.status}: {error_text}")
+                self._cache_data(cache_key, data)
+                return data
+            else:
+                error_text = await response.text()
+                logger.error(f"Alpha Vantage API error {response.status}: {error_text}")
+                raise Exception(f"Alpha Vantage API error {response.status}: {error_text}")
 
     @retry_on_error()
     async def get_time_series_data(
@@ -486,9 +494,6 @@ class AlphaVantageService:
 
                 results[function.value] = result
 
-                # Add delay between requests
-                await asyncio.sleep(self.rate_limit_delay)
-
             except Exception as e:
                 logger.error(f"Failed to get indicator {indicator_config['function'].value}: {str(e)}")
                 results[indicator_config['function'].value] = None
@@ -604,9 +609,14 @@ class AlphaVantageService:
         }
 
 # Utility functions
-async def create_alpha_vantage_service(api_key: str, rate_limit_delay: float = 12.0) -> AlphaVantageService:
+async def create_alpha_vantage_service(
+    api_key: str,
+    rate_limit_delay: float = 12.0,
+    session_pool: Optional[HTTPSessionPool] = None,
+    rate_limiter: Optional[TokenBucketRateLimiter] = None
+) -> AlphaVantageService:
     """Factory function to create AlphaVantageService instance"""
-    return AlphaVantageService(api_key, rate_limit_delay)
+    return AlphaVantageService(api_key, rate_limit_delay, session_pool, rate_limiter=rate_limiter)
 
 def get_recommended_indicators() -> List[Dict]:
     """Get list of recommended technical indicators for analysis"""
@@ -13,6 +13,10 @@ from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 from enum import Enum
 from functools import wraps
+
+from .http_session import HTTPSessionPool, get_default_session_pool
+from .rate_limiter import TokenBucketRateLimiter, get_shared_rate_limiter, rate_limiter_key
+from .ttl_cache import TTLCache
 import xml.etree.ElementTree as ET
 
 # Configure logging
@@ -91,15 +95,30 @@ def retry_on_error(max_retries: int = 3, delay: float = 1.0):
 class FREDService:
     """Comprehensive FRED API service for economic data - FinClick.AI"""
 
-    def __init__(self, api_key: str, rate_limit_delay: float = 0.1):
+    def __init__(
+        self,
+        api_key: str,
+        rate_limit_delay: float = 0.1,
+        session_pool: Optional[HTTPSessionPool] = None,
+        burst: int = 10,
+        cache_size: int = 2048,
+        rate_limiter: Optional[TokenBucketRateLimiter] = None
+    ):
         self.api_key = api_key
         self.base_url = "https://api.stlouisfed.org/fred"
+
+        # Sustained rate of one call per rate_limit_delay, with bursts of up to `burst` calls
         self.rate_limit_delay = rate_limit_delay
-        self.last_request_time = 0
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter(
+            rate_limiter_key('fred', api_key), rate_limit_delay, burst
+        )
 
-        # Cache for data
-        self._cache = {}
+        # Bounded LRU cache for data
         self._cache_ttl = 3600  # 1 hour cache for most economic data
+        self._cache = TTLCache(maxsize=cache_size, ttl=self._cache_ttl)
+
+        # Shared keep-alive connection pool (one per process unless injected)
+        self.session_pool = session_pool or get_default_session_pool()
 
         # Common economic indicators
         self.economic_indicators = {
@@ -161,77 +180,63 @@ class FREDService:
         logger.info("FRED service initialized")
 
     async def _rate_limit_check(self):
-        """Ensure we don't exceed FRED rate limits"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.rate_limit_delay:
-            await asyncio.sleep(self.rate_limit_delay - time_since_last)
-        self.last_request_time = time.time()
+        """Wait for a token from the shared FRED rate limiter"""
+        await self.rate_limiter.acquire()
 
     def _get_cache_key(self, endpoint: str, params: Dict) -> str:
         """Generate cache key for request"""
         param_str = "&".join([f"{k}={v}" for k, v in sorted(params.items())])
         return f"{endpoint}?{param_str}"
 
-    def _is_cache_valid(self, cache_key: str, ttl: int = None) -> bool:
+    def _is_cache_valid(self, cache_key: str) -> bool:
         """Check if cached data is still valid"""
-        if cache_key not in self._cache:
-            return False
+        return cache_key in self._cache
 
-        cached_time = self._cache[cache_key]['timestamp']
-        cache_ttl = ttl or self._cache_ttl
-        return (time.time() - cached_time) < cache_ttl
-
-    def _get_cached_data(self, cache_key: str, ttl: int = None) -> Optional[Any]:
+    def _get_cached_data(self, cache_key: str) -> Optional[Any]:
         """Get cached data if valid"""
-        if self._is_cache_valid(cache_key, ttl):
-            return self._cache[cache_key]['data']
-        return None
-
-    def _cache_data(self, cache_key: str, data: Any):
-        """Cache data with timestamp"""
-        self._cache[cache_key] = {
-            'data': data,
-            'timestamp': time.time()
-        }
+        return self._cache.get(cache_key)
+
+    def _cache_data(self, cache_key: str, data: Any, ttl: Optional[float] = None):
+        """Cache data for ttl seconds (service default when None)"""
+        self._cache.set(cache_key, data, ttl)
 
     async def _make_request(self, endpoint: str, params: Dict = None, cache_ttl: int = None) -> Dict:
         """Make request to FRED API"""
-        await self._rate_limit_check()
-
         if params is None:
             params = {}
 
         params['api_key'] = self.api_key
         params['file_type'] = 'json'
 
-        # Check cache first
+        # Serve cache hits without waiting on the rate limiter
         cache_key = self._get_cache_key(endpoint, params)
-        cached_data = self._get_cached_data(cache_key, cache_ttl)
-        if cached_data:
+        cached_data = self._get_cached_data(cache_key)
+        if cached_data is not None:
             return cached_data
 
+        await self._rate_limit_check()
+
         url = f"{self.base_url}/{endpoint}"
 
         headers = {
             'User-Agent': 'FinClick.AI/1.0'
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params, headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
+        session = await self.session_pool.get_session()
+        async with session.get(url, params=params, headers=headers) as response:
+            if response.status == 200:
+                data = await response.json()
 
-                    # Check for API errors
-                    if 'error_code' in data:
-                        raise Exception(f"FRED API error {data['error_code']}: {data.get('error_message', 'Unknown error')}")
+                # Check for API errors
+                if 'error_code' in data:
+                    raise Exception(f"FRED API error {data['error_code']}: {data.get('error_message', 'Unknown error')}")
 
-                    self._cache_data(cache_key, data)
-                    return data
-                else:
-                    error_text = await response.text()
-                    logger.error(f"FRED API error {response.status}: {error_text}")
-                    raise Exception(f"FRED API error {response.status}: {error_text}")
+                self._cache_data(cache_key, data, cache_ttl)
+                return data
+            else:
+                error_text = await response.text()
+                logger.error(f"FRED API error {response.status}: {error_text}")
+                raise Exception(f"FRED API error {response.status}: {error_text}")
 
     @retry_on_error()
     async def get_series(self, series_id: str) -> FREDSeries:
@@ -453,9 +458,6 @@ class FREDService:
                     logger.warning(f"Unknown indicator: {indicator}")
                     results[indicator] = []
 
-                # Add delay between requests
-                await asyncio.sleep(self.rate_limit_delay)
-
             except Exception as e:
                 logger.error(f"Failed to get data for indicator {indicator}: {str(e)}")
                 results[indicator] = []
@@ -493,8 +495,6 @@ class FREDService:
                     if observations and observations[-1].value is not None:
                         yield_curve[maturity] = observations[-1].value
 
-                    await asyncio.sleep(self.rate_limit_delay)
-
                 except Exception as e:
                     logger.warning(f"Failed to get yield for {maturity}: {str(e)}")
 
@@ -537,8 +537,6 @@ class FREDService:
 
                     calendar_data[indicator] = recent_observations
 
-                    await asyncio.sleep(self.rate_limit_delay)
-
                 except Exception as e:
                     logger.warning(f"Failed to get calendar data for {indicator}: {str(e)}")
 
@@ -606,9 +604,14 @@ class FREDService:
         return self.economic_indicators.copy()
 
 # Utility functions
-async def create_fred_service(api_key: str, rate_limit_delay: float = 0.1) -> FREDService:
+async def create_fred_service(
+    api_key: str,
+    rate_limit_delay: float = 0.1,
+    session_pool: Optional[HTTPSessionPool] = None,
+    rate_limiter: Optional[TokenBucketRateLimiter] = None
+) -> FREDService:
     """Factory function to create FREDService instance"""
-    return FREDService(api_key, rate_limit_delay)
+    return FREDService(api_key, rate_limit_delay, session_pool, rate_limiter=rate_limiter)
 
 def get_recession_indicators() -> List[str]:
     """Get list of key recession indicators"""
@@ -0,0 +1,229 @@
+"""
+HTTP Session Pool Benchmark
+Compares per-request aiohttp sessions with the shared HTTPSessionPool against
+a local stub server that simulates Yahoo Finance, Alpha Vantage, FRED and IEX Cloud
+
+Run from the integrations directory:
+    python -m financial_data.http_benchmark --requests 500 --concurrency 20
+"""
+
+import aiohttp
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+from .http_session import HTTPSessionPool, HTTPPoolConfig
+from .yahoo_finance_service import YahooFinanceService
+from .alpha_vantage_service import AlphaVantageService
+from .fred_service import FREDService
+from .iex_cloud_service import IEXCloudService
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class ProviderStubServer:
+    """Local HTTP server answering with canned payloads for each provider"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.request_count = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def _respond(self, payload: Dict) -> web.Response:
+        self.request_count += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return web.json_response(payload)
+
+    async def _yahoo_quote(self, request: web.Request) -> web.Response:
+        symbol = request.match_info['symbol']
+        return await self._respond({
+            'quoteSummary': {'result': [{
+                'price': {
+                    'regularMarketPrice': {'raw': 101.5},
+                    'regularMarketChange': {'raw': 1.2},
+                    'regularMarketChangePercent': {'raw': 0.012},
+                    'regularMarketVolume': {'raw': 1250000},
+                    'symbol': symbol
+                },
+                'summaryDetail': {'marketCap': {'raw': 2.5e9}, 'trailingPE': {'raw': 18.4}},
+                'defaultKeyStatistics': {'trailingEps': {'raw': 5.51}}
+            }], 'error': None}
+        })
+
+    async def _alpha_vantage_query(self, request: web.Request) -> web.Response:
+        symbol = request.query.get('symbol', 'IBM')
+        return await self._respond({
+            'Global Quote': {
+                '01. symbol': symbol,
+                '05. price': '101.5000',
+                '06. volume': '1250000',
+                '09. change': '1.2000',
+                '10. change percent': '1.2000%'
+            }
+        })
+
+    async def _fred_endpoint(self, request: web.Request) -> web.Response:
+        series_id = request.query.get('series_id', 'GDP')
+        return await self._respond({
+            'observations': [
+                {'date': f'2024-0{month}-01', 'value': str(100 + month), 'series_id': series_id}
+                for month in range(1, 10)
+            ]
+        })
+
+    async def _iex_quote(self, request: web.Request) -> web.Response:
+        symbol = request.match_info['symbol']
+        return await self._respond({
+            'symbol': symbol,
+            'latestPrice': 101.5,
+            'change': 1.2,
+            'changePercent': 0.012,
+            'latestVolume': 1250000
+        })
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/v10/finance/quoteSummary/{symbol}', self._yahoo_quote)
+        app.router.add_get('/query', self._alpha_vantage_query)
+        app.router.add_get('/fred/{endpoint:.*}', self._fred_endpoint)
+        app.router.add_get('/stable/stock/{symbol}/quote', self._iex_quote)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # Resolve the ephemeral port chosen by the OS
+        self.port = self._runner.addresses[0][1]
+        logger.info(f"Provider stub server listening on {self.base_url}")
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> 'ProviderStubServer':
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+def _provider_requests(stub_url: str) -> Dict[str, Tuple[str, Callable[[int], Tuple[str, Dict]]]]:
+    """Provider name -> (service base path, request builder returning (path, params))"""
+    return {
+        'yahoo_finance': ('', lambda i: (f'/v10/finance/quoteSummary/SYM{i}', {'modules': 'price'})),
+        'alpha_vantage': ('/query', lambda i: ('', {'function': 'GLOBAL_QUOTE', 'symbol': f'SYM{i}'})),
+        'fred': ('/fred', lambda i: ('series/observations', {'series_id': f'SERIES{i}'})),
+        'iex_cloud': ('', lambda i: (f'/stable/stock/SYM{i}/quote', {}))
+    }
+
+def _create_services(stub_url: str, pool: HTTPSessionPool) -> Dict[str, Any]:
+    """Services pointed at the stub with rate limiting disabled"""
+    services = {
+        'yahoo_finance': YahooFinanceService(rate_limit_delay=0, session_pool=pool),
+        'alpha_vantage': AlphaVantageService('demo', rate_limit_delay=0, session_pool=pool),
+        'fred': FREDService('demo', rate_limit_delay=0, session_pool=pool),
+        'iex_cloud': IEXCloudService('demo', rate_limit_delay=0, session_pool=pool)
+    }
+    for name, (base_path, _) in _provider_requests(stub_url).items():
+        services[name].base_url = stub_url + base_path
+    return services
+
+async def _call_service(service: Any, name: str, path: str, params: Dict):
+    if name == 'alpha_vantage':
+        return await service._make_request(dict(params))
+    return await service._make_request(path, dict(params))
+
+def _summarise(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'elapsed_seconds': round(elapsed, 4),
+        'requests_per_second': round(len(ordered) / elapsed, 1) if elapsed > 0 else 0.0,
+        'mean_ms': round(statistics.mean(ordered) * 1000, 3),
+        'p50_ms': round(ordered[len(ordered) // 2] * 1000, 3),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3)
+    }
+
+async def _run_mode(
+    call: Callable[[int], Any],
+    request_count: int,
+    concurrency: int
+) -> Dict[str, float]:
+    slots = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        async with slots:
+            start = time.perf_counter()
+            await call(i)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(request_count)])
+    return _summarise(latencies, time.perf_counter() - start)
+
+async def benchmark_session_pooling(
+    request_count: int = 500,
+    concurrency: int = 20,
+    latency: float = 0.0
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Benchmark every provider with a new session per request versus the pool
+
+    Returns provider -> {'per_request_session': stats, 'pooled_session': stats}.
+    Distinct symbols are requested so the services' caches never short-circuit.
+    """
+    results = {}
+    async with ProviderStubServer(latency=latency) as stub:
+        pool = HTTPSessionPool(HTTPPoolConfig(limit_per_host=concurrency))
+        services = _create_services(stub.base_url, pool)
+
+        for name, (base_path, build) in _provider_requests(stub.base_url).items():
+            url_base = stub.base_url + base_path
+
+            async def per_request_session(i: int, build=build, url_base=url_base, name=name):
+                path, params = build(i)
+                url = f"{url_base}/{path}" if name == 'fred' else url_base + path
+                async with aiohttp.ClientSession() as session:
+                    async with session.get(url, params=params) as response:
+                        return await response.json()
+
+            async def pooled_session(i: int, build=build, service=services[name], name=name):
+                path, params = build(i)
+                return await _call_service(service, name, path, params)
+
+            results[name] = {
+                'per_request_session': await _run_mode(per_request_session, request_count, concurrency),
+                'pooled_session': await _run_mode(pooled_session, request_count, concurrency)
+            }
+
+        await pool.close()
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the shared HTTP session pool")
+    parser.add_argument('--requests', type=int, default=500, help="Requests per provider and mode")
+    parser.add_argument('--concurrency', type=int, default=20, help="Concurrent requests in flight")
+    parser.add_argument('--latency', type=float, default=0.0, help="Simulated server latency in seconds")
+    args = parser.parse_args()
+
+    results = asyncio.run(benchmark_session_pooling(args.requests, args.concurrency, args.latency))
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Shared HTTP Session Layer
+Connection-pooled aiohttp client shared by the market-data services of FinClick.AI
+"""
+
+import aiohttp
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+@dataclass
+class HTTPPoolConfig:
+    """Connection pool settings for the shared session"""
+    limit: int = 100  # Total simultaneous connections
+    limit_per_host: int = 10  # Simultaneous connections per provider host
+    ttl_dns_cache: int = 300  # Seconds to cache DNS lookups
+    keepalive_timeout: float = 30.0  # Seconds an idle connection stays open
+    total_timeout: float = 30.0  # Per-request timeout
+    connect_timeout: float = 10.0
+    shutdown_grace: float = 0.25  # Time for SSL transports to close cleanly
+
+class HTTPSessionPool:
+    """
+    Lazily created aiohttp session with a keep-alive connection pool
+
+    A single ClientSession is shared by every service that uses this pool,
+    so repeated calls to the same provider reuse TCP and TLS connections
+    instead of paying for a new handshake per request. The session is bound
+    to the event loop it was created on and is recreated transparently if
+    used from a different loop or after being closed.
+    """
+
+    def __init__(self, config: Optional[HTTPPoolConfig] = None):
+        self.config = config or HTTPPoolConfig()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.config.limit,
+            limit_per_host=self.config.limit_per_host,
+            ttl_dns_cache=self.config.ttl_dns_cache,
+            use_dns_cache=True,
+            keepalive_timeout=self.config.keepalive_timeout,
+            enable_cleanup_closed=True
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=self.config.total_timeout,
+            connect=self.config.connect_timeout
+        )
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it on first use"""
+        loop = asyncio.get_running_loop()
+
+        if self._session is not None and not self._session.closed and self._loop is loop:
+            return self._session
+
+        if self._lock is None or self._loop is not loop:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            if self._session is None or self._session.closed or self._loop is not loop:
+                if self._session is not None and not self._session.closed and self._loop is not loop:
+                    logger.warning("HTTP session used from a new event loop, recreating it")
+                self._session = self._create_session()
+                self._loop = loop
+                logger.info(
+                    f"HTTP session pool opened (limit={self.config.limit}, "
+                    f"per_host={self.config.limit_per_host})"
+                )
+            return self._session
+
+    @property
+    def is_open(self) -> bool:
+        return self._session is not None and not self._session.closed
+
+    async def close(self):
+        """Close pooled connections, letting in-flight TLS shutdowns finish"""
+        session = self._session
+        self._session = None
+        if session is not None and not session.closed:
+            await session.close()
+            # aiohttp closes SSL transports asynchronously; give them a moment
+            await asyncio.sleep(self.config.shutdown_grace)
+            logger.info("HTTP session pool closed")
+
+    async def __aenter__(self) -> 'HTTPSessionPool':
+        await self.get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+# Process-wide pool shared by all market-data services
+_default_pool: Optional[HTTPSessionPool] = None
+
+def get_default_session_pool() -> HTTPSessionPool:
+    """Return the process-wide session pool, creating it on first use"""
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = HTTPSessionPool()
+    return _default_pool
+
+async def close_default_session_pool():
+    """Gracefully close the process-wide session pool (call on shutdown)"""
+    if _default_pool is not None:
+        await _default_pool.close()
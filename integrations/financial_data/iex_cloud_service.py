@@ -14,6 +14,10 @@ from dataclasses import dataclass
 from enum import Enum
 from functools import wraps
 
+from .http_session import HTTPSessionPool, get_default_session_pool
+from .rate_limiter import TokenBucketRateLimiter, get_shared_rate_limiter, rate_limiter_key
+from .ttl_cache import TTLCache
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -92,7 +96,16 @@ def retry_on_error(max_retries: int = 3, delay: float = 1.0):
 class IEXCloudService:
     """Comprehensive IEX Cloud API service for FinClick.AI"""
 
-    def __init__(self, api_token: str, is_sandbox: bool = False, rate_limit_delay: float = 0.1):
+    def __init__(
+        self,
+        api_token: str,
+        is_sandbox: bool = False,
+        rate_limit_delay: float = 0.1,
+        session_pool: Optional[HTTPSessionPool] = None,
+        burst: int = 10,
+        cache_size: int = 2048,
+        rate_limiter: Optional[TokenBucketRateLimiter] = None
+    ):
         self.api_token = api_token
         self.is_sandbox = is_sandbox
 
@@ -101,86 +114,78 @@ class IEXCloudService:
         else:
             self.base_url = "https://cloud.iexapis.com"
 
+        # Sustained rate of one call per rate_limit_delay, with bursts of up to `burst` calls
         self.rate_limit_delay = rate_limit_delay
-        self.last_request_time = 0
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter(
+            rate_limiter_key('iex_cloud', api_token), rate_limit_delay, burst
+        )
 
-        # Cache for data
-        self._cache = {}
+        # Bounded LRU cache for data
         self._cache_ttl = 60  # 1 minute cache for most data
+        self._cache = TTLCache(maxsize=cache_size, ttl=self._cache_ttl)
+
+        # Shared keep-alive connection pool (one per process unless injected)
+        self.session_pool = session_pool or get_default_session_pool()
 
         logger.info(f"IEX Cloud service initialized ({'sandbox' if is_sandbox else 'production'} mode)")
 
     async def _rate_limit_check(self):
-        """Ensure we don't exceed IEX Cloud rate limits"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.rate_limit_delay:
-            await asyncio.sleep(self.rate_limit_delay - time_since_last)
-        self.last_request_time = time.time()
+        """Wait for a token from the shared IEX Cloud rate limiter"""
+        await self.rate_limiter.acquire()
 
     def _get_cache_key(self, endpoint: str, params: Dict) -> str:
         """Generate cache key for request"""
         param_str = "&".join([f"{k}={v}" for k, v in sorted(params.items())])
         return f"{endpoint}?{param_str}"
 
-    def _is_cache_valid(self, cache_key: str, ttl: int = None) -> bool:
+    def _is_cache_valid(self, cache_key: str) -> bool:
         """Check if cached data is still valid"""
-        if cache_key not in self._cache:
-            return False
+        return cache_key in self._cache
 
-        cached_time = self._cache[cache_key]['timestamp']
-        cache_ttl = ttl or self._cache_ttl
-        return (time.time() - cached_time) < cache_ttl
-
-    def _get_cached_data(self, cache_key: str, ttl: int = None) -> Optional[Any]:
+    def _get_cached_data(self, cache_key: str) -> Optional[Any]:
         """Get cached data if valid"""
-        if self._is_cache_valid(cache_key, ttl):
-            return self._cache[cache_key]['data']
-        return None
-
-    def _cache_data(self, cache_key: str, data: Any):
-        """Cache data with timestamp"""
-        self._cache[cache_key] = {
-            'data': data,
-            'timestamp': time.time()
-        }
+        return self._cache.get(cache_key)
+
+    def _cache_data(self, cache_key: str, data: Any, ttl: Optional[float] = None):
+        """Cache data for ttl seconds (service default when None)"""
+        self._cache.set(cache_key, data, ttl)
 
     async def _make_request(self, endpoint: str, params: Dict = None, cache_ttl: int = None) -> Union[Dict, List]:
         """Make request to IEX Cloud API"""
-        await self._rate_limit_check()
-
         if params is None:
             params = {}
 
         params['token'] = self.api_token
 
-        # Check cache first
+        # Serve cache hits without waiting on the rate limiter
         cache_key = self._get_cache_key(endpoint, params)
-        cached_data = self._get_cached_data(cache_key, cache_ttl)
-        if cached_data:
+        cached_data = self._get_cached_data(cache_key)
+        if cached_data is not None:
             return cached_data
 
+        await self._rate_limit_check()
+
         url = f"{self.base_url}{endpoint}"
 
         headers = {
             'User-Agent': 'FinClick.AI/1.0'
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params, headers=headers) as response:
-                if response.status == 200:
-                    content_type = response.headers.get('content-type', '')
-                    if 'application/json' in content_type:
-                        data = await response.json()
-                    else:
-                        data = await response.text()
-
-                    self._cache_data(cache_key, data)
-                    return data
+        session = await self.session_pool.get_session()
+        async with session.get(url, params=params, headers=headers) as response:
+            if response.status == 200:
+                content_type = response.headers.get('content-type', '')
+                if 'application/json' in content_type:
+                    data = await response.json()
                 else:
-                    error_text = await response.text()
-                    logger.error(f"IEX Cloud API error {response.status}: {error_text}")
-                    raise Exception(f"IEX Cloud API error {response.status}: {error_text}")
+                    data = await response.text()
+
+                self._cache_data(cache_key, data, cache_ttl)
+                return data
+            else:
+                error_text = await response.text()
+                logger.error(f"IEX Cloud API error {response.status}: {error_text}")
+                raise Exception(f"IEX Cloud API error {response.status}: {error_text}")
 
     @retry_on_error()
     async def get_quote(self, symbol: str) -> IEXQuote:
@@ -647,10 +652,12 @@ class IEXCloudService:
 async def create_iex_cloud_service(
     api_token: str,
     is_sandbox: bool = False,
-    rate_limit_delay: float = 0.1
+    rate_limit_delay: float = 0.1,
+    session_pool: Optional[HTTPSessionPool] = None,
+    rate_limiter: Optional[TokenBucketRateLimiter] = None
 ) -> IEXCloudService:
     """Factory function to create IEXCloudService instance"""
-    return IEXCloudService(api_token, is_sandbox, rate_limit_delay)
+    return IEXCloudService(api_token, is_sandbox, rate_limit_delay, session_pool, rate_limiter=rate_limiter)
 
 def calculate_financial_ratios(stats: Dict, financials: Dict = None) -> Dict:
     """Calculate additional financial ratios from IEX data"""
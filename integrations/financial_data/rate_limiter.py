@@ -0,0 +1,121 @@
+"""
+Async Token-Bucket Rate Limiter
+Burst-capable request throttling shared by the market-data services of FinClick.AI
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Dict, Optional
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class TokenBucketRateLimiter:
+    """
+    Token bucket refilled at `rate` tokens per second up to `capacity`
+
+    Callers may spend up to `capacity` tokens back to back; after that each
+    call waits only as long as it takes for its token to be refilled, rather
+    than a fixed delay measured from the previous call. Waiters are served in
+    arrival order. A rate of None disables throttling entirely.
+    """
+
+    def __init__(self, rate: Optional[float], capacity: float = 1.0):
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive or None")
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        self.rate = rate
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def from_delay(cls, delay: float, burst: float = 1.0) -> 'TokenBucketRateLimiter':
+        """Build a limiter whose sustained rate is one call per `delay` seconds"""
+        return cls(1.0 / delay if delay and delay > 0 else None, burst)
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate is not None
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+
+    @property
+    def available_tokens(self) -> float:
+        """Tokens that could be spent right now without waiting"""
+        if not self.enabled:
+            return float('inf')
+        self._refill()
+        return self._tokens
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Wait until `tokens` are available and spend them; returns seconds waited"""
+        if not self.enabled:
+            return 0.0
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from a bucket of {self.capacity}")
+
+        async with self._get_lock():
+            self._refill()
+            waited = 0.0
+            if self._tokens < tokens:
+                waited = (tokens - self._tokens) / self.rate
+                await asyncio.sleep(waited)
+                self._refill()
+            self._tokens -= tokens
+            return waited
+
+    def drain(self):
+        """Empty the bucket, e.g. after the provider reports its limit was hit"""
+        if self.enabled:
+            self._refill()
+            self._tokens = min(self._tokens, 0.0)
+
+    async def __aenter__(self) -> 'TokenBucketRateLimiter':
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+# Process-wide limiters, one per provider and credential
+_shared_limiters: Dict[str, TokenBucketRateLimiter] = {}
+
+def rate_limiter_key(provider: str, credential: Optional[str] = None) -> str:
+    """Registry key for a provider account without keeping the raw credential"""
+    if not credential:
+        return provider
+    digest = hashlib.sha256(credential.encode('utf-8')).hexdigest()[:16]
+    return f"{provider}:{digest}"
+
+def get_shared_rate_limiter(key: str, delay: float, burst: float = 1.0) -> TokenBucketRateLimiter:
+    """
+    Return the limiter registered under `key`, creating it on first use
+
+    Every service instance for the same provider account shares one bucket,
+    so creating several service objects does not multiply the request rate.
+    """
+    # Services configured with different limits must not share a bucket
+    registry_key = f"{key}|{delay}|{burst}"
+    limiter = _shared_limiters.get(registry_key)
+    if limiter is None:
+        limiter = TokenBucketRateLimiter.from_delay(delay, burst)
+        _shared_limiters[registry_key] = limiter
+        logger.debug(f"Created rate limiter {key} (rate={limiter.rate}, burst={limiter.capacity})")
+    return limiter
@@ -13,6 +13,10 @@ from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 from enum import Enum
 from functools import wraps
+
+from .http_session import HTTPSessionPool, get_default_session_pool
+from .rate_limiter import TokenBucketRateLimiter, get_shared_rate_limiter, rate_limiter_key
+from .ttl_cache import TTLCache
 import pandas as pd
 
 # Configure logging
@@ -90,24 +94,34 @@ def retry_on_error(max_retries: int = 3, delay: float = 1.0):
 class YahooFinanceService:
     """Comprehensive Yahoo Finance API service for FinClick.AI"""
 
-    def __init__(self, rate_limit_delay: float = 0.5):
+    def __init__(
+        self,
+        rate_limit_delay: float = 0.5,
+        session_pool: Optional[HTTPSessionPool] = None,
+        burst: int = 5,
+        cache_size: int = 1024,
+        rate_limiter: Optional[TokenBucketRateLimiter] = None
+    ):
         self.base_url = "https://query1.finance.yahoo.com"
+
+        # Sustained rate of one call per rate_limit_delay, with bursts of up to `burst` calls
         self.rate_limit_delay = rate_limit_delay
-        self.last_request_time = 0
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter(
+            rate_limiter_key('yahoo_finance'), rate_limit_delay, burst
+        )
 
-        # Cache for frequently accessed data
-        self._cache = {}
+        # Bounded LRU cache for frequently accessed data
         self._cache_ttl = 60  # 1 minute cache
+        self._cache = TTLCache(maxsize=cache_size, ttl=self._cache_ttl)
+
+        # Shared keep-alive connection pool (one per process unless injected)
+        self.session_pool = session_pool or get_default_session_pool()
 
         logger.info("Yahoo Finance service initialized")
 
     async def _rate_limit_check(self):
-        """Ensure we don't exceed Yahoo Finance rate limits"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.rate_limit_delay:
-            await asyncio.sleep(self.rate_limit_delay - time_since_last)
-        self.last_request_time = time.time()
+        """Wait for a token from the shared Yahoo Finance rate limiter"""
+        await self.rate_limiter.acquire()
 
     def _get_cache_key(self, endpoint: str, params: Dict) -> str:
         """Generate cache key for request"""
@@ -116,54 +130,45 @@ class YahooFinanceService:
 
     def _is_cache_valid(self, cache_key: str) -> bool:
         """Check if cached data is still valid"""
-        if cache_key not in self._cache:
-            return False
-
-        cached_time = self._cache[cache_key]['timestamp']
-        return (time.time() - cached_time) < self._cache_ttl
+        return cache_key in self._cache
 
     def _get_cached_data(self, cache_key: str) -> Optional[Any]:
         """Get cached data if valid"""
-        if self._is_cache_valid(cache_key):
-            return self._cache[cache_key]['data']
-        return None
-
-    def _cache_data(self, cache_key: str, data: Any):
-        """Cache data with timestamp"""
-        self._cache[cache_key] = {
-            'data': data,
-            'timestamp': time.time()
-        }
+        return self._cache.get(cache_key)
+
+    def _cache_data(self, cache_key: str, data: Any, ttl: Optional[float] = None):
+        """Cache data for ttl seconds (service default when None)"""
+        self._cache.set(cache_key, data, ttl)
 
     async def _make_request(self, endpoint: str, params: Dict = None) -> Dict:
         """Make request to Yahoo Finance API"""
-        await self._rate_limit_check()
-
         if params is None:
             params = {}
 
-        # Check cache first
+        # Serve cache hits without waiting on the rate limiter
         cache_key = self._get_cache_key(endpoint, params)
         cached_data = self._get_cached_data(cache_key)
-        if cached_data:
+        if cached_data is not None:
             return cached_data
 
+        await self._rate_limit_check()
+
         url = f"{self.base_url}{endpoint}"
 
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params, headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    self._cache_data(cache_key, data)
-                    return data
-                else:
-                    error_text = await response.text()
-                    logger.error(f"Yahoo Finance API error {response.status}: {error_text}")
-                    raise Exception(f"Yahoo Finance API error {response.status}: {error_text}")
+        session = await self.session_pool.get_session()
+        async with session.get(url, params=params, headers=headers) as response:
+            if response.status == 200:
+                data = await response.json()
+                self._cache_data(cache_key, data)
+                return data
+            else:
+                error_text = await response.text()
+                logger.error(f"Yahoo Finance API error {response.status}: {error_text}")
+                raise Exception(f"Yahoo Finance API error {response.status}: {error_text}")
 
     @retry_on_error()
     async def get_quote(self, symbol: str) -> StockData:
@@ -324,10 +329,6 @@ class YahooFinanceService:
                     except Exception as e:
                         logger.warning(f"Failed to parse quote data: {str(e)}")
 
-                # Add delay between chunks
-                if i + chunk_size < len(symbols):
-                    await asyncio.sleep(self.rate_limit_delay)
-
             logger.info(f"Retrieved quotes for {len(all_quotes)} symbols")
             return all_quotes
 
@@ -527,9 +528,13 @@ class YahooFinanceService:
             raise
 
 # Utility functions
-async def create_yahoo_finance_service(rate_limit_delay: float = 0.5) -> YahooFinanceService:
+async def create_yahoo_finance_service(
+    rate_limit_delay: float = 0.5,
+    session_pool: Optional[HTTPSessionPool] = None,
+    rate_limiter: Optional[TokenBucketRateLimiter] = None
+) -> YahooFinanceService:
     """Factory function to create YahooFinanceService instance"""
-    return YahooFinanceService(rate_limit_delay)
+    return YahooFinanceService(rate_limit_delay, session_pool, rate_limiter=rate_limiter)
 
 def calculate_technical_indicators(historical_data: List[Dict]) -> Dict:
     """Calculate basic technical indicators from historical data"""
@@ -7,14 +7,18 @@ import boto3
 import asyncio
 import logging
 import json
+import math
+import os
 import time
 import hashlib
 import mimetypes
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, BinaryIO
-from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Any, BinaryIO
+from dataclasses import dataclass, field, asdict
 from enum import Enum
-from functools import wraps
+from functools import wraps, partial
 import io
 from botocore.exceptions import ClientError, BotoCoreError
 from urllib.parse import urlparse
@@ -66,6 +70,86 @@ class S3PresignedUrl:
     expires_at: datetime
     fields: Optional[Dict] = None  # For POST uploads
 
+# S3 multipart limits: every part but the last must be at least 5MiB, at most 10,000 parts
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PART_SIZE = 5 * 1024 * 1024 * 1024
+MAX_PARTS = 10000
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+TARGET_PART_COUNT = 1000
+
+def choose_part_size(file_size: Optional[int], min_part_size: int = DEFAULT_PART_SIZE, target_parts: int = TARGET_PART_COUNT) -> int:
+    """
+    Part size for a multipart upload of `file_size` bytes
+
+    Small files use `min_part_size` parts so several can upload at once;
+    larger files grow the part size (in whole MiB) to stay near
+    `target_parts` requests, and never exceed S3's 10,000 part limit.
+    """
+    part_size = max(min_part_size, MIN_PART_SIZE)
+    if file_size:
+        part_size = max(part_size, math.ceil(file_size / target_parts), math.ceil(file_size / MAX_PARTS))
+    mib = 1024 * 1024
+    return min(math.ceil(part_size / mib) * mib, MAX_PART_SIZE)
+
+@dataclass
+class MultipartUploadState:
+    """Progress of a resumable multipart upload"""
+    token: str
+    key: str
+    upload_id: str
+    part_size: int
+    file_size: Optional[int] = None
+    parts: Dict[int, str] = field(default_factory=dict)  # part number -> ETag
+    part_hashes: Dict[int, str] = field(default_factory=dict)  # part number -> SHA-256 of its bytes
+    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['parts'] = {str(number): etag for number, etag in self.parts.items()}
+        data['part_hashes'] = {str(number): digest for number, digest in self.part_hashes.items()}
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'MultipartUploadState':
+        data = dict(data)
+        data['parts'] = {int(number): etag for number, etag in data.get('parts', {}).items()}
+        data['part_hashes'] = {int(number): digest for number, digest in data.get('part_hashes', {}).items()}
+        return cls(**data)
+
+class MultipartUploadStateStore:
+    """Stores multipart upload state as one JSON file per upload"""
+
+    def __init__(self, directory: str = None):
+        self.directory = directory or os.path.join(tempfile.gettempdir(), 's3_multipart_uploads')
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, token: str) -> str:
+        return os.path.join(self.directory, f"{hashlib.sha256(token.encode()).hexdigest()}.json")
+
+    def load(self, token: str) -> Optional[MultipartUploadState]:
+        try:
+            with open(self._path(token)) as state_file:
+                return MultipartUploadState.from_dict(json.load(state_file))
+        except FileNotFoundError:
+            return None
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable multipart upload state: {str(e)}")
+            return None
+
+    def save(self, state: MultipartUploadState):
+        path = self._path(state.token)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as state_file:
+            json.dump(state.to_dict(), state_file)
+        # Atomic replace so an interruption never leaves a half-written state file
+        os.replace(temp_path, path)
+
+    def delete(self, token: str):
+        try:
+            os.remove(self._path(token))
+        except FileNotFoundError:
+            pass
+
 def retry_on_aws_error(max_retries: int = 3, delay: float = 1.0):
     """Decorator to retry AWS API calls on specific errors"""
     def decorator(func):
@@ -109,7 +193,10 @@ class AWSS3Service:
         region_name: str = 'us-east-1',
         cloudfront_domain: str = None,
         default_storage_class: StorageClass = StorageClass.STANDARD,
-        default_encryption: ServerSideEncryption = ServerSideEncryption.AES256
+        default_encryption: ServerSideEncryption = ServerSideEncryption.AES256,
+        endpoint_url: str = None,
+        max_upload_concurrency: int = 8,
+        upload_state_dir: str = None
     ):
         self.aws_access_key_id = aws_access_key_id
         self.aws_secret_access_key = aws_secret_access_key
@@ -118,13 +205,16 @@ class AWSS3Service:
         self.cloudfront_domain = cloudfront_domain
         self.default_storage_class = default_storage_class
         self.default_encryption = default_encryption
+        self.endpoint_url = endpoint_url
+        self.max_upload_concurrency = max_upload_concurrency
 
         # Initialize S3 client
         self.s3_client = boto3.client(
             's3',
             aws_access_key_id=aws_access_key_id,
             aws_secret_access_key=aws_secret_access_key,
-            region_name=region_name
+            region_name=region_name,
+            endpoint_url=endpoint_url
         )
 
         # Initialize S3 resource for high-level operations
@@ -132,7 +222,8 @@ class AWSS3Service:
             's3',
             aws_access_key_id=aws_access_key_id,
             aws_secret_access_key=aws_secret_access_key,
-            region_name=region_name
+            region_name=region_name,
+            endpoint_url=endpoint_url
         )
 
         self.bucket = self.s3_resource.Bucket(bucket_name)
@@ -141,6 +232,9 @@ class AWSS3Service:
         self.rate_limit_delay = 0.1  # 100ms between requests
         self.last_request_time = 0
 
+        # Resumable multipart upload state
+        self.upload_state_store = MultipartUploadStateStore(upload_state_dir)
+
         logger.info(f"AWS S3 service initialized for bucket: {bucket_name}")
 
     async def _rate_limit_check(self):
@@ -742,61 +836,261 @@ class AWSS3Service:
             logger.error(f"Failed to abort multipart upload: {str(e)}")
             return False
 
+    def _stream_size(self, file_content: BinaryIO) -> Optional[int]:
+        """Bytes left in a seekable stream, or None if it cannot seek"""
+        try:
+            position = file_content.tell()
+            end = file_content.seek(0, io.SEEK_END)
+            file_content.seek(position)
+            return end - position
+        except (AttributeError, OSError, ValueError):
+            return None
+
+    def _resume_token(self, file_content: BinaryIO, filename: str, prefix: str, user_id: str, file_size: int) -> Optional[str]:
+        """
+        Identify an upload by destination and source file so a retry finds its saved state
+
+        Only streams backed by a file get a token: name and size alone can't
+        tell two in-memory streams apart, so those resume only with an
+        explicit `resume_token`.
+        """
+        try:
+            source = os.fstat(file_content.fileno())
+        except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+            return None
+        return json.dumps([
+            self.bucket_name, prefix, user_id, filename, file_size,
+            source.st_dev, source.st_ino, source.st_mtime_ns
+        ])
+
+    async def _list_uploaded_parts(self, key: str, upload_id: str) -> Optional[Dict[int, Dict[str, Any]]]:
+        """Parts S3 already holds for an upload, or None if the upload no longer exists"""
+        parts = {}
+        marker = 0
+        try:
+            while True:
+                response = self.s3_client.list_parts(
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumberMarker=marker
+                )
+                for part in response.get('Parts', []):
+                    parts[part['PartNumber']] = {'ETag': part['ETag'], 'Size': part['Size']}
+                if not response.get('IsTruncated'):
+                    return parts
+                marker = response['NextPartNumberMarker']
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'NoSuchUpload':
+                return None
+            raise
+
+    async def _resume_multipart_upload(self, token: str, file_size: Optional[int], part_size: int) -> Optional[MultipartUploadState]:
+        """Saved state for an interrupted upload, reconciled with the parts S3 actually has"""
+        state = self.upload_state_store.load(token)
+        if state is None:
+            return None
+
+        if state.file_size != file_size or state.part_size != part_size:
+            logger.info(f"Source changed since multipart upload {state.upload_id} started, starting over")
+            await self.abort_multipart_upload(state.key, state.upload_id)
+            self.upload_state_store.delete(token)
+            return None
+
+        uploaded = await self._list_uploaded_parts(state.key, state.upload_id)
+        if uploaded is None:
+            self.upload_state_store.delete(token)
+            return None
+
+        # Only trust full-size parts whose content was recorded; the last part is cheap to send again
+        state.parts = {
+            number: part['ETag'] for number, part in uploaded.items()
+            if part['Size'] == part_size and number in state.part_hashes
+        }
+        state.part_hashes = {number: state.part_hashes[number] for number in state.parts}
+        logger.info(f"Resuming multipart upload {state.upload_id} for {state.key} with {len(state.parts)} parts done")
+        return state
+
+    @retry_on_aws_error()
+    async def _upload_part_in_executor(
+        self,
+        executor: ThreadPoolExecutor,
+        key: str,
+        upload_id: str,
+        part_number: int,
+        data: bytes
+    ) -> str:
+        """Upload one part on a worker thread and return its ETag"""
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(executor, partial(
+            self.s3_client.upload_part,
+            Bucket=self.bucket_name,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=data
+        ))
+        return response['ETag']
+
     async def upload_large_file(
         self,
         file_content: BinaryIO,
         filename: str,
         prefix: str = None,
         user_id: str = None,
-        chunk_size: int = 100 * 1024 * 1024,  # 100MB chunks
+        chunk_size: int = None,
+        max_concurrency: int = None,
+        resume_token: str = None,
+        progress_callback: Callable[[int, Optional[int]], None] = None,
         **kwargs
     ) -> S3UploadResult:
-        """Upload large file using multipart upload"""
+        """
+        Upload large file using concurrent, resumable multipart upload
+
+        Part size adapts to the file size unless `chunk_size` is given. At
+        most `max_concurrency` parts are read and in flight at once, so
+        memory is bounded by max_concurrency * part size. Completed parts
+        are saved to the upload state store: after an interruption, calling
+        again with the same file and arguments uploads only the missing
+        parts. Streams that are not backed by a file (BytesIO, sockets)
+        resume only when the caller passes the same `resume_token`. Saved
+        parts are re-read and checked against their recorded SHA-256 before
+        being reused, and any that differ are uploaded again. Interrupted uploads are left open
+        for resuming, so the bucket should have a lifecycle rule that aborts
+        incomplete multipart uploads. `progress_callback(bytes_done,
+        total_bytes)` is called as parts finish.
+        """
+        file_size = self._stream_size(file_content)
+        part_size = choose_part_size(file_size, chunk_size or DEFAULT_PART_SIZE)
+        concurrency = max(1, max_concurrency or self.max_upload_concurrency)
+        if resume_token is None and file_size is not None:
+            resume_token = self._resume_token(file_content, filename, prefix, user_id, file_size)
+
+        state = None
         try:
-            key = self._generate_key(filename, prefix, user_id)
-            content_type = self._get_content_type(filename)
-
-            # Create multipart upload
-            upload_id = await self.create_multipart_upload(
-                key=key,
-                content_type=content_type,
-                **kwargs
-            )
-
-            parts = []
-            part_number = 1
-
-            try:
-                while True:
-                    chunk = file_content.read(chunk_size)
-                    if not chunk:
-                        break
-
-                    part_info = await self.upload_part(
-                        key=key,
-                        upload_id=upload_id,
-                        part_number=part_number,
-                        data=chunk
-                    )
-
-                    parts.append(part_info)
-                    part_number += 1
+            if resume_token is not None:
+                state = await self._resume_multipart_upload(resume_token, file_size, part_size)
+
+            if state is None:
+                key = self._generate_key(filename, prefix, user_id)
+                upload_id = await self.create_multipart_upload(
+                    key=key,
+                    content_type=kwargs.pop('content_type', None) or self._get_content_type(filename),
+                    **kwargs
+                )
+                state = MultipartUploadState(
+                    token=resume_token or upload_id,
+                    key=key,
+                    upload_id=upload_id,
+                    part_size=part_size,
+                    file_size=file_size
+                )
+                if resume_token is not None:
+                    self.upload_state_store.save(state)
 
-                # Complete multipart upload
-                return await self.complete_multipart_upload(key, upload_id, parts)
+            await self._upload_parts(file_content, state, concurrency, resume_token is not None, progress_callback)
 
-            except Exception as e:
-                # Abort multipart upload on error
-                await self.abort_multipart_upload(key, upload_id)
-                raise e
+            parts = [{'PartNumber': number, 'ETag': etag} for number, etag in sorted(state.parts.items())]
+            result = await self.complete_multipart_upload(state.key, state.upload_id, parts)
+            if result.success and resume_token is not None:
+                self.upload_state_store.delete(resume_token)
+            return result
 
         except Exception as e:
+            if state is not None and resume_token is None:
+                # Nothing to resume from, so don't leave parts behind
+                await self.abort_multipart_upload(state.key, state.upload_id)
             logger.error(f"Failed to upload large file: {str(e)}")
             return S3UploadResult(
                 success=False,
+                key=state.key if state else None,
                 error_message=str(e)
             )
 
+    async def _upload_parts(
+        self,
+        file_content: BinaryIO,
+        state: MultipartUploadState,
+        concurrency: int,
+        persist: bool,
+        progress_callback: Callable[[int, Optional[int]], None] = None
+    ):
+        """
+        Read the stream part by part, uploading up to `concurrency` parts at a time
+
+        Parts already in `state` are read and compared with their recorded
+        hash; only parts whose bytes still match are skipped.
+        """
+        part_size = state.part_size
+        bytes_done = 0
+        slots = asyncio.Semaphore(concurrency)
+        tasks = set()
+        failure = None
+
+        def part_done(part_number, size, digest, task):
+            nonlocal bytes_done, failure
+            slots.release()
+            tasks.discard(task)
+            if task.cancelled():
+                return
+            if task.exception() is not None:
+                failure = failure or task.exception()
+                return
+            state.parts[part_number] = task.result()
+            if digest is not None:
+                state.part_hashes[part_number] = digest
+            bytes_done += size
+            if persist:
+                self.upload_state_store.save(state)
+            if progress_callback:
+                progress_callback(bytes_done, state.file_size)
+
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='s3-part') as executor:
+            try:
+                part_number = 0
+                while failure is None:
+                    part_number += 1
+                    data = None
+                    if part_number in state.parts:
+                        data = file_content.read(part_size)
+                        if hashlib.sha256(data).hexdigest() == state.part_hashes.get(part_number):
+                            bytes_done += len(data)
+                            continue
+                        logger.info(f"Part {part_number} of {state.key} differs from the saved upload, sending it again")
+                        del state.parts[part_number]
+                        state.part_hashes.pop(part_number, None)
+
+                    # Waiting for a free slot before reading bounds the parts held in memory
+                    await slots.acquire()
+                    if failure is not None:
+                        slots.release()
+                        break
+                    if data is None:
+                        data = file_content.read(part_size)
+                    if not data and part_number > 1:
+                        slots.release()
+                        break
+
+                    digest = hashlib.sha256(data).hexdigest() if persist else None
+                    task = asyncio.ensure_future(self._upload_part_in_executor(
+                        executor, state.key, state.upload_id, part_number, data
+                    ))
+                    tasks.add(task)
+                    task.add_done_callback(partial(part_done, part_number, len(data), digest))
+                    if len(data) < part_size:
+                        break
+
+                if tasks:
+                    await asyncio.wait(set(tasks))
+            finally:
+                for task in list(tasks):
+                    task.cancel()
+                if tasks:
+                    await asyncio.wait(set(tasks))
+
+        if failure is not None:
+            raise failure
+
     def calculate_file_hash(self, file_content: BinaryIO, algorithm: str = 'md5') -> str:
         """Calculate file hash"""
         hash_obj = hashlib.new(algorithm)
@@ -910,7 +1204,10 @@ async def create_aws_s3_service(
     region_name: str = 'us-east-1',
     cloudfront_domain: str = None,
     default_storage_class: StorageClass = StorageClass.STANDARD,
-    default_encryption: ServerSideEncryption = ServerSideEncryption.AES256
+    default_encryption: ServerSideEncryption = ServerSideEncryption.AES256,
+    endpoint_url: str = None,
+    max_upload_concurrency: int = 8,
+    upload_state_dir: str = None
 ) -> AWSS3Service:
     """Factory function to create AWSS3Service instance"""
     return AWSS3Service(
@@ -920,7 +1217,10 @@ async def create_aws_s3_service(
         region_name,
         cloudfront_domain,
         default_storage_class,
-        default_encryption
+        default_encryption,
+        endpoint_url,
+        max_upload_concurrency,
+        upload_state_dir
     )
 
 def create_file_upload_conditions(
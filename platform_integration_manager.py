@@ -35,6 +35,7 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent / "ai-agents"))
 sys.path.append(str(Path(__file__).parent / "financial-engine"))
 sys.path.append(str(Path(__file__).parent / "backend"))
+sys.path.append(str(Path(__file__).parent / "integrations" / "communication"))
 
 # Import platform components
 try:
@@ -43,12 +44,29 @@ try:
 except ImportError as e:
     logging.warning(f"Could not import AI agents or financial engine: {e}")
 
+try:
+    from financial_engine.core.engine import FinancialAnalysisEngine
+    from financial_engine.core.data_models import (
+        AnalysisRequest as EngineAnalysisRequest,
+        CompanyInfo as EngineCompanyInfo,
+        FinancialStatements as EngineFinancialStatements
+    )
+except ImportError as e:
+    logging.warning(f"Could not import streaming financial engine: {e}")
+    FinancialAnalysisEngine = None
+
+try:
+    from update_coalescer import UpdateCoalescer
+except ImportError as e:
+    logging.warning(f"Could not import update coalescer, progress updates will not be coalesced: {e}")
+    UpdateCoalescer = None
+
 # FastAPI and web framework imports
 import uvicorn
 from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 import redis
 import asyncpg
@@ -119,6 +137,11 @@ class PlatformIntegrationManager:
     المنسق الرئيسي لمنصة FinClick.AI بالكامل
     """
 
+    # Updates merged into the per-request progress state sent as deltas
+    COALESCED_UPDATE_TYPES = ("analysis_partial",)
+    # Updates after which a request sends no more progress
+    FINAL_UPDATE_TYPES = ("analysis_completed", "analysis_error")
+
     def __init__(self):
         """Initialize the platform integration manager"""
         self.logger = self._setup_logging()
@@ -147,6 +170,20 @@ class PlatformIntegrationManager:
         # WebSocket connections for real-time updates
         self.websocket_connections: Dict[str, WebSocket] = {}
 
+        # Per-group progress is merged per request and sent as rate-limited deltas
+        self.update_coalescer = None
+        if UpdateCoalescer is not None:
+            # Send errors reach the coalescer, which then resends the full state
+            self.update_coalescer = UpdateCoalescer(
+                self._write_user_update,
+                flush_interval=self.config["realtime"]["update_flush_interval"],
+                message_type="analysis_progress",
+                stream_field="request_id"
+            )
+
+        # Server-sent-event subscribers per analysis request
+        self.analysis_subscribers: Dict[str, List[asyncio.Queue]] = {}
+
     def _setup_logging(self) -> logging.Logger:
         """Setup comprehensive logging"""
         logging.basicConfig(
@@ -223,6 +260,11 @@ class PlatformIntegrationManager:
                 "debug": os.getenv("DEBUG", "false").lower() == "true",
                 "max_concurrent_analyses": int(os.getenv("MAX_CONCURRENT_ANALYSES", "10")),
                 "analysis_timeout_minutes": int(os.getenv("ANALYSIS_TIMEOUT_MINUTES", "30"))
+            },
+
+            # Real-time updates
+            "realtime": {
+                "update_flush_interval": float(os.getenv("REALTIME_UPDATE_FLUSH_INTERVAL", "0.5"))
             }
         }
 
@@ -314,7 +356,8 @@ class PlatformIntegrationManager:
                     for service_name, health in self.service_health.items()
                 },
                 "active_analyses": len(self.active_analyses),
-                "websocket_connections": len(self.websocket_connections)
+                "websocket_connections": len(self.websocket_connections),
+                "update_coalescing": self.update_coalescer.get_stats() if self.update_coalescer else None
             }
 
         # Analysis endpoints
@@ -335,7 +378,8 @@ class PlatformIntegrationManager:
                 return {
                     "request_id": analysis_request.request_id,
                     "status": "queued",
-                    "estimated_completion_time": (datetime.now() + timedelta(minutes=5)).isoformat()
+                    "estimated_completion_time": (datetime.now() + timedelta(minutes=5)).isoformat(),
+                    "stream_url": f"/api/analysis/stream/{analysis_request.request_id}"
                 }
 
             except Exception as e:
@@ -360,12 +404,55 @@ class PlatformIntegrationManager:
                 else:
                     raise HTTPException(status_code=404, detail="Analysis not found")
 
+        # Server-sent events with incremental analysis results
+        @self.fastapi_app.get("/api/analysis/stream/{request_id}")
+        async def stream_analysis(request_id: str):
+            """Stream analysis progress and partial results as server-sent events"""
+            if request_id not in self.active_analyses:
+                result = await self._get_analysis_result_from_db(request_id)
+                if not result:
+                    raise HTTPException(status_code=404, detail="Analysis not found")
+                return StreamingResponse(
+                    iter([self._format_sse({
+                        "type": "analysis_completed",
+                        "request_id": request_id,
+                        "status": result.get("status", "completed")
+                    })]),
+                    media_type="text/event-stream"
+                )
+
+            queue: asyncio.Queue = asyncio.Queue()
+            self.analysis_subscribers.setdefault(request_id, []).append(queue)
+
+            async def event_source():
+                try:
+                    while True:
+                        update = await queue.get()
+                        yield self._format_sse(update)
+                        if update.get("type") in ("analysis_completed", "analysis_error"):
+                            break
+                finally:
+                    subscribers = self.analysis_subscribers.get(request_id, [])
+                    if queue in subscribers:
+                        subscribers.remove(queue)
+                    if not subscribers:
+                        self.analysis_subscribers.pop(request_id, None)
+
+            return StreamingResponse(
+                event_source(),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+
         # WebSocket endpoint for real-time updates
         @self.fastapi_app.websocket("/ws/{user_id}")
         async def websocket_endpoint(websocket: WebSocket, user_id: str):
             """WebSocket endpoint for real-time updates"""
             await websocket.accept()
             self.websocket_connections[user_id] = websocket
+            if self.update_coalescer:
+                # The new socket has seen none of the earlier progress deltas
+                self.update_coalescer.reset(user_id)
 
             try:
                 while True:
@@ -466,8 +553,10 @@ class PlatformIntegrationManager:
     async def _initialize_financial_engine(self) -> None:
         """Initialize financial analysis engine"""
         try:
-            # This would initialize the 180 analysis types
-            self.financial_engine = {}  # Placeholder
+            if FinancialAnalysisEngine is not None:
+                self.financial_engine = FinancialAnalysisEngine()
+            else:
+                self.financial_engine = {}  # Placeholder
             self.logger.info("Financial analysis engine initialized with 180 analysis types")
 
         except Exception as e:
@@ -510,7 +599,7 @@ class PlatformIntegrationManager:
             self.logger.info(f"Processing analysis {request.request_id} for user {request.user_id}")
 
             # Send real-time update
-            await self._send_user_update(request.user_id, {
+            await self._publish_analysis_update(request, {
                 "type": "analysis_started",
                 "request_id": request.request_id,
                 "status": "processing"
@@ -541,7 +630,7 @@ class PlatformIntegrationManager:
             await self._store_analysis_result(response)
 
             # Send completion update
-            await self._send_user_update(request.user_id, {
+            await self._publish_analysis_update(request, {
                 "type": "analysis_completed",
                 "request_id": request.request_id,
                 "status": "completed",
@@ -554,7 +643,7 @@ class PlatformIntegrationManager:
             self.logger.error(f"Analysis {request.request_id} failed: {e}")
 
             # Send error update
-            await self._send_user_update(request.user_id, {
+            await self._publish_analysis_update(request, {
                 "type": "analysis_error",
                 "request_id": request.request_id,
                 "status": "error",
@@ -568,7 +657,9 @@ class PlatformIntegrationManager:
 
     async def _run_comprehensive_analysis(self, request: AnalysisRequest) -> Dict[str, Any]:
         """Run comprehensive analysis using all 180 analysis types"""
-        if self.agent_orchestrator:
+        if self._can_stream_analysis(request):
+            return await self._run_streaming_engine_analysis(request)
+        elif self.agent_orchestrator:
             # Use AI agents for comprehensive analysis
             result = await self.agent_orchestrator.execute_workflow(
                 WorkflowType.COMPREHENSIVE_ANALYSIS,
@@ -592,6 +683,38 @@ class PlatformIntegrationManager:
                 ]
             }
 
+    def _can_stream_analysis(self, request: AnalysisRequest) -> bool:
+        """Whether the request carries statements the streaming engine can analyse"""
+        return (
+            hasattr(self.financial_engine, "stream_comprehensive_analysis")
+            and bool(request.company_data.get("financial_statements"))
+        )
+
+    async def _run_streaming_engine_analysis(self, request: AnalysisRequest) -> Dict[str, Any]:
+        """Run the financial engine, pushing each analysis group's results as it finishes"""
+        company_data = request.company_data
+        engine_request = EngineAnalysisRequest(
+            request_id=request.request_id,
+            user_id=request.user_id,
+            company_info=EngineCompanyInfo(**company_data["company_info"]),
+            financial_statements=[
+                EngineFinancialStatements(**statement)
+                for statement in company_data["financial_statements"]
+            ],
+            selected_analyses=request.analysis_options.get("selected_analyses")
+        )
+
+        result: Dict[str, Any] = {"analysis_type": "comprehensive"}
+        async for event in self.financial_engine.stream_comprehensive_analysis(engine_request):
+            update = event.to_dict()
+            update["type"] = "analysis_partial" if event.event_type != "report" else "analysis_report"
+            await self._publish_analysis_update(request, update)
+
+            if event.report is not None:
+                result.update(update["report"])
+
+        return result
+
     async def _run_quick_analysis(self, request: AnalysisRequest) -> Dict[str, Any]:
         """Run quick analysis for urgent requests"""
         if self.agent_orchestrator:
@@ -644,14 +767,70 @@ class PlatformIntegrationManager:
             }
         }
 
+    async def _publish_analysis_update(self, request: AnalysisRequest, update: Dict[str, Any]) -> None:
+        """Deliver an analysis update to the user's WebSocket and any SSE subscribers"""
+        await self._send_user_update(request.user_id, update)
+        for queue in self.analysis_subscribers.get(request.request_id, []):
+            queue.put_nowait(update)
+
+    @staticmethod
+    def _format_sse(update: Dict[str, Any]) -> str:
+        """Encode an update as a server-sent event"""
+        return f"event: {update.get('type', 'message')}\ndata: {json.dumps(update, default=str)}\n\n"
+
     async def _send_user_update(self, user_id: str, update: Dict[str, Any]) -> None:
-        """Send real-time update to user via WebSocket"""
-        if user_id in self.websocket_connections:
-            try:
-                websocket = self.websocket_connections[user_id]
-                await websocket.send_text(json.dumps(update))
-            except Exception as e:
-                self.logger.error(f"Failed to send update to user {user_id}: {e}")
+        """
+        Send real-time update to user via WebSocket
+
+        Per-group progress is merged into the request's progress state and
+        sent as "analysis_progress" JSON merge-patch deltas, at most once
+        per flush interval. Other updates are sent whole, right after any
+        progress still pending for their request.
+        """
+        request_id = update.get("request_id")
+        if self.update_coalescer is None or request_id is None:
+            await self._deliver_user_update(user_id, update)
+            return
+
+        if update.get("type") in self.COALESCED_UPDATE_TYPES:
+            await self.update_coalescer.submit(user_id, request_id, self._progress_patch(update))
+            return
+
+        await self.update_coalescer.flush(
+            user_id, request_id,
+            close=update.get("type") in self.FINAL_UPDATE_TYPES
+        )
+        await self._deliver_user_update(user_id, update)
+
+    @staticmethod
+    def _progress_patch(update: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge patch adding one streamed group to a request's progress state"""
+        return {
+            "completed_groups": update.get("completed_groups"),
+            "total_groups": update.get("total_groups"),
+            "elapsed_seconds": update.get("elapsed_seconds"),
+            "groups": {
+                update.get("group") or "ungrouped": {
+                    "status": update.get("event_type"),
+                    "from_cache": update.get("from_cache"),
+                    "results": update.get("results"),
+                    "error": update.get("error")
+                }
+            }
+        }
+
+    async def _deliver_user_update(self, user_id: str, update: Dict[str, Any]) -> None:
+        """Write one update to the user's WebSocket, logging failures"""
+        try:
+            await self._write_user_update(user_id, update)
+        except Exception as e:
+            self.logger.error(f"Failed to send update to user {user_id}: {e}")
+
+    async def _write_user_update(self, user_id: str, update: Dict[str, Any]) -> None:
+        """Write one update to the user's WebSocket; raises if the send fails"""
+        websocket = self.websocket_connections.get(user_id)
+        if websocket is not None:
+            await websocket.send_text(json.dumps(update))
 
     async def _store_analysis_result(self, response: AnalysisResponse) -> None:
         """Store analysis result in database"""
@@ -831,6 +1010,7 @@ class PlatformIntegrationManager:
                     "active_analyses": len(self.active_analyses),
                     "websocket_connections": len(self.websocket_connections),
                     "queue_size": self.analysis_queue.qsize(),
+                    "update_coalescing": self.update_coalescer.get_stats() if self.update_coalescer else None,
                     "platform_status": self.platform_status.value,
                     "timestamp": datetime.now().isoformat()
                 }
@@ -919,7 +1099,9 @@ class PlatformIntegrationManager:
         if self.redis_client:
             self.redis_client.close()
 
-        # Close WebSocket connections
+        # Close WebSocket connections, sending any progress still pending
+        if self.update_coalescer:
+            await self.update_coalescer.flush_all()
         for websocket in self.websocket_connections.values():
             await websocket.close()
 